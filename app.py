@@ -1,653 +1,196 @@
-import pyautogui
-import subprocess
-import time
-import os
-import shutil
-from io import BytesIO
-
-from openai import AzureOpenAI
-
-import base64
-import json
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from azure.core.credentials import AzureKeyCredential
-from dotenv import load_dotenv
-
-# Optional: Make sure failsafe is off if your cursor jumps to corner
-pyautogui.FAILSAFE = False
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Get configuration from environment variables
-azure_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-api_version = os.getenv("AZURE_API_VERSION")
-cognitive_services_scope = os.getenv("COGNITIVE_SERVICES_SCOPE")
-cua_model_name = os.getenv("CUA_MODEL_NAME")
-
-token_provider = get_bearer_token_provider(
-    DefaultAzureCredential(), cognitive_services_scope
-)
-
-### client = OpenAI(api_key=config.api_key)
-client = AzureOpenAI(
-    azure_endpoint=azure_endpoint,
-    azure_ad_token_provider=token_provider,
-    api_version=api_version,
-)
-
-
-user_prompt = """
-The image provided as input is a screenshot in Visual Studio Code. 
-A user prompt has been provided to the Agent Mode in the GitHub Copilot chat panel, instructing it to write code based on the prompt.
-Once the code is generated and the copilot agent has finished processing, the "Keep" button will be enabled. Till the time it runs, the "Keep" button will be grayed out.
-
-In your response, please provide the following JSON format:
-{
-    "button": "enabled" or "disabled"
-}
-
-When the 'keep' button is enabled, you must return "enabled" in the response.
-If the button is disabled, return "disabled" in the response.
+"""
+Launch VS Code, set up the project and let GitHub Copilot's Agent mode write code.
+
+The job is read from the environment (PROJECT_FOLDER, DEVELOPER_PROMPT or
+DEVELOPER_PROMPT_FILE, JOB_RESULT_PATH) and can be overridden on the command
+line. The stages themselves live in engine.AutomationSession.
+
+Heavy dependencies (pyautogui, openai, azure.identity, numpy) are imported by
+the stage that first needs them, and the credential and client are created on
+the first model call, so --check-config runs without a display or network.
+
+Usage:
+    python app.py
+    python app.py --project-folder ~/pyauto-gui-samples/project2 --prompt "add a CLI"
+    python app.py --repeat 3 --result-path result.json
+    python app.py --restart
+    python app.py --check-config
+    python app.py --profile-startup
 """
 
+import time
 
-def find_vscode_executable():
-    """Find VS Code executable on Windows"""
-    # Common VS Code installation paths
-    username = os.getenv("USERNAME")
-    common_paths = [
-        # User installation
-        f"C:\\Users\\{username}\\AppData\\Local\\Programs\\Microsoft VS Code\\Code.exe",
-        f"C:\\Users\\{username}\\AppData\\Local\\Programs\\Microsoft VS Code\\bin\\code.cmd",
-        # System-wide installation
-        "C:\\Program Files\\Microsoft VS Code\\Code.exe",
-        "C:\\Program Files\\Microsoft VS Code\\bin\\code.cmd",
-        "C:\\Program Files (x86)\\Microsoft VS Code\\Code.exe",
-        "C:\\Program Files (x86)\\Microsoft VS Code\\bin\\code.cmd",
-        # Insiders version
-        f"C:\\Users\\{username}\\AppData\\Local\\Programs\\Microsoft VS Code Insiders\\Code - Insiders.exe",
-        "C:\\Program Files\\Microsoft VS Code Insiders\\Code - Insiders.exe",
-    ]
-
-    # First, check if 'code' is in PATH
-    code_cmd = shutil.which("code")
-    if code_cmd:
-        return code_cmd
+STARTED_AT = time.monotonic()
 
-    # Check common installation paths
-    for path in common_paths:
-        if os.path.exists(path):
-            return path
+import argparse
+import os
+import sys
 
-    # Try to find VS Code using Windows registry (alternative approach)
-    try:
-        import winreg
+from engine import AutomationConfig, AutomationError, AutomationSession
+from vscode_discovery import VSCodeDiscovery
 
-        # Check user installation registry
-        try:
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                r"Software\Classes\Applications\Code.exe\shell\open\command",
-            )
-            value, _ = winreg.QueryValueEx(key, "")
-            winreg.CloseKey(key)
-            # Extract path from registry value (remove quotes and arguments)
-            if value:
-                path = value.split('"')[1] if '"' in value else value.split()[0]
-                if os.path.exists(path):
-                    return path
-        except:
-            pass
 
-        # Check system installation registry
-        try:
-            key = winreg.OpenKey(
-                winreg.HKEY_LOCAL_MACHINE,
-                r"Software\Classes\Applications\Code.exe\shell\open\command",
-            )
-            value, _ = winreg.QueryValueEx(key, "")
-            winreg.CloseKey(key)
-            if value:
-                path = value.split('"')[1] if '"' in value else value.split()[0]
-                if os.path.exists(path):
-                    return path
-        except:
-            pass
+def load_env_file():
+    """Load .env into the environment; without python-dotenv only real variables are used."""
+    try:
+        from dotenv import load_dotenv
     except ImportError:
-        pass
-
-    return None
-
-
-def take_screenshot_and_convert_to_base64(screenshot_counter):
+        if os.path.exists(".env"):
+            print("⚠️ python-dotenv is not installed, ignoring .env")
+        return
+    load_dotenv()
+
+
+def build_config(args):
+    config = AutomationConfig.from_env()
+    if args.project_folder:
+        config.project_folder = os.path.expanduser(args.project_folder)
+    if args.prompt_file:
+        with open(args.prompt_file, "r", encoding="utf-8") as f:
+            config.developer_prompt = f.read().strip()
+    elif args.prompt:
+        config.developer_prompt = args.prompt
+    if args.restart and config.checkpoint_mode == "resume":
+        config.checkpoint_mode = "record"
+    return config
+
+
+def check_config(config, vscode_path=None):
     """
-    Take a screenshot, convert it to base64, and return the base64 string.
-
-    Args:
-        screenshot_counter (int): The counter for the screenshot for logging purposes
+    Print the resolved job configuration and what is missing, without a display or network.
 
     Returns:
-        str: Base64 encoded screenshot as a string, or None if there was an error
+        int: 0 when the configuration is complete, 1 otherwise
     """
+    problems = []
+    for name, value in (
+        ("AZURE_OPENAI_ENDPOINT", config.azure_endpoint),
+        ("AZURE_API_VERSION", config.api_version),
+        ("CUA_MODEL_NAME", config.cua_model_name),
+    ):
+        if not value:
+            problems.append(f"{name} is not set")
+    if not config.api_key and not config.cognitive_services_scope:
+        problems.append("Set AZURE_OPENAI_API_KEY or COGNITIVE_SERVICES_SCOPE")
+    if not os.path.isdir(config.project_folder):
+        problems.append(f"Project folder {config.project_folder} does not exist")
+
+    install = None if vscode_path else VSCodeDiscovery().find()
+    if not vscode_path and install is None:
+        problems.append("VS Code not found; set VSCODE_PATH or pass --vscode-path")
+
+    auth = "API key" if config.api_key else f"Azure AD ({config.cognitive_services_scope})"
+    print(f"🔧 Endpoint: {config.azure_endpoint} ({config.api_version}), model {config.cua_model_name}")
+    print(f"🔧 Auth: {auth}")
+    print(f"🔧 Project folder: {config.project_folder}")
+    print(f"🔧 VS Code: {vscode_path or (install.describe() if install else 'not found')}")
+    print(f"🔧 Prompt: {config.developer_prompt[:80]}{'...' if len(config.developer_prompt) > 80 else ''}")
+    for problem in problems:
+        print(f"❌ {problem}")
+    if not problems:
+        print("✅ Configuration complete")
+    return 1 if problems else 0
+
+
+def run_session(session, vscode_path, started_at):
     try:
-        # Take screenshot directly in memory
-        screenshot = pyautogui.screenshot()
-
-        # Convert screenshot to base64 directly in memory (no file I/O)
-        img_buffer = BytesIO()
-        screenshot.save(img_buffer, format="PNG")
-        img_buffer.seek(0)
-        base64_image = base64.b64encode(img_buffer.getvalue()).decode()
-
-        print(
-            f"Screenshot {screenshot_counter} captured in memory and converted to base64"
-        )
-        return base64_image
-    except Exception as e:
-        print(f"Error taking screenshot: {e}")
-        return None
-
-
-# Step 1: Launch VS Code with specific folder
-# Construct the full path from home directory
-home_directory = os.path.expanduser("~")
-project_folder = os.path.join(home_directory, "pyauto-gui-samples", "project1")
-print(f"Project folder path: {project_folder}")
-
-vscode_path = find_vscode_executable()
-print(f"DEBUG: Found VS Code path: {vscode_path}")
-
-if vscode_path:
-    print(f"DEBUG: Checking if path exists: {os.path.exists(vscode_path)}")
-    try:
-        # Launch VS Code with the specific project folder
-        subprocess.Popen([vscode_path, project_folder])
-        print(f"Launching VS Code with folder: {project_folder}")
-    except FileNotFoundError as e:
-        print(f"Error launching VS Code: {e}")
-        print("Trying alternative method...")
-        # Try using shell=True for .cmd files
-        if vscode_path.endswith(".cmd"):
-            subprocess.Popen([vscode_path, project_folder], shell=True)
-        else:
-            # Try finding VS Code manually
-            print("Please manually locate your VS Code installation.")
-            manual_path = input(
-                "Enter the full path to Code.exe (or press Enter to skip): "
-            )
-            if manual_path and os.path.exists(manual_path):
-                subprocess.Popen([manual_path, project_folder])
-            else:
-                print("Could not launch VS Code. Exiting.")
-                exit(1)
-else:
-    print(
-        "VS Code not found. Please ensure VS Code is installed and try one of these solutions:"
+        return session.run(vscode_path, started_at=started_at)
+    except AutomationError as e:
+        print(f"Error: {e}")
+        if vscode_path is not None or not sys.stdin.isatty():
+            raise
+
+    # Try finding VS Code manually
+    print("Please manually locate your VS Code installation.")
+    manual_path = input("Enter the full path to Code.exe (or press Enter to skip): ")
+    if manual_path and os.path.exists(manual_path):
+        return session.run(manual_path, started_at=started_at)
+    raise AutomationError("Could not launch VS Code")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--project-folder", help="Project to open (default: PROJECT_FOLDER)")
+    parser.add_argument("--prompt", help="Prompt for Copilot (default: DEVELOPER_PROMPT)")
+    parser.add_argument("--prompt-file", help="File containing the prompt for Copilot")
+    parser.add_argument("--vscode-path", help="VS Code executable (default: auto-detect)")
+    parser.add_argument(
+        "--result-path", help="Write a JSON result here (default: JOB_RESULT_PATH)"
     )
-    print(
-        "1. Add VS Code to PATH by opening VS Code, pressing Ctrl+Shift+P, and running 'Shell Command: Install code command in PATH'"
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Run the job this many times in one process, reusing clients and credentials",
     )
-    print("2. Or manually specify the path to Code.exe in this script")
-
-    # Let's also check what's actually installed
-    print("\nDEBUG: Checking common VS Code paths:")
-    common_debug_paths = [
-        r"C:\Users\{}\AppData\Local\Programs\Microsoft VS Code\Code.exe".format(
-            os.getenv("USERNAME")
-        ),
-        r"C:\Program Files\Microsoft VS Code\Code.exe",
-        r"C:\Program Files (x86)\Microsoft VS Code\Code.exe",
-    ]
-    for path in common_debug_paths:
-        print(f"  {path}: {'EXISTS' if os.path.exists(path) else 'NOT FOUND'}")
-
-    exit(1)
-
-time.sleep(5)  # wait for VS Code to fully load
-
-# Maximize VS Code window to fullscreen
-print("Maximizing VS Code window to fullscreen...")
-try:
-    # Method 1: Use pygetwindow to find and maximize the VS Code window
-    try:
-        import pygetwindow as gw
-
-        # Find VS Code windows
-        vscode_windows = [
-            w
-            for w in gw.getAllWindows()
-            if "Visual Studio Code" in w.title or "Code" in w.title
-        ]
-        target_window = None
-
-        # Find the window with our project
-        for window in vscode_windows:
-            if (
-                "project1" in window.title.lower()
-                or "pyauto-gui-samples" in window.title.lower()
-            ):
-                target_window = window
-                break
-
-        if not target_window and vscode_windows:
-            # Use the most recent VS Code window
-            target_window = vscode_windows[-1]
-
-        if target_window:
-            print(f"Found VS Code window: {target_window.title}")
-            # Activate the window first
-            target_window.activate()
-            time.sleep(1)
-            # Maximize the window
-            target_window.maximize()
-            print("VS Code window maximized to fullscreen")
-            time.sleep(1)
-        else:
-            print("Could not find VS Code window, trying keyboard shortcut method")
-            raise Exception("Window not found")
-
-    except ImportError:
-        print("pygetwindow not available, using keyboard shortcut method")
-        raise Exception("pygetwindow not available")
-
-except:
-    # Fallback method: Use keyboard shortcuts
-    try:
-        print("Using keyboard shortcut to maximize window...")
-        # First ensure VS Code window is focused
-        pyautogui.hotkey("alt", "tab")
-        time.sleep(0.5)
-
-        # Use Windows key + Up arrow to maximize window
-        pyautogui.hotkey("win", "up")
-        time.sleep(1)
-        print("VS Code window maximized using keyboard shortcut")
-
-    except Exception as e:
-        print(f"Could not maximize window: {e}")
-        print("Continuing with current window size...")
-
-# Step 2: Open PowerShell terminal (Ctrl+Shift+`)
-pyautogui.hotkey("ctrl", "shift", "`")
-print("Opened PowerShell terminal")
-time.sleep(2)  # wait for terminal to open
-
-# Step 2.5: Install packages from requirements.txt
-print("Installing packages from requirements.txt...")
-# Read requirements.txt file
-try:
-    project_requirements_path = os.path.join(project_folder, "requirements.txt")
-    if os.path.exists(project_requirements_path):
-        with open(project_requirements_path, "r") as f:
-            requirements = f.read().strip()
-
-        if requirements:
-            # Type the pip install command (PowerShell compatible)
-            pip_command = f"pip install -r requirements.txt"
-            pyautogui.typewrite(pip_command, interval=0.05)
-            pyautogui.press("enter")
-            print(
-                f"Executed: {pip_command}"
-            )  # Use CUA model to intelligently detect installation completion
-            print("Monitoring package installation using CUA model...")
-
-            # Count the number of packages for reference
-            package_count = len(
-                [
-                    line
-                    for line in requirements.split("\n")
-                    if line.strip() and not line.strip().startswith("#")
-                ]
-            )
-            print(f"Installing {package_count} packages...")
-            # Define prompt for CUA model to detect installation completion
-            installation_prompt = """
-The image provided is a screenshot of a PowerShell/Command Prompt terminal window where pip install is running.
-I need to determine if the package installation has completed or is still in progress.
-
-When installation is complete, the terminal will show an empty prompt (like "PS C:\\path>" or "C:\\path>") waiting for the next command.
-When installation is in progress, you'll see output like:
-- "Collecting package_name..."
-- "Downloading..."
-- "Installing collected packages..."
-- "Successfully installed..."
-- Progress bars or percentage indicators
-
-In your response, simply return one of these two words:
-    "complete" - when you see an empty command prompt ready for input
-    "in_progress" - when you see any installation activity or output
-
-Return "complete" when you see an empty command prompt ready for input.
-Return "in_progress" when you see any installation activity or output.
-"""
-
-            installation_complete = False
-            screenshot_counter = 1
-            max_wait_time = 300  # Maximum 5 minutes timeout
-            start_time = time.time()
-
-            # Initial wait to let installation start
-            print("Waiting 1 seconds for installation to begin...")
-            time.sleep(1)
-
-            while (
-                not installation_complete and (time.time() - start_time) < max_wait_time
-            ):
-                print(
-                    f"📸 Taking screenshot {screenshot_counter} to check installation status..."
-                )
-
-                # Take screenshot and convert to base64
-                base64_image = take_screenshot_and_convert_to_base64(screenshot_counter)
-
-                if base64_image is not None:
-                    try:
-                        print(f"🔍 Analyzing screenshot with CUA model...")
-
-                        # Create request to Computer Use Agent model
-                        response = client.responses.create(
-                            model=cua_model_name,
-                            tools=[
-                                {
-                                    "type": "computer_use_preview",
-                                    "display_width": 1920,  # Adjust based on your screen resolution
-                                    "display_height": 1080,
-                                    "environment": "windows",
-                                }
-                            ],
-                            input=[
-                                {
-                                    "type": "message",
-                                    "role": "user",
-                                    "content": [
-                                        {
-                                            "type": "input_text",
-                                            "text": installation_prompt,
-                                        },
-                                        {
-                                            "type": "input_image",
-                                            "image_url": f"data:image/png;base64,{base64_image}",
-                                        },
-                                    ],
-                                }
-                            ],
-                            truncation="auto",
-                        )
-
-                        # Extract the actual text content from the response object
-                        response_text = None
-
-                        # Check if response.output is a list of ResponseOutputMessage objects
-                        if (
-                            hasattr(response.output, "__iter__")
-                            and len(response.output) > 0
-                        ):
-                            # Get the first message in the output
-                            first_message = response.output[0]
-
-                            # Extract text content from the message
-                            if (
-                                hasattr(first_message, "content")
-                                and len(first_message.content) > 0
-                            ):
-                                first_content = first_message.content[0]
-                                if hasattr(first_content, "text"):
-                                    response_text = first_content.text
-                                    # Fallback to string conversion if above doesn't work
-                        if response_text is None:
-                            response_text = str(response.output)
-                            # Try to find JSON content in the response
-                            start_idx = response_text.find("{")
-                            end_idx = response_text.rfind("}") + 1
-
-                            if start_idx != -1 and end_idx > start_idx:
-                                response_text = response_text[start_idx:end_idx]
-
-                        print(
-                            f"🔍 CUA response - pip installation of packages is: {response_text}"
-                        )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Run every stage even if an earlier attempt of this job got further",
+    )
+    parser.add_argument(
+        "--check-config",
+        action="store_true",
+        help="Print the resolved configuration and exit without launching anything",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print an import-time breakdown of startup and of the deferred dependencies",
+    )
+    args = parser.parse_args(argv)
 
-                        # Try to parse as JSON first (for backward compatibility)
-                        try:
-                            response_data = json.loads(response_text)
-                            if "installation_status" in response_data:
-                                status = response_data["installation_status"]
-                            else:
-                                # If JSON doesn't have expected field, treat as string response
-                                status = response_text.strip().lower()
-                        except json.JSONDecodeError:
-                            # If not valid JSON, treat as plain text response
-                            status = response_text.strip().lower()
+    if args.profile_startup:
+        from startup_profile import profile_startup
 
-                        # Check installation status (normalize to lowercase for comparison)
-                        if status == "complete":
-                            print("✅ Package installation detected as COMPLETE!")
-                            installation_complete = True
-                            break
-                        elif status == "in_progress":
-                            print(
-                                "⏳ Installation still in progress, continuing to monitor..."
-                            )
-                        else:
-                            print(f"⚠️ Unexpected status: {status}")
-                            print("Expected 'complete' or 'in_progress'")
+        forwarded = [arg for arg in (sys.argv[1:] if argv is None else argv) if arg != "--profile-startup"]
+        return profile_startup(forwarded)
 
-                    except Exception as e:
-                        print(f"⚠️ Error calling CUA model: {e}")
-                        print("Continuing with monitoring...")
-                else:
-                    print("⚠️ Failed to capture screenshot, skipping this iteration...")
+    # Load environment variables from .env file
+    load_env_file()
 
-                # If installation not complete, wait before next check
-                if not installation_complete:
-                    print("⏸️ Waiting 10 seconds before next check...")
-                    time.sleep(10)
-                    screenshot_counter += 1
+    if args.check_config:
+        return check_config(build_config(args), args.vscode_path)
 
-            if installation_complete:
-                print("🎉 Package installation completed successfully!")
-            else:
-                print(
-                    "⏰ Installation monitoring timed out - assuming installation is complete"
-                )
-                print(f"Waited for {max_wait_time} seconds")
+    session = AutomationSession(build_config(args))
+    result_path = args.result_path or os.getenv("JOB_RESULT_PATH")
 
-            # Brief additional wait to ensure terminal is ready
-            print("Waiting 3 seconds for terminal to be ready...")
-            time.sleep(3)
+    result = None
+    started_at = STARTED_AT
+    for run in range(args.repeat):
+        if args.repeat > 1:
+            print(f"\n▶️ Run {run + 1}/{args.repeat}")
+        try:
+            result = run_session(session, args.vscode_path, started_at)
+        except AutomationError:
+            print("Could not launch VS Code. Exiting.")
+            return 1
 
-        else:
-            print("requirements.txt is empty, skipping package installation")
-    else:
         print(
-            f"requirements.txt not found at {project_requirements_path}, skipping package installation"
+            f"⏱️ Startup to first action: {result.startup_to_first_action:.2f}s "
+            f"({'cold' if run == 0 else 'warm'})"
         )
-
-except Exception as e:
-    print(f"Error reading requirements.txt: {e}")
-
-# Step 3: Open GitHub Copilot panel in Agent mode (Ctrl+Shift+I)
-print("Using CUA model to locate GitHub Copilot chat input area...")
-pyautogui.hotkey("ctrl", "alt", "i")
-time.sleep(3)  # Wait for panel to open
-
-# First, open the Copilot panel to ensure it's visible
-print("opening the Agent mode in the Copilot chat panel with Ctrl+Shift+I")
-pyautogui.hotkey("ctrl", "shift", "i")
-
-time.sleep(3)  # Wait for panel to open
-
-# Step 4: Pass developer prompt
-developer_prompt = """add a python script that calculates the factorial of the first n natural numbers. There is no need to create a python virtual environment. Add the code directly to the project. There is no need to write any test cases for this script. Just write the code that calculates the factorial of the first n natural numbers."""
-
-pyautogui.typewrite(developer_prompt, interval=0.05)
-pyautogui.press("enter")
-print("Prompt sent to Copilot")
-
-# Step 5: Take screenshots and monitor for completion
-print("Starting screenshot capture and monitoring for code generation completion...")
-
-
-max_wait_time = 120  # Maximum 2 minutes wait for code generation
-screenshot_interval = 3  # Take screenshot every 3 seconds
-elapsed_time = 0
-keep_button_found = False
-screenshot_counter = 1
-
-while elapsed_time < max_wait_time and not keep_button_found:
-    time.sleep(screenshot_interval)
-    elapsed_time += screenshot_interval
-
-    # Take screenshot directly in memory and convert to base64
-    try:
-        # Modular function to take screenshot and convert to base64
-        base64_image = take_screenshot_and_convert_to_base64(screenshot_counter)
-
-        if base64_image is not None:
-            # Use Azure OpenAI Computer Use Agent to check if Keep button is enabled
-            try:
-                # Debug: Print what we're sending to the model
-                print(f"🔍 Debug - Sending screenshot to Computer Use Agent model...")
-
-                # Create initial request to Computer Use Agent model
-                response = client.responses.create(
-                    model=cua_model_name,
-                    tools=[
-                        {
-                            "type": "computer_use_preview",
-                            "display_width": 1920,  # Adjust based on your screen resolution
-                            "display_height": 1080,
-                            "environment": "windows",
-                        }
-                    ],
-                    input=[
-                        {
-                            "type": "message",
-                            "role": "user",
-                            "content": [
-                                {"type": "input_text", "text": user_prompt},
-                                {
-                                    "type": "input_image",
-                                    "image_url": f"data:image/png;base64,{base64_image}",
-                                },
-                            ],
-                        }
-                    ],
-                    truncation="auto",
-                )
-                print(f"🔍 Debug - Model response received {response.output}")
-
-                # Extract the actual text content from the response object
-                response_text = None
-
-                # Check if response.output is a list of ResponseOutputMessage objects
-                if hasattr(response.output, "__iter__") and len(response.output) > 0:
-                    # Get the first message in the output
-                    first_message = response.output[0]
-
-                    # Extract text content from the message
-                    if (
-                        hasattr(first_message, "content")
-                        and len(first_message.content) > 0
-                    ):
-                        first_content = first_message.content[0]
-                        if hasattr(first_content, "text"):
-                            response_text = first_content.text
-
-                # Fallback to string conversion if above doesn't work
-                if response_text is None:
-                    response_text = str(response.output)
-                    # Try to find JSON content in the response
-                    start_idx = response_text.find("{")
-                    end_idx = response_text.rfind("}") + 1
-
-                    if start_idx != -1 and end_idx > start_idx:
-                        response_text = response_text[start_idx:end_idx]
-
-                # print(f"🔍 Extracted text: {response_text}")
-
-                # Parse the JSON content
-                response_data = json.loads(response_text)
-                print(f"🔍 Parsed response: {response_data}")
-                # Check if button is enabled
-                if "button" in response_data:
-                    button_status = response_data["button"]
-
-                    if button_status == "enabled":
-                        print("✅ 'Keep' button is ENABLED!")
-
-                        # Press Ctrl+Enter to accept the code (cursor is already in chat input area)
-                        print("⌨️ Pressing Ctrl+Enter to accept the generated code...")
-                        pyautogui.hotkey("ctrl", "enter")
-
-                        keep_button_found = True
-                        print("🎉 Successfully executed Ctrl+Enter to accept the code!")
-                        break
-
-                    elif button_status == "disabled":
-                        print(
-                            "⏳ Keep button is still disabled, continuing to monitor..."
-                        )
-
-                    else:
-                        print(f"⚠️ Unexpected button status: {button_status}")
-                else:
-                    print("⚠️ Response missing expected 'button' field")
-
-            except json.JSONDecodeError as e:
-                print(
-                    f"⚠️ Error parsing JSON response: {e}, continuing to loop through and wait for the 'Keep' button..."
-                )
-                print(f"Raw response: {response.output}")
-            except Exception as e:
-                print(f"⚠️ Error processing model response: {e}")
-
-            except Exception as e:
-                print(f"Error calling Computer Use Agent model: {e}")
-                print("Continuing with screenshot monitoring...")
-        else:
-            print("⚠️ Failed to capture screenshot, skipping this iteration...")
-
-        # If keep button still not found, pause for 5 seconds before next iteration
-        if not keep_button_found:
+        if result.time_to_first_prompt is not None:
             print(
-                "⏸️ Keep button not enabled yet, pausing for 5 seconds before next iteration..."
+                f"⏱️ Time to first prompt: {result.time_to_first_prompt:.2f}s "
+                f"({'warm' if result.warm_start else 'cold'} VS Code start)"
             )
-            time.sleep(5)
-
-        screenshot_counter += 1
-    except Exception as e:
-        print(f"Error saving screenshot: {e}")
-
-    # Progress update every 15 seconds
-    if elapsed_time % 15 == 0:
         print(
-            f"Still monitoring... ({elapsed_time}s elapsed, {screenshot_counter-1} screenshots taken)"
+            "⏱️ Stages: "
+            + ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in result.stage_seconds.items())
         )
+        if result.checkpoint and result.checkpoint["skipped"]:
+            print(
+                f"⏩ Skipped {', '.join(result.checkpoint['skipped'])}, "
+                f"saving about {result.checkpoint['seconds_saved']:.0f}s"
+            )
+        started_at = time.monotonic()
 
-# Handle any errors during the monitoring loop
-try:
-    pass  # Monitoring loop logic is above
-except Exception as e:
-    print(f"Error during monitoring: {e}")
-
-# Final status report
-if keep_button_found:
-    print("\n🎉 SUCCESS: GitHub Copilot has finished generating code!")
-    print("✅ The 'Keep' button was detected as enabled and automatically clicked!")
-    print(f"📊 Total monitoring time: {elapsed_time}s")
-    print(f"📸 Screenshots captured: {screenshot_counter-1}")
-    print("🚀 The generated code should now be accepted in your VS Code editor.")
-else:
-    print(f"\n⏰ Monitoring completed after {max_wait_time}s")
-    print("❓ Keep button status was not definitively detected as enabled")
-    print(f"📸 Screenshots captured: {screenshot_counter-1}")
-    print("💡 You may need to check the GitHub Copilot Chat panel manually")
+    # Machine-readable result for the multi-session orchestrator
+    if result_path:
+        result.write(result_path)
+    return 0
 
-print(f"� Total screenshots processed: {screenshot_counter-1}")
-# Note: Screenshots were processed in memory and sent directly to the API
-# Uncomment the folder creation and saving code above if you want to save screenshots for debugging
 
-# Optional: Move mouse to neutral area
-pyautogui.moveTo(100, 100)
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+import asyncio
+import time
+
+from openai import BadRequestError
+
+from cua_requests import create_cua_response
+from response_decoding import decode_verdict
+from tracing import record_usage, span
+
+
+class MonitorResult:
+    """Outcome of an AsyncScreenMonitor run."""
+
+    def __init__(self, verdict, elapsed, frames_captured, requests_sent, stale_results):
+        self.verdict = verdict
+        self.elapsed = elapsed
+        self.frames_captured = frames_captured
+        self.requests_sent = requests_sent
+        self.stale_results = stale_results
+
+    def summary(self):
+        return (
+            f"verdict={self.verdict} after {self.elapsed:.1f}s, "
+            f"{self.frames_captured} frames captured, {self.requests_sent} CUA requests, "
+            f"{self.stale_results} stale results dropped"
+        )
+
+
+class AsyncScreenMonitor:
+    """
+    Pipelined screenshot monitor built on an async Responses client.
+
+    A new frame is captured every `interval` seconds while earlier frames are
+    still being classified, with at most `max_in_flight` requests outstanding.
+    The first frame classified with one of the `done_verdicts` ends the run;
+    any other result older than one already applied is dropped as stale.
+    """
+
+    def __init__(
+        self,
+        client,
+        model_name,
+        prompt,
+        schema,
+        done_verdicts,
+        capture,
+        encode,
+        interval=1.0,
+        max_in_flight=2,
+        timeout=120,
+        gate=None,
+        local_detector=None,
+        structured_output=True,
+        reask_encode=None,
+        decode_stats=None,
+        budget=None,
+        cache=None,
+        cache_key=None,
+        conversation=None,
+        label="monitor",
+    ):
+        """
+        Args:
+            client (AsyncAzureOpenAI): Async Azure OpenAI client
+            model_name (str): CUA model deployment name
+            prompt (str): Instructions sent with every frame
+            schema (VerdictSchema): Expected field and values; answers are validated with
+                response_decoding.decode_verdict
+            done_verdicts (tuple): Verdicts that end monitoring, e.g. ("enabled",)
+            capture (callable): capture(frame_number) -> PIL image or None (blocking)
+            encode (callable): encode(screenshot) -> EncodedFrame or None (blocking)
+            interval (float): Seconds between captures
+            max_in_flight (int): Maximum concurrent CUA requests
+            timeout (float): Seconds before giving up
+            gate (FrameChangeGate): Optional change-detection gate
+            local_detector (KeepButtonDetector): Optional local detector consulted first
+            structured_output (bool): Constrain answers to the schema via the API
+            reask_encode (callable): reask_encode(screenshot) -> smaller EncodedFrame used to
+                re-ask at once after a malformed answer; None disables re-asking
+            decode_stats (DecodeStats): Optional counters for decoded answers and failures
+            budget (TokenBudget): Optional budget that records usage, stretches the capture
+                interval and stops model calls once it is used up
+            cache (VerdictCache): Optional verdict cache consulted before the model
+            cache_key (callable): cache_key(screenshot) -> key; required with a cache
+            conversation (CheckConversation): Optional conversation that sends `prompt`'s
+                requests, e.g. chained on an anchor; re-asks are always sent in full
+            label (str): Name used in log lines
+        """
+        self.client = client
+        self.model_name = model_name
+        self.prompt = prompt
+        self.schema = schema
+        self.done_verdicts = tuple(done_verdicts)
+        self.capture = capture
+        self.encode = encode
+        self.interval = interval
+        self.max_in_flight = max(1, max_in_flight)
+        self.timeout = timeout
+        self.gate = gate
+        self.local_detector = local_detector
+        self.structured_output = structured_output
+        self.reask_encode = reask_encode
+        self.decode_stats = decode_stats
+        self.budget = budget
+        self.cache = cache
+        self.cache_key = cache_key
+        self.conversation = conversation
+        self.label = label
+
+    def _record(self, check, response):
+        if self.budget is not None:
+            self.budget.record(check, response)
+
+    async def _send(self, check, prompt, frame, text_format):
+        if self.conversation is not None and prompt == self.conversation.prompt:
+            return await self.conversation.create_async(
+                self.client, self.model_name, frame, text_format, record=self._record
+            )
+        response = await create_cua_response(self.client, self.model_name, prompt, frame, text_format)
+        self._record(check, response)
+        return response
+
+    async def _request(self, check, frame_number, prompt, frame):
+        text_format = (
+            self.schema.text_format() if self.structured_output else None
+        )
+        with span("model_call", check=check, frame=frame_number) as current:
+            try:
+                response = await self._send(check, prompt, frame, text_format)
+            except BadRequestError as e:
+                if text_format is None:
+                    raise
+                print(f"⚠️ [{self.label}] Structured output rejected ({e}), falling back to prompt-only JSON")
+                self.structured_output = False
+                response = await self._send(check, prompt, frame, None)
+            record_usage(current, response)
+        return response
+
+    async def _decode(self, frame_number, screenshot, response):
+        """Validate an answer against the schema, re-asking at once if it is malformed."""
+        with span("parse", check=self.label):
+            decoded = decode_verdict(response, self.schema)
+        if (
+            decoded.reaskable
+            and self.reask_encode is not None
+            and screenshot is not None
+            and (self.budget is None or self.budget.allow_call())
+        ):
+            print(f"⚠️ [{self.label}] Malformed answer for frame {frame_number} ({decoded.failure}), re-asking now")
+            if self.decode_stats is not None:
+                self.decode_stats.record_failure(decoded.failure)
+            frame = await asyncio.to_thread(self.reask_encode, screenshot)
+            if frame is not None:
+                response = await self._request(
+                    f"{self.label}_reask", frame_number, self.schema.reask_prompt(), frame
+                )
+                with span("parse", check=self.label):
+                    decoded = decode_verdict(response, self.schema, reasked=True)
+        if self.decode_stats is not None:
+            self.decode_stats.record(decoded)
+        return decoded.verdict
+
+    async def _classify(self, frame_number, frame, key=None, screenshot=None):
+        try:
+            request_start = time.monotonic()
+            response = await self._request(self.label, frame_number, self.prompt, frame)
+            verdict = await self._decode(frame_number, screenshot, response)
+            print(f"🔍 [{self.label}] frame {frame_number} classified as {verdict}")
+            if key is not None and verdict is not None:
+                self.cache.put(key, verdict, time.monotonic() - request_start)
+            return frame_number, verdict
+        except Exception as e:
+            print(f"⚠️ [{self.label}] Error calling CUA model for frame {frame_number}: {e}")
+            return frame_number, None
+
+    async def run(self):
+        """
+        Monitor the screen until a done verdict arrives or the timeout expires.
+
+        Returns:
+            MonitorResult: The final verdict (None on timeout) and run counters
+        """
+        start_time = time.monotonic()
+        next_capture = start_time
+        pending = set()
+        frame_number = 0
+        last_sent = 0
+        latest_applied = 0
+        requests_sent = 0
+        stale_results = 0
+
+        def finish(verdict):
+            for task in pending:
+                task.cancel()
+            return MonitorResult(
+                verdict,
+                time.monotonic() - start_time,
+                frame_number,
+                requests_sent,
+                stale_results,
+            )
+
+        while time.monotonic() - start_time < self.timeout:
+            now = time.monotonic()
+
+            if now >= next_capture and len(pending) < self.max_in_flight:
+                frame_number += 1
+                next_capture = now + self.interval * (
+                    self.budget.poll_slowdown if self.budget is not None else 1.0
+                )
+                screenshot = await asyncio.to_thread(self.capture, frame_number)
+
+                if screenshot is not None:
+                    local_verdict = None
+                    if self.local_detector is not None:
+                        local_verdict = self.local_detector.detect(screenshot)
+
+                    if local_verdict is not None:
+                        print(f"🧮 [{self.label}] Local detector: {local_verdict} (no model call)")
+                        if local_verdict in self.done_verdicts:
+                            return finish(local_verdict)
+                    elif self.gate is not None and not self.gate.should_send(screenshot):
+                        print(f"🟰 [{self.label}] Frame {frame_number} unchanged, skipping")
+                    else:
+                        key = None
+                        cached_verdict = None
+                        if self.cache is not None:
+                            key = self.cache_key(screenshot)
+                            cached_verdict = self.cache.get(key)
+
+                        if cached_verdict is not None:
+                            print(f"💾 [{self.label}] Cached verdict: {cached_verdict} (no model call)")
+                            if cached_verdict in self.done_verdicts:
+                                return finish(cached_verdict)
+                            latest_applied = frame_number
+                            if self.gate is not None:
+                                self.gate.record_verdict(cached_verdict)
+                            continue
+
+                        if self.budget is not None and not self.budget.allow_call():
+                            print(f"💸 [{self.label}] Model budget used up, relying on local detection only")
+                            continue
+
+                        frame = await asyncio.to_thread(self.encode, screenshot)
+                        if frame is not None:
+                            pending.add(
+                                asyncio.create_task(
+                                    self._classify(frame_number, frame, key, screenshot)
+                                )
+                            )
+                            last_sent = frame_number
+                            requests_sent += 1
+
+            # Wait for the next capture slot, or for a request to free up a slot
+            remaining = self.timeout - (time.monotonic() - start_time)
+            if len(pending) >= self.max_in_flight:
+                wait_for = remaining
+            else:
+                wait_for = min(remaining, max(0.0, next_capture - time.monotonic()))
+
+            if not pending:
+                await asyncio.sleep(max(0.0, wait_for))
+                continue
+
+            done, pending = await asyncio.wait(
+                pending, timeout=max(0.0, wait_for), return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                result_frame, verdict = task.result()
+                if verdict in self.done_verdicts:
+                    return finish(verdict)
+                if verdict is None:
+                    continue
+                if result_frame < latest_applied:
+                    stale_results += 1
+                    continue
+                latest_applied = result_frame
+                if self.gate is not None and result_frame == last_sent:
+                    self.gate.record_verdict(verdict)
+
+        return finish(None)
@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+import time
+
+# Directory for state that persists between automation runs (learned timings, caches)
+DEFAULT_STATE_DIR = os.path.join(os.path.expanduser("~"), ".cua-vscode-automation")
+
+
+def state_path(*parts):
+    """
+    Return a path inside the automation state directory, creating the directory.
+
+    The directory defaults to ~/.cua-vscode-automation and can be moved with the
+    AUTOMATION_STATE_DIR environment variable.
+
+    Args:
+        *parts (str): Path components below the state directory
+
+    Returns:
+        str: The full path
+    """
+    state_dir = os.getenv("AUTOMATION_STATE_DIR") or DEFAULT_STATE_DIR
+    path = os.path.join(state_dir, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def process_alive(pid):
+    """Return True if a process with this PID is running."""
+    if sys.platform == "win32":
+        import ctypes
+
+        # os.kill(pid, 0) would send CTRL_C_EVENT on Windows, so ask the kernel instead
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        handle = ctypes.windll.kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            ctypes.windll.kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            return exit_code.value == STILL_ACTIVE
+        finally:
+            ctypes.windll.kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def lock_abandoned(lock_path, timeout):
+    """
+    Whether a lock file taken with write_lock_owner belongs to a process that has exited.
+
+    A lock without a readable owner (not written yet, or from an older
+    version) counts as abandoned once it is older than `timeout` seconds.
+
+    Args:
+        lock_path (str): The lock file
+        timeout (float): Age in seconds after which an ownerless lock is abandoned
+
+    Returns:
+        bool: True if the lock can be broken
+    """
+    try:
+        with open(lock_path, "r") as f:
+            owner = json.load(f)
+        return not process_alive(int(owner["pid"]))
+    except FileNotFoundError:
+        # Released in the meantime; try to take it again
+        return False
+    except (OSError, ValueError, KeyError, TypeError):
+        try:
+            return time.time() - os.path.getmtime(lock_path) > timeout
+        except OSError:
+            return False
+
+
+def write_lock_owner(fd):
+    """Record this process as the owner of a lock file just created with O_CREAT | O_EXCL."""
+    with os.fdopen(fd, "w") as f:
+        json.dump({"pid": os.getpid(), "created": time.time()}, f)
+
+
+def remove_lock(lock_path):
+    try:
+        os.remove(lock_path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,105 @@
+"""
+Compare the serial Keep-button loop with the pipelined async monitor.
+
+Both run against the local mock Responses endpoint with a configurable model
+latency and a fake screen that turns "enabled" after --complete-after seconds.
+Detection lag is the time between the fake screen completing and the monitor
+returning its verdict.
+
+Usage:
+    python -m benchmarks.bench_async_monitor --latency 2.5 --complete-after 10
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from openai import AsyncAzureOpenAI, AzureOpenAI
+
+from async_monitor import AsyncScreenMonitor
+from benchmarks.mock_responses_server import FakeScreen, MockResponsesServer
+from cua_requests import create_cua_response
+from response_decoding import VerdictSchema, decode_verdict
+from screen_capture import CaptureSettings, encode_frame
+
+API_VERSION = "2025-03-01-preview"
+MODEL_NAME = "computer-use-preview"
+PROMPT = 'Is the Keep button enabled? Answer {"button": "enabled"} or {"button": "disabled"}.'
+SCHEMA = VerdictSchema("keep_button", "button", ("enabled", "disabled"))
+SETTINGS = CaptureSettings()
+
+
+def run_serial(server_url, screen, interval, pause, timeout):
+    """Replicate app.py's loop: sleep, capture, classify, pause, repeat."""
+    client = AzureOpenAI(api_key="mock", azure_endpoint=server_url, api_version=API_VERSION)
+    requests_sent = 0
+    start_time = time.monotonic()
+    while time.monotonic() - start_time < timeout:
+        time.sleep(interval)
+        frame = encode_frame(screen.capture(), SETTINGS)
+        response = create_cua_response(client, MODEL_NAME, PROMPT, frame)
+        requests_sent += 1
+        if decode_verdict(response, SCHEMA).verdict == "enabled":
+            return time.monotonic(), requests_sent
+        time.sleep(pause)
+    return None, requests_sent
+
+
+def run_async(server_url, screen, interval, max_in_flight, timeout):
+    client = AsyncAzureOpenAI(
+        api_key="mock", azure_endpoint=server_url, api_version=API_VERSION
+    )
+    monitor = AsyncScreenMonitor(
+        client,
+        MODEL_NAME,
+        PROMPT,
+        SCHEMA,
+        ("enabled",),
+        capture=screen.capture,
+        encode=lambda screenshot: encode_frame(screenshot, SETTINGS),
+        interval=interval,
+        max_in_flight=max_in_flight,
+        timeout=timeout,
+        structured_output=False,
+        label=f"async x{max_in_flight}",
+    )
+    result = asyncio.run(monitor.run())
+    detected_at = time.monotonic() if result.verdict == "enabled" else None
+    return detected_at, result.requests_sent
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=2.5, help="Mock model latency (s)")
+    parser.add_argument("--complete-after", type=float, default=10.0)
+    parser.add_argument("--interval", type=float, default=1.0, help="Async capture interval")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args(argv)
+
+    rows = []
+    with MockResponsesServer(latency=args.latency) as server:
+        screen = FakeScreen(args.complete_after).start()
+        detected_at, requests_sent = run_serial(server.url, screen, 3, 5, args.timeout)
+        rows.append(("serial (3s + 5s pause)", screen, detected_at, requests_sent))
+
+        for max_in_flight in (1, 2, 4):
+            screen = FakeScreen(args.complete_after).start()
+            detected_at, requests_sent = run_async(
+                server.url, screen, args.interval, max_in_flight, args.timeout
+            )
+            rows.append((f"async, {max_in_flight} in flight", screen, detected_at, requests_sent))
+
+    print(
+        f"\n📊 Detection lag with {args.latency}s model latency, "
+        f"completion at {args.complete_after}s"
+    )
+    print(f"{'monitor':<26} {'lag s':>8} {'requests':>9} {'frames':>7}")
+    for name, screen, detected_at, requests_sent in rows:
+        lag = f"{detected_at - screen.completed_at:.2f}" if detected_at else "timeout"
+        print(f"{name:<26} {lag:>8} {requests_sent:>9} {screen.frames_captured:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
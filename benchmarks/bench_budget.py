@@ -0,0 +1,192 @@
+"""
+Show how a token budget caps and degrades the Keep-button loop on slow and stuck jobs.
+
+Each job runs AutomationSession.await_completion on a virtual clock against a
+synthetic VS Code screen (see bench_replay.synthetic_frame) and a simulated
+model that answers correctly and reports `usage` like the Responses API:
+image tokens follow the tile rule for high-detail images (85 + 170 per
+512-pixel tile), so smaller crops cost fewer tokens. A "slow" job enables the
+Keep button late, a "stuck" job never does and runs into the timeout.
+
+Budgets compared:
+    uncapped   usage is only accounted for
+    job cap    --job-tokens per job
+    hour cap   --hour-tokens shared by all jobs through one ledger
+
+Reported per job: whether the button was found, calls, tokens, the level the
+budget ended at, model calls skipped once the budget was used up, and spend
+per check. The local detector is left uncalibrated here, so once a cap is
+reached a job whose Keep button only the model can recognise runs into its
+timeout: a cap bounds what a stuck job costs, not whether a job succeeds.
+
+Usage:
+    python -m benchmarks.bench_budget
+    python -m benchmarks.bench_budget --job-tokens 5000 --hour-tokens 40000 --jobs slow,stuck,slow
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+from benchmarks.bench_replay import MODEL_NAME, SCREEN_SIZE, synthetic_frame
+from benchmarks.mock_responses_server import image_tokens
+from budget import TokenBudget
+from engine import AutomationConfig, AutomationSession
+from keep_detector import KeepButtonDetector
+from poll_scheduler import DurationHistory
+from replay import VirtualClock, make_response
+
+JOBS = {"slow": 90.0, "stuck": float("inf")}
+BUDGETS = ("uncapped", "job cap", "hour cap")
+
+
+class SyntheticDesktop:
+    """Serves synthetic_frame() for the virtual time; stands in for pyautogui."""
+
+    def __init__(self, clock, complete_after):
+        self.clock = clock
+        self.complete_after = complete_after
+        self.accepted = False
+
+    def screenshot(self):
+        return synthetic_frame(self.clock.now, self.complete_after)
+
+    def hotkey(self, *keys):
+        if keys == ("ctrl", "enter"):
+            self.accepted = True
+
+    def press(self, key):
+        pass
+
+    def write(self, text, interval=0.0):
+        pass
+
+    def moveTo(self, x, y, *args, **kwargs):
+        pass
+
+
+class SimulatedResponses:
+    """client.responses.create that answers the Keep check correctly and reports usage."""
+
+    def __init__(self, desktop, sleep, latency):
+        self.desktop = desktop
+        self.sleep = sleep
+        self.latency = latency
+
+    def create(self, **kwargs):
+        tool = kwargs["tools"][0]
+        prompt = kwargs["input"][0]["content"][0]["text"]
+        self.sleep(self.latency)
+        verdict = "enabled" if self.desktop.clock.now >= self.desktop.complete_after else "disabled"
+        return make_response(
+            f'{{"button": "{verdict}"}}',
+            {
+                "input_tokens": len(prompt) // 4 + image_tokens(tool["display_width"], tool["display_height"]),
+                "output_tokens": 12,
+            },
+        )
+
+
+class SimulatedClients:
+    """Drop-in for engine.CuaClients with a simulated sync client."""
+
+    def __init__(self, desktop, sleep, latency):
+        self.client = SimpleNamespace(responses=SimulatedResponses(desktop, sleep, latency))
+
+    def warm_up(self):
+        return self.client
+
+
+def run_job(complete_after, budget, history_path, timeout, latency, verbose):
+    clock = VirtualClock()
+    desktop = SyntheticDesktop(clock, complete_after)
+    config = AutomationConfig(
+        cua_model_name=MODEL_NAME, project_folder="/work/hello-project", generation_timeout=timeout
+    )
+    session = AutomationSession(
+        config,
+        clients=SimulatedClients(desktop, clock.sleep, latency),
+        desktop=desktop,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    session.recorder = None
+    # No learned durations, so every budget sees the same polling schedule
+    session.poll_history = DurationHistory(history_path)
+    session.verdict_cache = None
+    # The detector is uncalibrated for the synthetic button and never decides on its own
+    session.keep_button_detector = KeepButtonDetector(region=None)
+    session.budget = budget
+    budget.start_job()
+
+    output = sys.stdout if verbose else io.StringIO()
+    with contextlib.redirect_stdout(output):
+        found = session._timed("await_completion", session.await_completion)
+    return found, budget.metrics(), clock.now
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", default="slow,stuck,slow", help=f"Jobs to run in order: {', '.join(JOBS)}")
+    parser.add_argument("--timeout", type=float, default=150.0, help="Generation timeout per job (s)")
+    parser.add_argument("--latency", type=float, default=1.5, help="Model latency (s)")
+    parser.add_argument("--job-tokens", type=int, default=8000, help="BUDGET_JOB_TOKENS for 'job cap'")
+    parser.add_argument("--hour-tokens", type=int, default=25000, help="BUDGET_HOUR_TOKENS for 'hour cap'")
+    parser.add_argument("--input-price", type=float, default=2.5, help="US dollars per million input tokens")
+    parser.add_argument("--output-price", type=float, default=10.0, help="US dollars per million output tokens")
+    parser.add_argument("--verbose", action="store_true", help="Show the engine's log lines")
+    args = parser.parse_args(argv)
+
+    os.environ.pop("RECORD_DIR", None)
+    workdir = tempfile.mkdtemp(prefix="cua-budget-")
+    prices = {"input_price": args.input_price, "output_price": args.output_price}
+
+    print(f"\n📊 Keep-button loop under token budgets ({SCREEN_SIZE[0]}x{SCREEN_SIZE[1]} screen, virtual clock)")
+    print(
+        f"{'budget':<9} {'job':<6} {'found':>5} {'seconds':>8} {'calls':>6} {'tokens':>7} "
+        f"{'cost $':>7} {'skipped':>8}  {'ended at':<21} checks"
+    )
+    for name in BUDGETS:
+        if name == "uncapped":
+            budget = TokenBudget(**prices)
+        elif name == "job cap":
+            budget = TokenBudget(job_tokens=args.job_tokens, **prices)
+        else:
+            # Jobs run one after another on the virtual clock; the ledger shares their hour
+            hour_clock = VirtualClock()
+            budget = TokenBudget(
+                hour_tokens=args.hour_tokens,
+                ledger_path=os.path.join(workdir, "budget_ledger.jsonl"),
+                clock=hour_clock,
+                **prices,
+            )
+        totals = [0, 0, 0.0]
+        for index, job in enumerate(args.jobs.split(",")):
+            history_path = os.path.join(workdir, f"history_{name.replace(' ', '_')}_{index}.json")
+            found, metrics, seconds = run_job(
+                JOBS[job], budget, history_path, args.timeout, args.latency, args.verbose
+            )
+            if name == "hour cap":
+                hour_clock.sleep(seconds)
+            spend = metrics["job"]
+            totals[0] += spend["calls"]
+            totals[1] += spend["input_tokens"] + spend["output_tokens"]
+            totals[2] += spend["cost_usd"] or 0.0
+            checks = ", ".join(
+                f"{check} {check_spend['calls']}" for check, check_spend in metrics["checks"].items()
+            )
+            print(
+                f"{name:<9} {job:<6} {'yes' if found else 'no':>5} {seconds:>8.1f} {spend['calls']:>6} "
+                f"{spend['input_tokens'] + spend['output_tokens']:>7} {spend['cost_usd'] or 0.0:>7.4f} "
+                f"{metrics['calls_skipped']:>8}  {metrics['level']:<21} {checks or '-'}"
+            )
+        print(f"{name:<9} {'total':<6} {'':>5} {'':>8} {totals[0]:>6} {totals[1]:>7} {totals[2]:>7.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Compare on-demand screenshots with the background capture thread and frame ring.
+
+Each mode polls a synthetic 1920x1080 screen --ticks times, --tick-interval
+seconds apart, like the monitoring loops. Every tick checks whether the frame
+changed (from an 8x-downscaled thumbnail) and every --encode-every ticks the
+Copilot panel is encoded for the model:
+
+    original   screenshot, PNG of the full frame, base64 and a data URL on
+               every tick (the original take_screenshot_and_convert_to_base64)
+    direct     screenshot as a PIL image on the polling thread; encode on demand
+    ring-pil   capture thread with the PIL backend; the loop reads the ring
+    ring-raw   capture thread with a raw BGRA backend (as mss provides); the
+               change check reads the ring's memoryview through numpy
+
+Each mode runs in its own process so its peak RSS can be compared. Reported:
+capture fps (frames the thread captured per second; polls per second for the
+on-demand modes), ms of work per tick on the polling thread, PIL images and
+Python bytes allocated per tick (Pillow's arena counters and tracemalloc's
+per-tick peak; both include the capture thread's own work), and peak RSS.
+
+Usage:
+    python -m benchmarks.bench_capture
+    python -m benchmarks.bench_capture --fps 0 --ticks 60 --encode-every 3
+"""
+
+import argparse
+import base64
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from capture_thread import CaptureThread, PilBackend
+from screen_capture import CaptureSettings, encode_frame
+from screen_regions import COPILOT_CHAT_REGION
+
+SCREEN_SIZE = (1920, 1080)
+MODES = ("original", "direct", "ring-pil", "ring-raw")
+SETTINGS = CaptureSettings(region=COPILOT_CHAT_REGION)
+
+
+class SyntheticScreen:
+    """A VS Code-like screen with a cursor that moves on every grab."""
+
+    def __init__(self):
+        self.base = Image.new("RGB", SCREEN_SIZE, (30, 30, 30))
+        draw = ImageDraw.Draw(self.base)
+        draw.rectangle((1152, 0, 1920, 1080), fill=(37, 37, 38))
+        for line in range(40):
+            draw.rectangle((1172, 40 + line * 22, 1400 + line * 13 % 400, 50 + line * 22), fill=(204, 204, 204))
+        self.grabs = 0
+
+    def screenshot(self):
+        """Like pyautogui.screenshot(): a new full-frame PIL image per call."""
+        self.grabs += 1
+        image = self.base.copy()
+        x = 200 + self.grabs % 600
+        ImageDraw.Draw(image).rectangle((x, 200, x + 2, 218), fill=(220, 220, 220))
+        return image
+
+
+class RawBackend:
+    """Backend that copies a native BGRA buffer into the ring slot, as mss does."""
+
+    name = "raw"
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.raw = bytearray(screen.base.tobytes("raw", "BGRX"))
+
+    def open(self):
+        return SCREEN_SIZE
+
+    def grab_into(self, view):
+        self.screen.grabs += 1
+        view[:] = self.raw
+
+    def close(self):
+        pass
+
+
+def original_capture(screen):
+    """The original take_screenshot_and_convert_to_base64 pipeline."""
+    screenshot = screen.screenshot()
+    img_buffer = BytesIO()
+    screenshot.save(img_buffer, format="PNG")
+    img_bytes = img_buffer.getvalue()
+    base64_image = base64.b64encode(img_bytes).decode()
+    return f"data:image/png;base64,{base64_image}"
+
+
+def run_mode(mode, args):
+    screen = SyntheticScreen()
+    capture = None
+    if mode.startswith("ring"):
+        backend = PilBackend(screen.screenshot) if mode == "ring-pil" else RawBackend(screen)
+        capture = CaptureThread(backend, slots=args.slots, fps=args.fps)
+        capture.start()
+        time.sleep(0.2)
+
+    tracemalloc.start()
+    stats_before = Image.core.get_stats()
+    previous = None
+    work_seconds = 0.0
+    peak_bytes = 0
+    started = time.monotonic()
+    grabs_before = screen.grabs
+    for tick in range(args.ticks):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tick_started = time.perf_counter()
+        encode = tick % args.encode_every == 0
+
+        if mode == "original":
+            original_capture(screen)
+        elif mode == "direct":
+            image = screen.screenshot()
+            thumbnail = image.reduce(8).tobytes()
+            changed = thumbnail != previous
+            previous = thumbnail
+            if encode and changed:
+                encode_frame(image, SETTINGS)
+        elif mode == "ring-pil":
+            with capture.latest(fresh=False) as frame:
+                image = frame.image()
+                thumbnail = image.reduce(8).tobytes()
+                changed = thumbnail != previous
+                previous = thumbnail
+                if encode and changed:
+                    encode_frame(image, SETTINGS)
+        else:
+            with capture.latest(fresh=False) as frame:
+                thumbnail = frame.array()[::8, ::8, :3]
+                changed = previous is None or not np.array_equal(thumbnail, previous)
+                previous = thumbnail.copy()
+                if encode and changed:
+                    encode_frame(frame.image(), SETTINGS)
+
+        work_seconds += time.perf_counter() - tick_started
+        _, peak = tracemalloc.get_traced_memory()
+        peak_bytes += peak - baseline
+        time.sleep(args.tick_interval)
+
+    elapsed = time.monotonic() - started
+    stats_after = Image.core.get_stats()
+    tracemalloc.stop()
+    if capture is not None:
+        capture.stop()
+        fps = capture.metrics()["fps"]
+    else:
+        fps = (screen.grabs - grabs_before) / elapsed
+
+    return {
+        "mode": mode,
+        "capture_fps": fps,
+        "ms_per_tick": work_seconds / args.ticks * 1000,
+        "pil_images_per_tick": (stats_after["new_count"] - stats_before["new_count"]) / args.ticks,
+        "python_mb_per_tick": peak_bytes / args.ticks / 1e6,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--ticks", type=int, default=30, help="Polls per mode")
+    parser.add_argument("--tick-interval", type=float, default=0.1, help="Seconds between polls")
+    parser.add_argument("--encode-every", type=int, default=5, help="Encode for the model every N polls")
+    parser.add_argument("--fps", type=float, default=10.0, help="Capture thread rate limit; 0 captures flat out")
+    parser.add_argument("--slots", type=int, default=4, help="Frames in the ring")
+    parser.add_argument("--run-mode", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_mode:
+        print(json.dumps(run_mode(args.run_mode, args)))
+        return 0
+
+    print(
+        f"\n📊 Capture on a synthetic {SCREEN_SIZE[0]}x{SCREEN_SIZE[1]} screen: {args.ticks} polls, "
+        f"encoding every {args.encode_every}"
+    )
+    print(
+        f"{'mode':<10} {'capture fps':>12} {'ms/tick':>8} {'PIL imgs/tick':>14} "
+        f"{'py MB/tick':>11} {'peak RSS MB':>12}"
+    )
+    for mode in args.modes.split(","):
+        output = subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.bench_capture", "--run-mode", mode,
+                "--ticks", str(args.ticks), "--tick-interval", str(args.tick_interval),
+                "--encode-every", str(args.encode_every), "--fps", str(args.fps), "--slots", str(args.slots),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        row = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{mode:<10} {row['capture_fps']:>12.1f} {row['ms_per_tick']:>8.1f} "
+            f"{row['pil_images_per_tick']:>14.1f} {row['python_mb_per_tick']:>11.2f} {row['peak_rss_mb']:>12.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
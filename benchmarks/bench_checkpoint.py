@@ -0,0 +1,177 @@
+"""
+Simulated benchmark of retried jobs with and without the job checkpoint.
+
+Runs --jobs jobs spread over --projects project folders on a virtual clock,
+each job a new prompt. Every attempt charges the stage times below; Copilot
+needs a random time (--mean and --stdev seconds) from the prompt until the
+Keep button is enabled. An attempt fails when that time exceeds the Copilot
+wait (--timeout) or, with probability --crash-rate, when the Keep loop raises
+at a random point of the wait. Failed jobs are retried until they succeed or
+--max-attempts is reached.
+
+    restart   the original flow: every attempt relaunches VS Code, reinstalls
+              the requirements and retypes the prompt, and Copilot starts over
+    resume    JobCheckpoint decides what runs: a retry goes back to waiting in
+              the still-open window where Copilot kept working, and pip is
+              skipped while requirements.txt is unchanged since the last
+              successful install
+
+The stage decisions and the time-saved estimate come from job_checkpoint
+itself; only the stage durations are simulated.
+
+Usage:
+    python -m benchmarks.bench_checkpoint
+    python -m benchmarks.bench_checkpoint --jobs 50 --timeout 90 --crash-rate 0.2 --install 300
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+
+from job_checkpoint import JobCheckpoint, text_digest
+
+MODES = ("restart", "resume")
+REQUIREMENTS = "numpy\nrequests\n"
+
+
+def run_attempt(checkpoint, args, costs, rng, copilot_needs, waited):
+    """
+    One attempt of a job.
+
+    Returns:
+        tuple: (seconds spent, seconds Copilot has worked after the attempt, succeeded)
+    """
+    resumable = {}
+    if checkpoint is not None:
+        install_pending = not checkpoint.installed(text_digest(REQUIREMENTS), "pip")
+        resumable = checkpoint.resumable_stages(window_open=True, install_pending=install_pending)
+    spent = 0.0
+    for stage in ("launch", "open_terminal", "install_requirements", "open_copilot", "send_prompt"):
+        if stage in resumable:
+            checkpoint.skip(stage, resumable[stage])
+            if stage == "launch":
+                spent += args.refocus
+            continue
+        if stage == "install_requirements" and checkpoint is not None:
+            requirements_sha = text_digest(REQUIREMENTS)
+            if checkpoint.installed(requirements_sha, "pip"):
+                checkpoint.skip(stage, "requirements.txt is unchanged", seconds=checkpoint.install["seconds"])
+                continue
+            checkpoint.record_install(requirements_sha, "pip", costs[stage])
+        spent += costs[stage]
+        if checkpoint is not None:
+            checkpoint.complete(stage, costs[stage])
+
+    if "send_prompt" not in resumable:
+        # A new prompt: Copilot starts from scratch
+        waited = 0.0
+    remaining = copilot_needs - waited
+    crash_at = rng.uniform(0, args.timeout) if rng.random() < args.crash_rate else None
+    if crash_at is not None and crash_at < min(remaining, args.timeout):
+        return spent + crash_at, waited + crash_at, False
+    if remaining <= args.timeout:
+        return spent + remaining, copilot_needs, True
+    return spent + args.timeout, waited + args.timeout, False
+
+
+def run(mode, args, state_dir):
+    rng = random.Random(args.seed)
+    costs = {
+        "launch": args.launch,
+        "open_terminal": args.terminal,
+        "install_requirements": args.install,
+        "open_copilot": args.copilot,
+        "send_prompt": args.prompt,
+    }
+    job_seconds = []
+    attempts = 0
+    failed = 0
+    saved = 0.0
+    installs = 0
+    for job in range(args.jobs):
+        folder = os.path.join(state_dir, f"project{job % args.projects + 1}")
+        copilot_needs = max(5.0, rng.gauss(args.mean, args.stdev))
+        total = 0.0
+        waited = 0.0
+        for attempt in range(args.max_attempts):
+            attempts += 1
+            checkpoint = None
+            if mode == "resume":
+                checkpoint = JobCheckpoint(
+                    os.path.join(state_dir, f"{os.path.basename(folder)}.json"), folder, f"job {job}"
+                )
+            installs_before = checkpoint.install if checkpoint else None
+            seconds, waited, succeeded = run_attempt(checkpoint, args, costs, rng, copilot_needs, waited)
+            if checkpoint is None:
+                installs += 1
+            else:
+                installs += checkpoint.install is not installs_before
+                saved += checkpoint.seconds_saved
+                checkpoint.finish(succeeded)
+            total += seconds
+            if not succeeded and mode == "restart":
+                # The next attempt opens a new window and Copilot starts over
+                copilot_needs = max(5.0, rng.gauss(args.mean, args.stdev))
+            if succeeded:
+                break
+        else:
+            failed += 1
+        job_seconds.append(total)
+
+    return {
+        "attempts": attempts,
+        "failed": failed,
+        "mean_seconds": statistics.mean(job_seconds),
+        "total_minutes": sum(job_seconds) / 60,
+        "installs": installs,
+        "saved_minutes": saved / 60,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=30)
+    parser.add_argument("--projects", type=int, default=3, help="Project folders the jobs are spread over")
+    parser.add_argument("--mean", type=float, default=90.0, help="Mean Copilot generation time (s)")
+    parser.add_argument("--stdev", type=float, default=40.0, help="Spread of the generation time (s)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Copilot wait per attempt (s)")
+    parser.add_argument("--crash-rate", type=float, default=0.1, help="Chance the Keep loop raises")
+    parser.add_argument("--max-attempts", type=int, default=4)
+    parser.add_argument("--launch", type=float, default=12.0, help="VS Code launch and maximize (s)")
+    parser.add_argument("--terminal", type=float, default=2.0, help="Opening the terminal (s)")
+    parser.add_argument("--install", type=float, default=60.0, help="pip install and its wait (s)")
+    parser.add_argument("--copilot", type=float, default=6.0, help="Opening the Copilot panel (s)")
+    parser.add_argument("--prompt", type=float, default=2.0, help="Typing the prompt (s)")
+    parser.add_argument("--refocus", type=float, default=2.0, help="Focusing the open window on resume (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--verbose", action="store_true", help="Show the checkpoint's log lines")
+    args = parser.parse_args(argv)
+
+    print(
+        f"\n📊 {args.jobs} simulated jobs over {args.projects} projects: Copilot needs "
+        f"{args.mean:.0f}±{args.stdev:.0f}s, waits of {args.timeout:.0f}s, {args.crash_rate:.0%} crashes"
+    )
+    print(
+        f"{'mode':<8} {'attempts':>9} {'failed':>7} {'s/job':>7} {'total min':>10} "
+        f"{'pip runs':>9} {'saved min':>10}"
+    )
+    for mode in args.modes.split(","):
+        output = sys.stdout if args.verbose else io.StringIO()
+        with tempfile.TemporaryDirectory(prefix="cua-checkpoint-") as state_dir:
+            with contextlib.redirect_stdout(output):
+                row = run(mode, args, state_dir)
+        print(
+            f"{mode:<8} {row['attempts']:>9} {row['failed']:>7} {row['mean_seconds']:>7.0f} "
+            f"{row['total_minutes']:>10.1f} {row['installs']:>9} {row['saved_minutes']:>10.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
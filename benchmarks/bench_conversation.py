@@ -0,0 +1,138 @@
+"""
+Measure input tokens, upload size and time-to-verdict per Keep-button check for each request mode.
+
+Every mode runs --checks polls of the synthetic Copilot panel (a new frame
+each poll) through CheckConversation against the local mock Responses
+endpoint, which reports token usage, keeps stored responses for
+previous_response_id, emulates prompt caching and streams on request. The
+mock answers in prompt-only JSON followed by a short explanation of
+--explanation-tokens tokens, as models often do without structured output:
+
+    stateless         the full prompt with every screenshot (today's requests)
+    chain             the prompt once in an anchor, then previous_response_id
+                      with a one-line follow-up and the screenshot
+    stateless+stream  today's requests, acting on the verdict as soon as the
+                      "button" field is complete
+    chain+stream      both
+
+Input tokens are what the service counts for each check, including the
+anchor's context; "uncached" excludes tokens served from the prompt cache,
+which only applies to repeated prefixes of --cache-min-tokens or more. "KB
+up" is the mean request size including anchors, whose input tokens are
+listed separately.
+
+Usage:
+    python -m benchmarks.bench_conversation
+    python -m benchmarks.bench_conversation --checks 20 --explanation-tokens 80 --cache-min-tokens 256
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import threading
+import time
+
+from openai import AzureOpenAI
+
+from benchmarks.bench_replay import MODEL_NAME, synthetic_frame
+from benchmarks.mock_responses_server import MockResponsesServer, find_image_url
+from cua_conversation import CheckConversation
+from engine import KEEP_BUTTON_PROMPT, KEEP_SCHEMA
+from screen_capture import CaptureSettings, encode_frame
+from screen_regions import COPILOT_CHAT_REGION
+
+API_VERSION = "2025-03-01-preview"
+MODES = ("stateless", "chain", "stateless+stream", "chain+stream")
+
+
+def answer(payload, explanation_tokens):
+    """The mock's answer: the verdict first, then an explanation; OK to an anchor."""
+    if find_image_url(payload) is None:
+        return "OK"
+    reason = " ".join(["greyed"] * (explanation_tokens * 4 // 7))
+    return f'{{"button": "disabled", "reason": "The Keep button is {reason} out."}}'
+
+
+def run(mode, args):
+    server = MockResponsesServer(
+        latency=args.latency,
+        prefill=args.prefill_ms / 1000,
+        token_interval=args.token_ms / 1000,
+        cache_min_tokens=args.cache_min_tokens,
+        responder=lambda payload: answer(payload, args.explanation_tokens),
+    )
+    settings = CaptureSettings(region=COPILOT_CHAT_REGION)
+    with server:
+        client = AzureOpenAI(api_key="mock", azure_endpoint=server.url, api_version=API_VERSION, max_retries=0)
+        conversation = CheckConversation("keep", KEEP_BUTTON_PROMPT, mode.split("+")[0])
+        usage = {"keep": [0, 0], "keep_anchor": [0, 0]}
+        completed = []
+        all_completed = threading.Event()
+
+        def record(check, response):
+            usage[check][0] += response.usage.input_tokens
+            usage[check][1] += response.usage.input_tokens_details.cached_tokens
+            completed.append(check)
+            if completed.count("keep") == args.checks:
+                all_completed.set()
+
+        output = sys.stdout if args.verbose else io.StringIO()
+        seconds_to_verdict = []
+        with contextlib.redirect_stdout(output):
+            for check in range(args.checks):
+                frame = encode_frame(synthetic_frame(check * 2.0, float("inf")), settings)
+                started = time.monotonic()
+                conversation.create(
+                    client,
+                    MODEL_NAME,
+                    frame,
+                    stream_field=KEEP_SCHEMA.field if mode.endswith("stream") else None,
+                    record=record,
+                )
+                seconds_to_verdict.append(time.monotonic() - started)
+        # Streams still finishing in the background report their usage when they complete
+        all_completed.wait(timeout=10)
+
+    input_tokens, cached_tokens = usage["keep"]
+    return {
+        "input_tokens": input_tokens / args.checks,
+        "uncached": (input_tokens - cached_tokens) / args.checks,
+        "kb_up": server.bytes_received / 1024 / (args.checks + conversation.anchors),
+        "seconds_to_verdict": sum(seconds_to_verdict) / args.checks,
+        "anchors": conversation.anchors,
+        "anchor_tokens": usage["keep_anchor"][0],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--checks", type=int, default=10, help="Keep-button checks per mode")
+    parser.add_argument("--latency", type=float, default=0.3, help="Mock time to first token (s)")
+    parser.add_argument("--prefill-ms", type=float, default=0.2, help="Mock ms per uncached input token")
+    parser.add_argument("--token-ms", type=float, default=15.0, help="Mock ms per output token")
+    parser.add_argument("--explanation-tokens", type=int, default=40, help="Tokens after the verdict field")
+    parser.add_argument("--cache-min-tokens", type=int, default=1024, help="Shortest cacheable prefix")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--verbose", action="store_true", help="Show the conversation's log lines")
+    args = parser.parse_args(argv)
+
+    print(
+        f"\n📊 {args.checks} Keep-button checks per mode; answers carry {args.explanation_tokens} tokens "
+        f"after the verdict, prompt cache from {args.cache_min_tokens} tokens"
+    )
+    print(
+        f"{'mode':<17} {'input tok':>10} {'uncached':>9} {'KB up':>7} {'s to verdict':>13} "
+        f"{'anchors':>8} {'anchor tok':>11}"
+    )
+    for mode in args.modes.split(","):
+        row = run(mode, args)
+        print(
+            f"{mode:<17} {row['input_tokens']:>10.0f} {row['uncached']:>9.0f} {row['kb_up']:>7.1f} "
+            f"{row['seconds_to_verdict']:>13.2f} {row['anchors']:>8} {row['anchor_tokens']:>11}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
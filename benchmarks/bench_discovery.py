@@ -0,0 +1,195 @@
+"""
+Time VS Code discovery cold (full search) and warm (from the location index).
+
+Fake install trees for Linux (deb, snap, flatpak, Insiders, .tar.gz), macOS
+(/Applications, ~/Applications Insiders) and Windows (per-user, system,
+registry-only) are built in a temporary directory, and VSCodeDiscovery is
+pointed at each with its root, environment, home, PATH lookup and registry
+hooks. For each layout the benchmark reports the install found, the stats and
+time of a cold and a warm find(), and the stats after VS Code is "updated"
+(the executable's mtime changes), which must trigger a fresh discovery.
+
+Usage:
+    python -m benchmarks.bench_discovery
+    python -m benchmarks.bench_discovery --repeat 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from vscode_discovery import VSCodeDiscovery
+
+
+def write_install(root, executable, manifest_dir, version, name="code"):
+    """Create an executable and the package.json it ships with."""
+    os.makedirs(os.path.dirname(executable), exist_ok=True)
+    with open(executable, "w") as f:
+        f.write("#!/bin/sh\n")
+    os.makedirs(manifest_dir, exist_ok=True)
+    with open(os.path.join(manifest_dir, "package.json"), "w") as f:
+        json.dump({"name": name, "version": version}, f)
+    return executable
+
+
+def linux_deb(root, home):
+    share = os.path.join(root, "usr", "share", "code")
+    target = write_install(root, os.path.join(share, "bin", "code"), os.path.join(share, "resources", "app"), "1.95.3")
+    os.makedirs(os.path.join(root, "usr", "bin"), exist_ok=True)
+    os.symlink(target, os.path.join(root, "usr", "bin", "code"))
+    return {}
+
+
+def linux_snap(root, home):
+    write_install(
+        root,
+        os.path.join(root, "snap", "bin", "code"),
+        os.path.join(root, "snap", "code", "current", "usr", "share", "code", "resources", "app"),
+        "1.94.2",
+    )
+    return {}
+
+
+def linux_flatpak(root, home):
+    active = os.path.join(
+        home, ".local", "share", "flatpak", "app", "com.visualstudio.code", "current", "active"
+    )
+    target = write_install(
+        root,
+        os.path.join(active, "export", "bin", "com.visualstudio.code"),
+        os.path.join(active, "files", "extra", "vscode", "resources", "app"),
+        "1.93.1",
+    )
+    exports = os.path.join(home, ".local", "share", "flatpak", "exports", "bin")
+    os.makedirs(exports, exist_ok=True)
+    os.symlink(target, os.path.join(exports, "com.visualstudio.code"))
+    return {}
+
+
+def linux_insiders(root, home):
+    share = os.path.join(root, "usr", "share", "code-insiders")
+    write_install(
+        root, os.path.join(share, "bin", "code-insiders"), os.path.join(share, "resources", "app"),
+        "1.96.0-insider", name="code-insiders",
+    )
+    return {}
+
+
+def linux_tarball(root, home):
+    folder = os.path.join(home, "VSCode-linux-x64")
+    write_install(root, os.path.join(folder, "bin", "code"), os.path.join(folder, "resources", "app"), "1.95.0")
+    return {}
+
+
+def mac_applications(root, home):
+    app = os.path.join(root, "Applications", "Visual Studio Code.app", "Contents", "Resources", "app")
+    write_install(root, os.path.join(app, "bin", "code"), app, "1.95.3")
+    return {}
+
+
+def mac_user_insiders(root, home):
+    app = os.path.join(
+        home, "Applications", "Visual Studio Code - Insiders.app", "Contents", "Resources", "app"
+    )
+    write_install(root, os.path.join(app, "bin", "code-insiders"), app, "1.96.0-insider", name="code-insiders")
+    return {}
+
+
+def windows_user(root, home):
+    folder = os.path.join(home, "AppData", "Local", "Programs", "Microsoft VS Code")
+    write_install(root, os.path.join(folder, "Code.exe"), os.path.join(folder, "resources", "app"), "1.95.3")
+    return {"LOCALAPPDATA": os.path.join(home, "AppData", "Local")}
+
+
+def windows_system(root, home):
+    folder = os.path.join(root, "Program Files", "Microsoft VS Code")
+    write_install(root, os.path.join(folder, "Code.exe"), os.path.join(folder, "resources", "app"), "1.94.0")
+    return {"ProgramFiles": os.path.join(root, "Program Files")}
+
+
+def windows_registry(root, home):
+    folder = os.path.join(root, "Tools", "VSCode")
+    write_install(root, os.path.join(folder, "Code.exe"), os.path.join(folder, "resources", "app"), "1.92.0")
+    return {"REGISTRY": f'"{os.path.join(folder, "Code.exe")}" "%1"'}
+
+
+LAYOUTS = (
+    ("linux deb", "linux", linux_deb),
+    ("linux snap", "linux", linux_snap),
+    ("linux flatpak", "linux", linux_flatpak),
+    ("linux insiders", "linux", linux_insiders),
+    ("linux tar.gz", "linux", linux_tarball),
+    ("macOS app", "darwin", mac_applications),
+    ("macOS insiders", "darwin", mac_user_insiders),
+    ("windows user", "win32", windows_user),
+    ("windows system", "win32", windows_system),
+    ("windows registry", "win32", windows_registry),
+)
+
+
+def timed_find(discovery, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        install = discovery.find()
+    return install, (time.perf_counter() - started) / repeat * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=500, help="Warm find() calls to average")
+    parser.add_argument("--cold-repeat", type=int, default=20, help="Cold find() calls to average")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="cua-discovery-")
+    print("\n📊 VS Code discovery over fake install trees")
+    print(
+        f"{'layout':<17} {'found':<9} {'version':<15} {'cold stats':>10} {'cold µs':>8} "
+        f"{'warm stats':>10} {'warm µs':>8} {'after update':>12}"
+    )
+    for label, platform, build in LAYOUTS:
+        root = os.path.join(workdir, label.replace(" ", "-"))
+        home = os.path.join(root, "home", "dev")
+        os.makedirs(home)
+        environ = build(root, home)
+        registry_command = environ.pop("REGISTRY", None)
+        index_path = os.path.join(root, "vscode_index.json")
+
+        discovery = VSCodeDiscovery(
+            platform=platform,
+            environ=environ,
+            home=home,
+            root=root,
+            which=lambda command: None,
+            registry=lambda: [registry_command] if registry_command else [],
+            index_path=index_path,
+        )
+        cold_seconds = 0.0
+        for _ in range(args.cold_repeat):
+            if os.path.exists(index_path):
+                os.remove(index_path)
+            started = time.perf_counter()
+            cold = discovery.find()
+            cold_seconds += time.perf_counter() - started
+        cold_us = cold_seconds / args.cold_repeat * 1e6
+        cold_stats = discovery.stats
+        warm, warm_us = timed_find(discovery, args.repeat)
+        warm_stats = discovery.stats
+
+        # An update replaces the executable: its mtime changes and the index is stale
+        stat = os.stat(warm.path)
+        os.utime(warm.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        discovery.find()
+        update_stats = discovery.stats
+
+        print(
+            f"{label:<17} {cold.kind if cold else '-':<9} {(cold.version if cold else None) or '-':<15} "
+            f"{cold_stats:>10} {cold_us:>8.0f} {warm_stats:>10} {warm_us:>8.1f} {update_stats:>12}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Benchmark screenshot cropping, downscaling and encoding settings on sample frames.
+
+For every PNG in the frames directory and every capture setting, reports the
+encode time (median of --repeat runs) and the base64 payload size. With --live,
+each encoded frame is also sent to the CUA deployment configured in .env and the
+end-to-end request latency is reported.
+
+Usage:
+    python -m benchmarks.bench_encoding samples --check pip
+    python -m benchmarks.bench_encoding samples --check keep --live
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from PIL import Image
+
+from screen_capture import CaptureSettings, encode_frame
+from screen_regions import COPILOT_CHAT_REGION, TERMINAL_REGION
+
+CHECK_REGIONS = {"pip": TERMINAL_REGION, "keep": COPILOT_CHAT_REGION}
+
+BENCHMARK_PROMPT = (
+    "Describe in one short sentence what is visible in this screenshot of Visual Studio Code."
+)
+
+
+def settings_matrix(region):
+    """Return the capture settings compared by the benchmark."""
+    return [
+        CaptureSettings(region=None, image_format="png"),
+        CaptureSettings(region=region, image_format="png"),
+        CaptureSettings(region=region, image_format="jpeg", quality=85),
+        CaptureSettings(region=region, image_format="jpeg", quality=70, max_width=960),
+        CaptureSettings(region=region, image_format="webp", quality=80),
+        CaptureSettings(region=region, image_format="webp", quality=60, max_width=960),
+    ]
+
+
+def create_live_client():
+    """Create an Azure OpenAI client from the same .env settings app.py uses."""
+    from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+    from dotenv import load_dotenv
+    from openai import AzureOpenAI
+
+    load_dotenv()
+    token_provider = get_bearer_token_provider(
+        DefaultAzureCredential(), os.getenv("COGNITIVE_SERVICES_SCOPE")
+    )
+    return AzureOpenAI(
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+        azure_ad_token_provider=token_provider,
+        api_version=os.getenv("AZURE_API_VERSION"),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("frames_dir", help="Directory of sample PNG screenshots")
+    parser.add_argument("--check", choices=sorted(CHECK_REGIONS), default="pip")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--live", action="store_true", help="Also time real CUA requests")
+    args = parser.parse_args(argv)
+
+    frame_names = sorted(
+        name for name in os.listdir(args.frames_dir) if name.lower().endswith(".png")
+    )
+    if not frame_names:
+        print(f"No PNG frames found in {args.frames_dir}")
+        return 1
+
+    client = None
+    if args.live:
+        from cua_requests import create_cua_response
+
+        client = create_live_client()
+        model_name = os.getenv("CUA_MODEL_NAME")
+
+    results = {}
+    for name in frame_names:
+        with Image.open(os.path.join(args.frames_dir, name)) as screenshot:
+            screenshot = screenshot.convert("RGB")
+
+        for settings in settings_matrix(CHECK_REGIONS[args.check]):
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                frame = encode_frame(screenshot, settings)
+                timings.append(time.perf_counter() - started)
+
+            row = results.setdefault(
+                settings.describe(), {"encode": [], "bytes": [], "latency": [], "size": None}
+            )
+            row["encode"].append(statistics.median(timings))
+            row["bytes"].append(frame.payload_bytes)
+            row["size"] = f"{frame.width}x{frame.height}"
+
+            if client is not None:
+                started = time.perf_counter()
+                create_cua_response(client, model_name, BENCHMARK_PROMPT, frame)
+                row["latency"].append(time.perf_counter() - started)
+
+    print(f"📊 Encoding benchmark: {len(frame_names)} frames, check={args.check}")
+    header = f"{'setting':<48} {'size':>10} {'encode ms':>10} {'payload KB':>11}"
+    if client is not None:
+        header += f" {'request s':>10}"
+    print(header)
+    for description, row in results.items():
+        line = (
+            f"{description:<48} {row['size']:>10} "
+            f"{statistics.mean(row['encode']) * 1000:>10.1f} "
+            f"{statistics.mean(row['bytes']) / 1024:>11.1f}"
+        )
+        if row["latency"]:
+            line += f" {statistics.mean(row['latency']):>10.2f}"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
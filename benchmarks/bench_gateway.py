@@ -0,0 +1,151 @@
+"""
+Measure CUA throughput under contention with and without the request gateway.
+
+Several sessions, each with several monitors (threads), classify frames
+against the local mock Responses endpoint, which accepts --rate-limit
+requests per second, refuses the rest with 429 and a Retry-After header,
+and fails --error-rate of the accepted ones with 500. Monitors of the same
+session ask the same question about the same frame at the same time, as
+overlapping monitors of one screen do. Every monitor needs --answers
+answers. Clients:
+
+    blanket   SDK retries off; any error is printed and the monitor sleeps
+              --pause seconds, like the original loops
+    sdk       the OpenAI SDK's default retries, then the same --pause
+    retry     the gateway's Retry-After-aware, jittered retries only
+    gateway   + token bucket pacing at the deployment's limit and coalescing
+              of identical concurrent requests
+
+Usage:
+    python -m benchmarks.bench_gateway
+    python -m benchmarks.bench_gateway --sessions 4 --monitors 3 --rate-limit 4 --error-rate 0.05
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import threading
+import time
+
+from openai import AzureOpenAI
+from PIL import Image
+
+from benchmarks.mock_responses_server import MockResponsesServer
+from cua_gateway import CuaGateway
+from cua_requests import create_cua_response
+from response_decoding import response_output
+from screen_capture import CaptureSettings, encode_frame
+
+API_VERSION = "2025-03-01-preview"
+MODEL_NAME = "computer-use-preview"
+PROMPT = 'Is the Keep button enabled? Answer {"button": "enabled"} or {"button": "disabled"}.'
+CLIENTS = ("blanket", "sdk", "retry", "gateway")
+
+
+def session_frame(session, tick):
+    """The frame a session's monitors see at a tick; it differs between sessions and ticks."""
+    return encode_frame(
+        Image.new("RGB", (64, 36), (40 + session * 30 % 200, tick * 7 % 256, 60)), CaptureSettings()
+    )
+
+
+def make_client(name, server_url, rate_limit):
+    client = AzureOpenAI(
+        api_key="mock",
+        azure_endpoint=server_url,
+        api_version=API_VERSION,
+        max_retries=2 if name == "sdk" else 0,
+    )
+    if name in ("blanket", "sdk"):
+        return client, None
+    gateway = CuaGateway(
+        requests_per_minute=rate_limit * 60 if name == "gateway" else None,
+        burst=1 if name == "gateway" else None,
+        coalesce=name == "gateway",
+    )
+    return gateway.wrap(client), gateway
+
+
+def monitor(client, session, answers, pause, results):
+    tick = 0
+    errors = 0
+    while tick < answers:
+        try:
+            response = create_cua_response(client, MODEL_NAME, PROMPT, session_frame(session, tick))
+            response_output(response)
+            tick += 1
+        except Exception as e:
+            errors += 1
+            print(f"❌ Error calling CUA model: {e}")
+            time.sleep(pause)
+    results.append(errors)
+
+
+def run(name, args):
+    server = MockResponsesServer(
+        latency=args.latency,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        error_rate=args.error_rate,
+    )
+    with server:
+        client, gateway = make_client(name, server.url, args.rate_limit)
+        results = []
+        threads = [
+            threading.Thread(target=monitor, args=(client, session, args.answers, args.pause, results))
+            for session in range(args.sessions)
+            for _ in range(args.monitors)
+        ]
+        output = sys.stdout if args.verbose else io.StringIO()
+        started = time.monotonic()
+        with contextlib.redirect_stdout(output):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        seconds = time.monotonic() - started
+    return {
+        "seconds": seconds,
+        "sent": server.requests_received,
+        "rate_limited": server.rate_limited,
+        "server_errors": server.server_errors,
+        "failed": sum(results),
+        "coalesced": gateway.stats.coalesced if gateway is not None else 0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--monitors", type=int, default=2, help="Monitors per session")
+    parser.add_argument("--answers", type=int, default=6, help="Answers each monitor needs")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock model latency (s)")
+    parser.add_argument("--rate-limit", type=float, default=5.0, help="Requests per second the mock accepts")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After sent with a 429 (s)")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Fraction of accepted requests failing with 500")
+    parser.add_argument("--pause", type=float, default=5.0, help="Sleep after an error outside the gateway (s)")
+    parser.add_argument("--clients", default=",".join(CLIENTS))
+    parser.add_argument("--verbose", action="store_true", help="Show error and retry lines")
+    args = parser.parse_args(argv)
+
+    needed = args.sessions * args.monitors * args.answers
+    print(
+        f"\n📊 {args.sessions} sessions x {args.monitors} monitors x {args.answers} answers against a mock "
+        f"accepting {args.rate_limit:g} req/s ({args.latency}s latency, {args.error_rate:.0%} 500s)"
+    )
+    print(
+        f"{'client':<9} {'seconds':>8} {'answers/s':>10} {'sent':>6} {'429s':>6} {'500s':>6} "
+        f"{'errors seen':>12} {'coalesced':>10}"
+    )
+    for name in args.clients.split(","):
+        row = run(name, args)
+        print(
+            f"{name:<9} {row['seconds']:>8.2f} {needed / row['seconds']:>10.2f} {row['sent']:>6} "
+            f"{row['rate_limited']:>6} {row['server_errors']:>6} {row['failed']:>12} {row['coalesced']:>10}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Measure orchestrator throughput (jobs/hour) as the number of workers grows.
+
+Every worker gets its own Xvfb framebuffer (or shares the current desktop with
+--backend local) and runs benchmarks.fake_worker against the local mock
+Responses endpoint, so no VS Code, Copilot or Azure OpenAI is needed.
+
+Usage:
+    python -m benchmarks.bench_orchestrator --jobs 8 --workers 1,2,4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from benchmarks.mock_responses_server import MockResponsesServer
+from orchestrator import Job, Orchestrator, build_displays, summarize
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--backend", choices=("xvfb", "local"), default="xvfb")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mock model latency (s)")
+    parser.add_argument("--generation-seconds", type=float, default=3.0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temp_dir, MockResponsesServer(
+        latency=args.latency
+    ) as server:
+        jobs = []
+        for index in range(args.jobs):
+            project_folder = os.path.join(temp_dir, "projects", f"project{index + 1}")
+            os.makedirs(project_folder)
+            jobs.append(Job(f"job{index + 1}", project_folder, f"write script #{index + 1}"))
+
+        extra_env = {
+            "AZURE_OPENAI_ENDPOINT": server.url,
+            "AZURE_OPENAI_API_KEY": "mock",
+            "FAKE_GENERATION_SECONDS": str(args.generation_seconds),
+        }
+
+        summaries = []
+        for workers in [int(count) for count in args.workers.split(",")]:
+            orchestrator = Orchestrator(
+                build_displays(args.backend, workers),
+                os.path.join(temp_dir, f"results-{workers}"),
+                worker_command=[sys.executable, "-m", "benchmarks.fake_worker"],
+                job_timeout=120,
+                extra_env=extra_env,
+            )
+            results, wall_seconds = orchestrator.run(jobs)
+            summaries.append(summarize(results, wall_seconds, len(orchestrator.displays)))
+
+    print()
+    print("\n".join(summaries))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Simulated benchmark of polling strategies for the Keep-button wait.
+
+Runs many simulated jobs on a virtual clock (no real sleeping). Each job
+completes at a random time; every poll captures the screen and then spends
+--latency seconds waiting for the model. Detection lag is the time between the
+actual completion and the poll that reports it.
+
+Strategies compared:
+    fixed    app.py's original cadence: sleep 3 s, check, sleep 5 s
+    backoff  PollScheduler with exponential backoff and no history
+    learned  PollScheduler that learns the typical duration from earlier jobs
+
+Usage:
+    python -m benchmarks.bench_poll_scheduler --runs 200 --mean 45 --stdev 10
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+
+from poll_scheduler import DurationHistory, PollScheduler
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+def make_check(clock, completes_at, latency):
+    """Return a check() that sees the screen at call time and answers after latency."""
+
+    def check():
+        captured_at = clock.now
+        clock.sleep(latency)
+        return captured_at >= completes_at
+
+    return check
+
+
+def run_fixed(completes_at, latency, timeout):
+    clock = SimulatedClock()
+    check = make_check(clock, completes_at, latency)
+    polls = 0
+    while clock.now < timeout:
+        clock.sleep(3)
+        polls += 1
+        if check():
+            return clock.now - completes_at, polls
+        clock.sleep(5)
+    return None, polls
+
+
+def run_scheduler(completes_at, latency, timeout, history):
+    clock = SimulatedClock()
+    scheduler = PollScheduler(
+        "copilot_generation",
+        timeout=timeout,
+        min_interval=1,
+        max_interval=8,
+        history=history,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    found = scheduler.poll(make_check(clock, completes_at, latency))
+    lag = clock.now - completes_at if found else None
+    return lag, scheduler.polls
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--mean", type=float, default=45.0, help="Mean completion time (s)")
+    parser.add_argument("--stdev", type=float, default=10.0)
+    parser.add_argument("--latency", type=float, default=2.0, help="Model latency per poll (s)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    completion_times = [
+        min(args.timeout * 0.9, max(1.0, rng.gauss(args.mean, args.stdev)))
+        for _ in range(args.runs)
+    ]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        learned_history = DurationHistory(os.path.join(temp_dir, "history.json"))
+
+        results = {"fixed": [], "backoff": [], "learned": []}
+        for completes_at in completion_times:
+            results["fixed"].append(run_fixed(completes_at, args.latency, args.timeout))
+            results["backoff"].append(
+                run_scheduler(completes_at, args.latency, args.timeout, None)
+            )
+            results["learned"].append(
+                run_scheduler(completes_at, args.latency, args.timeout, learned_history)
+            )
+
+    print(
+        f"📊 Detection lag over {args.runs} simulated jobs "
+        f"(completion ~N({args.mean}, {args.stdev}) s, model latency {args.latency}s)"
+    )
+    print(f"{'strategy':<10} {'mean lag':>9} {'p95 lag':>8} {'polls/job':>10} {'timeouts':>9}")
+    for name, rows in results.items():
+        lags = [lag for lag, _ in rows if lag is not None]
+        polls = [count for _, count in rows]
+        timeouts = sum(1 for lag, _ in rows if lag is None)
+        print(
+            f"{name:<10} {statistics.mean(lags):>8.2f}s {percentile(lags, 0.95):>7.2f}s "
+            f"{statistics.mean(polls):>10.1f} {timeouts:>9}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
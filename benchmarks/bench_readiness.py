@@ -0,0 +1,220 @@
+"""
+Measure the seconds readiness probes save over the fixed sleeps after launch and hotkeys.
+
+Runs AutomationSession's launch → maximize → terminal → Copilot stages against
+a simulated VS Code on a virtual clock. The window, terminal pane, chat panel
+and Agent mode input each appear some time after the action that opens them,
+with delays taken from a machine profile. Every screenshot costs
+--capture-cost seconds. Each profile is run three ways:
+
+    fixed    the original fixed sleeps (READINESS=off)
+    probes   window-title polling plus pixel checks of the terminal and chat regions
+    pixels   pixel checks only, as on Linux where windows cannot be enumerated
+
+"early" counts actions taken before the UI they act on was ready; these are
+the steps that misfire on slow machines.
+
+Usage:
+    python -m benchmarks.bench_readiness
+    python -m benchmarks.bench_readiness --profiles slow --timeout-scale 2 --capture-cost 0.08
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+from unittest import mock
+
+from PIL import Image, ImageDraw
+
+from engine import AutomationConfig, AutomationSession
+from readiness import ReadinessProbes
+from replay import VirtualClock
+from screen_regions import COPILOT_CHAT_REGION, TERMINAL_REGION, region_to_box
+
+SCREEN_SIZE = (1280, 720)
+
+# Seconds until each piece of UI is ready after the action that opens it
+PROFILES = {
+    "fast": {"window": 2.0, "focus": 0.1, "maximize": 0.3, "terminal": 0.5, "chat": 0.8, "agent": 0.5},
+    "typical": {"window": 4.0, "focus": 0.2, "maximize": 0.5, "terminal": 1.2, "chat": 1.8, "agent": 1.0},
+    "slow": {"window": 9.0, "focus": 0.5, "maximize": 1.5, "terminal": 3.5, "chat": 5.0, "agent": 3.5},
+}
+MODES = ("fixed", "probes", "pixels")
+
+
+class SimulatedWindow:
+    def __init__(self, vscode, title):
+        self.vscode = vscode
+        self.title = title
+
+    def activate(self):
+        self.vscode.schedule("focus", "window")
+
+    def maximize(self):
+        self.vscode.schedule("maximize", "focus")
+
+    @property
+    def isActive(self):
+        return self.vscode.ready("focus")
+
+    @property
+    def isMaximized(self):
+        return self.vscode.ready("maximize")
+
+
+class SimulatedVSCode:
+    """VS Code UI that appears after profile delays; also stands in for pyautogui and Popen."""
+
+    def __init__(self, clock, profile, project, capture_cost):
+        self.clock = clock
+        self.profile = profile
+        self.capture_cost = capture_cost
+        self.window = SimulatedWindow(self, f"{project} - Visual Studio Code")
+        self.ready_at = {}
+        self.early = []
+
+    def ready(self, name):
+        return name in self.ready_at and self.clock.now >= self.ready_at[name]
+
+    def schedule(self, name, requires):
+        """Start opening `name`, noting whether the UI it depends on was ready."""
+        started = self.clock.now
+        if requires is not None and not self.ready(requires):
+            self.early.append(name)
+            # The action only takes effect once the UI it needs has appeared
+            started = max(started, self.ready_at.get(requires, started))
+        self.ready_at[name] = started + self.profile[name]
+
+    def started_between(self, name, fraction):
+        """True once `name` is the given fraction of the way through opening."""
+        if name not in self.ready_at:
+            return False
+        delay = self.profile[name]
+        return self.clock.now >= self.ready_at[name] - delay * (1 - fraction)
+
+    # subprocess.Popen
+    def launch(self, command, shell=False):
+        self.ready_at["window"] = self.clock.now + self.profile["window"]
+
+    # pygetwindow enumeration
+    def windows(self):
+        return [self.window] if self.ready("window") else []
+
+    # pyautogui
+    def hotkey(self, *keys):
+        if keys == ("ctrl", "shift", "`"):
+            self.schedule("terminal", "maximize")
+        elif keys == ("ctrl", "alt", "i"):
+            self.schedule("chat", "terminal")
+        elif keys == ("ctrl", "shift", "i"):
+            self.schedule("agent", "chat")
+        elif keys == ("alt", "tab"):
+            self.schedule("focus", "window")
+        elif keys == ("win", "up"):
+            self.schedule("maximize", "focus")
+
+    def press(self, key):
+        pass
+
+    def write(self, text, interval=0.0):
+        pass
+
+    def moveTo(self, x, y):
+        pass
+
+    def screenshot(self):
+        self.clock.sleep(self.capture_cost)
+        image = Image.new("RGB", SCREEN_SIZE, (0, 90, 160))  # desktop wallpaper
+        draw = ImageDraw.Draw(image)
+        width, height = SCREEN_SIZE
+        # The window shows blank first, then the workbench is drawn
+        if self.started_between("window", 0.75) or self.ready("window"):
+            draw.rectangle((0, 0, width, height), fill=(30, 30, 30))
+        if self.ready("window"):
+            draw.rectangle((0, 0, 48, height), fill=(51, 51, 51))
+            draw.rectangle((48, 0, 300, height), fill=(37, 37, 38))
+            for line in range(12):
+                draw.rectangle((320, 40 + line * 24, 700 + (line * 53) % 300, 52 + line * 24), fill=(156, 220, 254))
+
+        # The terminal pane opens at once; the shell prints its prompt when ready
+        left, top, right, bottom = region_to_box(SCREEN_SIZE, TERMINAL_REGION)
+        if self.started_between("terminal", 0.1):
+            draw.rectangle((left, top, right, bottom), fill=(24, 24, 24))
+        if self.ready("terminal"):
+            draw.rectangle((left + 10, top + 10, left + 200, top + 22), fill=(204, 204, 204))
+
+        # The chat panel slides in, then its input is drawn with the focus border
+        left, top, right, bottom = region_to_box(SCREEN_SIZE, COPILOT_CHAT_REGION)
+        if self.ready("chat"):
+            draw.rectangle((left, top, right, bottom), fill=(24, 24, 24))
+            draw.rectangle((left + 10, bottom - 60, right - 10, bottom - 20), outline=(0, 120, 212), width=2)
+        elif self.started_between("chat", 0.5):
+            draw.rectangle((left, (top + bottom) // 2, right, bottom), fill=(24, 24, 24))
+        if self.ready("agent"):
+            # The mode picker under the input switches to Agent
+            draw.rectangle((left + 10, bottom - 16, left + 90, bottom - 4), fill=(204, 204, 204))
+        return image
+
+
+def run_stages(profile, mode, capture_cost, timeout_scale, verbose):
+    clock = VirtualClock()
+    config = AutomationConfig(project_folder="/work/hello-project")
+    vscode = SimulatedVSCode(clock, profile, config.project_name, capture_cost)
+    session = AutomationSession(
+        config, clients=object(), desktop=vscode, clock=clock, sleep=clock.sleep
+    )
+    list_windows = vscode.windows
+    if mode == "pixels":
+        def list_windows():
+            raise ImportError("pygetwindow not available")
+    session.readiness = ReadinessProbes(
+        enabled=mode != "fixed",
+        timeout_scale=timeout_scale,
+        list_windows=list_windows,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    output = sys.stdout if verbose else io.StringIO()
+    with contextlib.redirect_stdout(output), mock.patch("engine.subprocess.Popen", vscode.launch):
+        session.launch("code")
+        session.open_terminal()
+        session.open_copilot()
+    # The prompt is typed next and needs the Agent mode input
+    if not vscode.ready("agent"):
+        vscode.early.append("prompt")
+    timeouts = sum(not result.ready for result in session.readiness.results)
+    return clock.now, vscode.early, timeouts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", default=",".join(PROFILES))
+    parser.add_argument("--capture-cost", type=float, default=0.04, help="Seconds per screenshot")
+    parser.add_argument(
+        "--timeout-scale", type=float, default=1.0,
+        help="READINESS_TIMEOUT_SCALE; also stretches the wait for panels that were already open",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Show the engine's log lines")
+    args = parser.parse_args(argv)
+
+    print("\n📊 Launch → maximize → terminal → Copilot on a simulated VS Code (virtual clock)")
+    print(f"{'profile':<9} {'mode':<7} {'seconds':>8} {'saved':>7} {'early':>6} {'timeouts':>9}  early steps")
+    for name in args.profiles.split(","):
+        fixed_seconds = None
+        for mode in MODES:
+            seconds, early, timeouts = run_stages(
+                PROFILES[name], mode, args.capture_cost, args.timeout_scale, args.verbose
+            )
+            if mode == "fixed":
+                fixed_seconds = seconds
+            print(
+                f"{name:<9} {mode:<7} {seconds:>8.2f} {fixed_seconds - seconds:>7.2f} "
+                f"{len(early):>6} {timeouts:>9}  {', '.join(early) or '-'}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,369 @@
+"""
+Replay recorded runs through the pip-install and Keep-button monitoring loops, offline and headless.
+
+Each recording (a RECORD_DIR run directory, see replay.SessionRecorder) is fed
+through AutomationSession._monitor_installation_with_screenshots and
+AutomationSession.await_completion with a ReplayDesktop serving the recorded
+frames and ReplayClients answering every model request from the recorded
+responses. Each loop replays the recording from its start. Time runs on a virtual clock, so a two-minute wait replays
+in well under a second and no display, network or Azure credential is needed.
+Without --recordings, synthetic VS Code-like recordings are generated first.
+
+Reported per loop and configuration, averaged over the jobs:
+    lag      seconds from the first frame showing the awaited state (terminal
+             idle, Keep button enabled) to the loop detecting it
+    calls    model calls per job
+    MB up    request bytes uploaded per job
+    CPU s    process CPU time spent in the loop per job (capture, gate, hashing, encoding)
+    wasted   polls per job that ended without a usable answer and waited a full interval
+
+With --malformed, that fraction of the synthetic first answers are malformed
+(prose, a wrong field, an empty reply) while the recorded re-asks answer
+correctly, so --max-reasks 0,1 shows the poll cycles the immediate re-ask saves.
+
+Configurations:
+    original   every frame sent in full as PNG, no gate, cache or local detector
+    crop       frames cropped to the terminal / Copilot panel
+    gate       + frame-change gate
+    cache      + verdict cache
+    detector   + local Keep-button detector (calibrated to the synthetic button);
+               the pip loop has no local check, so it matches cache there
+
+Usage:
+    python -m benchmarks.bench_replay
+    python -m benchmarks.bench_replay --complete-after 20,45,70 --latency 2.5
+    python -m benchmarks.bench_replay --loops pip --install-after 10,25,40
+    python -m benchmarks.bench_replay --malformed 0.3 --max-reasks 0,1 --configurations cache
+    python -m benchmarks.bench_replay --recordings recordings/*/
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from PIL import Image, ImageDraw
+
+from cua_requests import build_cua_input, computer_use_tool
+from engine import (
+    INSTALLATION_PROMPT,
+    KEEP_BUTTON_PROMPT,
+    KEEP_SCHEMA,
+    PIP_SCHEMA,
+    AutomationConfig,
+    AutomationSession,
+)
+from frame_gate import FrameChangeGate
+from keep_detector import (
+    DISABLED_BUTTON_OPACITY,
+    VSCODE_BUTTON_COLOR,
+    VSCODE_PANEL_BACKGROUND,
+    KeepButtonDetector,
+    blend_colors,
+)
+from poll_scheduler import DurationHistory
+from response_decoding import decode_verdict, reask_settings
+from replay import (
+    Recording,
+    ReplayClients,
+    ReplayDesktop,
+    SessionRecorder,
+    VirtualClock,
+    make_response,
+)
+from screen_capture import CaptureSettings, encode_frame
+from screen_regions import COPILOT_CHAT_REGION, TERMINAL_REGION
+from verdict_cache import VerdictCache
+
+MODEL_NAME = "computer-use-preview"
+SCREEN_SIZE = (1920, 1080)
+KEEP_BUTTON_BOX = (1580, 980, 1660, 1010)
+KEEP_BUTTON_REGION = (0.82, 0.9, 0.87, 0.94)
+CONFIGURATIONS = ("original", "crop", "gate", "cache", "detector")
+LOOPS = ("pip", "keep")
+# The pip loop sleeps this long after detecting completion, before it returns
+PIP_SETTLE_SECONDS = 3
+MALFORMED_ANSWERS = (
+    "The Keep button appears to be {verdict}.",
+    '{{"status": "{verdict}"}}',
+    "",
+    '{{"button": "greyed out"}}',
+)
+
+
+def is_enabled(text):
+    return decode_verdict(make_response(text), KEEP_SCHEMA).verdict == "enabled"
+
+
+def is_installed(text):
+    return decode_verdict(make_response(text), PIP_SCHEMA).verdict == "complete"
+
+
+def synthetic_frame(seconds, complete_after, install_after=0.0):
+    """
+    A VS Code-like screen: pip prints a line per second into the terminal until it
+    returns to the prompt, while Copilot streams lines into the chat panel until
+    Keep turns blue. By default pip has already finished and the terminal is idle,
+    as it is by the time the engine waits for the Keep button.
+    """
+    image = Image.new("RGB", SCREEN_SIZE, (30, 30, 30))
+    draw = ImageDraw.Draw(image)
+    panel_left = int(COPILOT_CHAT_REGION[0] * SCREEN_SIZE[0])
+    draw.rectangle((panel_left, 0, SCREEN_SIZE[0], SCREEN_SIZE[1]), fill=VSCODE_PANEL_BACKGROUND)
+
+    # Terminal below the editor, left of the chat panel
+    terminal_top = int(TERMINAL_REGION[1] * SCREEN_SIZE[1])
+    draw.line((0, terminal_top, panel_left, terminal_top), fill=(70, 70, 70))
+    lines = int(min(seconds, install_after))
+    for line in range(min(lines, 20)):
+        width = 240 + (line * 53) % 360
+        top = terminal_top + 12 + line * 20
+        draw.rectangle((12, top, 12 + width, top + 9), fill=(190, 190, 190))
+    if seconds >= install_after:
+        top = terminal_top + 12 + min(lines, 20) * 20
+        draw.rectangle((12, top, 110, top + 9), fill=(230, 230, 120))
+
+    # One new line of streamed text every two seconds until generation completes
+    lines = int(min(seconds, complete_after) // 2)
+    for line in range(min(lines, 40)):
+        width = 180 + (line * 97) % 480
+        top = 40 + line * 22
+        draw.rectangle((panel_left + 20, top, panel_left + 20 + width, top + 10), fill=(204, 204, 204))
+
+    # Blinking cursor in the editor: a tiny change the frame gate should ignore
+    if int(seconds) % 2:
+        draw.rectangle((200, 200, 202, 218), fill=(220, 220, 220))
+
+    enabled = seconds >= complete_after
+    color = (
+        VSCODE_BUTTON_COLOR
+        if enabled
+        else blend_colors(VSCODE_BUTTON_COLOR, VSCODE_PANEL_BACKGROUND, DISABLED_BUTTON_OPACITY)
+    )
+    draw.rectangle(KEEP_BUTTON_BOX, fill=color)
+    return image
+
+
+def _request(prompt, frame):
+    return {
+        "model": MODEL_NAME,
+        "tools": [computer_use_tool(frame.width, frame.height)],
+        "input": build_cua_input(prompt, frame),
+        "truncation": "auto",
+    }
+
+
+def make_synthetic_recording(
+    root,
+    name,
+    complete_after,
+    install_after,
+    duration,
+    frame_interval,
+    latency,
+    malformed=0.0,
+    seed=0,
+):
+    """
+    Record a synthetic run: a frame every `frame_interval` seconds, each answered by the model
+    for both the pip and the Keep check.
+
+    Requests are recorded as the default checks send them (cropped PNG), so
+    replays with the default capture settings match them exactly. A
+    `malformed` fraction of the Keep answers is unusable; every frame also gets
+    a correct answer to each check's cheaper re-ask.
+    """
+    rng = random.Random(f"{seed}-{name}")
+    clock = VirtualClock()
+    recorder = SessionRecorder(root, clock=clock)
+    directory = recorder.start(name)
+    checks = (
+        (KEEP_BUTTON_PROMPT, KEEP_SCHEMA, CaptureSettings(region=COPILOT_CHAT_REGION), complete_after),
+        (INSTALLATION_PROMPT, PIP_SCHEMA, CaptureSettings(region=TERMINAL_REGION), install_after),
+    )
+
+    while clock.now <= duration:
+        image = synthetic_frame(clock.now, complete_after, install_after)
+        recorder.record_frame(image)
+        for prompt, schema, settings, done_after in checks:
+            verdict = schema.values[0] if clock.now >= done_after else schema.values[1]
+            answer = f'{{"{schema.field}": "{verdict}"}}'
+            first_answer = answer
+            if schema is KEEP_SCHEMA and rng.random() < malformed:
+                first_answer = rng.choice(MALFORMED_ANSWERS).format(verdict=verdict)
+
+            recorder.record_response(
+                _request(prompt, encode_frame(image, settings)),
+                make_response(first_answer),
+                latency,
+                recorder.last_frame,
+            )
+            recorder.record_response(
+                _request(schema.reask_prompt(), encode_frame(image, reask_settings(settings))),
+                make_response(answer),
+                latency * 0.6,
+                recorder.last_frame,
+            )
+        clock.sleep(frame_interval)
+    return directory
+
+
+def configure(session, name, cache):
+    """Switch the session's optimisations on up to configuration `name`."""
+    level = CONFIGURATIONS.index(name)
+    if level == 0:
+        session.config.pip_capture_settings = CaptureSettings()
+        session.config.keep_capture_settings = CaptureSettings()
+    if level < 2:
+        # A gate that never finds a frame unchanged sends every frame
+        session.pip_frame_gate = FrameChangeGate("pip", region=TERMINAL_REGION, min_changed_pixels=0)
+        session.keep_frame_gate = FrameChangeGate(
+            "keep", region=COPILOT_CHAT_REGION, min_changed_pixels=0
+        )
+    session.verdict_cache = cache if level >= 3 else None
+    session.keep_button_detector = KeepButtonDetector(
+        region=KEEP_BUTTON_REGION if level >= 4 else None
+    )
+
+
+def replay_job(recording, loop, name, max_reasks, history, cache, latency, timeout, verbose):
+    clock = VirtualClock()
+    desktop = ReplayDesktop(recording, clock=clock)
+    clients = ReplayClients(recording, desktop, sleep=clock.sleep, latency=latency)
+    config = AutomationConfig(
+        cua_model_name=MODEL_NAME,
+        project_folder=recording.directory,
+        install_timeout=timeout,
+        generation_timeout=timeout,
+        max_reasks=max_reasks,
+    )
+    session = AutomationSession(
+        config, clients=clients, desktop=desktop, clock=clock, sleep=clock.sleep
+    )
+    session.recorder = None
+    session.poll_history = history
+    configure(session, name, cache)
+
+    output = sys.stdout if verbose else io.StringIO()
+    cpu_started = time.process_time()
+    with contextlib.redirect_stdout(output):
+        if loop == "pip":
+            found = session._monitor_installation_with_screenshots()
+            detected_at = clock.now - PIP_SETTLE_SECONDS
+        else:
+            found = session.await_completion()
+            detected_at = desktop.action_time("ctrl+enter")
+    cpu_seconds = time.process_time() - cpu_started
+
+    if loop == "pip":
+        done_at = recording.first_frame_time(INSTALLATION_PROMPT, is_installed)
+    else:
+        done_at = recording.first_frame_time(KEEP_BUTTON_PROMPT, is_enabled)
+    lag = detected_at - done_at if found and done_at is not None else None
+    return {
+        "found": found,
+        "lag": lag,
+        "calls": clients.calls,
+        "bytes": clients.bytes_uploaded,
+        "cpu": cpu_seconds,
+        "unmatched": clients.unmatched,
+        "wasted": session.decode_stats.unusable,
+        "reasks": session.decode_stats.reasks,
+    }
+
+
+def print_rows(loop, recordings, rows):
+    title = "pip-install" if loop == "pip" else "Keep-button"
+    print(f"\n📊 Replayed {recordings} job(s) through the {title} loop on a virtual clock")
+    print(
+        f"{'config':<12} {'found':>6} {'lag p50':>8} {'lag max':>8} {'calls/job':>10} "
+        f"{'MB up/job':>10} {'CPU s/job':>10} {'wasted':>7} {'re-asks':>8} {'unmatched':>10}"
+    )
+    for name, jobs in rows:
+        lags = [job["lag"] for job in jobs if job["lag"] is not None]
+        print(
+            f"{name:<12} {sum(job['found'] for job in jobs):>3}/{len(jobs):<2} "
+            f"{statistics.median(lags) if lags else float('nan'):>8.2f} "
+            f"{max(lags) if lags else float('nan'):>8.2f} "
+            f"{statistics.mean(job['calls'] for job in jobs):>10.1f} "
+            f"{statistics.mean(job['bytes'] for job in jobs) / 1e6:>10.2f} "
+            f"{statistics.mean(job['cpu'] for job in jobs):>10.3f} "
+            f"{statistics.mean(job['wasted'] for job in jobs):>7.1f} "
+            f"{statistics.mean(job['reasks'] for job in jobs):>8.1f} "
+            f"{sum(job['unmatched'] for job in jobs):>10}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recordings", nargs="*", help="Recorded run directories (globs allowed)")
+    parser.add_argument(
+        "--complete-after", default="18,30,42,35,27",
+        help="Synthetic jobs: seconds until the Keep button is enabled, one per job",
+    )
+    parser.add_argument(
+        "--install-after", default="8,14,6,20,11",
+        help="Synthetic jobs: seconds until pip returns to the prompt, one per job",
+    )
+    parser.add_argument("--frame-interval", type=float, default=1.0, help="Synthetic frame spacing (s)")
+    parser.add_argument(
+        "--latency", type=float, default=None,
+        help="Model latency (s); the recorded latency of each response by default",
+    )
+    parser.add_argument("--synthetic-latency", type=float, default=2.0, help="Latency recorded in synthetic runs (s)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--loops", default=",".join(LOOPS), help="Monitoring loops to replay")
+    parser.add_argument("--configurations", default=",".join(CONFIGURATIONS))
+    parser.add_argument("--malformed", type=float, default=0.0, help="Synthetic fraction of malformed answers")
+    parser.add_argument("--max-reasks", default="1", help="Comma-separated re-ask limits to compare")
+    parser.add_argument("--verbose", action="store_true", help="Show the engine's log lines")
+    args = parser.parse_args(argv)
+
+    os.environ.pop("RECORD_DIR", None)
+    workdir = tempfile.mkdtemp(prefix="cua-replay-")
+    directories = []
+    for pattern in args.recordings or []:
+        directories += sorted(glob.glob(pattern)) or [pattern]
+    if not directories:
+        install_after = args.install_after.split(",")
+        for job, complete_after in enumerate(args.complete_after.split(",")):
+            complete_after = float(complete_after)
+            installed_after = float(install_after[job % len(install_after)])
+            directories.append(
+                make_synthetic_recording(
+                    workdir, f"job{job + 1}", complete_after, installed_after,
+                    max(complete_after, installed_after) + 20,
+                    args.frame_interval, args.synthetic_latency, args.malformed,
+                )
+            )
+    recordings = [Recording(directory) for directory in directories]
+
+    reask_limits = [int(limit) for limit in args.max_reasks.split(",")]
+    for loop in args.loops.split(","):
+        rows = []
+        for name in args.configurations.split(","):
+            for max_reasks in reask_limits:
+                # History and cache carry over from job to job, as they do between real runs
+                label = name if len(reask_limits) == 1 else f"{name} r{max_reasks}"
+                history = DurationHistory(os.path.join(workdir, f"history_{loop}_{label}.json"))
+                cache = VerdictCache()
+                jobs = [
+                    replay_job(
+                        recording, loop, name, max_reasks, history, cache,
+                        args.latency, args.timeout, args.verbose,
+                    )
+                    for recording in recordings
+                ]
+                rows.append((label, jobs))
+        print_rows(loop, len(recordings), rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
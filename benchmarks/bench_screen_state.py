@@ -0,0 +1,213 @@
+"""
+Compare the batched screen-state query with per-check requests in the engine's own wait order.
+
+The engine waits for pip first and for the Keep button afterwards; the two
+waits never overlap. Each mode below polls a fake desktop against the local
+mock Responses endpoint: its terminal turns idle (a green block in the
+terminal region) after --terminal-after seconds. In the "keep" scenario its
+Keep button turns enabled (a blue block in the Copilot region) after
+--keep-after seconds; in the "copilot error" scenario Copilot stops with an
+error (a red block) at the same time and the button never turns enabled.
+The mock answers every field it is asked from the pixels it receives, so a
+crop that leaves out a region cannot see that region's answer.
+
+    per-check    the pip wait, then the Keep wait, each sending its own
+                 question cropped to its own region (SCREEN_STATE=off)
+    batched      the same sequential waits through one ScreenStateBroker,
+                 registered the way the engine registers them: each request
+                 also asks whether Copilot is streaming and an error is
+                 visible, so a failed generation ends the Keep wait early
+    overlapping  both waits at once on one broker; not what the engine does,
+                 shown as the most batching could save if the waits overlapped
+
+Reported are the detection times, requests, bytes uploaded and input tokens.
+
+Usage:
+    python -m benchmarks.bench_screen_state --latency 1.0 --terminal-after 3 --keep-after 6
+"""
+
+import argparse
+import base64
+import re
+import sys
+import time
+from io import BytesIO
+
+import numpy as np
+from openai import AzureOpenAI
+from PIL import Image
+
+from benchmarks.mock_responses_server import (
+    NEGATIVE_COLOR,
+    POSITIVE_COLOR,
+    MockResponsesServer,
+    find_image_url,
+    find_input_text,
+)
+from engine import AutomationSession
+from screen_regions import COPILOT_CHAT_REGION, TERMINAL_REGION, region_to_box
+from screen_state import ScreenStateBroker
+
+API_VERSION = "2025-03-01-preview"
+MODEL_NAME = "computer-use-preview"
+SIZE = (1280, 720)
+MODES = ("per-check", "batched", "overlapping")
+SCENARIOS = ("keep", "copilot error")
+
+# The part of each region the other one does not cover, so a crop shows only its own indicator
+TERMINAL_INDICATOR = (TERMINAL_REGION[0], TERMINAL_REGION[1], COPILOT_CHAT_REGION[0], TERMINAL_REGION[3])
+KEEP_INDICATOR = (COPILOT_CHAT_REGION[0], COPILOT_CHAT_REGION[1], COPILOT_CHAT_REGION[2], TERMINAL_REGION[1])
+TERMINAL_COLOR = (0, 200, 120)
+ERROR_COLOR = (220, 40, 40)
+
+# The engine's waits in order, the fields each registers (AutomationSession._watch_screen_state,
+# its own question first), how it decides, and the verdicts that end it
+ENGINE_WAITS = (
+    ("pip", ("terminal_idle", "error_visible"), AutomationSession._pip_state_verdict, ("complete",)),
+    (
+        "keep",
+        ("keep_enabled", "copilot_streaming", "error_visible"),
+        AutomationSession._keep_state_verdict,
+        ("enabled", "failed"),
+    ),
+)
+
+
+class FakeDesktop:
+    """Fake screen whose terminal turns green once idle and whose Copilot panel turns blue
+    once the Keep button is enabled, or red once Copilot has failed."""
+
+    def __init__(self, terminal_after, keep_after, error_after=float("inf")):
+        self.terminal_after = terminal_after
+        self.keep_after = keep_after
+        self.error_after = error_after
+        self.started_at = time.monotonic()
+        self.frames_captured = 0
+
+    def capture(self):
+        self.frames_captured += 1
+        elapsed = time.monotonic() - self.started_at
+        image = Image.new("RGB", SIZE, NEGATIVE_COLOR)
+        if elapsed >= self.terminal_after:
+            image.paste(TERMINAL_COLOR, region_to_box(SIZE, TERMINAL_INDICATOR))
+        if elapsed >= self.keep_after:
+            image.paste(POSITIVE_COLOR, region_to_box(SIZE, KEEP_INDICATOR))
+        elif elapsed >= self.error_after:
+            image.paste(ERROR_COLOR, region_to_box(SIZE, KEEP_INDICATOR))
+        return image
+
+
+def shows(pixels, color, tolerance=40):
+    return bool((np.abs(pixels - np.array(color)).max(axis=-1) < tolerance).any())
+
+
+def respond(payload):
+    """Answer each asked field from the indicator colours visible in the received crop."""
+    fields = re.findall(r'"(\w+)": true or false', find_input_text(payload))
+    encoded = find_image_url(payload).split(",", 1)[1]
+    with Image.open(BytesIO(base64.b64decode(encoded))) as image:
+        pixels = np.asarray(image.convert("RGB"), dtype=np.int16)
+
+    answers = {
+        "terminal_idle": shows(pixels, TERMINAL_COLOR),
+        "keep_enabled": shows(pixels, POSITIVE_COLOR),
+        "copilot_streaming": not shows(pixels, POSITIVE_COLOR) and not shows(pixels, ERROR_COLOR),
+        "error_visible": shows(pixels, ERROR_COLOR),
+    }
+    return "{" + ", ".join(f'"{field}": {str(answers[field]).lower()}' for field in fields) + "}"
+
+
+def until(decide, final, name, done_at, started_at):
+    def on_state(answers):
+        verdict = decide(answers)
+        if verdict in final:
+            done_at[name] = (time.monotonic() - started_at, verdict)
+            return True
+        return False
+
+    return on_state
+
+
+def run(mode, client, terminal_after, keep_after, error_after, interval, timeout):
+    desktop = FakeDesktop(terminal_after, keep_after, error_after)
+    done_at = {}
+    brokers = {}
+
+    def register(broker, name, fields, decide, final):
+        # A per-check request asks only the check's own question
+        fields = list(fields) if mode != "per-check" else [fields[0]]
+        broker.watch(name, fields, until(decide, final, name, done_at, desktop.started_at))
+
+    if mode == "overlapping":
+        shared = ScreenStateBroker(client, MODEL_NAME)
+        for wait in ENGINE_WAITS:
+            register(shared, *wait)
+        brokers["shared"] = shared
+        waits = [("shared", None, None, None)]
+    else:
+        shared = ScreenStateBroker(client, MODEL_NAME)
+        for name, *_ in ENGINE_WAITS:
+            brokers[name] = shared if mode == "batched" else ScreenStateBroker(client, MODEL_NAME)
+        waits = list(ENGINE_WAITS)
+
+    for name, fields, decide, final in waits:
+        broker = brokers[name]
+        if fields is not None:
+            register(broker, name, fields, decide, final)
+        while broker.fields and time.monotonic() - desktop.started_at < timeout:
+            broker.query(desktop.capture())
+            if broker.fields:
+                time.sleep(interval)
+
+    requests = sum(broker.requests_sent for broker in set(brokers.values()))
+    return done_at, requests
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=1.0, help="Mock model latency (s)")
+    parser.add_argument("--terminal-after", type=float, default=3.0)
+    parser.add_argument("--keep-after", type=float, default=6.0)
+    parser.add_argument("--interval", type=float, default=0.5, help="Pause between frames (s)")
+    parser.add_argument("--timeout", type=float, default=20.0)
+    args = parser.parse_args(argv)
+
+    rows = []
+    for scenario in SCENARIOS:
+        keep_after, error_after = args.keep_after, float("inf")
+        if scenario == "copilot error":
+            keep_after, error_after = float("inf"), args.keep_after
+        for mode in MODES:
+            with MockResponsesServer(latency=args.latency, responder=respond) as server:
+                client = AzureOpenAI(api_key="mock", azure_endpoint=server.url, api_version=API_VERSION)
+                done_at, requests = run(
+                    mode, client, args.terminal_after, keep_after, error_after,
+                    args.interval, args.timeout,
+                )
+                rows.append(
+                    (scenario, mode, done_at, requests, server.bytes_received, server.input_tokens)
+                )
+
+    print(
+        f"\n📊 pip then Keep waits, {args.latency}s model latency, terminal idle at "
+        f"{args.terminal_after}s, Keep enabled (or Copilot error) at {args.keep_after}s, "
+        f"{args.timeout}s timeout"
+    )
+    print(
+        f"{'scenario':<14} {'mode':<12} {'pip done':>9} {'keep done':>18} {'requests':>9} "
+        f"{'KB sent':>8} {'input tok':>10}"
+    )
+    for scenario, mode, done_at, requests, sent, input_tokens in rows:
+        pip_done = f"{done_at['pip'][0]:.2f}s" if "pip" in done_at else "timeout"
+        keep_done = (
+            f"{done_at['keep'][0]:.2f}s {done_at['keep'][1]}" if "keep" in done_at else "timeout"
+        )
+        print(
+            f"{scenario:<14} {mode:<12} {pip_done:>9} {keep_done:>18} {requests:>9} "
+            f"{sent / 1024:>8.1f} {input_tokens:>10}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Measure app.py's startup time with eager and deferred imports, without a display or network.
+
+Every mode runs in a fresh interpreter --runs times with DISPLAY unset and a
+placeholder endpoint and API key, so nothing reaches the screen or Azure:
+
+    eager         what app.py did before imports were deferred: dotenv,
+                  openai, numpy, asyncio, azure.identity and pyautogui (those
+                  installed here) and engine up front, then the client built
+                  before doing anything
+    lazy          python app.py --check-config: parse arguments, resolve the
+                  configuration and find VS Code
+    first-client  lazy startup plus building the OpenAI client, i.e. the cost
+                  moved to the first model call
+
+Reported are the median and fastest wall time and the number of modules
+imported (from one extra run under -X importtime).
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --modes eager,lazy
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from startup_profile import APP_PATH, time_imports
+
+MODES = ("eager", "lazy", "first-client")
+
+EAGER_SCRIPT = """
+import asyncio
+import numpy
+import openai
+try:
+    import dotenv
+except ImportError:
+    pass
+try:
+    import azure.identity
+except ImportError:
+    pass
+try:
+    import pyautogui
+except ImportError:
+    pass
+import engine
+from openai import AzureOpenAI
+AzureOpenAI(api_key="placeholder", azure_endpoint="http://127.0.0.1:9", api_version="2025-03-01-preview")
+"""
+
+FIRST_CLIENT_SCRIPT = """
+import sys
+sys.argv = [{app!r}, "--check-config"]
+import app
+app.main(sys.argv[1:])
+from engine import AutomationConfig, get_cua_clients
+get_cua_clients(AutomationConfig.from_env()).client
+"""
+
+
+def child_environment():
+    env = dict(os.environ)
+    env.pop("DISPLAY", None)
+    env.pop("WAYLAND_DISPLAY", None)
+    env.update(
+        {
+            "AZURE_OPENAI_ENDPOINT": "http://127.0.0.1:9",
+            "AZURE_API_VERSION": "2025-03-01-preview",
+            "CUA_MODEL_NAME": "computer-use-preview",
+            "AZURE_OPENAI_API_KEY": "placeholder",
+            "VSCODE_PATH": sys.executable,
+            "PROJECT_FOLDER": tempfile.gettempdir(),
+        }
+    )
+    return env
+
+
+def command(mode):
+    if mode == "eager":
+        return ["-c", EAGER_SCRIPT]
+    if mode == "lazy":
+        return [APP_PATH, "--check-config"]
+    return ["-c", FIRST_CLIENT_SCRIPT.format(app=APP_PATH)]
+
+
+def run(mode, args, env):
+    args_for_mode = command(mode)
+    seconds = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable] + args_for_mode,
+            capture_output=True,
+            cwd=os.path.dirname(APP_PATH),
+            env=env,
+            check=True,
+        )
+        seconds.append(time.perf_counter() - started)
+    timings, _, _, _ = time_imports(args_for_mode, env=env)
+    return {
+        "median_ms": statistics.median(seconds) * 1000,
+        "fastest_ms": min(seconds) * 1000,
+        "modules": len(timings),
+        "openai_loaded": any(timing.name == "openai" for timing in timings),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Interpreter starts per mode")
+    parser.add_argument("--modes", default=",".join(MODES))
+    args = parser.parse_args(argv)
+
+    env = child_environment()
+    print(f"\n📊 Startup over {args.runs} runs per mode, no display, placeholder endpoint")
+    print(f"{'mode':<14} {'median ms':>10} {'fastest ms':>11} {'modules':>8} {'openai':>7}")
+    for mode in args.modes.split(","):
+        row = run(mode, args, env)
+        print(
+            f"{mode:<14} {row['median_ms']:>10.0f} {row['fastest_ms']:>11.0f} {row['modules']:>8} "
+            f"{'yes' if row['openai_loaded'] else 'no':>7}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
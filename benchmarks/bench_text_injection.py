@@ -0,0 +1,157 @@
+"""
+Benchmark text injection time against prompt length for each backend.
+
+By default the keyboard is simulated: a fake text field receives the key events
+and every pyautogui call is charged its real costs (--pause after each call, as
+pyautogui.PAUSE does, and --key-cost per key event) on a virtual clock, so the
+original typewrite(interval=0.05) can be measured for long prompts without
+waiting minutes. Read-back verification runs against the fake field. With --live
+the text is entered into whatever window has focus after a countdown; focus an
+empty editor or the Copilot chat box first.
+
+Usage:
+    python -m benchmarks.bench_text_injection --lengths 100,330,1000,4000
+    python -m benchmarks.bench_text_injection --lengths 100,330 --live
+"""
+
+import argparse
+import sys
+import time
+
+from text_injection import INJECTION_BACKENDS, TextInjector
+
+SAMPLE = (
+    "add a python script that calculates the factorial of the first n natural numbers. "
+    "There is no need to create a python virtual environment. Add the code directly to the project.\n"
+)
+
+
+class FakeClipboard:
+    available = True
+
+    def __init__(self):
+        self.text = ""
+
+    def copy(self, text):
+        self.text = text
+
+    def paste(self):
+        return self.text
+
+
+class FakeKeyboard:
+    """A text field driven through pyautogui-style calls, with costs on a virtual clock."""
+
+    def __init__(self, clipboard, pause, key_cost):
+        self.clipboard = clipboard
+        self.pause = pause
+        self.key_cost = key_cost
+        self.field = ""
+        self.selected = False
+        self.virtual_seconds = 0.0
+
+    def _call(self, key_events, interval=0.0):
+        self.virtual_seconds += key_events * (self.key_cost + interval) + self.pause
+
+    def _insert(self, text):
+        if self.selected:
+            self.field = ""
+            self.selected = False
+        self.field += text
+
+    def write(self, text, interval=0.0):
+        self._insert(text)
+        self._call(len(text), interval)
+
+    def hotkey(self, *keys):
+        self._call(len(keys))
+        if keys[-1] == "v":
+            self._insert(self.clipboard.paste())
+        elif keys[-1] == "a":
+            self.selected = True
+        elif keys[-1] == "c" and self.selected:
+            self.clipboard.copy(self.field)
+        elif keys[-1] == "enter":
+            self._insert("\n")
+        else:
+            self.selected = False
+
+    def press(self, key):
+        self._call(1)
+        if key == "delete" and self.selected:
+            self.field = ""
+            self.selected = False
+
+    def screenshot(self):
+        raise RuntimeError("The simulated keyboard only supports read-back verification")
+
+
+def make_text(length):
+    return (SAMPLE * (length // len(SAMPLE) + 1))[:length].rstrip("\n")
+
+
+def run_simulated(text, backend, pause, key_cost):
+    clipboard = FakeClipboard()
+    keyboard = FakeKeyboard(clipboard, pause, key_cost)
+    if backend == "original":
+        keyboard.write(text, interval=0.05)
+        return keyboard.virtual_seconds, keyboard.field == text
+
+    injector = TextInjector(backend, keyboard=keyboard, clipboard=clipboard)
+    started = time.monotonic()
+    result = injector.inject(text, verify="readback")
+    return time.monotonic() - started + keyboard.virtual_seconds, result.verified
+
+
+def run_live(text, backend, countdown):
+    import pyautogui
+
+    print(f"Focus an empty input: entering {len(text)} characters with {backend} in {countdown}s...")
+    time.sleep(countdown)
+    if backend == "original":
+        started = time.monotonic()
+        pyautogui.typewrite(text, interval=0.05)
+        return time.monotonic() - started, None
+
+    result = TextInjector(backend).inject(text, verify="readback")
+    return result.seconds, result.verified
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lengths", default="100,330,1000,4000", help="Prompt lengths in characters")
+    parser.add_argument(
+        "--backends", default=",".join(("original",) + INJECTION_BACKENDS),
+        help="Comma-separated backends; 'original' is typewrite(interval=0.05)",
+    )
+    parser.add_argument("--pause", type=float, default=0.1, help="Simulated pyautogui.PAUSE (s)")
+    parser.add_argument("--key-cost", type=float, default=0.002, help="Simulated cost per key event (s)")
+    parser.add_argument("--live", action="store_true", help="Type into the focused window")
+    parser.add_argument("--countdown", type=float, default=3.0)
+    args = parser.parse_args(argv)
+
+    lengths = [int(length) for length in args.lengths.split(",")]
+    backends = [backend for backend in args.backends.split(",") if backend]
+
+    results = {}
+    for backend in backends:
+        for length in lengths:
+            text = make_text(length)
+            if args.live:
+                results[backend, length] = run_live(text, backend, args.countdown)
+            else:
+                results[backend, length] = run_simulated(text, backend, args.pause, args.key_cost)
+
+    mode = "live" if args.live else f"simulated (pause {args.pause}s, {args.key_cost * 1000:g} ms/key)"
+    print(f"\n📊 Injection time in seconds by prompt length, {mode}")
+    print(f"{'backend':<10}" + "".join(f"{length:>10}" for length in lengths) + "  verified")
+    for backend in backends:
+        row = [results[backend, length] for length in lengths]
+        verified = {result[1] for result in row}
+        status = "yes" if verified == {True} else "no" if False in verified else "n/a"
+        print(f"{backend:<10}" + "".join(f"{seconds:>10.2f}" for seconds, _ in row) + f"  {status}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Measure time-to-token for automation workers with and without the shared token cache.
+
+Tokens come from a fake issuer that sleeps --issue-latency seconds per token,
+standing in for a credential chain walk and token request, so no Azure
+account or network is needed.
+
+Workers: --workers processes start at once, like orchestrator workers, and
+each asks for a token; a second wave then starts after the first finished,
+like the next jobs. Reported per wave are the median and slowest time to the
+first token inside the worker, and the tokens issued:
+
+    per-process  a cache in each process only, like DefaultAzureCredential
+                 with get_bearer_token_provider: every worker fetches
+    shared       TokenCache with its shared file: one worker fetches under the
+                 lock, the others take its token
+
+Refresh: one process asks for a token every --call-interval seconds over
+--hours hours of virtual time with tokens living --lifetime seconds.
+Reported are the calls that had to wait for a fetch:
+
+    at-expiry    the token is only replaced once it is about to expire
+    proactive    it is refreshed in the background --refresh-before seconds ahead
+
+Usage:
+    python -m benchmarks.bench_token_cache
+    python -m benchmarks.bench_token_cache --workers 8 --issue-latency 3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from replay import VirtualClock
+from token_cache import CachedToken, TokenCache
+
+SCOPE = "https://cognitiveservices.azure.com/.default"
+
+
+class FakeTokenIssuer:
+    """Credential whose get_token sleeps like a chain walk and issues numbered tokens."""
+
+    def __init__(self, latency, lifetime, clock=time.time):
+        self.latency = latency
+        self.lifetime = lifetime
+        self.clock = clock
+        self.issued = 0
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes):
+        time.sleep(self.latency)
+        with self._lock:
+            self.issued += 1
+            return CachedToken(f"token-{os.getpid()}-{self.issued}", self.clock() + self.lifetime)
+
+
+def worker(args):
+    issuer = FakeTokenIssuer(args.issue_latency, args.lifetime)
+    cache = TokenCache(SCOPE, credential=issuer, path=args.cache_path)
+    started = time.perf_counter()
+    cache()
+    print(json.dumps({"seconds": time.perf_counter() - started, "issued": issuer.issued}))
+    return 0
+
+
+def run_wave(args, cache_path):
+    command = [
+        sys.executable, "-m", "benchmarks.bench_token_cache", "--worker",
+        "--issue-latency", str(args.issue_latency), "--lifetime", str(args.lifetime),
+    ]
+    if cache_path:
+        command += ["--cache-path", cache_path]
+    processes = [
+        subprocess.Popen(command, stdout=subprocess.PIPE, text=True) for _ in range(args.workers)
+    ]
+    rows = [json.loads(process.communicate()[0].strip().splitlines()[-1]) for process in processes]
+    seconds = [row["seconds"] for row in rows]
+    return statistics.median(seconds), max(seconds), sum(row["issued"] for row in rows)
+
+
+def run_refresh(mode, args):
+    clock = VirtualClock()
+    issuer = FakeTokenIssuer(args.issue_latency / 100, args.lifetime, clock=clock)
+    cache = TokenCache(
+        SCOPE,
+        credential=issuer,
+        refresh_before=args.refresh_before if mode == "proactive" else 60.0,
+        min_validity=60.0,
+        clock=clock,
+    )
+    calls = 0
+    waited = 0
+    while clock() < args.hours * 3600:
+        started = time.perf_counter()
+        cache()
+        if time.perf_counter() - started >= issuer.latency:
+            waited += 1
+        calls += 1
+        clock.sleep(args.call_interval)
+        # Real time for a background refresh to run while virtual time passes
+        time.sleep(0.001)
+    return calls, waited, issuer.issued
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes per wave")
+    parser.add_argument("--issue-latency", type=float, default=1.5, help="Seconds the fake issuer takes")
+    parser.add_argument("--lifetime", type=float, default=3600.0, help="Token lifetime (s)")
+    parser.add_argument("--hours", type=float, default=3.0, help="Virtual hours for the refresh run")
+    parser.add_argument("--call-interval", type=float, default=5.0, help="Virtual seconds between calls")
+    parser.add_argument("--refresh-before", type=float, default=300.0, help="Proactive refresh margin (s)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--cache-path", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        return worker(args)
+
+    print(f"\n📊 {args.workers} workers per wave, fake issuer taking {args.issue_latency}s per token")
+    print(f"{'mode':<12} {'wave':>5} {'median ms':>10} {'slowest ms':>11} {'issued':>7}")
+    with tempfile.TemporaryDirectory(prefix="cua-tokens-") as state_dir:
+        for mode in ("per-process", "shared"):
+            cache_path = os.path.join(state_dir, "token.json") if mode == "shared" else None
+            for wave in (1, 2):
+                median, slowest, issued = run_wave(args, cache_path)
+                print(f"{mode:<12} {wave:>5} {median * 1000:>10.2f} {slowest * 1000:>11.2f} {issued:>7}")
+
+    print(
+        f"\n📊 A call every {args.call_interval:g}s for {args.hours:g}h, tokens living {args.lifetime:.0f}s"
+    )
+    print(f"{'mode':<12} {'calls':>7} {'waited':>7} {'issued':>7}")
+    for mode in ("at-expiry", "proactive"):
+        calls, waited, issued = run_refresh(mode, args)
+        print(f"{mode:<12} {calls:>7} {waited:>7} {issued:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Compare cold and warm time-to-first-prompt with the VS Code window pool.
+
+Runs a sequence of jobs through AutomationSession's launch → terminal →
+Copilot → prompt stages with a pool of --size windows recycled after
+--recycle-after jobs. By default VS Code is simulated on a virtual clock: a
+launch is charged --cold-start seconds (until VS Code and Copilot are usable)
+and a `code -r` folder switch --switch seconds, and every sleep the engine
+does runs instantly. The keyboard is the simulated text field from
+bench_text_injection. With --live, real VS Code windows are launched and the
+wall-clock time is measured; run it on a desktop you are not using.
+
+Reported per job are the time to the first prompt and the time release()
+takes in the job's cleanup; a window due for recycling is restarted by the
+next acquire, so its cost shows up as that job's cold start.
+
+Usage:
+    python -m benchmarks.bench_vscode_pool --jobs 6 --size 1 --recycle-after 4
+    python -m benchmarks.bench_vscode_pool --jobs 3 --live --folders ~/p1,~/p2,~/p3
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_text_injection import FakeClipboard, FakeKeyboard
+from engine import AutomationConfig, AutomationSession
+from readiness import ReadinessProbes
+from replay import VirtualClock
+from text_injection import TextInjector
+from vscode_discovery import find_vscode_executable
+from vscode_pool import CodeCliLauncher, VSCodePool
+
+
+class FakeLauncher:
+    """Pretend VS Code instances whose start-up and folder switches cost virtual time."""
+
+    def __init__(self, clock, cold_start, switch):
+        self.clock = clock
+        self.cold_start = cold_start
+        self.switch = switch
+        self.running = set()
+
+    def launch(self, window, folder):
+        self.clock.sleep(self.cold_start)
+        self.running.add(window.slot)
+
+    def open_folder(self, window, folder):
+        self.clock.sleep(self.switch)
+
+    def is_alive(self, window):
+        return window.slot in self.running
+
+    def stop(self, window):
+        self.running.discard(window.slot)
+
+
+def run_jobs(args, folders, workdir):
+    live = args.live
+    clock = time.monotonic if live else VirtualClock()
+    sleep = time.sleep if live else clock.sleep
+
+    config = AutomationConfig(pool_size=args.size, pool_recycle_after=args.recycle_after)
+    if live:
+        session = AutomationSession(config)
+        vscode_path = args.vscode_path or find_vscode_executable()
+        launcher = CodeCliLauncher(vscode_path)
+    else:
+        clipboard = FakeClipboard()
+        keyboard = FakeKeyboard(clipboard, pause=0.0, key_cost=0.0)
+        session = AutomationSession(
+            config, clients=object(), desktop=keyboard, clock=clock, sleep=sleep
+        )
+        session.text_injector = TextInjector(
+            "clipboard", keyboard=keyboard, clipboard=clipboard, settle_time=0
+        )
+        # The simulated VS Code has no screen to probe; keep the fixed waits
+        session.readiness = ReadinessProbes(enabled=False, clock=clock, sleep=sleep)
+        vscode_path = "code"
+        launcher = FakeLauncher(clock, args.cold_start, args.switch)
+
+    session.pool = VSCodePool(
+        launcher,
+        size=args.size,
+        recycle_after=args.recycle_after,
+        prepare=session._prepare_pooled_window,
+        reset=session._reset_pooled_window,
+        # The simulated launch already charges the time until VS Code is usable
+        ready=session._wait_for_pooled_launch if live else None,
+        path=os.path.join(workdir, "pool.json"),
+        idle_folder=workdir,
+        launch_wait=10.0 if live else 0.0,
+        sleep=sleep,
+    )
+
+    rows = []
+    for job in range(args.jobs):
+        session._reset_run_state()
+        session.config.project_folder = folders[job % len(folders)]
+        output = sys.stdout if args.verbose else io.StringIO()
+        with contextlib.redirect_stdout(output):
+            started = clock()
+            session.launch(vscode_path)
+            session.open_terminal()
+            session.open_copilot()
+            session.send_prompt("add a python script that prints hello")
+            time_to_prompt = clock() - started
+            release_started = clock()
+            session.pool.release(session._pooled_window)
+            release_seconds = clock() - release_started
+            session._pooled_window = None
+        rows.append((job + 1, session.result.warm_start, time_to_prompt, release_seconds))
+
+    if live:
+        session.pool.shutdown()
+    return rows, session.pool
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=6)
+    parser.add_argument("--size", type=int, default=1, help="Pooled windows")
+    parser.add_argument("--recycle-after", type=int, default=4, help="Jobs per window before a restart")
+    parser.add_argument("--cold-start", type=float, default=12.0, help="Simulated launch cost (s)")
+    parser.add_argument("--switch", type=float, default=2.5, help="Simulated `code -r` cost (s)")
+    parser.add_argument("--live", action="store_true", help="Launch real VS Code windows")
+    parser.add_argument("--vscode-path", help="VS Code executable for --live")
+    parser.add_argument("--folders", help="Comma-separated project folders; temporary folders by default")
+    parser.add_argument("--verbose", action="store_true", help="Show the engine's log lines")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="cua-pool-")
+    if args.folders:
+        folders = [os.path.expanduser(folder) for folder in args.folders.split(",")]
+    else:
+        folders = []
+        for index in range(3):
+            folders.append(os.path.join(workdir, f"project{index + 1}"))
+            os.makedirs(folders[-1])
+
+    rows, pool = run_jobs(args, folders, workdir)
+
+    mode = "live" if args.live else (
+        f"simulated (launch {args.cold_start}s, folder switch {args.switch}s)"
+    )
+    print(f"\n📊 Time to first prompt, pool of {args.size} recycled every {args.recycle_after} jobs, {mode}")
+    print(f"{'job':>4} {'start':>6} {'seconds':>8} {'release s':>10}")
+    for job, warm, seconds, release_seconds in rows:
+        print(f"{job:>4} {'warm' if warm else 'cold':>6} {seconds:>8.2f} {release_seconds:>10.2f}")
+    for label, warm in (("cold", False), ("warm", True)):
+        times = [seconds for _, started_warm, seconds, _ in rows if bool(started_warm) == warm]
+        if times:
+            print(f"{label}: mean {statistics.mean(times):.2f}s over {len(times)} jobs")
+    print(f"♻️ {pool.summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Measure how much sooner, and with how many fewer model calls, the workspace signal detects completion.
+
+A simulated Copilot writes files into a real temporary project folder on a
+virtual clock: it thinks for --think seconds, then creates and edits files
+a chunk at a time for --writing seconds, and the Keep button is enabled
+--button-delay seconds after the last write. The Keep-button loop runs with
+the synthetic screen and simulated model from bench_budget, under each
+workspace signal mode:
+
+    off       screenshot and model loop only (the original behaviour)
+    confirm   wait until the files have been quiet for --quiet seconds, then
+              confirm with the Keep-button check
+    primary   accept as soon as the files have been quiet, without a model call
+
+"lag" is the time from the Keep button being enabled to Ctrl+Enter; a
+negative lag means the code was accepted before Copilot had finished, which
+can happen in primary mode when --quiet is shorter than the pauses between
+Copilot's writes. The diff manifest of the last run is printed at the end.
+
+Usage:
+    python -m benchmarks.bench_workspace
+    python -m benchmarks.bench_workspace --quiet 1,3,5 --writing 40 --button-delay 2
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+from benchmarks.bench_budget import SimulatedClients, SyntheticDesktop
+from benchmarks.bench_replay import MODEL_NAME
+from engine import AutomationConfig, AutomationSession
+from keep_detector import KeepButtonDetector
+from poll_scheduler import DurationHistory
+from replay import VirtualClock
+from workspace_watcher import WorkspaceWatcher
+
+MODES = ("off", "confirm", "primary")
+
+EXISTING_FILES = {
+    "requirements.txt": "requests\n",
+    "main.py": 'def main():\n    print("hello")\n\n\nif __name__ == "__main__":\n    main()\n',
+}
+
+
+class SimulatedCopilot:
+    """Writes the generated files at scheduled virtual times."""
+
+    def __init__(self, folder, clock, think, writing, chunks=12):
+        self.folder = folder
+        self.clock = clock
+        self.writes = []
+        step = writing / max(1, chunks - 1)
+        for chunk in range(chunks):
+            if chunk == chunks - 1:
+                target = "main.py"
+            else:
+                target = ("factorial.py", "test_factorial.py")[chunk % 2]
+            self.writes.append((think + chunk * step, target, chunk))
+        self.last_write_at = self.writes[-1][0]
+
+    def catch_up(self):
+        while self.writes and self.writes[0][0] <= self.clock.now:
+            _, target, chunk = self.writes.pop(0)
+            path = os.path.join(self.folder, target)
+            if target == "main.py":
+                with open(path, "w") as f:
+                    f.write(
+                        "from factorial import factorial\n\n\ndef main():\n"
+                        "    print(factorial(5))\n\n\nif __name__ == \"__main__\":\n    main()\n"
+                    )
+            else:
+                with open(path, "a") as f:
+                    f.write(f"# chunk {chunk}\ndef part_{chunk}():\n    return {chunk}\n\n")
+
+
+class TimedDesktop(SyntheticDesktop):
+    def __init__(self, clock, complete_after):
+        super().__init__(clock, complete_after)
+        self.accepted_at = None
+
+    def hotkey(self, *keys):
+        if keys == ("ctrl", "enter") and self.accepted_at is None:
+            self.accepted_at = self.clock.now
+        super().hotkey(*keys)
+
+
+def run_job(mode, quiet, args, workdir, index):
+    folder = os.path.join(workdir, f"project_{index}")
+    os.makedirs(folder)
+    for name, text in EXISTING_FILES.items():
+        with open(os.path.join(folder, name), "w") as f:
+            f.write(text)
+
+    clock = VirtualClock()
+    copilot = SimulatedCopilot(folder, clock, args.think, args.writing)
+    button_at = copilot.last_write_at + args.button_delay
+
+    def sleep(seconds):
+        clock.sleep(seconds)
+        copilot.catch_up()
+
+    desktop = TimedDesktop(clock, button_at)
+    config = AutomationConfig(
+        cua_model_name=MODEL_NAME,
+        project_folder=folder,
+        generation_timeout=args.timeout,
+        workspace_signal=mode,
+        workspace_quiet=quiet,
+    )
+    session = AutomationSession(
+        config,
+        clients=SimulatedClients(desktop, sleep, args.latency),
+        desktop=desktop,
+        clock=clock,
+        sleep=sleep,
+    )
+    session.recorder = None
+    session.verdict_cache = None
+    session.poll_history = DurationHistory(os.path.join(workdir, f"history_{index}.json"))
+    session.keep_button_detector = KeepButtonDetector(region=None)
+
+    output = sys.stdout if args.verbose else io.StringIO()
+    with contextlib.redirect_stdout(output):
+        # As send_prompt does, just before the prompt is submitted
+        if mode != "off":
+            session.workspace_watcher = WorkspaceWatcher(
+                folder, quiet=quiet, poll_interval=0.5, backend="polling", clock=clock
+            ).start()
+        found = session.await_completion()
+
+    lag = desktop.accepted_at - button_at if found else None
+    return {
+        "found": found,
+        "lag": lag,
+        "calls": session.budget.job.calls,
+        "scans": session.workspace_watcher.scans if session.workspace_watcher else 0,
+        "workspace": session.result.workspace,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--think", type=float, default=6.0, help="Seconds before the first file is written")
+    parser.add_argument("--writing", type=float, default=25.0, help="Seconds over which files are written")
+    parser.add_argument("--button-delay", type=float, default=1.0, help="Keep enabled this long after the last write")
+    parser.add_argument("--quiet", default="3", help="Comma-separated WORKSPACE_QUIET values")
+    parser.add_argument("--latency", type=float, default=1.5, help="Model latency (s)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--verbose", action="store_true", help="Show the engine's log lines")
+    args = parser.parse_args(argv)
+
+    os.environ.pop("RECORD_DIR", None)
+    workdir = tempfile.mkdtemp(prefix="cua-workspace-")
+    print(
+        f"\n📊 Completion detection: Copilot writes for {args.writing:g}s after {args.think:g}s, "
+        f"Keep enabled {args.button_delay:g}s after the last write"
+    )
+    print(f"{'mode':<8} {'quiet':>6} {'found':>6} {'lag s':>7} {'model calls':>12} {'scans':>6}")
+    runs = 0
+    last = None
+    for quiet in [float(value) for value in args.quiet.split(",")]:
+        for mode in MODES:
+            if mode == "off" and runs:
+                continue
+            row = run_job(mode, quiet, args, workdir, runs)
+            runs += 1
+            last = row
+            print(
+                f"{mode:<8} {quiet if mode != 'off' else '-':>6} {'yes' if row['found'] else 'no':>6} "
+                f"{row['lag'] if row['lag'] is not None else float('nan'):>7.2f} {row['calls']:>12} {row['scans']:>6}"
+            )
+
+    if last and last["workspace"]:
+        print("\n📝 Diff manifest of the last run:")
+        for change in last["workspace"]["files"]:
+            print(f"   {change['status']:<8} {change['path']:<20} +{change['lines_added']}/-{change['lines_removed']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
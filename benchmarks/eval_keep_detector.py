@@ -0,0 +1,111 @@
+"""
+Evaluate the local Keep-button detector against a labelled screenshot corpus.
+
+The corpus directory must contain an "enabled" and a "disabled" sub-directory of
+PNG screenshots. For each class the script reports precision and recall of the
+detector's confident answers, how many frames it deferred to the CUA model, and
+the mean detection time per frame.
+
+Usage:
+    python -m benchmarks.eval_keep_detector corpus --region 0.82,0.88,0.9,0.92
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from PIL import Image
+
+from keep_detector import KeepButtonDetector, parse_color
+from screen_regions import parse_region
+
+LABELS = ("enabled", "disabled")
+
+
+def load_corpus(corpus_dir):
+    """Return a list of (path, label) pairs from the labelled sub-directories."""
+    samples = []
+    for label in LABELS:
+        label_dir = os.path.join(corpus_dir, label)
+        if not os.path.isdir(label_dir):
+            continue
+        for name in sorted(os.listdir(label_dir)):
+            if name.lower().endswith(".png"):
+                samples.append((os.path.join(label_dir, name), label))
+    return samples
+
+
+def evaluate(detector, samples):
+    """
+    Run the detector over every sample.
+
+    Returns:
+        tuple: (dict of (label, verdict) -> count, total detection seconds)
+    """
+    counts = {}
+    seconds = 0.0
+    for path, label in samples:
+        with Image.open(path) as screenshot:
+            screenshot.load()
+            started = time.perf_counter()
+            verdict = detector.detect(screenshot)
+            seconds += time.perf_counter() - started
+
+        counts[(label, verdict)] = counts.get((label, verdict), 0) + 1
+        if verdict is not None and verdict != label:
+            print(f"  ❌ {path}: labelled {label}, detected {verdict}")
+    return counts, seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("corpus_dir", help="Directory with enabled/ and disabled/ PNGs")
+    parser.add_argument("--region", help="Keep button region as left,top,right,bottom fractions")
+    parser.add_argument("--enabled-color", help="#rrggbb colour of the enabled button")
+    parser.add_argument("--disabled-color", help="#rrggbb colour of the disabled button")
+    parser.add_argument("--tolerance", type=int, default=24)
+    args = parser.parse_args(argv)
+
+    detector = KeepButtonDetector.from_env()
+    if args.region:
+        detector.region = parse_region(args.region)
+    if args.enabled_color:
+        detector.enabled_color[:] = parse_color(args.enabled_color)
+    if args.disabled_color:
+        detector.disabled_color[:] = parse_color(args.disabled_color)
+    detector.tolerance = args.tolerance
+
+    if not detector.active:
+        print("No Keep button region configured; pass --region or set KEEP_BUTTON_REGION")
+        return 1
+
+    samples = load_corpus(args.corpus_dir)
+    if not samples:
+        print(f"No labelled PNGs found under {args.corpus_dir}/enabled or /disabled")
+        return 1
+
+    counts, seconds = evaluate(detector, samples)
+
+    print(f"\n📊 Keep detector on {len(samples)} labelled screenshots")
+    for label in LABELS:
+        true_positives = counts.get((label, label), 0)
+        predicted = sum(counts.get((other, label), 0) for other in LABELS)
+        actual = sum(counts.get((label, verdict), 0) for verdict in LABELS + (None,))
+        precision = true_positives / predicted if predicted else float("nan")
+        recall = true_positives / actual if actual else float("nan")
+        print(
+            f"  {label:<9} precision={precision:.3f} recall={recall:.3f} "
+            f"({true_positives}/{predicted} predicted, {actual} labelled)"
+        )
+
+    deferred = sum(counts.get((label, None), 0) for label in LABELS)
+    print(f"  deferred to CUA model: {deferred}/{len(samples)}")
+    print(f"  ⏱️ {seconds / len(samples) * 1000:.2f} ms per frame")
+
+    false_enabled = counts.get(("disabled", "enabled"), 0)
+    return 1 if false_enabled else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
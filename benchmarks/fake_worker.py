@@ -0,0 +1,84 @@
+"""
+Stand-in for app.py used by the orchestrator benchmark.
+
+It follows the same contract as app.py (PROJECT_FOLDER, DEVELOPER_PROMPT and
+JOB_RESULT_PATH from the environment) without VS Code: it grabs a frame from
+$DISPLAY to exercise the worker's framebuffer, simulates launch and install
+time, then polls the CUA endpoint configured in AZURE_OPENAI_ENDPOINT (the mock
+Responses server) until it reports the Keep button as enabled.
+"""
+
+import json
+import os
+import sys
+import time
+
+from openai import AzureOpenAI
+
+from benchmarks.mock_responses_server import FakeScreen
+from cua_requests import create_cua_response
+from response_decoding import VerdictSchema, decode_verdict
+from screen_capture import CaptureSettings, encode_frame
+
+
+KEEP_SCHEMA = VerdictSchema("keep_button", "button", ("enabled", "disabled"))
+
+
+def grab_display():
+    """Return True if a frame could be captured from $DISPLAY."""
+    display = os.getenv("DISPLAY")
+    if not display:
+        return False
+    try:
+        from PIL import ImageGrab
+
+        ImageGrab.grab(xdisplay=display)
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not capture {display}: {e}")
+        return False
+
+
+def main():
+    started = time.monotonic()
+    display_ok = grab_display()
+    time.sleep(float(os.getenv("FAKE_SETUP_SECONDS", "1")))
+
+    client = AzureOpenAI(
+        api_key=os.getenv("AZURE_OPENAI_API_KEY", "mock"),
+        azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+        api_version=os.getenv("AZURE_API_VERSION", "2025-03-01-preview"),
+    )
+    screen = FakeScreen(float(os.getenv("FAKE_GENERATION_SECONDS", "3"))).start()
+    settings = CaptureSettings()
+
+    keep_button_found = False
+    requests_sent = 0
+    while time.monotonic() - started < 120:
+        frame = encode_frame(screen.capture(), settings)
+        response = create_cua_response(
+            client, "mock", os.getenv("DEVELOPER_PROMPT", ""), frame
+        )
+        requests_sent += 1
+        if decode_verdict(response, KEEP_SCHEMA).verdict == "enabled":
+            keep_button_found = True
+            break
+        time.sleep(0.5)
+
+    with open(os.environ["JOB_RESULT_PATH"], "w") as f:
+        json.dump(
+            {
+                "keep_button_found": keep_button_found,
+                "monitoring_seconds": round(time.monotonic() - started, 3),
+                "requests_sent": requests_sent,
+                "display_captured": display_ok,
+                "project_folder": os.getenv("PROJECT_FOLDER"),
+            },
+            f,
+            indent=2,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
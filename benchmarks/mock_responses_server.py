@@ -0,0 +1,479 @@
+"""
+Local mock of the Azure OpenAI Responses endpoint for offline benchmarks.
+
+The mock answers POST .../responses after a configurable latency. It "looks" at
+the screenshot it receives: a frame whose top-left pixel is predominantly blue
+gets the positive answer (e.g. {"button": "enabled"}), any other frame gets the
+negative one. Fake screen sources therefore signal completion by turning blue.
+
+Like a deployment with a requests-per-minute quota, it can refuse requests
+above --rate-limit per second with 429 and a Retry-After header, and fail a
+fraction of requests with 500.
+
+Every answer reports token usage estimated from the request: about four
+characters per text token and the high-detail tile count for images. Stored
+responses can be continued with previous_response_id, whose earlier input
+and output count towards the new request as on the real service, and prompt
+caching is emulated: a request whose leading items (tools, instructions,
+then input in order) repeat an earlier request's has those tokens reported
+as cached, in 128-token steps from --cache-min-tokens. With stream=true the
+answer is sent as server-sent events, one delta per text token.
+
+Usage:
+    python -m benchmarks.mock_responses_server --port 8765 --latency 2.5
+    python -m benchmarks.mock_responses_server --rate-limit 4 --retry-after 2 --error-rate 0.05
+    python -m benchmarks.mock_responses_server --prefill-ms 0.3 --token-ms 20
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+from PIL import Image
+
+POSITIVE_COLOR = (0, 120, 212)
+NEGATIVE_COLOR = (60, 60, 60)
+
+# Prompt caching applies to prefixes of at least this many tokens, in steps of CACHE_STEP
+CACHE_MIN_TOKENS = 1024
+CACHE_STEP = 128
+
+
+def frame_is_positive(image_url):
+    """Return True when the data-URL image's top-left pixel is predominantly blue."""
+    encoded = image_url.split(",", 1)[1]
+    with Image.open(BytesIO(base64.b64decode(encoded))) as image:
+        red, green, blue = image.convert("RGB").getpixel((0, 0))
+    return blue > red + 60
+
+
+def image_tokens(width, height):
+    """Tokens of a high-detail image: fit in 2048x2048, shortest side to 768, 512-pixel tiles."""
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
+
+def text_tokens(text):
+    """Rough token count of a text: four characters per token."""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def text_chunks(text):
+    """Split an answer into token-sized deltas for streaming."""
+    return [text[index : index + 4] for index in range(0, len(text), 4)] or [""]
+
+
+def _segment(kind, value, tokens):
+    digest = hashlib.sha256(f"{kind}:{value}".encode()).hexdigest()
+    return digest, tokens
+
+
+def request_segments(payload):
+    """
+    Split a request into the (digest, tokens) items the model reads, in order.
+
+    Returns:
+        tuple: (tools and instructions segments, input item segments)
+    """
+    head = []
+    if payload.get("tools"):
+        tools = json.dumps(payload["tools"], sort_keys=True)
+        head.append(_segment("tools", tools, text_tokens(tools)))
+    if payload.get("instructions"):
+        head.append(_segment("instructions", payload["instructions"], text_tokens(payload["instructions"])))
+
+    items = []
+    for item in payload.get("input", []):
+        if isinstance(item, str):
+            items.append(_segment("text", item, text_tokens(item)))
+            continue
+        for content in item.get("content", []) if isinstance(item, dict) else []:
+            if not isinstance(content, dict):
+                continue
+            if content.get("type") == "input_text":
+                items.append(_segment("text", content.get("text", ""), text_tokens(content.get("text", ""))))
+            elif content.get("type") == "input_image":
+                url = content.get("image_url", "")
+                encoded = url.split(",", 1)[-1]
+                with Image.open(BytesIO(base64.b64decode(encoded))) as image:
+                    tokens = image_tokens(*image.size)
+                items.append(_segment("image", url, tokens))
+    return head, items
+
+
+def find_image_url(payload):
+    """Return the first input_image URL in a Responses request payload, or None."""
+    for item in payload.get("input", []):
+        if not isinstance(item, dict):
+            continue
+        for content in item.get("content", []):
+            if isinstance(content, dict) and content.get("type") == "input_image":
+                return content.get("image_url")
+    return None
+
+
+def find_input_text(payload):
+    """Return the first input_text in a Responses request payload, or an empty string."""
+    for item in payload.get("input", []):
+        if not isinstance(item, dict):
+            continue
+        for content in item.get("content", []):
+            if isinstance(content, dict) and content.get("type") == "input_text":
+                return content.get("text", "")
+    return ""
+
+
+def build_response(text, model, usage=None, response_id=None):
+    """Build a minimal Responses API result carrying one output_text."""
+    response = {
+        "id": response_id or f"resp_{uuid.uuid4().hex}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": model,
+        "output": [
+            {
+                "type": "message",
+                "id": f"msg_{uuid.uuid4().hex}",
+                "status": "completed",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+    }
+    if usage is not None:
+        response["usage"] = usage
+    return response
+
+
+def stream_events(response, delay, token_interval):
+    """
+    Server-sent events for a streamed answer, each with the seconds to wait before it.
+
+    Args:
+        response (dict): The completed response built by build_response
+        delay (float): Seconds before the first event
+        token_interval (float): Seconds between text deltas
+
+    Returns:
+        list: (seconds to wait, event dict)
+    """
+    message = response["output"][0]
+    text = message["content"][0]["text"]
+    in_progress = dict(response, status="in_progress", output=[])
+    in_progress.pop("usage", None)
+    events = [
+        (delay, {"type": "response.created", "response": in_progress}),
+        (0.0, {"type": "response.output_item.added", "output_index": 0,
+               "item": dict(message, status="in_progress", content=[])}),
+        (0.0, {"type": "response.content_part.added", "item_id": message["id"], "output_index": 0,
+               "content_index": 0, "part": {"type": "output_text", "text": "", "annotations": []}}),
+    ]
+    for chunk in text_chunks(text):
+        events.append(
+            (token_interval, {"type": "response.output_text.delta", "item_id": message["id"],
+                              "output_index": 0, "content_index": 0, "delta": chunk, "logprobs": []})
+        )
+    events += [
+        (0.0, {"type": "response.output_text.done", "item_id": message["id"], "output_index": 0,
+               "content_index": 0, "text": text, "logprobs": []}),
+        (0.0, {"type": "response.output_item.done", "output_index": 0, "item": message}),
+        (0.0, {"type": "response.completed", "response": response}),
+    ]
+    for number, (_, event) in enumerate(events):
+        event["sequence_number"] = number
+    return events
+
+
+class FakeScreen:
+    """
+    Screenshot source that switches from the negative to the positive colour
+    `complete_after` seconds after it is started.
+    """
+
+    def __init__(self, complete_after, size=(320, 180), capture_cost=0.02):
+        self.complete_after = complete_after
+        self.size = size
+        self.capture_cost = capture_cost
+        self.started_at = None
+        self.frames_captured = 0
+
+    def start(self):
+        self.started_at = time.monotonic()
+        return self
+
+    @property
+    def completed_at(self):
+        return self.started_at + self.complete_after
+
+    def capture(self, frame_number=None):
+        """Return the current fake frame as a PIL image, like take_screenshot."""
+        time.sleep(self.capture_cost)
+        self.frames_captured += 1
+        done = time.monotonic() >= self.completed_at
+        return Image.new("RGB", self.size, POSITIVE_COLOR if done else NEGATIVE_COLOR)
+
+
+class MockResponsesServer:
+    """Threaded HTTP server emulating client.responses.create with fixed latency."""
+
+    def __init__(
+        self,
+        latency=1.0,
+        positive_text='{"button": "enabled"}',
+        negative_text='{"button": "disabled"}',
+        host="127.0.0.1",
+        port=0,
+        responder=None,
+        rate_limit=None,
+        retry_after=1.0,
+        error_rate=0.0,
+        seed=0,
+        prefill=0.0,
+        token_interval=0.0,
+        cache_min_tokens=CACHE_MIN_TOKENS,
+    ):
+        """
+        Args:
+            latency (float): Seconds each request takes
+            positive_text (str): Answer for frames whose top-left pixel is blue
+            negative_text (str): Answer for any other frame
+            host (str): Interface to listen on
+            port (int): Port to listen on; 0 picks a free one
+            responder (callable): Optional responder(payload) -> answer text, replacing
+                the positive/negative rule
+            rate_limit (float): Requests accepted per second (a one-second window); more
+                are refused with 429. None accepts everything
+            retry_after (float): Seconds sent in Retry-After with a 429, or None to omit it
+            error_rate (float): Fraction of accepted requests answered with 500
+            seed (int): Seed for the injected 500s
+            prefill (float): Extra seconds per input token not served from the prompt cache
+            token_interval (float): Seconds per output text token
+            cache_min_tokens (int): Shortest repeated prefix reported as cached
+        """
+        self.latency = latency
+        self.positive_text = positive_text
+        self.negative_text = negative_text
+        self.responder = responder
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.prefill = prefill
+        self.token_interval = token_interval
+        self.cache_min_tokens = cache_min_tokens
+        self.requests_received = 0
+        self.rate_limited = 0
+        self.server_errors = 0
+        self.bytes_received = 0
+        self.input_tokens = 0
+        self.cached_tokens = 0
+        self.output_tokens = 0
+        self._stored = {}
+        self._prefixes = set()
+        self._accepted_at = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with server._lock:
+                    server.bytes_received += len(body)
+                payload = json.loads(body or b"{}")
+                status, reply, headers = server.handle(self.path, payload)
+                if isinstance(reply, list):
+                    self.send_response(status)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.end_headers()
+                    for delay, event in reply:
+                        if delay > 0:
+                            time.sleep(delay)
+                        self.wfile.write(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode())
+                        self.wfile.flush()
+                    return
+                data = json.dumps(reply).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _cached_tokens(self, segments):
+        """Tokens of the longest prefix of `segments` an earlier request started with."""
+        digest = hashlib.sha256()
+        total = cached = 0
+        for segment_digest, tokens in segments:
+            digest.update(segment_digest.encode())
+            total += tokens
+            prefix = digest.hexdigest()
+            if prefix in self._prefixes:
+                cached = total
+            self._prefixes.add(prefix)
+        if cached < self.cache_min_tokens:
+            return 0
+        return cached // CACHE_STEP * CACHE_STEP
+
+    def handle(self, path, payload):
+        """
+        Produce the (status, JSON body) reply for one request.
+
+        Args:
+            path (str): Request path
+            payload (dict): Decoded JSON request body
+
+        Returns:
+            tuple: (HTTP status code, response dict or list of (delay, event) for a
+                stream, extra headers dict)
+        """
+        if not path.split("?")[0].endswith("/responses"):
+            return 404, {"error": {"message": f"Unknown path {path}"}}, {}
+
+        with self._lock:
+            self.requests_received += 1
+            refused = False
+            if self.rate_limit is not None:
+                now = time.monotonic()
+                self._accepted_at = [t for t in self._accepted_at if now - t < 1.0]
+                refused = len(self._accepted_at) >= self.rate_limit
+                if refused:
+                    self.rate_limited += 1
+                else:
+                    self._accepted_at.append(now)
+            failed = not refused and self._random.random() < self.error_rate
+            if failed:
+                self.server_errors += 1
+
+        if refused:
+            headers = {"Retry-After": f"{self.retry_after:g}"} if self.retry_after is not None else {}
+            error = {"code": "429", "message": "Requests to the deployment have exceeded the rate limit."}
+            return 429, {"error": error}, headers
+        if failed:
+            time.sleep(self.latency)
+            return 500, {"error": {"code": "500", "message": "Injected server error."}}, {}
+
+        if self.responder is not None:
+            text = self.responder(payload)
+        else:
+            image_url = find_image_url(payload)
+            positive = image_url is not None and frame_is_positive(image_url)
+            text = self.positive_text if positive else self.negative_text
+
+        head, items = request_segments(payload)
+        previous = payload.get("previous_response_id")
+        response_id = f"resp_{uuid.uuid4().hex}"
+        output_tokens = text_tokens(text)
+        with self._lock:
+            if previous is not None and previous not in self._stored:
+                error = {
+                    "message": f"Previous response with id '{previous}' not found.",
+                    "type": "invalid_request_error",
+                    "param": "previous_response_id",
+                    "code": "previous_response_not_found",
+                }
+                return 400, {"error": error}, {}
+            # Instructions are not carried over from a previous response, its input and output are
+            context = (self._stored[previous] if previous else []) + items
+            segments = head + context
+            input_tokens = sum(tokens for _, tokens in segments)
+            cached = self._cached_tokens(segments)
+            if payload.get("store", True):
+                self._stored[response_id] = context + [_segment("output", text, output_tokens)]
+            self.input_tokens += input_tokens
+            self.cached_tokens += cached
+            self.output_tokens += output_tokens
+
+        usage = {
+            "input_tokens": input_tokens,
+            "input_tokens_details": {"cached_tokens": cached},
+            "output_tokens": output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": input_tokens + output_tokens,
+        }
+        response = build_response(text, payload.get("model", "mock"), usage, response_id)
+        delay = self.latency + self.prefill * (input_tokens - cached)
+        if payload.get("stream"):
+            return 200, stream_events(response, delay, self.token_interval), {}
+        time.sleep(delay + self.token_interval * len(text_chunks(text)))
+        return 200, response, {}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--positive", default='{"button": "enabled"}')
+    parser.add_argument("--negative", default='{"button": "disabled"}')
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests accepted per second")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After sent with a 429 (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction answered with 500")
+    parser.add_argument("--prefill-ms", type=float, default=0.0, help="Extra ms per uncached input token")
+    parser.add_argument("--token-ms", type=float, default=0.0, help="ms per output text token")
+    parser.add_argument("--cache-min-tokens", type=int, default=CACHE_MIN_TOKENS)
+    args = parser.parse_args(argv)
+
+    server = MockResponsesServer(
+        args.latency,
+        args.positive,
+        args.negative,
+        port=args.port,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        error_rate=args.error_rate,
+        prefill=args.prefill_ms / 1000,
+        token_interval=args.token_ms / 1000,
+        cache_min_tokens=args.cache_min_tokens,
+    )
+    print(f"Mock Responses endpoint listening on {server.url} (latency {args.latency}s)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Replay a recorded sequence of screenshots through the frame-change gate.
+
+Frames are read in file-name order from a directory of PNGs. When a labels file
+is given (JSON object mapping file name to the expected verdict, e.g.
+{"0001.png": "in_progress", "0002.png": "complete"}), frames that are "sent"
+receive their label as the simulated model verdict, and every skipped frame is
+checked against its label to catch stale verdicts.
+
+Usage:
+    python -m benchmarks.replay_frame_gate recordings/pip --region 0,0.55,1,1
+    python -m benchmarks.replay_frame_gate recordings/keep --labels recordings/keep/labels.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from PIL import Image
+
+from frame_gate import FrameChangeGate
+from screen_regions import parse_region
+
+
+def load_frames(frames_dir):
+    """Return the sorted PNG file names in a directory."""
+    return sorted(
+        name for name in os.listdir(frames_dir) if name.lower().endswith(".png")
+    )
+
+
+def replay(frames_dir, gate, labels=None):
+    """
+    Feed every frame in frames_dir through the gate.
+
+    Args:
+        frames_dir (str): Directory containing the recorded PNG frames
+        gate (FrameChangeGate): Gate under test
+        labels (dict): Optional mapping of file name to expected verdict
+
+    Returns:
+        tuple: (list of stale frame names, total seconds spent in should_send)
+    """
+    stale_frames = []
+    gate_seconds = 0.0
+
+    for name in load_frames(frames_dir):
+        with Image.open(os.path.join(frames_dir, name)) as frame:
+            frame.load()
+            started = time.perf_counter()
+            send = gate.should_send(frame)
+            gate_seconds += time.perf_counter() - started
+
+        expected = labels.get(name) if labels else None
+        if send:
+            gate.record_verdict(expected if expected is not None else "unknown")
+            print(f"  {name}: sent")
+        else:
+            reused = gate.last_verdict
+            marker = ""
+            if expected is not None and reused != expected:
+                stale_frames.append(name)
+                marker = f"  <-- STALE (expected {expected})"
+            print(f"  {name}: skipped, reused '{reused}'{marker}")
+
+    return stale_frames, gate_seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("frames_dir", help="Directory of recorded PNG frames")
+    parser.add_argument("--region", help="left,top,right,bottom screen fractions")
+    parser.add_argument("--labels", help="JSON file mapping frame name to verdict")
+    parser.add_argument("--downscale", type=int, default=4)
+    parser.add_argument("--pixel-threshold", type=int, default=24)
+    parser.add_argument("--min-changed-pixels", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    labels = None
+    if args.labels:
+        with open(args.labels, "r") as f:
+            labels = json.load(f)
+
+    gate = FrameChangeGate(
+        "replay",
+        region=parse_region(args.region),
+        downscale=args.downscale,
+        pixel_threshold=args.pixel_threshold,
+        min_changed_pixels=args.min_changed_pixels,
+    )
+
+    print(f"Replaying frames from {args.frames_dir}")
+    stale_frames, gate_seconds = replay(args.frames_dir, gate, labels)
+
+    total = gate.frames_sent + gate.frames_skipped
+    print(f"\n📊 {gate.summary()}")
+    if total:
+        print(f"⏱️ Gate cost: {gate_seconds / total * 1000:.2f} ms per frame")
+    if labels is not None:
+        print(f"🧪 Stale verdicts reused: {len(stale_frames)}")
+
+    return 1 if stale_frames else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Replay labelled screenshots through the verdict cache over several simulated runs.
+
+Frames are read in file-name order from a directory of PNGs with a labels file
+(JSON object mapping file name to the verdict the model would return). Each pass
+stands for one automation run: frames that miss the cache "call the model",
+which costs --latency seconds and stores the label; frames that hit reuse the
+cached verdict, which is checked against the label to catch hash collisions.
+
+Usage:
+    python -m benchmarks.replay_verdict_cache recordings/keep --labels recordings/keep/labels.json --region 0.6,0,1,1 --passes 3
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+from benchmarks.replay_frame_gate import load_frames
+from screen_regions import parse_region
+from verdict_cache import VerdictCache
+
+
+def replay_pass(frames_dir, labels, cache, region, latency, run):
+    """
+    Feed every labelled frame through the cache once.
+
+    Returns:
+        tuple: (list of frame names with a wrong cached verdict, seconds spent hashing)
+    """
+    wrong = []
+    hash_seconds = 0.0
+
+    for name in load_frames(frames_dir):
+        if name not in labels:
+            continue
+        with Image.open(os.path.join(frames_dir, name)) as frame:
+            frame.load()
+            started = time.perf_counter()
+            key = cache.key("replay", frame, region)
+            verdict = cache.get(key)
+            hash_seconds += time.perf_counter() - started
+
+        if verdict is None:
+            cache.put(key, labels[name], latency)
+        elif verdict != labels[name]:
+            wrong.append(name)
+            print(f"  pass {run} {name}: cached '{verdict}'  <-- WRONG (expected {labels[name]})")
+
+    return wrong, hash_seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("frames_dir", help="Directory of recorded PNG frames")
+    parser.add_argument("--labels", required=True, help="JSON file mapping frame name to verdict")
+    parser.add_argument("--region", help="left,top,right,bottom screen fractions")
+    parser.add_argument("--passes", type=int, default=3, help="Simulated runs over the frames")
+    parser.add_argument("--latency", type=float, default=2.0, help="Model latency per call (s)")
+    parser.add_argument("--hash-size", type=int, default=32)
+    parser.add_argument("--max-entries", type=int, default=256)
+    parser.add_argument(
+        "--persist", action="store_true", help="Start each pass from the cache saved to disk"
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.labels, "r") as f:
+        labels = json.load(f)
+    region = parse_region(args.region)
+
+    hits = lookups = 0
+    saved_seconds = hash_seconds = 0.0
+    wrong = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "verdict_cache.json") if args.persist else None
+        cache = VerdictCache(path, max_entries=args.max_entries, hash_size=args.hash_size)
+
+        print(f"Replaying {args.frames_dir} for {args.passes} passes")
+        for run in range(1, args.passes + 1):
+            if path and run > 1:
+                # Each pass is a new process that loads the cache from disk
+                cache = VerdictCache(path, max_entries=args.max_entries, hash_size=args.hash_size)
+            pass_wrong, pass_seconds = replay_pass(
+                args.frames_dir, labels, cache, region, args.latency, run
+            )
+            print(f"  pass {run}: {cache.summary()}")
+            cache.save()
+
+            wrong.extend(pass_wrong)
+            hash_seconds += pass_seconds
+            if path or run == args.passes:
+                hits += cache.hits
+                lookups += cache.hits + cache.misses
+                saved_seconds += cache.saved_seconds
+
+    print(
+        f"\n📊 {hits} hits / {lookups} lookups ({hits / max(1, lookups):.0%} hit rate), "
+        f"~{saved_seconds:.1f}s of model latency saved"
+    )
+    if lookups:
+        print(f"⏱️ Hash + lookup cost: {hash_seconds / lookups * 1000:.2f} ms per frame")
+    print(f"🧪 Wrong cached verdicts: {len(wrong)}")
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
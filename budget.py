@@ -0,0 +1,327 @@
+import json
+import os
+import time
+
+from automation_state import state_path
+from response_decoding import reask_settings
+
+# Degradation levels, applied in order as the budget is consumed
+LEVEL_NORMAL = 0
+LEVEL_SPARSE = 1
+LEVEL_SMALL = 2
+LEVEL_LOCAL = 3
+LEVEL_NAMES = ("normal", "sparse polling", "smaller crops", "local-only detection")
+
+HOUR = 3600.0
+
+
+def _limit_from_env(name):
+    value = os.getenv(name)
+    return int(value) if value and int(value) > 0 else None
+
+
+def _price_from_env(name):
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+class Spend:
+    """Calls and tokens spent by one job, stage or check."""
+
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    @property
+    def tokens(self):
+        return self.input_tokens + self.output_tokens
+
+    def add(self, input_tokens, output_tokens):
+        self.calls += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+
+    def cost(self, input_price, output_price):
+        """US dollars at the given per-million-token prices, or None if no price is set."""
+        if input_price is None and output_price is None:
+            return None
+        return (
+            self.input_tokens * (input_price or 0.0) + self.output_tokens * (output_price or 0.0)
+        ) / 1e6
+
+    def to_dict(self, input_price=None, output_price=None):
+        cost = self.cost(input_price, output_price)
+        return {
+            "calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(cost, 4) if cost is not None else None,
+        }
+
+    def report(self, input_price=None, output_price=None):
+        cost = self.cost(input_price, output_price)
+        return (
+            f"{self.calls} calls, {self.input_tokens} input + {self.output_tokens} output tokens"
+            + (f" (${cost:.4f})" if cost is not None else "")
+        )
+
+
+class TokenBudget:
+    """
+    Account for every CUA call's tokens and degrade monitoring as a budget runs out.
+
+    Usage is read from each response's `usage` field and added to the job's
+    spend, broken down by session stage and by check. Caps can be set on calls
+    and tokens per job and per hour; the hourly window is shared by every
+    process through an append-only ledger in the state directory, so parallel
+    orchestrator workers draw on the same allowance.
+
+    As the most consumed cap fills up, the monitoring loops degrade in steps:
+    sparser polling at `sparse_at` of the cap, smaller JPEG crops at
+    `small_at`, and local-only detection (local detector, frame gate and verdict
+    cache, no model calls) once a cap is reached. A call already in flight can
+    overshoot a cap by its own tokens.
+    """
+
+    def __init__(
+        self,
+        job_tokens=None,
+        job_calls=None,
+        hour_tokens=None,
+        hour_calls=None,
+        sparse_at=0.5,
+        small_at=0.75,
+        sparse_factor=2.0,
+        small_width=640,
+        input_price=None,
+        output_price=None,
+        ledger_path=None,
+        clock=time.time,
+    ):
+        """
+        Args:
+            job_tokens (int): Tokens one job may spend, or None for no cap
+            job_calls (int): Model calls one job may make, or None for no cap
+            hour_tokens (int): Tokens all jobs may spend in any hour, or None for no cap
+            hour_calls (int): Model calls all jobs may make in any hour, or None for no cap
+            sparse_at (float): Fraction of a cap at which polling slows down
+            small_at (float): Fraction of a cap at which frames are sent as small JPEGs
+            sparse_factor (float): Factor applied to polling delays when sparse
+            small_width (int): Largest width of a frame sent when budget is low
+            input_price (float): US dollars per million input tokens, for reports
+            output_price (float): US dollars per million output tokens, for reports
+            ledger_path (str): Hourly ledger; budget_ledger.jsonl in the state directory
+            clock (callable): Wall-clock time source; the ledger outlives the process
+        """
+        self.job_tokens = job_tokens
+        self.job_calls = job_calls
+        self.hour_tokens = hour_tokens
+        self.hour_calls = hour_calls
+        self.sparse_at = sparse_at
+        self.small_at = small_at
+        self.sparse_factor = sparse_factor
+        self.small_width = small_width
+        self.input_price = input_price
+        self.output_price = output_price
+        self.clock = clock
+
+        self.ledger_path = None
+        if hour_tokens is not None or hour_calls is not None:
+            self.ledger_path = ledger_path or state_path("budget_ledger.jsonl")
+        self._ledger_offset = 0
+        self._hour = []  # (timestamp, tokens) of calls in the last hour, from every process
+
+        self.stage = None
+        self.job = Spend()
+        self.stages = {}
+        self.checks = {}
+        self.level = LEVEL_NORMAL
+        self.degraded_calls_skipped = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a budget from BUDGET_JOB_TOKENS, BUDGET_JOB_CALLS, BUDGET_HOUR_TOKENS,
+        BUDGET_HOUR_CALLS, BUDGET_INPUT_PRICE and BUDGET_OUTPUT_PRICE.
+
+        Returns:
+            TokenBudget: The budget; it only accounts for spend unless a cap is set
+        """
+        return cls(
+            job_tokens=_limit_from_env("BUDGET_JOB_TOKENS"),
+            job_calls=_limit_from_env("BUDGET_JOB_CALLS"),
+            hour_tokens=_limit_from_env("BUDGET_HOUR_TOKENS"),
+            hour_calls=_limit_from_env("BUDGET_HOUR_CALLS"),
+            input_price=_price_from_env("BUDGET_INPUT_PRICE"),
+            output_price=_price_from_env("BUDGET_OUTPUT_PRICE"),
+        )
+
+    def start_job(self):
+        """Reset the per-job spend; the hourly window carries on."""
+        self.stage = None
+        self.job = Spend()
+        self.stages = {}
+        self.checks = {}
+        self.degraded_calls_skipped = 0
+        self.level = LEVEL_NORMAL
+        self._compact_ledger()
+        self._update_level(announce=False)
+
+    def _read_ledger(self):
+        """Pick up calls appended to the ledger (by any process) since the last read."""
+        if self.ledger_path is None:
+            return
+        try:
+            with open(self.ledger_path, "rb") as f:
+                f.seek(self._ledger_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        # A line still being written by another process is read next time
+        complete = data[: data.rfind(b"\n") + 1]
+        self._ledger_offset += len(complete)
+        for line in complete.decode("utf-8", errors="replace").splitlines():
+            try:
+                entry = json.loads(line)
+                self._hour.append((float(entry["t"]), int(entry["tokens"])))
+            except (ValueError, KeyError, TypeError):
+                continue
+
+    def _compact_ledger(self, max_bytes=1_000_000):
+        """Rewrite a large ledger with only the last hour's calls."""
+        if self.ledger_path is None:
+            return
+        try:
+            if os.path.getsize(self.ledger_path) < max_bytes:
+                return
+        except OSError:
+            return
+        self._hour_spend()
+        # Calls appended by other processes between the read and the replace are lost,
+        # which only under-counts a window that is a megabyte of calls deep
+        temporary = f"{self.ledger_path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            for timestamp, tokens in self._hour:
+                f.write(json.dumps({"t": timestamp, "tokens": tokens}) + "\n")
+        os.replace(temporary, self.ledger_path)
+        self._ledger_offset = os.path.getsize(self.ledger_path)
+
+    def _hour_spend(self):
+        self._read_ledger()
+        cutoff = self.clock() - HOUR
+        self._hour = [entry for entry in self._hour if entry[0] >= cutoff]
+        return len(self._hour), sum(tokens for _, tokens in self._hour)
+
+    def used_fraction(self):
+        """Fraction of the most consumed cap, or 0.0 without caps."""
+        fractions = []
+        if self.job_tokens:
+            fractions.append(self.job.tokens / self.job_tokens)
+        if self.job_calls:
+            fractions.append(self.job.calls / self.job_calls)
+        if self.ledger_path is not None:
+            calls, tokens = self._hour_spend()
+            if self.hour_tokens:
+                fractions.append(tokens / self.hour_tokens)
+            if self.hour_calls:
+                fractions.append(calls / self.hour_calls)
+        return max(fractions, default=0.0)
+
+    def _update_level(self, announce=True):
+        used = self.used_fraction()
+        if used >= 1.0:
+            level = LEVEL_LOCAL
+        elif used >= self.small_at:
+            level = LEVEL_SMALL
+        elif used >= self.sparse_at:
+            level = LEVEL_SPARSE
+        else:
+            level = LEVEL_NORMAL
+        if level != self.level and announce:
+            print(f"💸 Budget {used:.0%} used, switching to {LEVEL_NAMES[level]}")
+        self.level = level
+        return level
+
+    def allow_call(self):
+        """
+        Decide whether a model call may be made now.
+
+        Returns:
+            bool: False once a cap is reached; the caller should rely on local detection
+        """
+        if self._update_level() >= LEVEL_LOCAL:
+            self.degraded_calls_skipped += 1
+            return False
+        return True
+
+    @property
+    def poll_slowdown(self):
+        """Factor for polling delays: 1.0 normally, sparse_factor once the budget runs low."""
+        return self.sparse_factor if self.level >= LEVEL_SPARSE else 1.0
+
+    def capture_settings(self, settings):
+        """
+        The capture settings to use at the current level.
+
+        Args:
+            settings (CaptureSettings): The check's configured settings
+
+        Returns:
+            CaptureSettings: `settings`, or a smaller JPEG of the same region when budget is low
+        """
+        if self.level >= LEVEL_SMALL:
+            return reask_settings(settings, self.small_width)
+        return settings
+
+    def record(self, check, response):
+        """
+        Add one model call's usage to the job, its stage and its check.
+
+        Args:
+            check (str): Check that made the call, e.g. "keep" or "pip_reask"
+            response (Response): Result of client.responses.create
+        """
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", None) or 0
+        output_tokens = getattr(usage, "output_tokens", None) or 0
+
+        self.job.add(input_tokens, output_tokens)
+        self.stages.setdefault(self.stage or "other", Spend()).add(input_tokens, output_tokens)
+        self.checks.setdefault(check, Spend()).add(input_tokens, output_tokens)
+
+        if self.ledger_path is not None:
+            line = json.dumps(
+                {"t": round(self.clock(), 3), "tokens": input_tokens + output_tokens, "pid": os.getpid()}
+            )
+            try:
+                with open(self.ledger_path, "a") as f:
+                    f.write(line + "\n")
+            except OSError as e:
+                print(f"⚠️ Could not write budget ledger {self.ledger_path}: {e}")
+        self._update_level()
+
+    def metrics(self):
+        prices = (self.input_price, self.output_price)
+        metrics = {
+            "job": self.job.to_dict(*prices),
+            "stages": {stage: spend.to_dict(*prices) for stage, spend in self.stages.items()},
+            "checks": {check: spend.to_dict(*prices) for check, spend in self.checks.items()},
+            "level": LEVEL_NAMES[self.level],
+            "calls_skipped": self.degraded_calls_skipped,
+        }
+        if self.ledger_path is not None:
+            calls, tokens = self._hour_spend()
+            metrics["last_hour"] = {"calls": calls, "tokens": tokens}
+        return metrics
+
+    def summary(self):
+        prices = (self.input_price, self.output_price)
+        stages = "; ".join(
+            f"{stage}: {spend.report(*prices)}" for stage, spend in self.stages.items()
+        )
+        return (
+            f"{self.job.report(*prices)}, ended at {LEVEL_NAMES[self.level]}"
+            + (f", {self.degraded_calls_skipped} calls skipped" if self.degraded_calls_skipped else "")
+            + (f" [{stages}]" if stages else "")
+        )
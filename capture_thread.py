@@ -0,0 +1,418 @@
+import os
+import threading
+import time
+
+from PIL import Image
+
+# Raw layout of every frame in the ring: 8-bit B, G, R and padding/alpha per pixel
+BYTES_PER_PIXEL = 4
+
+
+class MssBackend:
+    """
+    Grab the screen with mss, which returns the native BGRA buffer (XGetImage or
+    XShm on X11, BitBlt on Windows, CoreGraphics on macOS) without building a PIL image.
+    """
+
+    name = "mss"
+
+    def __init__(self, monitor=1):
+        """
+        Args:
+            monitor (int): mss monitor index; 1 is the primary monitor, 0 all monitors
+        """
+        import mss  # noqa: F401 - fail at construction when mss is not installed
+
+        self.monitor = monitor
+        self._sct = None
+        self._monitor = None
+
+    def open(self):
+        """Create the mss handle; it is thread-local, so this runs on the capture thread."""
+        import mss
+
+        self._sct = mss.mss()
+        self._monitor = self._sct.monitors[self.monitor]
+        return self._monitor["width"], self._monitor["height"]
+
+    def grab_into(self, view):
+        shot = self._sct.grab(self._monitor)
+        view[:] = shot.raw
+
+    def close(self):
+        if self._sct is not None:
+            self._sct.close()
+            self._sct = None
+
+
+class PilBackend:
+    """
+    Grab the screen with a PIL screenshot function (pyautogui.screenshot or
+    PIL.ImageGrab.grab) and pack it into the ring's BGRA layout.
+
+    Not zero-copy: each grab still builds a PIL image and a packed copy of it,
+    so per tick it allocates more than a screenshot taken on demand. It is only
+    used when CAPTURE_BACKEND=pil asks for it, e.g. to compare it in
+    benchmarks/bench_capture.py.
+    """
+
+    name = "pil"
+
+    def __init__(self, screenshot=None):
+        """
+        Args:
+            screenshot (callable): Returns a PIL image of the screen; PIL.ImageGrab.grab when None
+        """
+        if screenshot is None:
+            from PIL import ImageGrab
+
+            screenshot = ImageGrab.grab
+        self.screenshot = screenshot
+        self._size = None
+
+    def open(self):
+        image = self.screenshot()
+        self._size = image.size
+        return image.size
+
+    def grab_into(self, view):
+        image = self.screenshot()
+        if image.size != self._size:
+            raise ValueError(f"Screen size changed from {self._size} to {image.size}")
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        view[:] = image.tobytes("raw", "BGRX")
+
+    def close(self):
+        pass
+
+
+def default_backend():
+    """
+    The backend CAPTURE_BACKEND=auto uses.
+
+    Only mss makes the ring pay off; with PIL every grab allocates more than
+    capturing on demand, so there is no PIL fallback here and the caller
+    captures on demand instead.
+
+    Returns:
+        MssBackend: The mss backend
+
+    Raises:
+        ImportError: If mss is not installed
+    """
+    try:
+        return MssBackend()
+    except ImportError as e:
+        raise ImportError("mss is not installed, and the PIL backend costs more than on-demand capture") from e
+
+
+class Frame:
+    """
+    One captured frame, pinned in its ring slot until released.
+
+    `view` is a memoryview of the slot's raw BGRA bytes; nothing is copied
+    until image() or array() is called. The slot is not overwritten while the
+    frame is pinned, so release it (or use it as a context manager) once done.
+    """
+
+    def __init__(self, ring, slot, sequence, captured_at, width, height):
+        self.ring = ring
+        self.slot = slot
+        self.sequence = sequence
+        self.captured_at = captured_at
+        self.width = width
+        self.height = height
+        self.view = ring.views[slot]
+        self._image = None
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    def array(self):
+        """The frame as a (height, width, 4) BGRA numpy array sharing the ring's memory."""
+        import numpy as np
+
+        return np.frombuffer(self.view, dtype=np.uint8).reshape(self.height, self.width, BYTES_PER_PIXEL)
+
+    def image(self):
+        """The frame as an RGB PIL image, converted on first use."""
+        if self._image is None:
+            self._image = Image.frombuffer("RGB", self.size, self.view, "raw", "BGRX", 0, 1)
+        return self._image
+
+    def release(self):
+        if self.view is not None:
+            self.ring.release(self.slot)
+            self.view = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class FrameRing:
+    """
+    Fixed set of preallocated frame slots in one buffer.
+
+    The writer fills the oldest slot that is neither pinned by a reader nor
+    the latest frame; readers pin the latest frame. Nothing is allocated per
+    frame.
+    """
+
+    def __init__(self, slots, width, height):
+        """
+        Args:
+            slots (int): Number of frames held (at least 2)
+            width (int): Frame width in pixels
+            height (int): Frame height in pixels
+        """
+        self.slots = max(2, slots)
+        self.width = width
+        self.height = height
+        self.frame_bytes = width * height * BYTES_PER_PIXEL
+        self.buffer = bytearray(self.slots * self.frame_bytes)
+        view = memoryview(self.buffer)
+        self.views = [
+            view[index * self.frame_bytes : (index + 1) * self.frame_bytes]
+            for index in range(self.slots)
+        ]
+        self._pins = [0] * self.slots
+        self._sequences = [0] * self.slots
+        self._captured_at = [None] * self.slots
+        self._latest = None
+        self._next_sequence = 1
+        self._next_slot = 0
+        self._condition = threading.Condition()
+
+    def acquire_write(self):
+        """
+        Pick a slot to capture into.
+
+        Returns:
+            int: Slot index, or None if every slot is pinned or latest
+        """
+        with self._condition:
+            for offset in range(self.slots):
+                slot = (self._next_slot + offset) % self.slots
+                if slot != self._latest and not self._pins[slot]:
+                    self._next_slot = (slot + 1) % self.slots
+                    # Invalidate the slot while it is being written
+                    self._sequences[slot] = 0
+                    return slot
+            return None
+
+    def publish(self, slot, captured_at):
+        """Make a written slot the latest frame and wake waiting readers."""
+        with self._condition:
+            self._sequences[slot] = self._next_sequence
+            self._next_sequence += 1
+            self._captured_at[slot] = captured_at
+            self._latest = slot
+            self._condition.notify_all()
+
+    def latest(self, after=0, timeout=None):
+        """
+        Pin the latest frame.
+
+        Args:
+            after (int): Only return a frame with a higher sequence number than this
+            timeout (float): Seconds to wait for such a frame; None waits indefinitely
+
+        Returns:
+            Frame: The pinned frame, or None on timeout
+        """
+        with self._condition:
+            ready = self._condition.wait_for(
+                lambda: self._latest is not None and self._sequences[self._latest] > after,
+                timeout,
+            )
+            if not ready:
+                return None
+            slot = self._latest
+            self._pins[slot] += 1
+            return Frame(
+                self, slot, self._sequences[slot], self._captured_at[slot], self.width, self.height
+            )
+
+    def release(self, slot):
+        with self._condition:
+            self._pins[slot] -= 1
+
+
+class CaptureThread:
+    """
+    Capture the screen on a dedicated thread into a FrameRing.
+
+    The polling loops no longer block on the screenshot: they take the latest
+    frame as a pinned memoryview and convert or encode it only when they need
+    to. Frames are captured at up to `fps` per second; a capture is dropped
+    when every slot is pinned by a reader.
+    """
+
+    def __init__(self, backend=None, slots=4, fps=10.0, clock=time.monotonic):
+        """
+        Args:
+            backend (MssBackend or PilBackend): Capture backend; default_backend() when None
+            slots (int): Frames kept in the ring
+            fps (float): Highest capture rate
+            clock (callable): Monotonic time source
+        """
+        self.backend = backend
+        self.slots = slots
+        self.fps = fps
+        self.clock = clock
+
+        self.ring = None
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.errors = 0
+        self.capture_seconds = 0.0
+        self._started_at = None
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+        self._error = None
+        self._last_sequence = 0
+
+    @classmethod
+    def from_env(cls, screenshot=None):
+        """
+        Build a capture thread from CAPTURE_BACKEND ("mss", "pil" or "auto"),
+        CAPTURE_FPS and CAPTURE_SLOTS.
+
+        Args:
+            screenshot (callable): PIL screenshot function for the PIL backend
+
+        Returns:
+            CaptureThread: The configured, not yet started, capture thread
+
+        Raises:
+            ImportError: For "auto" or "mss" when mss is not installed
+        """
+        backend = os.getenv("CAPTURE_BACKEND", "auto").lower()
+        if backend == "mss":
+            backend = MssBackend()
+        elif backend == "pil":
+            backend = PilBackend(screenshot)
+        else:
+            backend = default_backend()
+        return cls(
+            backend,
+            slots=int(os.getenv("CAPTURE_SLOTS", "4")),
+            fps=float(os.getenv("CAPTURE_FPS", "10")),
+        )
+
+    def _run(self):
+        try:
+            width, height = self.backend.open()
+            self.ring = FrameRing(self.slots, width, height)
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        interval = 1.0 / self.fps if self.fps else 0.0
+        try:
+            while not self._stop.is_set():
+                started = self.clock()
+                slot = self.ring.acquire_write()
+                if slot is None:
+                    self.frames_dropped += 1
+                else:
+                    try:
+                        self.backend.grab_into(self.ring.views[slot])
+                        self.ring.publish(slot, self.clock())
+                        self.frames_captured += 1
+                    except Exception as e:
+                        self.errors += 1
+                        self._error = e
+                self.capture_seconds += self.clock() - started
+                self._stop.wait(max(0.0, interval - (self.clock() - started)))
+        finally:
+            self.backend.close()
+
+    def start(self):
+        """
+        Start capturing and wait for the backend to open.
+
+        Raises:
+            Exception: The backend's error if it could not be opened
+        """
+        self._started_at = self.clock()
+        self._thread = threading.Thread(target=self._run, name="screen-capture", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self.ring is None:
+            raise self._error
+        print(
+            f"🎥 Capturing {self.ring.width}x{self.ring.height} with {self.backend.name} "
+            f"at up to {self.fps:g} fps into {self.ring.slots} slots"
+        )
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def latest(self, fresh=True, timeout=2.0):
+        """
+        Pin the latest frame.
+
+        Args:
+            fresh (bool): Wait for a frame not handed out before, so polls never see a stale one
+            timeout (float): Seconds to wait for a frame
+
+        Returns:
+            Frame: The pinned frame, or None when no frame arrived in time
+        """
+        frame = self.ring.latest(after=self._last_sequence if fresh else 0, timeout=timeout)
+        if frame is not None:
+            self._last_sequence = frame.sequence
+        return frame
+
+    def screenshot(self):
+        """
+        Drop-in for pyautogui.screenshot(): a PIL image of the next captured frame.
+
+        Returns:
+            PIL.Image.Image: The frame
+
+        Raises:
+            RuntimeError: If no frame was captured within the timeout
+        """
+        frame = self.latest()
+        if frame is None:
+            raise RuntimeError(f"No frame captured ({self._error or 'capture thread stalled'})")
+        with frame:
+            return frame.image()
+
+    def metrics(self):
+        elapsed = self.clock() - self._started_at if self._started_at is not None else 0.0
+        return {
+            "backend": self.backend.name,
+            "frames_captured": self.frames_captured,
+            "frames_dropped": self.frames_dropped,
+            "errors": self.errors,
+            "fps": round(self.frames_captured / elapsed, 2) if elapsed else 0.0,
+            "ms_per_capture": (
+                round(self.capture_seconds / self.frames_captured * 1000, 2) if self.frames_captured else None
+            ),
+        }
+
+    def summary(self):
+        metrics = self.metrics()
+        return (
+            f"{metrics['frames_captured']} frames at {metrics['fps']:.1f} fps with {metrics['backend']} "
+            f"({metrics['ms_per_capture'] or 0:.1f} ms each, {metrics['frames_dropped']} dropped)"
+        )
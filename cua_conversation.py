@@ -0,0 +1,286 @@
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from cua_requests import build_cua_input, computer_use_tool
+
+CONVERSATION_MODES = ("stateless", "chain")
+
+# Appended to a check's prompt in the anchor request, which carries no screenshot
+ANCHOR_SUFFIX = (
+    "\nThe screenshots follow in the next messages, one per message. Answer each of them as "
+    "described above. For now, reply with OK."
+)
+
+# Sent with every chained screenshot in place of the full prompt
+FOLLOW_UP_PROMPT = "Here is the current screenshot. Answer as instructed."
+
+
+def _text_input(text):
+    return [{"type": "message", "role": "user", "content": [{"type": "input_text", "text": text}]}]
+
+
+class StreamedAnswer:
+    """
+    A verdict read from a streamed response before the stream finished.
+
+    Shaped like a Responses API result for response_decoding: its one output
+    text is a JSON object holding just the verdict field. Usage is unknown
+    until the stream completes, so `usage` is None.
+    """
+
+    def __init__(self, response_id, field, value):
+        self.id = response_id
+        self.usage = None
+        self.output = [
+            SimpleNamespace(
+                type="message",
+                content=[SimpleNamespace(type="output_text", text=json.dumps({field: value}))],
+            )
+        ]
+
+
+class CheckConversation:
+    """
+    The requests one monitoring check sends the CUA model across polls.
+
+    In "stateless" mode every request carries the full prompt with the
+    screenshot, exactly as create_cua_response sends it. In "chain" mode the
+    prompt is sent once, in an anchor request without a screenshot, and each
+    check continues that stored response through previous_response_id with a
+    one-line follow-up and the new screenshot only. Checks continue the
+    anchor rather than the previous check, so earlier screenshots never pile
+    up in the context. The service still counts the anchor's tokens as input
+    on every check (from its prompt cache once the prefix is long enough);
+    chaining saves sending the prompt. If the anchor has expired or was not
+    stored, the check is resent in full and the next one re-anchors.
+
+    With a `stream_field`, the answer is streamed and returned as soon as that
+    JSON field's value is complete; the rest of the stream is read on a
+    background thread. Completed responses, including anchors and streams
+    finishing in the background, are passed to `record(check, response)`.
+    """
+
+    def __init__(self, name, prompt, mode="stateless", clock=time.monotonic):
+        """
+        Args:
+            name (str): Check name, e.g. "keep"; anchors are recorded as "<name>_anchor"
+            prompt (str): The check's full prompt
+            mode (str): "stateless" or "chain"
+            clock (callable): Monotonic time source
+        """
+        if mode not in CONVERSATION_MODES:
+            raise ValueError(f"Unknown conversation mode {mode!r}, expected one of {CONVERSATION_MODES}")
+        self.name = name
+        self.prompt = prompt
+        self.mode = mode
+        self.clock = clock
+
+        self.anchor_id = None
+        self.requests = 0
+        self.anchors = 0
+        self.chained = 0
+        self.fallbacks = 0
+        self.streamed = 0
+        self.early_verdicts = 0
+        self.input_tokens = 0
+        self.cached_tokens = 0
+        self.prompt_chars_sent = 0
+        self.verdict_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def anchor_request(self, model_name, frame):
+        """Keyword arguments for the request that establishes a chain's instructions."""
+        return {
+            "model": model_name,
+            "tools": [computer_use_tool(frame.width, frame.height)],
+            "input": _text_input(self.prompt + ANCHOR_SUFFIX),
+            "truncation": "auto",
+        }
+
+    def request(self, model_name, frame, text_format=None, chained=None):
+        """
+        Keyword arguments for client.responses.create classifying one frame.
+
+        Args:
+            model_name (str): CUA model deployment name
+            frame (EncodedFrame): Encoded screenshot
+            text_format (dict): Optional structured-output `text` parameter
+            chained (bool): Continue the anchor; by default when in chain mode and anchored
+
+        Returns:
+            dict: The request's keyword arguments
+        """
+        if chained is None:
+            chained = self.mode == "chain" and self.anchor_id is not None
+        kwargs = {
+            "model": model_name,
+            "tools": [computer_use_tool(frame.width, frame.height)],
+            "input": build_cua_input(FOLLOW_UP_PROMPT if chained else self.prompt, frame),
+            "truncation": "auto",
+        }
+        if chained:
+            kwargs["previous_response_id"] = self.anchor_id
+        if text_format:
+            kwargs["text"] = text_format
+        return kwargs
+
+    def _observe(self, response):
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        details = getattr(usage, "input_tokens_details", None)
+        with self._lock:
+            self.input_tokens += getattr(usage, "input_tokens", None) or 0
+            self.cached_tokens += getattr(details, "cached_tokens", None) or 0
+
+    def _finish(self, check, response, record):
+        self._observe(response)
+        if record is not None:
+            record(check, response)
+
+    def _count(self, kwargs, started):
+        with self._lock:
+            self.requests += 1
+            self.chained += "previous_response_id" in kwargs
+            self.prompt_chars_sent += len(kwargs["input"][0]["content"][0]["text"])
+            self.verdict_seconds += self.clock() - started
+
+    def _anchored(self, response):
+        self.anchors += 1
+        self.anchor_id = response.id
+        print(f"🔗 Anchored the {self.name} check's instructions as {response.id}")
+
+    def _stream(self, client, kwargs, field, record):
+        """Stream a request and return once `field` has a complete value, or at the end."""
+        pattern = re.compile(r'"%s"\s*:\s*"([^"]*)"' % re.escape(field))
+        events = iter(client.responses.create(stream=True, **kwargs))
+        self.streamed += 1
+        response_id = None
+        text = ""
+        for event in events:
+            if event.type == "response.created":
+                response_id = event.response.id
+            elif event.type == "response.output_text.delta":
+                text += event.delta
+                match = pattern.search(text)
+                if match:
+                    self.early_verdicts += 1
+                    threading.Thread(
+                        target=self._drain, args=(events, record), name=f"{self.name}-stream", daemon=True
+                    ).start()
+                    return StreamedAnswer(response_id, field, match.group(1))
+            elif event.type in ("response.completed", "response.incomplete", "response.failed"):
+                self._finish(self.name, event.response, record)
+                return event.response
+        raise RuntimeError(f"Stream for the {self.name} check ended without a response")
+
+    def _drain(self, events, record):
+        try:
+            for event in events:
+                if event.type in ("response.completed", "response.incomplete", "response.failed"):
+                    self._finish(self.name, event.response, record)
+        except Exception as e:
+            print(f"⚠️ Could not finish streaming the {self.name} answer: {e}")
+
+    def _send(self, client, kwargs, stream_field, record):
+        started = self.clock()
+        if stream_field:
+            response = self._stream(client, kwargs, stream_field, record)
+        else:
+            response = client.responses.create(**kwargs)
+            self._finish(self.name, response, record)
+        self._count(kwargs, started)
+        return response
+
+    def create(self, client, model_name, frame, text_format=None, stream_field=None, record=None):
+        """
+        Classify one frame, anchoring the chain first when needed.
+
+        Args:
+            client (AzureOpenAI): Azure OpenAI client
+            model_name (str): CUA model deployment name
+            frame (EncodedFrame): Encoded screenshot
+            text_format (dict): Optional structured-output `text` parameter
+            stream_field (str): Stream the answer and return once this JSON field is complete
+            record (callable): record(check, response) for every completed response
+
+        Returns:
+            Response or StreamedAnswer: The answer
+        """
+        from openai import BadRequestError
+
+        if self.mode == "chain" and self.anchor_id is None:
+            anchor = client.responses.create(**self.anchor_request(model_name, frame))
+            self._finish(f"{self.name}_anchor", anchor, record)
+            self._anchored(anchor)
+
+        kwargs = self.request(model_name, frame, text_format)
+        try:
+            return self._send(client, kwargs, stream_field, record)
+        except BadRequestError as e:
+            if "previous_response_id" not in kwargs:
+                raise
+            print(f"⚠️ Chained {self.name} check rejected ({e}), resending it in full")
+            self.anchor_id = None
+            self.fallbacks += 1
+            kwargs = self.request(model_name, frame, text_format, chained=False)
+            return self._send(client, kwargs, stream_field, record)
+
+    async def create_async(self, client, model_name, frame, text_format=None, record=None):
+        """Async variant of create() for AsyncAzureOpenAI; answers are not streamed."""
+        from openai import BadRequestError
+
+        if self.mode == "chain" and self.anchor_id is None:
+            anchor = await client.responses.create(**self.anchor_request(model_name, frame))
+            self._finish(f"{self.name}_anchor", anchor, record)
+            self._anchored(anchor)
+
+        kwargs = self.request(model_name, frame, text_format)
+        started = self.clock()
+        try:
+            response = await client.responses.create(**kwargs)
+        except BadRequestError as e:
+            if "previous_response_id" not in kwargs:
+                raise
+            print(f"⚠️ Chained {self.name} check rejected ({e}), resending it in full")
+            self.anchor_id = None
+            self.fallbacks += 1
+            kwargs = self.request(model_name, frame, text_format, chained=False)
+            response = await client.responses.create(**kwargs)
+        self._finish(self.name, response, record)
+        self._count(kwargs, started)
+        return response
+
+    def metrics(self):
+        return {
+            "mode": self.mode,
+            "requests": self.requests,
+            "anchors": self.anchors,
+            "chained": self.chained,
+            "fallbacks": self.fallbacks,
+            "streamed": self.streamed,
+            "early_verdicts": self.early_verdicts,
+            "input_tokens": self.input_tokens,
+            "cached_tokens": self.cached_tokens,
+            "prompt_chars_sent": self.prompt_chars_sent,
+            "mean_seconds_to_verdict": (
+                round(self.verdict_seconds / self.requests, 3) if self.requests else None
+            ),
+        }
+
+    def summary(self):
+        chain = (
+            f", {self.chained} chained on {self.anchors} anchors ({self.fallbacks} resent in full)"
+            if self.mode == "chain"
+            else ""
+        )
+        stream = f", {self.early_verdicts}/{self.streamed} verdicts before the stream ended" if self.streamed else ""
+        mean = self.verdict_seconds / self.requests if self.requests else 0.0
+        return (
+            f"{self.requests} checks{chain}{stream}; {self.input_tokens} input tokens "
+            f"({self.cached_tokens} cached), {self.prompt_chars_sent} prompt characters sent, "
+            f"verdict after {mean:.2f}s on average"
+        )
@@ -0,0 +1,468 @@
+import concurrent.futures
+import email.utils
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+from automation_state import state_path
+
+
+class TokenBucket:
+    """
+    Token bucket for one deployment: `rate` requests per second, bursts up to `capacity`.
+
+    reserve() takes a token at once and returns how long the caller must wait
+    before using it. The balance may go negative, so concurrent callers queue up
+    one interval apart instead of all waking at the same moment.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        """
+        Args:
+            rate (float): Tokens added per second
+            capacity (float): Largest balance (burst size); one second's worth when None
+            clock (callable): Monotonic time source
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens=1.0):
+        """
+        Take `tokens` from the bucket.
+
+        Returns:
+            float: Seconds to wait before the request may be sent
+        """
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def drain(self, seconds):
+        """Empty the bucket so the next token is available in `seconds`, e.g. after a 429."""
+        with self._lock:
+            self._refill(self.clock())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+def retry_after_seconds(error):
+    """
+    Read the server's requested delay from a failed request.
+
+    Args:
+        error (Exception): Error raised by client.responses.create
+
+    Returns:
+        float: Seconds from retry-after-ms or Retry-After (seconds or an HTTP date), or None
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    """True for 429s, 5xx responses, timeouts and dropped connections; other errors are final."""
+    # openai is already loaded once a request has failed; importing it here keeps startup light
+    from openai import APIConnectionError, APIStatusError, RateLimitError
+
+    if isinstance(error, (RateLimitError, APIConnectionError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def request_key(kwargs):
+    """Digest identifying a request, so identical concurrent requests can share one call."""
+    return hashlib.sha256(json.dumps(kwargs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class GatewayStats:
+    """Counters for requests through the gateway."""
+
+    def __init__(self):
+        self.requests = 0
+        self.calls = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.server_errors = 0
+        self.failures = 0
+        self.throttle_seconds = 0.0
+        self.backoff_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def to_dict(self):
+        return {
+            "requests": self.requests,
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "server_errors": self.server_errors,
+            "failures": self.failures,
+            "throttle_seconds": round(self.throttle_seconds, 3),
+            "backoff_seconds": round(self.backoff_seconds, 3),
+        }
+
+    def summary(self):
+        return (
+            f"{self.requests} requests, {self.calls} calls ({self.coalesced} coalesced), "
+            f"{self.rate_limited} rate-limited, {self.server_errors} server errors, "
+            f"{self.retries} retries, {self.failures} failed; waited {self.throttle_seconds:.1f}s "
+            f"for the rate limit and {self.backoff_seconds:.1f}s backing off"
+        )
+
+
+class CuaGateway:
+    """
+    Shared front for every client.responses.create call to one Azure OpenAI endpoint.
+
+    Requests are paced by a token bucket per deployment (the request's `model`),
+    so many sessions in one process stay under the deployment's rate limit
+    instead of stampeding it. 429s, 5xx responses and dropped connections are
+    retried with exponential backoff and full jitter; a Retry-After (or
+    retry-after-ms) from the server is honoured, with a little jitter so the
+    waiting callers do not all return at once, and it drains the deployment's
+    bucket so every caller waits, not only the one that was refused. With a
+    `pause_path`, that pause is also written to a small file that other
+    processes (orchestrator workers) read before sending.
+
+    Identical requests in flight at the same time, e.g. two monitors asking the
+    same question about the same frame, share one call. All requests go through
+    one client per endpoint, so its keep-alive connection pool is reused; the
+    client's own retries should be turned off (max_retries=0) so the gateway
+    alone decides when to retry.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute=None,
+        burst=None,
+        max_retries=4,
+        base_delay=0.5,
+        max_delay=30.0,
+        coalesce=True,
+        pause_path=None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+        jitter=random.random,
+    ):
+        """
+        Args:
+            requests_per_minute (float): Requests per minute per deployment, or None for no pacing
+            burst (int): Requests that may be sent at once after an idle period
+            max_retries (int): Retries of one request before its error is raised
+            base_delay (float): First backoff delay in seconds without Retry-After
+            max_delay (float): Longest backoff delay in seconds
+            coalesce (bool): Share one call between identical concurrent requests
+            pause_path (str): File shared between processes recording rate-limit pauses,
+                or None to keep pauses within the process
+            clock (callable): Monotonic time source
+            sleep (callable): Sleep function
+            jitter (callable): Returns a random float in [0, 1)
+        """
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.coalesce = coalesce
+        self.pause_path = pause_path
+        self.clock = clock
+        self.sleep = sleep
+        self.jitter = jitter
+
+        self.stats = GatewayStats()
+        self._buckets = {}
+        self._paused_until = {}  # deployment -> monotonic time
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._async_in_flight = {}
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build the gateway from CUA_RATE_LIMIT (requests per minute per deployment),
+        CUA_RATE_BURST, CUA_MAX_RETRIES and CUA_COALESCE ("on"/"off").
+
+        Returns:
+            CuaGateway: The configured gateway; pauses are shared through the state directory
+        """
+        rate = os.getenv("CUA_RATE_LIMIT")
+        burst = os.getenv("CUA_RATE_BURST")
+        return cls(
+            requests_per_minute=float(rate) if rate else None,
+            burst=int(burst) if burst else None,
+            max_retries=int(os.getenv("CUA_MAX_RETRIES", "4")),
+            coalesce=os.getenv("CUA_COALESCE", "on").lower() != "off",
+            pause_path=state_path("gateway_pauses.json"),
+        )
+
+    def wrap(self, client):
+        """Return a drop-in for `client` whose responses.create goes through the gateway."""
+        return GatewayClient(self, client)
+
+    def wrap_async(self, client):
+        """Return a drop-in for an async client whose responses.create goes through the gateway."""
+        return AsyncGatewayClient(self, client)
+
+    def _bucket(self, deployment):
+        if self.requests_per_minute is None:
+            return None
+        with self._lock:
+            if deployment not in self._buckets:
+                self._buckets[deployment] = TokenBucket(
+                    self.requests_per_minute / 60.0, self.burst, clock=self.clock
+                )
+            return self._buckets[deployment]
+
+    def _shared_pause(self, deployment):
+        """Seconds left of a pause recorded by any process for this deployment."""
+        remaining = self._paused_until.get(deployment, 0.0) - self.clock()
+        if self.pause_path is not None:
+            try:
+                with open(self.pause_path, "r") as f:
+                    until = json.load(f).get(deployment, 0.0)
+                remaining = max(remaining, until - time.time())
+            except (OSError, ValueError, AttributeError):
+                pass
+        return max(0.0, remaining)
+
+    def _record_pause(self, deployment, seconds):
+        self._paused_until[deployment] = max(
+            self._paused_until.get(deployment, 0.0), self.clock() + seconds
+        )
+        bucket = self._bucket(deployment)
+        if bucket is not None:
+            bucket.drain(seconds)
+        if self.pause_path is None:
+            return
+        try:
+            try:
+                with open(self.pause_path, "r") as f:
+                    pauses = json.load(f)
+            except (OSError, ValueError):
+                pauses = {}
+            pauses[deployment] = max(pauses.get(deployment, 0.0), time.time() + seconds)
+            temporary = f"{self.pause_path}.{os.getpid()}.tmp"
+            with open(temporary, "w") as f:
+                json.dump(pauses, f)
+            os.replace(temporary, self.pause_path)
+        except OSError as e:
+            print(f"⚠️ Could not share rate-limit pause through {self.pause_path}: {e}")
+
+    def _admission_delay(self, deployment):
+        """Seconds to wait before sending: a shared pause, then the deployment's token bucket."""
+        delay = self._shared_pause(deployment)
+        bucket = self._bucket(deployment)
+        if bucket is not None:
+            delay = max(delay, bucket.reserve())
+        return delay
+
+    def _retry_delay(self, deployment, error, attempt):
+        """
+        Decide whether to retry a failed call and how long to back off first.
+
+        Returns:
+            float: Seconds to back off, or None to raise the error
+        """
+        from openai import APIStatusError, RateLimitError
+
+        if not is_retryable(error) or attempt >= self.max_retries:
+            self.stats.add(failures=1)
+            return None
+        if isinstance(error, RateLimitError):
+            self.stats.add(rate_limited=1)
+        elif isinstance(error, APIStatusError):
+            self.stats.add(server_errors=1)
+
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            delay = min(self.max_delay, retry_after) + self.jitter() * self.base_delay
+            self._record_pause(deployment, retry_after)
+        else:
+            delay = self.jitter() * min(self.max_delay, self.base_delay * 2 ** attempt)
+        self.stats.add(retries=1)
+        print(
+            f"⏳ CUA request to {deployment} failed ({type(error).__name__}), "
+            f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+        )
+        return delay
+
+    def _wait_before_call(self, deployment, backoff):
+        """Seconds to wait before the next attempt: the longer of backoff and admission."""
+        delay = max(backoff, self._admission_delay(deployment))
+        self.stats.add(
+            calls=1, backoff_seconds=min(delay, backoff), throttle_seconds=max(0.0, delay - backoff)
+        )
+        return delay
+
+    def _send(self, create, kwargs):
+        deployment = kwargs.get("model", "default")
+        backoff = 0.0
+        for attempt in range(self.max_retries + 1):
+            delay = self._wait_before_call(deployment, backoff)
+            if delay > 0:
+                self.sleep(delay)
+            try:
+                return create(**kwargs)
+            except Exception as e:
+                backoff = self._retry_delay(deployment, e, attempt)
+                if backoff is None:
+                    raise
+
+    async def _send_async(self, create, kwargs):
+        import asyncio
+
+        deployment = kwargs.get("model", "default")
+        backoff = 0.0
+        for attempt in range(self.max_retries + 1):
+            delay = self._wait_before_call(deployment, backoff)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                return await create(**kwargs)
+            except Exception as e:
+                backoff = self._retry_delay(deployment, e, attempt)
+                if backoff is None:
+                    raise
+
+    def create(self, create, kwargs):
+        """
+        Send one request through the gateway.
+
+        Args:
+            create (callable): The wrapped client's responses.create
+            kwargs (dict): Its keyword arguments
+
+        Returns:
+            Response: The Responses API result, possibly shared with identical requests
+        """
+        self.stats.add(requests=1)
+        # A stream can only be read once, so streamed requests are never shared
+        if not self.coalesce or kwargs.get("stream"):
+            return self._send(create, kwargs)
+
+        key = request_key(kwargs)
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = concurrent.futures.Future()
+        if not leader:
+            self.stats.add(coalesced=1)
+            return future.result()
+
+        try:
+            response = self._send(create, kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    async def create_async(self, create, kwargs):
+        """Async variant of create() for AsyncAzureOpenAI."""
+        import asyncio
+
+        self.stats.add(requests=1)
+        if not self.coalesce or kwargs.get("stream"):
+            return await self._send_async(create, kwargs)
+
+        key = (id(asyncio.get_running_loop()), request_key(kwargs))
+        future = self._async_in_flight.get(key)
+        if future is not None:
+            self.stats.add(coalesced=1)
+            return await asyncio.shield(future)
+
+        future = self._async_in_flight[key] = asyncio.get_running_loop().create_future()
+        try:
+            response = await self._send_async(create, kwargs)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark the exception as retrieved when no other request was waiting on it
+                future.exception()
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            self._async_in_flight.pop(key, None)
+
+
+class _GatewayResponses:
+    def __init__(self, gateway, responses):
+        self._gateway = gateway
+        self._responses = responses
+
+    def create(self, **kwargs):
+        return self._gateway.create(self._responses.create, kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._responses, name)
+
+
+class _AsyncGatewayResponses(_GatewayResponses):
+    async def create(self, **kwargs):
+        return await self._gateway.create_async(self._responses.create, kwargs)
+
+
+class GatewayClient:
+    """An OpenAI client whose responses.create is routed through a CuaGateway."""
+
+    _responses_class = _GatewayResponses
+
+    def __init__(self, gateway, client):
+        self.gateway = gateway
+        self.wrapped = client
+        self.responses = self._responses_class(gateway, client.responses)
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+
+class AsyncGatewayClient(GatewayClient):
+    """An async OpenAI client whose responses.create is routed through a CuaGateway."""
+
+    _responses_class = _AsyncGatewayResponses
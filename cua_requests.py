@@ -0,0 +1,71 @@
+
+
+def computer_use_tool(display_width, display_height, environment="windows"):
+    """
+    Build the computer_use_preview tool definition for a frame of the given size.
+
+    Args:
+        display_width (int): Width in pixels of the image sent to the model
+        display_height (int): Height in pixels of the image sent to the model
+        environment (str): Desktop environment reported to the model
+
+    Returns:
+        dict: Tool definition for client.responses.create
+    """
+    return {
+        "type": "computer_use_preview",
+        "display_width": display_width,
+        "display_height": display_height,
+        "environment": environment,
+    }
+
+
+def build_cua_input(prompt, frame):
+    """
+    Build the input message carrying a prompt and an encoded screenshot.
+
+    Args:
+        prompt (str): Instructions for the model
+        frame (EncodedFrame): Encoded screenshot
+
+    Returns:
+        list: Input items for client.responses.create
+    """
+    return [
+        {
+            "type": "message",
+            "role": "user",
+            "content": [
+                {"type": "input_text", "text": prompt},
+                {"type": "input_image", "image_url": frame.data_url},
+            ],
+        }
+    ]
+
+
+def create_cua_response(client, model_name, prompt, frame, text_format=None):
+    """
+    Send one screenshot and prompt to the Computer Use Agent model.
+
+    The tool's display size is taken from the encoded frame, so cropped and
+    downscaled frames are described to the model with their real dimensions.
+
+    Args:
+        client (AzureOpenAI): Azure OpenAI client
+        model_name (str): CUA model deployment name
+        prompt (str): Instructions for the model
+        frame (EncodedFrame): Encoded screenshot
+        text_format (dict): Optional `text` parameter constraining the answer to a
+            JSON schema (see response_decoding.VerdictSchema.text_format)
+
+    Returns:
+        Response: The raw Responses API result
+    """
+    options = {"text": text_format} if text_format else {}
+    return client.responses.create(
+        model=model_name,
+        tools=[computer_use_tool(frame.width, frame.height)],
+        input=build_cua_input(prompt, frame),
+        truncation="auto",
+        **options,
+    )
@@ -0,0 +1,1695 @@
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+from budget import TokenBudget
+from capture_thread import CaptureThread
+from cua_conversation import CheckConversation
+from cua_gateway import CuaGateway
+from frame_gate import FrameChangeGate
+from job_checkpoint import JobCheckpoint, text_digest
+from keep_detector import KeepButtonDetector
+from pip_installer import run_pip_subprocess, terminal_log_command, wait_for_terminal_log
+from poll_scheduler import DurationHistory, PollScheduler
+from readiness import ReadinessProbes, has_color, has_ink
+from replay import RecordingClients, SessionRecorder
+from response_decoding import DecodeStats, VerdictSchema, decode_verdict, reask_settings
+from screen_capture import CaptureSettings, encode_frame
+from screen_regions import COPILOT_CHAT_REGION, TERMINAL_REGION
+from screen_state import ScreenStateBroker
+from text_injection import TextInjector
+from token_cache import TokenCache
+from tracing import record_usage, span, trace_path_from_env, tracer
+from verdict_cache import VerdictCache, prompt_id
+from vscode_discovery import VSCodeDiscovery, find_vscode_executable
+from vscode_pool import CodeCliLauncher, VSCodePool
+from workspace_watcher import WorkspaceWatcher
+
+KEEP_BUTTON_PROMPT = """
+The image provided as input is a screenshot in Visual Studio Code.
+A user prompt has been provided to the Agent Mode in the GitHub Copilot chat panel, instructing it to write code based on the prompt.
+Once the code is generated and the copilot agent has finished processing, the "Keep" button will be enabled. Till the time it runs, the "Keep" button will be grayed out.
+
+In your response, please provide the following JSON format:
+{
+    "button": "enabled" or "disabled"
+}
+
+When the 'keep' button is enabled, you must return "enabled" in the response.
+If the button is disabled, return "disabled" in the response.
+"""
+
+INSTALLATION_PROMPT = """
+The image provided is a screenshot of a PowerShell/Command Prompt terminal window where pip install is running.
+I need to determine if the package installation has completed or is still in progress.
+
+When installation is complete, the terminal will show an empty prompt (like "PS C:\\path>" or "C:\\path>") waiting for the next command.
+When installation is in progress, you'll see output like:
+- "Collecting package_name..."
+- "Downloading..."
+- "Installing collected packages..."
+- "Successfully installed..."
+- Progress bars or percentage indicators
+
+In your response, simply return one of these two words:
+    "complete" - when you see an empty command prompt ready for input
+    "in_progress" - when you see any installation activity or output
+
+Return "complete" when you see an empty command prompt ready for input.
+Return "in_progress" when you see any installation activity or output.
+"""
+
+DEFAULT_DEVELOPER_PROMPT = """add a python script that calculates the factorial of the first n natural numbers. There is no need to create a python virtual environment. Add the code directly to the project. There is no need to write any test cases for this script. Just write the code that calculates the factorial of the first n natural numbers."""
+
+
+# Verdict cache keys include the prompt, so editing a prompt invalidates its cached verdicts
+PIP_PROMPT_ID = prompt_id("pip_install", INSTALLATION_PROMPT)
+KEEP_PROMPT_ID = prompt_id("keep_button", KEEP_BUTTON_PROMPT)
+
+# Answers each check may give; sent as the structured-output schema and used to validate replies
+PIP_SCHEMA = VerdictSchema(
+    "pip_install",
+    "installation_status",
+    ("complete", "in_progress"),
+    "Decide whether pip install in the VS Code terminal has finished and an empty prompt "
+    'waits for the next command ("complete") or is still running ("in_progress").',
+)
+KEEP_SCHEMA = VerdictSchema(
+    "keep_button",
+    "button",
+    ("enabled", "disabled"),
+    'Decide whether the "Keep" button in the GitHub Copilot chat panel is enabled '
+    '("enabled") or grayed out ("disabled").',
+)
+
+
+class AutomationError(Exception):
+    """Raised when a stage of the automation cannot continue."""
+
+
+def load_pyautogui():
+    """
+    Import pyautogui on first use.
+
+    pyautogui connects to the display when imported, so importing it lazily lets
+    the engine be imported and replayed (see replay.py) on a headless machine.
+    """
+    import pyautogui
+
+    # Optional: Make sure failsafe is off if your cursor jumps to corner
+    pyautogui.FAILSAFE = False
+    return pyautogui
+
+
+def take_screenshot(screenshot_counter, desktop=None):
+    """
+    Take a screenshot in memory.
+
+    Args:
+        screenshot_counter (int): The counter for the screenshot for logging purposes
+        desktop: Object with pyautogui's screenshot(); pyautogui itself when None
+
+    Returns:
+        PIL.Image.Image: The screenshot, or None if there was an error
+    """
+    try:
+        with span("capture", frame=screenshot_counter):
+            screenshot = (desktop or load_pyautogui()).screenshot()
+        print(f"Screenshot {screenshot_counter} captured in memory")
+        return screenshot
+    except Exception as e:
+        print(f"Error taking screenshot: {e}")
+        return None
+
+
+def encode_screenshot(screenshot, settings):
+    """
+    Crop, downscale and encode a screenshot for the CUA model.
+
+    Args:
+        screenshot (PIL.Image.Image): The screenshot to encode
+        settings (CaptureSettings): Region, scaling and image format to use
+
+    Returns:
+        EncodedFrame: The encoded frame, or None if there was an error
+    """
+    try:
+        with span("encode", format=settings.image_format) as current:
+            frame = encode_frame(screenshot, settings)
+            current.set_attribute("bytes", frame.payload_bytes)
+            current.set_attribute("width", frame.width)
+            current.set_attribute("height", frame.height)
+        return frame
+    except Exception as e:
+        print(f"Error encoding screenshot: {e}")
+        return None
+
+
+def accept_generated_code(desktop=None):
+    """Accept Copilot's generated code once the Keep button is enabled."""
+    print("✅ 'Keep' button is ENABLED!")
+
+    # Press Ctrl+Enter to accept the code (cursor is already in chat input area)
+    print("⌨️ Pressing Ctrl+Enter to accept the generated code...")
+    (desktop or load_pyautogui()).hotkey("ctrl", "enter")
+    print("🎉 Successfully executed Ctrl+Enter to accept the code!")
+
+
+class AutomationConfig:
+    """Everything a session needs to know, normally read from the environment / .env."""
+
+    def __init__(
+        self,
+        azure_endpoint=None,
+        api_version=None,
+        cognitive_services_scope=None,
+        cua_model_name=None,
+        api_key=None,
+        project_folder=None,
+        user_data_dir=None,
+        developer_prompt=DEFAULT_DEVELOPER_PROMPT,
+        pip_install_mode="subprocess",
+        pip_executable="pip",
+        monitor_mode="serial",
+        monitor_interval=1.0,
+        monitor_max_in_flight=2,
+        screen_state_mode="off",
+        structured_output=True,
+        max_reasks=1,
+        conversation_mode="stateless",
+        stream_verdicts=False,
+        pool_size=0,
+        pool_recycle_after=20,
+        workspace_signal="confirm",
+        workspace_quiet=3.0,
+        workspace_fallback=20.0,
+        workspace_manifest=None,
+        capture_thread=False,
+        checkpoint_mode="resume",
+        pip_capture_settings=None,
+        keep_capture_settings=None,
+        install_timeout=300,
+        generation_timeout=120,
+    ):
+        self.azure_endpoint = azure_endpoint
+        self.api_version = api_version
+        self.cognitive_services_scope = cognitive_services_scope
+        self.cua_model_name = cua_model_name
+        self.api_key = api_key
+        self.project_folder = project_folder or os.path.join(
+            os.path.expanduser("~"), "pyauto-gui-samples", "project1"
+        )
+        self.user_data_dir = user_data_dir
+        self.developer_prompt = developer_prompt
+        self.pip_install_mode = pip_install_mode.lower()
+        self.pip_executable = pip_executable
+        self.monitor_mode = monitor_mode.lower()
+        self.monitor_interval = monitor_interval
+        self.monitor_max_in_flight = monitor_max_in_flight
+        self.screen_state_mode = screen_state_mode.lower()
+        self.structured_output = structured_output
+        self.max_reasks = max_reasks
+        self.conversation_mode = conversation_mode.lower()
+        self.stream_verdicts = stream_verdicts
+        self.pool_size = pool_size
+        self.pool_recycle_after = pool_recycle_after
+        self.workspace_signal = workspace_signal.lower()
+        self.workspace_quiet = workspace_quiet
+        self.workspace_fallback = workspace_fallback
+        self.workspace_manifest = workspace_manifest
+        self.capture_thread = capture_thread
+        self.checkpoint_mode = checkpoint_mode.lower()
+        self.pip_capture_settings = pip_capture_settings or CaptureSettings(
+            region=TERMINAL_REGION
+        )
+        self.keep_capture_settings = keep_capture_settings or CaptureSettings(
+            region=COPILOT_CHAT_REGION
+        )
+        self.install_timeout = install_timeout
+        self.generation_timeout = generation_timeout
+
+    @classmethod
+    def from_env(cls):
+        """Build the configuration from environment variables (call load_dotenv first)."""
+        developer_prompt = DEFAULT_DEVELOPER_PROMPT
+        if os.getenv("DEVELOPER_PROMPT_FILE"):
+            with open(os.getenv("DEVELOPER_PROMPT_FILE"), "r", encoding="utf-8") as f:
+                developer_prompt = f.read().strip()
+        elif os.getenv("DEVELOPER_PROMPT"):
+            developer_prompt = os.getenv("DEVELOPER_PROMPT")
+
+        return cls(
+            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+            api_version=os.getenv("AZURE_API_VERSION"),
+            cognitive_services_scope=os.getenv("COGNITIVE_SERVICES_SCOPE"),
+            cua_model_name=os.getenv("CUA_MODEL_NAME"),
+            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+            project_folder=os.getenv("PROJECT_FOLDER"),
+            user_data_dir=os.getenv("VSCODE_USER_DATA_DIR"),
+            developer_prompt=developer_prompt,
+            pip_install_mode=os.getenv("PIP_INSTALL_MODE", "subprocess"),
+            pip_executable=os.getenv("PIP_EXECUTABLE", "pip"),
+            install_timeout=float(os.getenv("INSTALL_TIMEOUT", "300")),
+            monitor_mode=os.getenv("MONITOR_MODE", "serial"),
+            monitor_interval=float(os.getenv("MONITOR_INTERVAL", "1")),
+            monitor_max_in_flight=int(os.getenv("MONITOR_MAX_IN_FLIGHT", "2")),
+            screen_state_mode=os.getenv("SCREEN_STATE", "off"),
+            structured_output=os.getenv("STRUCTURED_OUTPUT", "on").lower() != "off",
+            max_reasks=int(os.getenv("MAX_REASKS", "1")),
+            conversation_mode=os.getenv("CUA_CONVERSATION", "stateless"),
+            stream_verdicts=os.getenv("STREAM_VERDICTS", "off").lower() == "on",
+            pool_size=int(os.getenv("VSCODE_POOL", "0")),
+            pool_recycle_after=int(os.getenv("VSCODE_POOL_RECYCLE", "20")),
+            workspace_signal=os.getenv("WORKSPACE_SIGNAL", "confirm"),
+            workspace_quiet=float(os.getenv("WORKSPACE_QUIET", "3")),
+            workspace_fallback=float(os.getenv("WORKSPACE_FALLBACK", "20")),
+            workspace_manifest=os.getenv("WORKSPACE_MANIFEST"),
+            capture_thread=os.getenv("CAPTURE_THREAD", "off").lower() == "on",
+            checkpoint_mode=os.getenv("CHECKPOINT", "resume"),
+            pip_capture_settings=CaptureSettings.from_env("PIP_CHECK", TERMINAL_REGION),
+            keep_capture_settings=CaptureSettings.from_env(
+                "KEEP_CHECK", COPILOT_CHAT_REGION
+            ),
+        )
+
+    @property
+    def project_name(self):
+        return os.path.basename(os.path.normpath(self.project_folder)).lower()
+
+
+class CuaClients:
+    """
+    Lazily created Azure credential and OpenAI clients for one endpoint.
+
+    Nothing is created until first use, and instances are shared through
+    get_cua_clients() so later sessions in the same process reuse the clients'
+    HTTP connection pools. Entra ID tokens come from a TokenCache, which shares
+    them with the other automation processes and refreshes them before expiry. Both clients are put
+    behind one CuaGateway, which paces, retries and coalesces their requests;
+    the SDK's own retries are turned off so only the gateway retries.
+    """
+
+    def __init__(self, azure_endpoint, api_version, cognitive_services_scope, api_key=None):
+        self.azure_endpoint = azure_endpoint
+        self.api_version = api_version
+        self.cognitive_services_scope = cognitive_services_scope
+        self.api_key = api_key
+
+        self.gateway = CuaGateway.from_env()
+        self.token_cache = None
+        self._client = None
+        self._async_client = None
+
+    def _auth(self):
+        if self.api_key:
+            # Key-based auth, e.g. for a local mock endpoint or a key-enabled deployment
+            return {"api_key": self.api_key}
+
+        if self.token_cache is None:
+            self.token_cache = TokenCache.from_env(self.cognitive_services_scope)
+        return {"azure_ad_token_provider": self.token_cache}
+
+    @property
+    def client(self):
+        if self._client is None:
+            # openai takes about a second to import, so it is loaded with the first client
+            from openai import AzureOpenAI
+
+            self._client = self.gateway.wrap(
+                AzureOpenAI(
+                    azure_endpoint=self.azure_endpoint,
+                    api_version=self.api_version,
+                    max_retries=0,
+                    **self._auth(),
+                )
+            )
+        return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            from openai import AsyncAzureOpenAI
+
+            self._async_client = self.gateway.wrap_async(
+                AsyncAzureOpenAI(
+                    azure_endpoint=self.azure_endpoint,
+                    api_version=self.api_version,
+                    max_retries=0,
+                    **self._auth(),
+                )
+            )
+        return self._async_client
+
+    def warm_up(self):
+        """Create the client and acquire a token now instead of on the first model call."""
+        self._auth()
+        if self.token_cache is not None:
+            self.token_cache()
+        return self.client
+
+
+_shared_clients = {}
+
+
+def get_cua_clients(config):
+    """
+    Return the process-wide CuaClients for the config's endpoint and credentials.
+
+    Args:
+        config (AutomationConfig): Session configuration
+
+    Returns:
+        CuaClients: Shared, lazily initialised clients
+    """
+    key = (
+        config.azure_endpoint,
+        config.api_version,
+        config.cognitive_services_scope,
+        config.api_key,
+    )
+    if key not in _shared_clients:
+        _shared_clients[key] = CuaClients(*key)
+    return _shared_clients[key]
+
+
+class SessionResult:
+    """Outcome and per-stage timings of one AutomationSession.run()."""
+
+    def __init__(self, project_folder):
+        self.project_folder = project_folder
+        self.keep_button_found = False
+        self.monitoring_seconds = 0.0
+        self.screenshots = 0
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.install_result = None
+        self.stage_seconds = {}
+        self.startup_to_first_action = None
+        self.time_to_first_prompt = None
+        self.warm_start = None
+        self.verdict_cache = None
+        self.decode = None
+        self.readiness = None
+        self.budget = None
+        self.gateway = None
+        self.workspace = None
+        self.capture = None
+        self.conversations = None
+        self.checkpoint = None
+        self.credential = None
+        self.trace_id = None
+        self.error = None
+
+    def to_dict(self):
+        return {
+            "project_folder": self.project_folder,
+            "keep_button_found": self.keep_button_found,
+            "monitoring_seconds": round(self.monitoring_seconds, 3),
+            "screenshots": self.screenshots,
+            "frames_sent": self.frames_sent,
+            "frames_skipped": self.frames_skipped,
+            "install_seconds": (
+                round(self.install_result.duration, 3) if self.install_result else None
+            ),
+            "startup_to_first_action_seconds": (
+                round(self.startup_to_first_action, 3)
+                if self.startup_to_first_action is not None
+                else None
+            ),
+            "time_to_first_prompt_seconds": (
+                round(self.time_to_first_prompt, 3)
+                if self.time_to_first_prompt is not None
+                else None
+            ),
+            "warm_start": self.warm_start,
+            "stage_seconds": {
+                stage: round(seconds, 3) for stage, seconds in self.stage_seconds.items()
+            },
+            "verdict_cache": self.verdict_cache,
+            "decode": self.decode,
+            "readiness": self.readiness,
+            "budget": self.budget,
+            "gateway": self.gateway,
+            "workspace": self.workspace,
+            "capture": self.capture,
+            "conversations": self.conversations,
+            "checkpoint": self.checkpoint,
+            "credential": self.credential,
+            "trace_id": self.trace_id,
+            "error": self.error,
+        }
+
+    def write(self, path):
+        """Write the result as JSON, e.g. for the multi-session orchestrator."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+class AutomationSession:
+    """
+    Drive one VS Code window through the launch → setup → prompt → await-completion flow.
+
+    Each stage is a method so callers can run the whole flow with run() or
+    individual stages on their own. A session can be run repeatedly; the Azure
+    credential and OpenAI clients are created on first use and shared across
+    sessions in the same process.
+    """
+
+    def __init__(
+        self, config=None, clients=None, desktop=None, clock=time.monotonic, sleep=time.sleep
+    ):
+        """
+        Args:
+            config (AutomationConfig): Settings; read from the environment when None
+            clients (CuaClients): Clients to use; the shared ones for the config when None
+            desktop: Object with pyautogui's screenshot/hotkey/press/write/moveTo
+                functions; pyautogui itself when None (replay.ReplayDesktop in replays)
+            clock (callable): Monotonic time source for the monitoring loops
+            sleep (callable): Sleep function for the monitoring loops
+        """
+        self.config = config or AutomationConfig.from_env()
+        self.clients = clients or get_cua_clients(self.config)
+        self.desktop = desktop or load_pyautogui()
+        self.clock = clock
+        self.sleep = sleep
+
+        # Saves captured frames and model responses for offline replay (RECORD_DIR)
+        self.recorder = SessionRecorder.from_env()
+        if self.recorder is not None:
+            self.clients = RecordingClients(self.clients, self.recorder)
+
+        # Local pixel detector for the Keep button, consulted before the CUA model
+        self.keep_button_detector = KeepButtonDetector.from_env()
+
+        # Durations of previous waits, used to poll densely around the expected completion time
+        self.poll_history = DurationHistory()
+
+        # Verdicts for screens already classified, shared by the pip and Keep checks and across runs
+        self.verdict_cache = VerdictCache.from_env()
+
+        # Pastes the pip command and prompt instead of typing them a character at a time
+        self.text_injector = TextInjector.from_env(keyboard=self.desktop)
+
+        # Validates model answers and counts failures by class and re-asks
+        self.decode_stats = DecodeStats()
+
+        # Each check's requests across polls, chained on one anchor with CUA_CONVERSATION=chain
+        self.conversations = {}
+
+        # Waits for windows, panes and the chat input to appear instead of fixed sleeps
+        self.readiness = ReadinessProbes.from_env(clock=clock, sleep=sleep)
+
+        # Token and call accounting per job and stage, degrading the loops as caps are reached
+        self.budget = TokenBudget.from_env()
+
+        # Watches the project folder for the files Copilot writes (WORKSPACE_SIGNAL)
+        self.workspace_watcher = None
+
+        # Background capture into a frame ring (CAPTURE_THREAD), started on the first screenshot
+        self.capture_thread = None
+
+        # Warm VS Code windows handed from job to job (VSCODE_POOL), created on first launch
+        self.pool = None
+        self._pooled_window = None
+
+        # One request answering the questions of every waiting monitor (SCREEN_STATE=batched)
+        self._screen_state = None
+
+        self.result = None
+        self._run_started = None
+        self._reset_run_state()
+
+    def _reset_run_state(self):
+        # Change-detection gates: skip the CUA call when the region of interest is unchanged
+        self.pip_frame_gate = FrameChangeGate(
+            "pip", region=self.config.pip_capture_settings.region
+        )
+        self.keep_frame_gate = FrameChangeGate(
+            "keep", region=self.config.keep_capture_settings.region
+        )
+        self.result = SessionResult(self.config.project_folder)
+        # Stages reached by this job, persisted so a retry can skip what is done
+        self.checkpoint = JobCheckpoint.from_env(
+            self.config.project_folder, self.config.developer_prompt, mode=self.config.checkpoint_mode
+        )
+        self.readiness.results = []
+        self.budget.start_job()
+        if self.workspace_watcher is not None:
+            self.workspace_watcher.stop()
+        self.workspace_watcher = None
+
+    def _mark_first_action(self):
+        if self.result.startup_to_first_action is None and self._run_started is not None:
+            self.result.startup_to_first_action = time.monotonic() - self._run_started
+
+    @property
+    def screen(self):
+        """
+        Where screenshots come from: the background capture thread when CAPTURE_THREAD=on
+        and it could be started, otherwise the desktop (pyautogui).
+        """
+        if not self.config.capture_thread:
+            return self.desktop
+        if self.capture_thread is None:
+            try:
+                self.capture_thread = CaptureThread.from_env(screenshot=self.desktop.screenshot).start()
+            except Exception as e:
+                print(f"⚠️ Could not start the capture thread ({e}), capturing on demand")
+                self.config.capture_thread = False
+                return self.desktop
+        return self.capture_thread
+
+    def _stop_capture_thread(self):
+        if self.capture_thread is not None:
+            self.capture_thread.stop()
+            self.result.capture = self.capture_thread.metrics()
+            print(f"🎥 Capture thread - {self.capture_thread.summary()}")
+            self.capture_thread = None
+
+    def _take_screenshot(self, screenshot_counter):
+        screenshot = take_screenshot(screenshot_counter, self.screen)
+        if screenshot is not None and self.recorder is not None:
+            self.recorder.record_frame(screenshot)
+        return screenshot
+
+    def _cached_verdict(self, prompt_key, screenshot, settings):
+        """Return (cached verdict or None, cache key or None) for a frame."""
+        if self.verdict_cache is None:
+            return None, None
+        key = self.verdict_cache.key(prompt_key, screenshot, settings.region)
+        return self.verdict_cache.get(key), key
+
+    def _cache_verdict(self, key, verdict, latency):
+        if key is not None:
+            self.verdict_cache.put(key, verdict, latency)
+
+    @property
+    def screen_state(self):
+        """The batched screen-state broker, or None unless SCREEN_STATE=batched."""
+        if self.config.screen_state_mode != "batched":
+            return None
+        if self._screen_state is None:
+            self._screen_state = ScreenStateBroker(
+                self.clients.client,
+                self.config.cua_model_name,
+                CaptureSettings(
+                    max_width=self.config.keep_capture_settings.max_width,
+                    image_format=self.config.keep_capture_settings.image_format,
+                    quality=self.config.keep_capture_settings.quality,
+                ),
+                structured_output=self.config.structured_output,
+                budget=self.budget,
+                decode_stats=self.decode_stats,
+            )
+        return self._screen_state
+
+    def _watch_screen_state(self, name, fields):
+        """
+        Register a monitor's fields on the batched query.
+
+        Each request then answers all of them about one frame: whether the wait
+        is over and what else the same crop shows, such as an error that ends it
+        early. Only fields inside the monitor's own region (or tied to no region)
+        are registered, so the crop does not widen.
+
+        Args:
+            name (str): Monitor name, e.g. "keep"
+            fields (list): Screen-state fields its decision reads
+
+        Returns:
+            list: The waiters, to pass to _unwatch_screen_state when the monitor finishes
+        """
+        if self.screen_state is None:
+            return []
+        return [self.screen_state.watch(name, fields, None)]
+
+    def _unwatch_screen_state(self, waiters):
+        for waiter in waiters:
+            self.screen_state.unwatch(waiter)
+        if waiters:
+            print(f"📊 Screen state - {self.screen_state.summary()}")
+
+    def _screen_state_verdict(self, screenshot, decide, cache_key):
+        """
+        Ask the batched screen-state query and map its answers to a verdict.
+
+        Args:
+            screenshot (PIL.Image.Image): Full screenshot
+            decide (callable): decide(state dict) -> verdict, or None if the answers
+                needed for one are missing
+            cache_key (str): Verdict cache key for the frame, or None
+
+        Returns:
+            str: The verdict, or None if the model did not answer what it needs
+        """
+        try:
+            request_start = self.clock()
+            state = self.screen_state.query(screenshot)
+        except Exception as e:
+            print(f"⚠️ Error calling CUA model: {e}")
+            return None
+
+        verdict = decide(state or {})
+        if verdict is None:
+            print(f"⚠️ Screen state without a usable answer: {state}")
+            return None
+        self._cache_verdict(cache_key, verdict, self.clock() - request_start)
+        return verdict
+
+    @staticmethod
+    def _pip_state_verdict(state):
+        """Pip wait verdict from terminal_idle and error_visible."""
+        if state.get("terminal_idle") is None:
+            return None
+        if not state["terminal_idle"]:
+            return "in_progress"
+        if state.get("error_visible"):
+            print("⚠️ An error is visible in the terminal, pip install likely finished with errors")
+        return "complete"
+
+    @staticmethod
+    def _keep_state_verdict(state):
+        """
+        Keep wait verdict from keep_enabled, copilot_streaming and error_visible.
+
+        A disabled button while Copilot has stopped streaming and shows an error
+        is "failed": the button will not turn enabled, so the wait ends early.
+        """
+        if state.get("keep_enabled") is None:
+            return None
+        if state["keep_enabled"]:
+            return "enabled"
+        if state.get("error_visible") and state.get("copilot_streaming") is False:
+            return "failed"
+        return "disabled"
+
+    def _conversation(self, check, prompt, chain=True):
+        """
+        The CheckConversation carrying a check's requests, created on first use.
+
+        Args:
+            check (str): Check name, e.g. "keep"
+            prompt (str): The check's full prompt
+            chain (bool): Follow CUA_CONVERSATION; False always sends the full prompt
+
+        Returns:
+            CheckConversation: The check's conversation
+        """
+        mode = self.config.conversation_mode if chain else "stateless"
+        conversation = self.conversations.get(check)
+        if conversation is None or conversation.prompt != prompt or conversation.mode != mode:
+            conversation = self.conversations[check] = CheckConversation(
+                check, prompt, mode, clock=self.clock
+            )
+        return conversation
+
+    def _call_model(self, check, prompt, frame, schema=None, chain=True):
+        """Send one frame to the CUA model inside a model_call span with token usage."""
+        from openai import BadRequestError
+
+        text_format = schema.text_format() if schema and self.config.structured_output else None
+        conversation = self._conversation(check, prompt, chain)
+        # Streamed answers are not recorded for replay, so streaming is skipped while recording
+        stream_field = (
+            schema.field if schema and self.config.stream_verdicts and self.recorder is None else None
+        )
+        with span("model_call", check=check, bytes=frame.payload_bytes) as current:
+            request_start = self.clock()
+            try:
+                response = conversation.create(
+                    self.clients.client,
+                    self.config.cua_model_name,
+                    frame,
+                    text_format,
+                    stream_field=stream_field,
+                    record=self.budget.record,
+                )
+            except BadRequestError as e:
+                if text_format is None:
+                    raise
+                print(f"⚠️ Structured output rejected ({e}), falling back to prompt-only JSON")
+                self.config.structured_output = False
+                response = conversation.create(
+                    self.clients.client,
+                    self.config.cua_model_name,
+                    frame,
+                    stream_field=stream_field,
+                    record=self.budget.record,
+                )
+            current.set_attribute("seconds_to_verdict", round(self.clock() - request_start, 3))
+            record_usage(current, response)
+        return response
+
+    def _ask_model(self, check, prompt, schema, screenshot, frame, settings):
+        """
+        Classify a frame and validate the answer, re-asking at once if it is malformed.
+
+        A malformed answer would otherwise cost a whole polling interval. The
+        re-ask uses a short prompt and a smaller JPEG of the same screenshot.
+
+        Args:
+            check (str): Check name for spans and logs, e.g. "keep"
+            prompt (str): Full prompt for the first request
+            schema (VerdictSchema): Expected field and values
+            screenshot (PIL.Image.Image): Full screenshot, re-encoded for a re-ask
+            frame (EncodedFrame): Encoded frame for the first request
+            settings (CaptureSettings): The check's capture settings
+
+        Returns:
+            DecodedVerdict: Verdict or failure class of the last answer
+        """
+        response = self._call_model(check, prompt, frame, schema)
+        with span("parse", check=check):
+            decoded = decode_verdict(response, schema)
+
+        for _ in range(self.config.max_reasks):
+            if not decoded.reaskable or not self.budget.allow_call():
+                break
+            print(f"⚠️ Malformed {check} answer ({decoded.failure}): {decoded.text!r}, re-asking now")
+            self.decode_stats.record_failure(decoded.failure)
+            cheaper_frame = encode_screenshot(screenshot, reask_settings(settings))
+            if cheaper_frame is None:
+                break
+            response = self._call_model(
+                f"{check}_reask", schema.reask_prompt(), cheaper_frame, schema, chain=False
+            )
+            with span("parse", check=check):
+                decoded = decode_verdict(response, schema, reasked=True)
+
+        self.decode_stats.record(decoded)
+        return decoded
+
+    def _timed(self, stage, function, *args):
+        self.budget.stage = stage
+        with span(stage) as current:
+            try:
+                value = function(*args)
+            finally:
+                self.result.stage_seconds[stage] = (
+                    tracer.clock() - current.start_ns
+                ) / 1e9
+            self.checkpoint.complete(stage, self.result.stage_seconds[stage])
+            return value
+
+    def _run_stage(self, stage, function, resumable):
+        """Run a stage under _timed unless the checkpoint says it can be skipped."""
+        if stage in resumable:
+            self.checkpoint.skip(stage, resumable[stage])
+            return None
+        return self._timed(stage, function)
+
+    def _project_window_open(self):
+        """Whether a VS Code window showing the project is open; False when windows cannot be listed."""
+        try:
+            return any(
+                self.config.project_name in window.title.lower()
+                for window in self.readiness.list_windows()
+            )
+        except ImportError:
+            return False
+
+    def _install_pending(self):
+        """Whether install_requirements will run pip, which may type into the focused window."""
+        requirements_path = os.path.join(self.config.project_folder, "requirements.txt")
+        try:
+            with open(requirements_path, "r") as f:
+                requirements = f.read().strip()
+        except OSError:
+            return False
+        return bool(requirements) and not self.checkpoint.installed(
+            text_digest(requirements), self.config.pip_executable
+        )
+
+    def launch(self, vscode_path=None):
+        """
+        Step 1: Launch VS Code with the project folder and maximize its window.
+
+        Args:
+            vscode_path (str): VS Code executable; discovered automatically when None
+
+        Raises:
+            AutomationError: If VS Code cannot be found or launched
+        """
+        project_folder = self.config.project_folder
+        print(f"Project folder path: {project_folder}")
+
+        if vscode_path is None:
+            install = VSCodeDiscovery().find()
+            vscode_path = install.path if install is not None else None
+            print(f"DEBUG: Found {install.describe() if install else 'no VS Code'}")
+
+        if not vscode_path:
+            print(
+                "VS Code not found. Please ensure VS Code is installed and try one of these solutions:"
+            )
+            print(
+                "1. Add VS Code to PATH by opening VS Code, pressing Ctrl+Shift+P, and running 'Shell Command: Install code command in PATH'"
+            )
+            print("2. Or set VSCODE_PATH to the VS Code executable or portable install folder")
+
+            # Let's also check what's actually installed
+            print("\nDEBUG: Checked these VS Code locations:")
+            for path, edition, kind in VSCodeDiscovery().candidates():
+                print(f"  {path} ({edition}, {kind}): {'EXISTS' if os.path.exists(path) else 'NOT FOUND'}")
+
+            raise AutomationError("VS Code executable not found")
+
+        print(f"DEBUG: Checking if path exists: {os.path.exists(vscode_path)}")
+        self._mark_first_action()
+
+        if self.pool is None and self.config.pool_size > 0:
+            self.pool = VSCodePool(
+                CodeCliLauncher(vscode_path),
+                size=self.config.pool_size,
+                recycle_after=self.config.pool_recycle_after,
+                prepare=self._prepare_pooled_window,
+                reset=self._reset_pooled_window,
+                ready=self._wait_for_pooled_launch,
+                sleep=self.sleep,
+            )
+        if self.pool is not None:
+            baseline = self._readiness_baseline()
+            window, warm = self.pool.acquire(project_folder)
+            if window is not None:
+                self._pooled_window = window
+                self.result.warm_start = warm
+                if warm:
+                    # Already running and maximized; only the folder reloads
+                    self._wait_for_window(
+                        "VS Code folder switch", baseline, timeout=15, fixed_sleep=2, unchanged_after=2
+                    )
+                # A cold pooled window was already waited for and prepared by the pool
+                return
+
+        self.result.warm_start = False
+        baseline = self._readiness_baseline()
+        command = [vscode_path, project_folder]
+        if self.config.user_data_dir:
+            # A separate instance; otherwise the folder may open in one already running
+            command = [vscode_path, "--user-data-dir", self.config.user_data_dir, project_folder]
+        try:
+            # Launch VS Code with the specific project folder
+            subprocess.Popen(command)
+            print(f"Launching VS Code with folder: {project_folder}")
+        except FileNotFoundError as e:
+            print(f"Error launching VS Code: {e}")
+            # Try using shell=True for .cmd files
+            if not vscode_path.endswith(".cmd"):
+                raise AutomationError(f"Could not launch VS Code at {vscode_path}") from e
+            print("Trying alternative method...")
+            subprocess.Popen(command, shell=True)
+
+        self._wait_for_window("VS Code window", baseline, timeout=30, fixed_sleep=5)
+        self.maximize_window()
+
+    def _capture(self):
+        try:
+            return self.screen.screenshot()
+        except Exception as e:
+            print(f"Error taking screenshot: {e}")
+            return None
+
+    def _readiness_baseline(self):
+        """Screenshot to compare against after an action, or None when probes are off."""
+        return self._capture() if self.readiness.enabled else None
+
+    def _wait_for_window(self, name, baseline, timeout, fixed_sleep, unchanged_after=None):
+        """
+        Wait for the project's VS Code window to show, by its title when windows can
+        be listed and otherwise until the whole screen has changed and settled.
+        """
+        try:
+            self.readiness.window_title(name, self.config.project_name, timeout, fixed_sleep)
+        except ImportError:
+            self.readiness.settle(
+                name, self._capture, baseline, None, timeout, fixed_sleep,
+                quiet=1.0, unchanged_after=unchanged_after, require=has_ink(),
+            )
+
+    def _wait_for_pooled_launch(self, window):
+        """Wait until a launched pooled window has written code.lock and shows its folder."""
+        title = os.path.basename(os.path.normpath(window.folder)).lower()
+
+        def check():
+            # code.lock names the new instance's main process once it is up
+            if self.pool.launcher.is_alive(window) is not True:
+                return False
+            try:
+                return any(title in w.title.lower() for w in self.readiness.list_windows())
+            except ImportError:
+                return True
+
+        self.readiness.wait("pooled VS Code window", check, timeout=60, fixed_sleep=self.pool.launch_wait)
+
+    def maximize_window(self):
+        """Maximize the project's VS Code window to fullscreen."""
+        with span("maximize"):
+            self._maximize_window()
+
+    def _maximize_window(self):
+        print("Maximizing VS Code window to fullscreen...")
+        try:
+            # Method 1: Use pygetwindow to find and maximize the VS Code window
+            try:
+                # Find VS Code windows
+                vscode_windows = self.readiness.list_windows()
+                target_window = None
+
+                # Find the window with our project
+                for window in vscode_windows:
+                    if self.config.project_name in window.title.lower():
+                        target_window = window
+                        break
+
+                if not target_window and vscode_windows:
+                    # Use the most recent VS Code window
+                    target_window = vscode_windows[-1]
+
+                if target_window:
+                    print(f"Found VS Code window: {target_window.title}")
+                    # Activate the window first
+                    target_window.activate()
+                    self.readiness.wait(
+                        "window focus",
+                        lambda: getattr(target_window, "isActive", True),
+                        timeout=2,
+                        fixed_sleep=1,
+                    )
+                    # Maximize the window
+                    target_window.maximize()
+                    print("VS Code window maximized to fullscreen")
+                    self.readiness.wait(
+                        "window maximize",
+                        lambda: getattr(target_window, "isMaximized", True),
+                        timeout=2,
+                        fixed_sleep=1,
+                    )
+                else:
+                    print("Could not find VS Code window, trying keyboard shortcut method")
+                    raise Exception("Window not found")
+
+            except ImportError:
+                print("pygetwindow not available, using keyboard shortcut method")
+                raise Exception("pygetwindow not available")
+
+        except:
+            # Fallback method: Use keyboard shortcuts
+            try:
+                print("Using keyboard shortcut to maximize window...")
+                # First ensure VS Code window is focused
+                self.desktop.hotkey("alt", "tab")
+                self.sleep(0.5)
+
+                # Use Windows key + Up arrow to maximize window
+                self.desktop.hotkey("win", "up")
+                self.sleep(1)
+                print("VS Code window maximized using keyboard shortcut")
+
+            except Exception as e:
+                print(f"Could not maximize window: {e}")
+                print("Continuing with current window size...")
+
+    def _prepare_pooled_window(self, window):
+        """
+        Maximize a freshly launched pooled window and open its Copilot panel.
+
+        The terminal is left to the job, which opens it in the project folder;
+        _reset_pooled_window closes it again, so every job starts with none.
+        """
+        self.maximize_window()
+        self.open_copilot()
+
+    def _reset_pooled_window(self, window):
+        """Leave a pooled window clean for the next job."""
+        # Focus the job's terminal (Ctrl+`) and exit its shell, which closes it;
+        # the next job's Ctrl+Shift+` would otherwise open a second one next to it
+        self.desktop.hotkey("ctrl", "`")
+        self.sleep(0.5)
+        self.desktop.write("exit", interval=0)
+        self.desktop.press("enter")
+        # Save All (Ctrl+K S), then Close All Editors (Ctrl+K Ctrl+W)
+        self.desktop.hotkey("ctrl", "k")
+        self.desktop.press("s")
+        self.desktop.hotkey("ctrl", "k")
+        self.desktop.hotkey("ctrl", "w")
+        # Start a new Copilot chat so the next prompt has no history
+        self.desktop.hotkey("ctrl", "alt", "i")
+        self.desktop.hotkey("ctrl", "l")
+
+    def open_terminal(self):
+        """Step 2: Open PowerShell terminal (Ctrl+Shift+`)."""
+        baseline = self._readiness_baseline()
+        self.desktop.hotkey("ctrl", "shift", "`")
+        print("Opened PowerShell terminal")
+        # wait for the terminal pane to open and print its prompt
+        self.readiness.settle(
+            "terminal", self._capture, baseline, TERMINAL_REGION,
+            timeout=10, fixed_sleep=2, require=has_ink(),
+        )
+
+    def install_requirements(self):
+        """
+        Step 2.5: Install packages from the project's requirements.txt.
+
+        Completion is detected from pip itself when possible; the CUA screenshot
+        monitor is the fallback.
+
+        Returns:
+            PipInstallResult: pip's exit code and timings, or None if there was nothing
+            to install or completion was detected from screenshots
+        """
+        print("Installing packages from requirements.txt...")
+        project_folder = self.config.project_folder
+        project_requirements_path = os.path.join(project_folder, "requirements.txt")
+        if not os.path.exists(project_requirements_path):
+            print(
+                f"requirements.txt not found at {project_requirements_path}, skipping package installation"
+            )
+            return None
+
+        with open(project_requirements_path, "r") as f:
+            requirements = f.read().strip()
+        if not requirements:
+            print("requirements.txt is empty, skipping package installation")
+            return None
+
+        requirements_sha = text_digest(requirements)
+        if self.checkpoint.installed(requirements_sha, self.config.pip_executable):
+            self.checkpoint.skip(
+                "install_requirements",
+                "requirements.txt is unchanged since the last successful install",
+                seconds=self.checkpoint.install["seconds"],
+            )
+            return None
+        install_started = self.clock()
+
+        # Detect completion directly from pip when possible; screenshots are the fallback
+        pip_install_mode = self.config.pip_install_mode
+        install_result = None
+
+        if pip_install_mode == "subprocess":
+            print("Running pip install as a managed subprocess...")
+            install_result = run_pip_subprocess(
+                project_folder,
+                self.config.pip_executable,
+                timeout=self.config.install_timeout,
+                on_line=print,
+            )
+
+        if install_result is None:
+            if pip_install_mode == "terminal-log":
+                # pip writes a timestamped log and the exit code lands in a marker file
+                pip_log_dir = tempfile.mkdtemp(prefix="cua-pip-")
+                pip_log_path = os.path.join(pip_log_dir, "pip.log")
+                pip_exit_code_path = os.path.join(pip_log_dir, "exit_code.txt")
+                pip_command = terminal_log_command(pip_log_path, pip_exit_code_path)
+            else:
+                # Type the pip install command (PowerShell compatible)
+                pip_command = f"pip install -r requirements.txt"
+            injection = self.text_injector.inject(
+                pip_command, verify="diff", region=self.config.pip_capture_settings.region
+            )
+            print(f"⌨️ pip command {injection.report()}")
+            self.desktop.press("enter")
+            print(f"Executed: {pip_command}")
+
+            if pip_install_mode == "terminal-log":
+                print("Tailing pip log to detect installation completion...")
+                install_result = wait_for_terminal_log(
+                    pip_log_path,
+                    pip_exit_code_path,
+                    timeout=max(0.0, self.config.install_timeout - (self.clock() - install_started)),
+                )
+
+        # Count the number of packages for reference
+        package_count = len(
+            [
+                line
+                for line in requirements.split("\n")
+                if line.strip() and not line.strip().startswith("#")
+            ]
+        )
+        print(f"Installing {package_count} packages...")
+
+        if install_result is not None:
+            print(f"📦 {install_result.report()}")
+            if not install_result.succeeded:
+                print("⚠️ pip install finished with errors, continuing anyway")
+            self.result.install_result = install_result
+            if install_result.succeeded:
+                self.checkpoint.record_install(
+                    requirements_sha, self.config.pip_executable, install_result.duration
+                )
+            return install_result
+
+        # Use CUA model to intelligently detect installation completion
+        print("Monitoring package installation using CUA model...")
+        # Whatever the log tail already waited counts against the same install timeout
+        remaining = max(0.0, self.config.install_timeout - (self.clock() - install_started))
+        # An idle terminal says nothing about pip's exit code, so this install is not checkpointed
+        self._monitor_installation_with_screenshots(remaining)
+        return None
+
+    def _monitor_installation_with_screenshots(self, timeout=None):
+        installation_complete = False
+        screenshot_counter = 1
+        max_wait_time = self.config.install_timeout if timeout is None else timeout
+
+        # Poll densely around the install duration learned from previous runs
+        pip_scheduler = PollScheduler(
+            "pip_install",
+            timeout=max_wait_time,
+            min_interval=2,
+            max_interval=10,
+            history=self.poll_history,
+            pace=lambda: self.budget.poll_slowdown,
+            clock=self.clock,
+            sleep=self.sleep,
+        ).start()
+        screen_state_waiters = self._watch_screen_state("pip", ["terminal_idle", "error_visible"])
+
+        while not installation_complete and pip_scheduler.wait():
+            print(
+                f"📸 Taking screenshot {screenshot_counter} to check installation status..."
+            )
+
+            # Take screenshot and encode it only if the terminal changed
+            screenshot = self._take_screenshot(screenshot_counter)
+            encoded_frame = None
+            status = None
+            cache_key = None
+            if screenshot is not None:
+                if self.pip_frame_gate.should_send(screenshot):
+                    status, cache_key = self._cached_verdict(
+                        PIP_PROMPT_ID, screenshot, self.config.pip_capture_settings
+                    )
+                    if status is not None:
+                        print(f"💾 Terminal seen before, cached verdict: {status} (no model call)")
+                    elif not self.budget.allow_call():
+                        # There is no local check for the terminal; treat it like the timeout
+                        print("💸 Model budget used up, no longer monitoring the installation")
+                        break
+                    elif self.screen_state is not None:
+                        status = self._screen_state_verdict(
+                            screenshot, self._pip_state_verdict, cache_key
+                        )
+                    else:
+                        pip_settings = self.budget.capture_settings(
+                            self.config.pip_capture_settings
+                        )
+                        encoded_frame = encode_screenshot(screenshot, pip_settings)
+                else:
+                    print(
+                        f"🟰 Terminal unchanged since last check, reusing verdict: {self.pip_frame_gate.last_verdict}"
+                    )
+
+            if encoded_frame is not None:
+                try:
+                    print(f"🔍 Analyzing screenshot with CUA model...")
+
+                    # Create request to Computer Use Agent model
+                    request_start = self.clock()
+                    decoded = self._ask_model(
+                        "pip",
+                        INSTALLATION_PROMPT,
+                        PIP_SCHEMA,
+                        screenshot,
+                        encoded_frame,
+                        pip_settings,
+                    )
+                    print(f"🔍 CUA response - pip installation of packages is: {decoded.text}")
+
+                    status = decoded.verdict
+                    if status is not None:
+                        self._cache_verdict(
+                            cache_key, status, self.clock() - request_start
+                        )
+                    else:
+                        print(f"⚠️ Unusable answer ({decoded.failure}), checking again at the next poll")
+
+                except Exception as e:
+                    print(f"⚠️ Error calling CUA model: {e}")
+                    print("Continuing with monitoring...")
+            elif screenshot is None:
+                print("⚠️ Failed to capture screenshot, skipping this iteration...")
+
+            # Check installation status (normalize to lowercase for comparison)
+            if status == "complete":
+                print("✅ Package installation detected as COMPLETE!")
+                installation_complete = True
+                pip_scheduler.complete()
+                break
+            elif status == "in_progress":
+                print("⏳ Installation still in progress, continuing to monitor...")
+                self.pip_frame_gate.record_verdict(status)
+
+            # If installation not complete, the scheduler decides when to check next
+            if not installation_complete:
+                print(f"⏸️ Next check in {pip_scheduler.next_delay():.1f} seconds...")
+                screenshot_counter += 1
+
+        self._unwatch_screen_state(screen_state_waiters)
+        print(f"📊 Frame gate - {self.pip_frame_gate.summary()}")
+        if self.verdict_cache is not None:
+            print(f"💾 Verdict cache - {self.verdict_cache.summary()}")
+            self.verdict_cache.save()
+
+        if installation_complete:
+            print("🎉 Package installation completed successfully!")
+        else:
+            print("⏰ Installation monitoring timed out - assuming installation is complete")
+            print(f"Waited for {max_wait_time} seconds")
+
+        # Brief additional wait to ensure terminal is ready
+        print("Waiting 3 seconds for terminal to be ready...")
+        self.sleep(3)
+        return installation_complete
+
+    def open_copilot(self):
+        """Step 3: Open GitHub Copilot panel in Agent mode (Ctrl+Shift+I)."""
+        print("Using CUA model to locate GitHub Copilot chat input area...")
+        baseline = self._readiness_baseline()
+        self.desktop.hotkey("ctrl", "alt", "i")
+        # Wait for panel to open with its input focused; an already open panel only moves focus
+        self.readiness.settle(
+            "Copilot chat panel", self._capture, baseline, COPILOT_CHAT_REGION,
+            timeout=10, fixed_sleep=3, unchanged_after=3,
+            require=has_color(self.readiness.focus_color),
+        )
+
+        # First, open the Copilot panel to ensure it's visible
+        print("opening the Agent mode in the Copilot chat panel with Ctrl+Shift+I")
+        baseline = self._readiness_baseline()
+        self.desktop.hotkey("ctrl", "shift", "i")
+
+        # Wait for the Agent mode chat input
+        self.readiness.settle(
+            "Copilot agent input", self._capture, baseline, COPILOT_CHAT_REGION,
+            timeout=10, fixed_sleep=3, unchanged_after=3,
+            require=has_color(self.readiness.focus_color),
+        )
+
+    def send_prompt(self, developer_prompt=None):
+        """
+        Step 4: Pass developer prompt to Copilot.
+
+        Args:
+            developer_prompt (str): Prompt to send; the configured prompt when None
+        """
+        injection = self.text_injector.inject(
+            developer_prompt or self.config.developer_prompt, verify="readback"
+        )
+        print(f"⌨️ Prompt {injection.report()}")
+        if self.config.workspace_signal != "off" and os.path.isdir(self.config.project_folder):
+            # Baseline the workspace before Copilot can write to it
+            self.workspace_watcher = WorkspaceWatcher(
+                self.config.project_folder, quiet=self.config.workspace_quiet, clock=self.clock
+            ).start()
+        self.desktop.press("enter")
+        print("Prompt sent to Copilot")
+        if self._run_started is not None:
+            self.result.time_to_first_prompt = time.monotonic() - self._run_started
+
+    def _wait_for_workspace(self, scheduler):
+        """
+        Hold off screenshots and model calls until the files Copilot writes have settled.
+
+        Args:
+            scheduler (PollScheduler): The Keep-button scheduler, whose deadline also applies
+
+        Returns:
+            bool: True if the edits settled; False without a watcher, when no file changed
+                within workspace_fallback seconds, or on timeout
+        """
+        watcher = self.workspace_watcher
+        if watcher is None:
+            return False
+
+        print(f"📂 Waiting for generated files to go quiet for {watcher.quiet}s...")
+        while not scheduler.expired:
+            if watcher.check():
+                print(
+                    f"📂 Workspace quiet since {watcher.last_change_at - watcher.started_at:.1f}s "
+                    "after the prompt, checking the Keep button now"
+                )
+                scheduler.expedite()
+                return True
+            if watcher.idle_seconds >= self.config.workspace_fallback:
+                print(
+                    f"📂 No files changed within {self.config.workspace_fallback}s, "
+                    "falling back to screenshot monitoring"
+                )
+                return False
+            self.sleep(min(watcher.poll_interval, scheduler.remaining))
+        return False
+
+    def _finish_workspace_watch(self):
+        watcher = self.workspace_watcher
+        if watcher is None:
+            return
+        watcher.stop()
+        changes = watcher.manifest()
+        print(f"📂 Generated files - {watcher.summary(changes)}")
+        for change in changes:
+            print(f"   {change.status:<8} {change.path} (+{change.lines_added}/-{change.lines_removed})")
+        self.result.workspace = watcher.metrics(changes)
+        self.checkpoint.record_files(changes)
+        if self.config.workspace_manifest:
+            watcher.write_manifest(self.config.workspace_manifest, changes)
+            print(f"📝 Diff manifest written to {self.config.workspace_manifest}")
+
+    def await_completion(self):
+        """
+        Step 5: Take screenshots and monitor for completion, then accept the code.
+
+        Returns:
+            bool: True if the Keep button was detected as enabled and accepted
+        """
+        print("Starting screenshot capture and monitoring for code generation completion...")
+
+        max_wait_time = self.config.generation_timeout
+        elapsed_time = 0
+        keep_button_found = False
+        screenshot_counter = 1
+        next_progress_report = 15
+
+        # Poll densely around the generation time learned from previous runs
+        keep_scheduler = PollScheduler(
+            "copilot_generation",
+            timeout=max_wait_time,
+            min_interval=1,
+            max_interval=8,
+            history=self.poll_history,
+            pace=lambda: self.budget.poll_slowdown,
+            clock=self.clock,
+            sleep=self.sleep,
+        ).start()
+
+        # Generated files that have stopped changing mean Copilot is done; the model only confirms
+        if self._wait_for_workspace(keep_scheduler) and self.config.workspace_signal == "primary":
+            print("📂 Accepting on the workspace signal alone (WORKSPACE_SIGNAL=primary)")
+            keep_scheduler.mark_poll()
+            accept_generated_code(self.desktop)
+            keep_button_found = True
+            keep_scheduler.complete()
+            elapsed_time = keep_scheduler.elapsed
+
+        if not keep_button_found and self.config.monitor_mode == "async":
+            # Pipelined monitor: capture the next frame while earlier ones are being classified
+            print("Monitoring the Keep button with the pipelined async monitor...")
+            # Imported here so serial runs never load asyncio
+            import asyncio
+
+            from async_monitor import AsyncScreenMonitor
+
+            keep_monitor = AsyncScreenMonitor(
+                self.clients.async_client,
+                self.config.cua_model_name,
+                KEEP_BUTTON_PROMPT,
+                KEEP_SCHEMA,
+                ("enabled",),
+                capture=self._take_screenshot,
+                encode=lambda screenshot: encode_screenshot(
+                    screenshot, self.budget.capture_settings(self.config.keep_capture_settings)
+                ),
+                interval=self.config.monitor_interval,
+                max_in_flight=self.config.monitor_max_in_flight,
+                timeout=keep_scheduler.remaining,
+                gate=self.keep_frame_gate,
+                local_detector=self.keep_button_detector,
+                structured_output=self.config.structured_output,
+                reask_encode=(
+                    (
+                        lambda screenshot: encode_screenshot(
+                            screenshot,
+                            reask_settings(
+                                self.budget.capture_settings(self.config.keep_capture_settings)
+                            ),
+                        )
+                    )
+                    if self.config.max_reasks
+                    else None
+                ),
+                decode_stats=self.decode_stats,
+                budget=self.budget,
+                cache=self.verdict_cache,
+                cache_key=lambda screenshot: self.verdict_cache.key(
+                    KEEP_PROMPT_ID, screenshot, self.config.keep_capture_settings.region
+                ),
+                conversation=self._conversation("keep", KEEP_BUTTON_PROMPT),
+                label="keep",
+            )
+            keep_result = asyncio.run(keep_monitor.run())
+            print(f"📊 Async monitor - {keep_result.summary()}")
+
+            # The serial loop below is skipped: either the button was found or the time is used up
+            elapsed_time = keep_result.elapsed
+            screenshot_counter = keep_result.frames_captured + 1
+            if keep_result.verdict == "enabled":
+                accept_generated_code(self.desktop)
+                keep_button_found = True
+
+        screen_state_waiters = []
+        if not keep_button_found:
+            screen_state_waiters = self._watch_screen_state(
+                "keep", ["keep_enabled", "copilot_streaming", "error_visible"]
+            )
+
+        while not keep_button_found and keep_scheduler.wait():
+            elapsed_time = keep_scheduler.elapsed
+
+            # Take screenshot directly in memory and encode it for the CUA model
+            try:
+                # Take screenshot and encode it only if the Copilot panel changed
+                screenshot = self._take_screenshot(screenshot_counter)
+                encoded_frame = None
+                local_status = None
+                cache_key = None
+                if screenshot is not None:
+                    local_status = self.keep_button_detector.detect(screenshot)
+                    if local_status is not None:
+                        print(
+                            f"🧮 Local detector: Keep button is {local_status} (no model call)"
+                        )
+                    elif self.keep_frame_gate.should_send(screenshot):
+                        local_status, cache_key = self._cached_verdict(
+                            KEEP_PROMPT_ID, screenshot, self.config.keep_capture_settings
+                        )
+                        if local_status is not None:
+                            print(
+                                f"💾 Copilot panel seen before, cached verdict: {local_status} (no model call)"
+                            )
+                            if local_status != "enabled":
+                                self.keep_frame_gate.record_verdict(local_status)
+                        elif not self.budget.allow_call():
+                            print("💸 Model budget used up, relying on local detection only")
+                        elif self.screen_state is not None:
+                            local_status = self._screen_state_verdict(
+                                screenshot, self._keep_state_verdict, cache_key
+                            )
+                            if local_status == "disabled":
+                                print("⏳ Keep button is still disabled, continuing to monitor...")
+                                self.keep_frame_gate.record_verdict(local_status)
+                        else:
+                            keep_settings = self.budget.capture_settings(
+                                self.config.keep_capture_settings
+                            )
+                            encoded_frame = encode_screenshot(screenshot, keep_settings)
+                    else:
+                        print(
+                            f"🟰 Copilot panel unchanged since last check, reusing verdict: {self.keep_frame_gate.last_verdict}"
+                        )
+
+                if local_status == "enabled":
+                    accept_generated_code(self.desktop)
+                    keep_button_found = True
+                    keep_scheduler.complete()
+                    break
+                elif local_status == "failed":
+                    print("❌ Copilot stopped with an error and the Keep button disabled, ending the wait")
+                    break
+                elif encoded_frame is not None:
+                    # Use Azure OpenAI Computer Use Agent to check if Keep button is enabled
+                    try:
+                        # Debug: Print what we're sending to the model
+                        print(f"🔍 Debug - Sending screenshot to Computer Use Agent model...")
+
+                        # Create initial request to Computer Use Agent model
+                        request_start = self.clock()
+                        decoded = self._ask_model(
+                            "keep",
+                            KEEP_BUTTON_PROMPT,
+                            KEEP_SCHEMA,
+                            screenshot,
+                            encoded_frame,
+                            keep_settings,
+                        )
+                        request_seconds = self.clock() - request_start
+                        print(f"🔍 Parsed response: {decoded.text}")
+
+                        # Check if button is enabled
+                        button_status = decoded.verdict
+                        if button_status is not None:
+                            self._cache_verdict(cache_key, button_status, request_seconds)
+
+                        if button_status == "enabled":
+                            accept_generated_code(self.desktop)
+                            keep_button_found = True
+                            keep_scheduler.complete()
+                            break
+
+                        elif button_status == "disabled":
+                            print(
+                                "⏳ Keep button is still disabled, continuing to monitor..."
+                            )
+                            self.keep_frame_gate.record_verdict(button_status)
+
+                        else:
+                            print(
+                                f"⚠️ Unusable model response ({decoded.failure}), continuing to loop through and wait for the 'Keep' button..."
+                            )
+                            print(f"Raw response: {decoded.text}")
+                    except Exception as e:
+                        print(f"⚠️ Error processing model response: {e}")
+                elif screenshot is None:
+                    print("⚠️ Failed to capture screenshot, skipping this iteration...")
+
+                # If keep button still not found, the scheduler decides when to check next
+                if not keep_button_found:
+                    print(
+                        f"⏸️ Keep button not enabled yet, next check in {keep_scheduler.next_delay():.1f} seconds..."
+                    )
+
+                screenshot_counter += 1
+            except Exception as e:
+                print(f"Error during monitoring: {e}")
+
+            # Progress update every 15 seconds
+            if elapsed_time >= next_progress_report:
+                next_progress_report += 15
+                print(
+                    f"Still monitoring... ({elapsed_time:.0f}s elapsed, {screenshot_counter-1} screenshots taken)"
+                )
+
+        self._unwatch_screen_state(screen_state_waiters)
+        self._finish_workspace_watch()
+
+        # Final status report
+        if keep_button_found:
+            print("\n🎉 SUCCESS: GitHub Copilot has finished generating code!")
+            print("✅ The 'Keep' button was detected as enabled and automatically clicked!")
+            print(f"📊 Total monitoring time: {elapsed_time:.1f}s")
+            print(f"📸 Screenshots captured: {screenshot_counter-1}")
+            print("🚀 The generated code should now be accepted in your VS Code editor.")
+        else:
+            print(f"\n⏰ Monitoring completed after {max_wait_time}s")
+            print("❓ Keep button status was not definitively detected as enabled")
+            print(f"📸 Screenshots captured: {screenshot_counter-1}")
+            print("💡 You may need to check the GitHub Copilot Chat panel manually")
+
+        print(f"📸 Total screenshots processed: {screenshot_counter-1}")
+        print(f"📊 Frame gate - {self.keep_frame_gate.summary()}")
+        if self.keep_button_detector.active:
+            print(f"🧮 Keep detector - {self.keep_button_detector.summary()}")
+        if self.verdict_cache is not None:
+            print(f"💾 Verdict cache - {self.verdict_cache.summary()}")
+            self.verdict_cache.save()
+            self.result.verdict_cache = self.verdict_cache.metrics()
+        print(f"🧾 Response decoding - {self.decode_stats.summary()}")
+        self.result.decode = self.decode_stats.metrics()
+
+        self.result.keep_button_found = keep_button_found
+        self.result.monitoring_seconds = elapsed_time
+        self.result.screenshots = screenshot_counter - 1
+        self.result.frames_sent = self.keep_frame_gate.frames_sent
+        self.result.frames_skipped = self.keep_frame_gate.frames_skipped
+        return keep_button_found
+
+    def run(self, vscode_path=None, started_at=None):
+        """
+        Run the full flow: launch, terminal, install, Copilot, prompt, await completion.
+
+        Args:
+            vscode_path (str): VS Code executable; discovered automatically when None
+            started_at (float): time.monotonic() at process start, so startup-to-first-action
+                includes imports and configuration; defaults to now
+
+        Returns:
+            SessionResult: Outcome, per-stage timings and startup-to-first-action time
+
+        Raises:
+            AutomationError: If a stage cannot continue
+        """
+        self._reset_run_state()
+        self._run_started = started_at if started_at is not None else time.monotonic()
+        self.result.trace_id = tracer.start_trace()
+        if self.recorder is not None:
+            self.recorder.start(self.result.trace_id)
+
+        failed = True
+        try:
+            with span("session", project=self.config.project_name):
+                # A retry of an interrupted job skips what is still valid in the open window
+                resumable = {}
+                if self.checkpoint.resuming and self.config.pool_size == 0:
+                    print(f"⏩ Resuming attempt {self.checkpoint.attempt} of this job")
+                    resumable = self.checkpoint.resumable_stages(
+                        self._project_window_open(), install_pending=self._install_pending()
+                    )
+                if "launch" in resumable:
+                    self.checkpoint.skip("launch", resumable["launch"])
+                    self._mark_first_action()
+                    self.maximize_window()
+                else:
+                    self._timed("launch", self.launch, vscode_path)
+                self._run_stage("open_terminal", self.open_terminal, resumable)
+                try:
+                    self._timed("install_requirements", self.install_requirements)
+                except Exception as e:
+                    print(f"Error reading requirements.txt: {e}")
+                self._run_stage("open_copilot", self.open_copilot, resumable)
+                self._run_stage("send_prompt", self.send_prompt, resumable)
+                self._timed("await_completion", self.await_completion)
+            failed = False
+        finally:
+            self.checkpoint.finish(not failed and self.result.keep_button_found)
+            self.result.checkpoint = self.checkpoint.metrics()
+            if self.checkpoint.resuming or self.checkpoint.skipped:
+                print(f"⏩ Checkpoint - {self.checkpoint.summary()}")
+            self.result.readiness = self.readiness.metrics()
+            self.result.budget = self.budget.metrics()
+            print(f"💸 Model spend - {self.budget.summary()}")
+            gateway = getattr(self.clients, "gateway", None)
+            if gateway is not None and gateway.stats.requests:
+                self.result.gateway = gateway.stats.to_dict()
+                print(f"🚥 CUA gateway (this process) - {gateway.stats.summary()}")
+            if self.readiness.results:
+                print(f"🚦 Readiness - {self.readiness.summary()}")
+            token_cache = getattr(self.clients, "token_cache", None)
+            if token_cache is not None:
+                self.result.credential = token_cache.metrics()
+                print(f"🔑 Azure token (this process) - {token_cache.summary()}")
+            conversations = [c for c in self.conversations.values() if c.requests]
+            if conversations:
+                self.result.conversations = {c.name: c.metrics() for c in conversations}
+                for conversation in conversations:
+                    print(f"💬 {conversation.name} check requests - {conversation.summary()}")
+            self._stop_capture_thread()
+            if self._pooled_window is not None:
+                self.pool.release(self._pooled_window, healthy=not failed)
+                self._pooled_window = None
+                print(f"♻️ VS Code pool - {self.pool.summary()}")
+            # Per-stage spans for this run, summarised across runs with trace_report.py
+            trace_path = trace_path_from_env()
+            if trace_path:
+                tracer.export(trace_path)
+            else:
+                tracer.finished = []
+            if self.recorder is not None:
+                print(f"🎞️ Recording - {self.recorder.summary()}")
+
+        # Optional: Move mouse to neutral area
+        self.desktop.moveTo(100, 100)
+        return self.result
@@ -0,0 +1,125 @@
+from PIL import Image, ImageChops
+
+from screen_regions import crop_region
+
+
+class FrameChangeGate:
+    """
+    Change-detection stage between screenshot capture and the CUA model call.
+
+    Each frame is cropped to a region of interest and downsampled to a small RGB
+    thumbnail. The thumbnail is compared with the one from the last frame that was
+    actually sent to the model; if only a handful of thumbnail pixels changed (a
+    blinking cursor, a clock), the previous verdict is reused instead of paying for
+    another model round trip.
+    """
+
+    def __init__(
+        self,
+        name,
+        region=None,
+        downscale=4,
+        pixel_threshold=24,
+        min_changed_pixels=4,
+        max_consecutive_skips=10,
+    ):
+        """
+        Args:
+            name (str): Label used in log lines, e.g. "pip" or "keep"
+            region (tuple): (left, top, right, bottom) screen fractions to compare, or None
+            downscale (int): Factor by which the region is shrunk before comparing
+            pixel_threshold (int): Per-channel difference (0-255) for a pixel to count as changed
+            min_changed_pixels (int): Changed thumbnail pixels needed to treat the frame as new
+            max_consecutive_skips (int): Force a model call after this many skipped frames
+        """
+        self.name = name
+        self.region = region
+        self.downscale = max(1, int(downscale))
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_pixels = min_changed_pixels
+        self.max_consecutive_skips = max_consecutive_skips
+
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.last_verdict = None
+
+        self._reference = None
+        self._pending = None
+        self._consecutive_skips = 0
+
+    def _thumbnail(self, image):
+        cropped = crop_region(image, self.region).convert("RGB")
+        width, height = cropped.size
+        size = (max(1, width // self.downscale), max(1, height // self.downscale))
+        return cropped.resize(size, Image.BOX)
+
+    def changed_pixels(self, thumbnail, reference):
+        """
+        Count thumbnail pixels whose largest per-channel difference exceeds the threshold.
+
+        Args:
+            thumbnail (PIL.Image.Image): Thumbnail of the current frame
+            reference (PIL.Image.Image): Thumbnail of the last frame sent to the model
+
+        Returns:
+            int: Number of changed pixels
+        """
+        if thumbnail.size != reference.size:
+            return thumbnail.size[0] * thumbnail.size[1]
+
+        red, green, blue = ImageChops.difference(thumbnail, reference).split()
+        delta = ImageChops.lighter(ImageChops.lighter(red, green), blue)
+        return sum(delta.histogram()[self.pixel_threshold + 1 :])
+
+    def should_send(self, image):
+        """
+        Decide whether a frame must be sent to the model.
+
+        Args:
+            image (PIL.Image.Image): Full screenshot
+
+        Returns:
+            bool: True if the model should be called, False if last_verdict can be reused
+        """
+        thumbnail = self._thumbnail(image)
+
+        if (
+            self._reference is not None
+            and self.last_verdict is not None
+            and self._consecutive_skips < self.max_consecutive_skips
+            and self.changed_pixels(thumbnail, self._reference) < self.min_changed_pixels
+        ):
+            self.frames_skipped += 1
+            self._consecutive_skips += 1
+            return False
+
+        self._pending = thumbnail
+        self.frames_sent += 1
+        self._consecutive_skips = 0
+        return True
+
+    def record_verdict(self, verdict):
+        """
+        Store the model's verdict for the frame most recently passed by should_send.
+
+        Args:
+            verdict (str): Parsed verdict, e.g. "in_progress" or "disabled"
+        """
+        self._reference = self._pending
+        self.last_verdict = verdict
+
+    def reset(self):
+        """Forget the reference frame and verdict, e.g. after the screen was acted on."""
+        self._reference = None
+        self._pending = None
+        self.last_verdict = None
+        self._consecutive_skips = 0
+
+    def summary(self):
+        """Return a one-line report of frames sent versus skipped."""
+        total = self.frames_sent + self.frames_skipped
+        skipped_pct = (self.frames_skipped / total * 100) if total else 0.0
+        return (
+            f"{self.name}: {self.frames_sent} frames sent, "
+            f"{self.frames_skipped} skipped ({skipped_pct:.0f}% of {total})"
+        )
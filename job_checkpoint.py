@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+import time
+
+from automation_state import state_path
+
+CHECKPOINT_MODES = ("resume", "record", "off")
+
+# Stages of AutomationSession.run() in order
+STAGES = ("launch", "open_terminal", "install_requirements", "open_copilot", "send_prompt", "await_completion")
+
+
+def text_digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def job_id(project_folder):
+    """Checkpoint file name for a project folder: its name plus a hash of the full path."""
+    folder = os.path.normcase(os.path.abspath(project_folder))
+    name = os.path.basename(os.path.normpath(folder)) or "job"
+    return f"{name}-{text_digest(folder)[:10]}"
+
+
+class JobCheckpoint:
+    """
+    Persisted progress of one job, so a retry resumes where the last attempt stopped.
+
+    A job is a project folder and its prompt. Each stage that completes is
+    recorded with its duration, and the file is rewritten after every stage,
+    so a crash or a Copilot wait that times out leaves the stages reached on
+    disk. The next run of the same job resumes that attempt: launch and the
+    terminal are skipped while the project's VS Code window is still open,
+    and the Copilot panel and prompt as well once the prompt was sent to it,
+    so the run goes straight back to waiting for the Keep button. An attempt
+    that accepts the generated code completes the job; a run after that, or
+    with a different prompt, starts a new attempt.
+
+    The last successful pip install is kept across attempts:
+    install_requirements is skipped whenever requirements.txt and the pip
+    executable are unchanged since then. Time saved is estimated from the
+    durations the skipped stages took when they last ran.
+    """
+
+    def __init__(self, path, project_folder, prompt, resume=True, clock=time.time):
+        """
+        Args:
+            path (str): JSON file the checkpoint is kept in, or None to keep it in memory
+            project_folder (str): The job's project folder
+            prompt (str): The prompt the job sends to Copilot
+            resume (bool): False records progress but never skips a stage
+            clock (callable): Wall-clock time source; checkpoints outlive the process
+        """
+        self.path = path
+        self.project_folder = project_folder
+        self.prompt_sha = text_digest(prompt)
+        self.resume = resume
+        self.clock = clock
+
+        self.attempt = 1
+        self.previous_stages = {}
+        self.stages = {}
+        self.install = None
+        self.files = []
+        self.completed = False
+        self.skipped = []
+        self.seconds_saved = 0.0
+
+        data = self._load()
+        self.install = data.get("install")
+        interrupted = data.get("stages") and not data.get("completed")
+        if interrupted and data.get("prompt_sha") == self.prompt_sha:
+            self.attempt = data.get("attempt", 1) + 1
+            self.previous_stages = data["stages"]
+
+    @classmethod
+    def from_env(cls, project_folder, prompt, mode=None):
+        """
+        Build the checkpoint from CHECKPOINT ("resume" by default, "record" or "off").
+
+        Args:
+            project_folder (str): The job's project folder
+            prompt (str): The prompt the job sends to Copilot
+            mode (str): Overrides CHECKPOINT
+
+        Returns:
+            JobCheckpoint: The job's checkpoint; kept in memory only when off
+        """
+        mode = (mode or os.getenv("CHECKPOINT", "resume")).lower()
+        if mode not in CHECKPOINT_MODES:
+            raise ValueError(f"Unknown checkpoint mode {mode!r}, expected one of {CHECKPOINT_MODES}")
+        path = None if mode == "off" else state_path("checkpoints", f"{job_id(project_folder)}.json")
+        return cls(path, project_folder, prompt, resume=mode == "resume")
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable checkpoint {self.path}: {e}")
+            return {}
+
+    def save(self):
+        if not self.path:
+            return
+        data = {
+            "project_folder": self.project_folder,
+            "prompt_sha": self.prompt_sha,
+            "attempt": self.attempt,
+            "stages": self.stages,
+            "install": self.install,
+            "files": self.files,
+            "completed": self.completed,
+            "updated_at": self.clock(),
+        }
+        # Written whole and renamed, so a crash mid-write leaves the previous checkpoint
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save checkpoint {self.path}: {e}")
+
+    @property
+    def resuming(self):
+        """True when this run continues an attempt that stopped before accepting the code."""
+        return self.resume and bool(self.previous_stages)
+
+    def resumable_stages(self, window_open, install_pending=False):
+        """
+        Stages of the interrupted attempt that need not run again.
+
+        Args:
+            window_open (bool): Whether the project's VS Code window is still open
+            install_pending (bool): Whether pip still has to run; it may type its command,
+                so the terminal is then opened (and focused) again
+
+        Returns:
+            dict: Stage name -> why it can be skipped
+        """
+        if not self.resuming or not window_open:
+            return {}
+        stages = {}
+        if "launch" in self.previous_stages:
+            stages["launch"] = "the project's VS Code window is still open"
+        if "open_terminal" in self.previous_stages and not install_pending:
+            stages["open_terminal"] = "the terminal is still open and nothing will be typed into it"
+        if "send_prompt" in self.previous_stages:
+            for stage in ("open_copilot", "send_prompt"):
+                stages[stage] = "the prompt was already sent to that window"
+        return stages
+
+    def skip(self, stage, reason, seconds=None):
+        """
+        Record a stage as skipped, carrying over its last duration as the time saved.
+
+        Args:
+            stage (str): Stage name
+            reason (str): Why it did not need to run
+            seconds (float): Time saved; the stage's duration in the interrupted attempt when None
+        """
+        if seconds is None:
+            seconds = self.previous_stages.get(stage, {}).get("seconds", 0.0)
+        self.skipped.append(stage)
+        self.seconds_saved += seconds
+        self.stages[stage] = {"seconds": seconds, "at": self.clock(), "skipped": True}
+        print(f"⏩ Skipping {stage}: {reason} (saves about {seconds:.0f}s)")
+        self.save()
+
+    def complete(self, stage, seconds):
+        """Record a stage that ran to completion."""
+        if stage in self.skipped:
+            # Keep the duration it took when it ran, for the next retry's estimate
+            return
+        self.stages[stage] = {"seconds": round(seconds, 3), "at": self.clock()}
+        self.save()
+
+    def installed(self, requirements_sha, pip_executable):
+        """
+        Whether these requirements were installed successfully with this pip already.
+
+        Returns:
+            bool: True when pip can be skipped
+        """
+        return (
+            self.resume
+            and self.install is not None
+            and self.install.get("requirements_sha") == requirements_sha
+            and self.install.get("pip_executable") == pip_executable
+        )
+
+    def record_install(self, requirements_sha, pip_executable, seconds):
+        """Remember a successful install of requirements.txt."""
+        self.install = {
+            "requirements_sha": requirements_sha,
+            "pip_executable": pip_executable,
+            "seconds": round(seconds, 3),
+            "at": self.clock(),
+        }
+        self.save()
+
+    def record_files(self, changes):
+        """
+        Record the files Copilot generated.
+
+        Args:
+            changes (list): workspace_watcher.FileChange entries
+        """
+        self.files = [change.to_dict() for change in changes]
+        self.save()
+
+    def finish(self, succeeded):
+        """Close the attempt; a succeeded one completes the job."""
+        self.completed = succeeded
+        self.save()
+
+    def metrics(self):
+        return {
+            "attempt": self.attempt,
+            "resumed": self.resuming,
+            "skipped": list(self.skipped),
+            "seconds_saved": round(self.seconds_saved, 3),
+            "completed": self.completed,
+            "files": len(self.files),
+        }
+
+    def summary(self):
+        skipped = ", ".join(self.skipped) if self.skipped else "nothing"
+        return (
+            f"attempt {self.attempt}{' (resumed)' if self.resuming else ''}, skipped {skipped}, "
+            f"saved about {self.seconds_saved:.0f}s"
+        )
@@ -0,0 +1,175 @@
+import os
+
+from screen_regions import crop_region, region_from_env
+
+# VS Code's default primary button colour (Dark Modern / Light Modern themes)
+VSCODE_BUTTON_COLOR = (0, 120, 212)
+# Default chat panel background behind the button (Dark Modern theme)
+VSCODE_PANEL_BACKGROUND = (24, 24, 24)
+# VS Code renders disabled buttons at 40% opacity over the panel background
+DISABLED_BUTTON_OPACITY = 0.4
+
+
+def parse_color(value, default=None):
+    """
+    Parse an RGB colour from "#rrggbb" or "r,g,b".
+
+    Args:
+        value (str): Colour string, or None/empty for the default
+        default (tuple): Colour returned when value is empty
+
+    Returns:
+        tuple: (r, g, b) integers, or default if value is empty
+    """
+    if not value or not value.strip():
+        return default
+
+    value = value.strip()
+    if value.startswith("#"):
+        hex_digits = value[1:]
+        if len(hex_digits) != 6:
+            raise ValueError(f"Expected a colour like #0078d4, got: {value}")
+        return tuple(int(hex_digits[i : i + 2], 16) for i in (0, 2, 4))
+
+    parts = [int(part) for part in value.split(",")]
+    if len(parts) != 3 or not all(0 <= part <= 255 for part in parts):
+        raise ValueError(f"Expected a colour like 0,120,212, got: {value}")
+    return tuple(parts)
+
+
+def blend_colors(foreground, background, opacity):
+    """Return foreground drawn at the given opacity over background."""
+    return tuple(
+        round(fg * opacity + bg * (1 - opacity)) for fg, bg in zip(foreground, background)
+    )
+
+
+class KeepButtonDetector:
+    """
+    Local fast path for the Keep-button check.
+
+    The detector looks only at a small, calibrated region around the Keep button
+    and measures, with vectorized NumPy, which fraction of its pixels match the
+    enabled button colour and which match the greyed-out (disabled) colour. It
+    answers "enabled" or "disabled" only when one colour clearly dominates and
+    returns None otherwise, in which case the caller falls back to the CUA model.
+    """
+
+    def __init__(
+        self,
+        region=None,
+        enabled_color=VSCODE_BUTTON_COLOR,
+        disabled_color=None,
+        background_color=VSCODE_PANEL_BACKGROUND,
+        tolerance=24,
+        min_match_ratio=0.05,
+        max_conflict_ratio=0.01,
+    ):
+        """
+        Args:
+            region (tuple): (left, top, right, bottom) screen fractions tightly around
+                the Keep button; None disables the detector
+            enabled_color (tuple): RGB colour of the enabled button
+            disabled_color (tuple): RGB colour of the disabled button; derived from
+                enabled_color and background_color when None
+            background_color (tuple): RGB colour of the panel behind the button
+            tolerance (int): Largest per-channel difference for a pixel to match a colour
+            min_match_ratio (float): Fraction of region pixels that must match a colour
+            max_conflict_ratio (float): Largest fraction allowed for the other colour
+        """
+        import numpy as np
+
+        self.region = region
+        self.enabled_color = np.array(enabled_color, dtype=np.int16)
+        if disabled_color is None:
+            disabled_color = blend_colors(
+                enabled_color, background_color, DISABLED_BUTTON_OPACITY
+            )
+        self.disabled_color = np.array(disabled_color, dtype=np.int16)
+        self.tolerance = tolerance
+        self.min_match_ratio = min_match_ratio
+        self.max_conflict_ratio = max_conflict_ratio
+
+        self.local_verdicts = 0
+        self.unsure_frames = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a detector from KEEP_BUTTON_REGION, KEEP_ENABLED_COLOR,
+        KEEP_DISABLED_COLOR and KEEP_BACKGROUND_COLOR.
+
+        Returns:
+            KeepButtonDetector: The detector (inactive if KEEP_BUTTON_REGION is not set)
+        """
+        return cls(
+            region=region_from_env("KEEP_BUTTON_REGION"),
+            enabled_color=parse_color(
+                os.getenv("KEEP_ENABLED_COLOR"), VSCODE_BUTTON_COLOR
+            ),
+            disabled_color=parse_color(os.getenv("KEEP_DISABLED_COLOR")),
+            background_color=parse_color(
+                os.getenv("KEEP_BACKGROUND_COLOR"), VSCODE_PANEL_BACKGROUND
+            ),
+        )
+
+    @property
+    def active(self):
+        return self.region is not None
+
+    def color_ratios(self, image):
+        """
+        Measure how much of the button region matches each button colour.
+
+        Args:
+            image (PIL.Image.Image): Full screenshot
+
+        Returns:
+            tuple: (enabled_ratio, disabled_ratio) as fractions of the region's pixels
+        """
+        import numpy as np
+
+        pixels = np.asarray(crop_region(image, self.region).convert("RGB"), dtype=np.int16)
+        enabled = np.abs(pixels - self.enabled_color).max(axis=-1) <= self.tolerance
+        disabled = np.abs(pixels - self.disabled_color).max(axis=-1) <= self.tolerance
+        return float(enabled.mean()), float(disabled.mean())
+
+    def detect(self, image):
+        """
+        Classify the Keep button locally.
+
+        Args:
+            image (PIL.Image.Image): Full screenshot
+
+        Returns:
+            str: "enabled" or "disabled" when confident, None when the model should decide
+        """
+        if not self.active:
+            return None
+
+        enabled_ratio, disabled_ratio = self.color_ratios(image)
+
+        verdict = None
+        if (
+            enabled_ratio >= self.min_match_ratio
+            and disabled_ratio <= self.max_conflict_ratio
+        ):
+            verdict = "enabled"
+        elif (
+            disabled_ratio >= self.min_match_ratio
+            and enabled_ratio <= self.max_conflict_ratio
+        ):
+            verdict = "disabled"
+
+        if verdict is None:
+            self.unsure_frames += 1
+        else:
+            self.local_verdicts += 1
+        return verdict
+
+    def summary(self):
+        """Return a one-line report of local verdicts versus model fallbacks."""
+        return (
+            f"{self.local_verdicts} answered locally, "
+            f"{self.unsure_frames} deferred to the CUA model"
+        )
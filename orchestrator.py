@@ -0,0 +1,441 @@
+"""
+Run many (project folder, prompt) automation jobs in parallel across isolated displays.
+
+Each worker owns one display (an Xvfb virtual framebuffer on Linux, or an
+existing X display / desktop session) and runs app.py for one job at a time with
+PROJECT_FOLDER, DEVELOPER_PROMPT and JOB_RESULT_PATH set, and with a VS Code
+user data dir of its own (VSCODE_USER_DATA_DIR). Results, timings and
+failures from all workers are aggregated into results.json.
+
+The jobs file is a JSON list or JSON-lines file of objects such as
+{"id": "factorial", "project_folder": "~/pyauto-gui-samples/project1", "prompt": "..."}.
+
+Usage:
+    python orchestrator.py jobs.json --workers 4 --backend xvfb
+    python orchestrator.py jobs.json --backend display --displays :1,:2
+"""
+
+import argparse
+import json
+import os
+import queue
+import select
+import shlex
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from automation_state import state_path
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# Runs shorter than this report no jobs/hour; the rate would only reflect start-up noise
+MIN_RATE_SECONDS = 1.0
+
+
+class Job:
+    """One project folder and the prompt to send to Copilot for it."""
+
+    def __init__(self, job_id, project_folder, prompt):
+        self.job_id = job_id
+        self.project_folder = os.path.expanduser(project_folder)
+        self.prompt = prompt
+
+
+def load_jobs(path):
+    """
+    Load jobs from a JSON list or a JSON-lines file.
+
+    Args:
+        path (str): Jobs file
+
+    Returns:
+        list: Job objects
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read().strip()
+
+    if text.startswith("["):
+        entries = json.loads(text)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    return [
+        Job(entry.get("id") or f"job{index + 1}", entry["project_folder"], entry["prompt"])
+        for index, entry in enumerate(entries)
+    ]
+
+
+class XvfbDisplay:
+    """
+    A private Xvfb virtual framebuffer for one worker.
+
+    The display number is not chosen up front: Xvfb is started with
+    -displayfd, claims the first display whose lock file it can create and
+    writes the number back, so a worker never attaches to an X server that
+    some other user or process already runs.
+    """
+
+    def __init__(self, width=1920, height=1080):
+        self.number = None
+        self.width = width
+        self.height = height
+        self._process = None
+
+    @property
+    def name(self):
+        return f":{self.number}" if self.number is not None else "xvfb"
+
+    def start(self, timeout=10):
+        xvfb = shutil.which("Xvfb")
+        if xvfb is None:
+            raise RuntimeError("Xvfb not found; install it or use --backend display")
+
+        read_fd, write_fd = os.pipe()
+        try:
+            self._process = subprocess.Popen(
+                [
+                    xvfb,
+                    "-displayfd",
+                    str(write_fd),
+                    "-screen",
+                    "0",
+                    f"{self.width}x{self.height}x24",
+                    "-nolisten",
+                    "tcp",
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                pass_fds=(write_fd,),
+            )
+        finally:
+            os.close(write_fd)
+
+        # Xvfb writes the display number and a newline once it accepts connections
+        output = b""
+        deadline = time.monotonic() + timeout
+        try:
+            while not output.endswith(b"\n"):
+                remaining = deadline - time.monotonic()
+                ready, _, _ = select.select([read_fd], [], [], max(remaining, 0))
+                chunk = os.read(read_fd, 16) if ready else b""
+                if not chunk:
+                    self.stop()
+                    raise RuntimeError("Xvfb failed to start")
+                output += chunk
+        finally:
+            os.close(read_fd)
+        self.number = int(output.strip())
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+        self.number = None
+
+    def env(self):
+        return {"DISPLAY": self.name}
+
+
+class ExistingDisplay:
+    """A display or desktop session that is already running (e.g. ":1"), or the current one."""
+
+    def __init__(self, name=None):
+        self.name = name or "local"
+        self._display = name
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def env(self):
+        return {"DISPLAY": self._display} if self._display else {}
+
+
+class JobResult:
+    """Outcome and timing of one job."""
+
+    def __init__(self, job, worker, display, exit_code, duration, details, error, log_path):
+        self.job = job
+        self.worker = worker
+        self.display = display
+        self.exit_code = exit_code
+        self.duration = duration
+        self.details = details
+        self.error = error
+        self.log_path = log_path
+
+    @property
+    def succeeded(self):
+        return (
+            self.error is None
+            and self.exit_code == 0
+            and bool(self.details.get("keep_button_found"))
+        )
+
+    def to_dict(self):
+        return {
+            "id": self.job.job_id,
+            "project_folder": self.job.project_folder,
+            "worker": self.worker,
+            "display": self.display,
+            "succeeded": self.succeeded,
+            "exit_code": self.exit_code,
+            "duration_seconds": round(self.duration, 3),
+            "error": self.error,
+            "details": self.details,
+            "log": self.log_path,
+        }
+
+
+class Orchestrator:
+    """Dispatch jobs from a queue to one worker thread per display."""
+
+    def __init__(self, displays, output_dir, worker_command=None, job_timeout=900, extra_env=None):
+        """
+        Args:
+            displays (list): XvfbDisplay or ExistingDisplay objects, one per worker
+            output_dir (str): Directory for per-job logs, result files and results.json
+            worker_command (list): Command run per job; defaults to this Python running app.py
+            job_timeout (float): Seconds before a job's worker process is killed
+            extra_env (dict): Additional environment variables for every job
+        """
+        self.displays = displays
+        self.output_dir = output_dir
+        self.worker_command = worker_command or [sys.executable, APP_PATH]
+        self.job_timeout = job_timeout
+        self.extra_env = extra_env or {}
+
+        self._results = []
+        self._lock = threading.Lock()
+
+    def _run_job(self, job, worker, display):
+        job_dir = os.path.join(self.output_dir, job.job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        log_path = os.path.join(job_dir, "worker.log")
+        result_path = os.path.join(job_dir, "result.json")
+        if os.path.exists(result_path):
+            os.remove(result_path)
+
+        env = os.environ.copy()
+        env.update(self.extra_env)
+        env.update(display.env())
+        env["PROJECT_FOLDER"] = job.project_folder
+        env["DEVELOPER_PROMPT"] = job.prompt
+        env["JOB_RESULT_PATH"] = result_path
+        env["PYTHONUNBUFFERED"] = "1"
+        # The code CLI hands a folder to any instance already running on the same user
+        # data dir, whatever its display; a dir per worker keeps each window on its own
+        env["VSCODE_USER_DATA_DIR"] = state_path("orchestrator", f"worker{worker}", "user-data")
+
+        print(f"▶️ [worker {worker} {display.name}] starting {job.job_id}")
+        exit_code = None
+        error = None
+        start_time = time.monotonic()
+        with open(log_path, "w", encoding="utf-8") as log:
+            try:
+                exit_code = subprocess.run(
+                    self.worker_command,
+                    env=env,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                    timeout=self.job_timeout,
+                ).returncode
+            except subprocess.TimeoutExpired:
+                error = f"timed out after {self.job_timeout}s"
+            except OSError as e:
+                error = f"could not start worker: {e}"
+        duration = time.monotonic() - start_time
+
+        details = {}
+        if os.path.exists(result_path):
+            try:
+                with open(result_path, "r") as f:
+                    details = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                error = error or f"unreadable result file: {e}"
+        elif error is None:
+            error = f"worker exited with code {exit_code} without a result"
+
+        result = JobResult(job, worker, display.name, exit_code, duration, details, error, log_path)
+        status = "✅" if result.succeeded else "❌"
+        print(f"{status} [worker {worker} {display.name}] {job.job_id} in {duration:.1f}s")
+        return result
+
+    def _worker(self, worker, display, jobs):
+        try:
+            display.start()
+        except Exception as e:
+            print(f"⚠️ [worker {worker}] display {display.name} unavailable: {e}")
+            return
+
+        try:
+            while True:
+                try:
+                    job = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                result = self._run_job(job, worker, display)
+                with self._lock:
+                    self._results.append(result)
+        finally:
+            display.stop()
+
+    def run(self, jobs):
+        """
+        Run all jobs and write results.json.
+
+        Args:
+            jobs (list): Job objects
+
+        Returns:
+            tuple: (list of JobResult, wall-clock seconds)
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        job_queue = queue.Queue()
+        for job in jobs:
+            job_queue.put(job)
+
+        self._results = []
+        start_time = time.monotonic()
+        threads = [
+            threading.Thread(target=self._worker, args=(index + 1, display, job_queue))
+            for index, display in enumerate(self.displays)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_seconds = time.monotonic() - start_time
+
+        # Jobs left in the queue had no working display to run on
+        while not job_queue.empty():
+            job = job_queue.get_nowait()
+            self._results.append(
+                JobResult(job, None, None, None, 0.0, {}, "no worker available", None)
+            )
+
+        with open(os.path.join(self.output_dir, "results.json"), "w") as f:
+            json.dump(
+                {
+                    "wall_seconds": round(wall_seconds, 3),
+                    "workers": len(self.displays),
+                    "jobs": [result.to_dict() for result in self._results],
+                },
+                f,
+                indent=2,
+            )
+        return self._results, wall_seconds
+
+
+def summarize(results, wall_seconds, workers):
+    """Return a multi-line summary of throughput, timings and failures."""
+    succeeded = [result for result in results if result.succeeded]
+    failed = [result for result in results if not result.succeeded]
+    # Only finished work counts; a run that failed at once has no meaningful rate
+    rate = ""
+    if succeeded and wall_seconds >= MIN_RATE_SECONDS:
+        rate = f" ({len(succeeded) / wall_seconds * 3600:.1f} succeeded jobs/hour)"
+
+    lines = [
+        f"📊 {len(results)} jobs on {workers} workers in {wall_seconds:.1f}s{rate}",
+        f"   ✅ {len(succeeded)} succeeded, ❌ {len(failed)} failed",
+    ]
+    durations = [result.duration for result in results if result.duration]
+    if durations:
+        lines.append(
+            f"   ⏱️ per job: mean {statistics.mean(durations):.1f}s, "
+            f"median {statistics.median(durations):.1f}s, max {max(durations):.1f}s"
+        )
+    for label, warm in (("cold", False), ("warm", True)):
+        prompt_times = [
+            result.details["time_to_first_prompt_seconds"]
+            for result in results
+            if result.details.get("time_to_first_prompt_seconds") is not None
+            and bool(result.details.get("warm_start")) == warm
+        ]
+        if prompt_times:
+            lines.append(
+                f"   🚀 time to first prompt, {label} VS Code start: mean "
+                f"{statistics.mean(prompt_times):.1f}s over {len(prompt_times)} jobs"
+            )
+    spends = [
+        result.details["budget"]["job"]
+        for result in results
+        if (result.details.get("budget") or {}).get("job")
+    ]
+    if spends:
+        tokens = sum(spend["input_tokens"] + spend["output_tokens"] for spend in spends)
+        costs = [spend["cost_usd"] for spend in spends if spend.get("cost_usd") is not None]
+        lines.append(
+            f"   💸 model spend: {sum(spend['calls'] for spend in spends)} calls, {tokens} tokens"
+            + (f", ${sum(costs):.4f}" if costs else "")
+        )
+    for result in failed:
+        lines.append(f"   {result.job.job_id}: {result.error or 'Keep button not detected'}")
+    return "\n".join(lines)
+
+
+def build_displays(backend, workers, displays=None):
+    """
+    Create one display per worker.
+
+    Args:
+        backend (str): "xvfb", "display" (existing X displays) or "local" (current desktop)
+        workers (int): Number of workers for the xvfb and local backends
+        displays (list): Display names for the display backend
+
+    Returns:
+        list: Display objects
+    """
+    if backend == "xvfb":
+        return [XvfbDisplay() for _ in range(workers)]
+    if backend == "display":
+        return [ExistingDisplay(name) for name in displays]
+    if workers > 1:
+        print("⚠️ The local backend shares one desktop; running a single worker")
+    return [ExistingDisplay()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("jobs_file", help="JSON or JSON-lines file of jobs")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--backend", choices=("xvfb", "display", "local"), default="xvfb")
+    parser.add_argument("--displays", default="", help="Comma-separated displays for --backend display")
+    parser.add_argument("--output-dir", default="orchestrator-results")
+    parser.add_argument("--job-timeout", type=float, default=900)
+    parser.add_argument("--worker-command", help="Command to run per job instead of app.py")
+    args = parser.parse_args(argv)
+
+    displays = build_displays(
+        args.backend,
+        args.workers,
+        [name for name in args.displays.split(",") if name],
+    )
+    if not displays:
+        print("No displays configured")
+        return 1
+
+    orchestrator = Orchestrator(
+        displays,
+        args.output_dir,
+        worker_command=shlex.split(args.worker_command) if args.worker_command else None,
+        job_timeout=args.job_timeout,
+    )
+    results, wall_seconds = orchestrator.run(load_jobs(args.jobs_file))
+    print(summarize(results, wall_seconds, len(displays)))
+    return 0 if all(result.succeeded for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
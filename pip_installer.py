@@ -0,0 +1,264 @@
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+# Timestamp prefix pip writes on every line of a --log file, e.g. "2025-06-01T10:15:02,481 "
+PIP_LOG_TIMESTAMP = re.compile(r"^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}),(\d{3}) ?(.*)$")
+COLLECTING_LINE = re.compile(r"^\s*Collecting ([A-Za-z0-9][A-Za-z0-9._-]*)")
+ALREADY_SATISFIED_LINE = re.compile(r"^\s*Requirement already satisfied: ([A-Za-z0-9][A-Za-z0-9._-]*)")
+INSTALLING_LINE = re.compile(r"^\s*Installing collected packages: (.+)$")
+SUCCESS_LINE = re.compile(r"^\s*Successfully installed (.+)$")
+
+
+class PipTimingTracker:
+    """
+    Derive per-package timings from pip's streamed output.
+
+    Each "Collecting <package>" line starts that package's resolve/download phase,
+    which ends when the next package starts or when pip moves on to
+    "Installing collected packages". The install phase runs until
+    "Successfully installed".
+    """
+
+    def __init__(self):
+        self.package_timings = {}
+        self.already_satisfied = []
+        self.install_seconds = None
+        self.error_lines = []
+
+        self._current_package = None
+        self._current_started = None
+        self._install_started = None
+
+    def _finish_current(self, timestamp):
+        if self._current_package is not None:
+            self.package_timings[self._current_package] = timestamp - self._current_started
+            self._current_package = None
+
+    def feed(self, line, timestamp):
+        """
+        Consume one line of pip output.
+
+        Args:
+            line (str): Output line without its trailing newline
+            timestamp (float): When the line was produced, in seconds
+        """
+        collecting = COLLECTING_LINE.match(line)
+        if collecting:
+            self._finish_current(timestamp)
+            self._current_package = collecting.group(1)
+            self._current_started = timestamp
+            return
+
+        satisfied = ALREADY_SATISFIED_LINE.match(line)
+        if satisfied:
+            self.already_satisfied.append(satisfied.group(1))
+            return
+
+        if INSTALLING_LINE.match(line):
+            self._finish_current(timestamp)
+            self._install_started = timestamp
+            return
+
+        if SUCCESS_LINE.match(line):
+            self._finish_current(timestamp)
+            if self._install_started is not None:
+                self.install_seconds = timestamp - self._install_started
+            return
+
+        if line.lstrip().startswith("ERROR:"):
+            self.error_lines.append(line.strip())
+
+    def close(self, timestamp):
+        """Finish any package still being collected when the output ends."""
+        self._finish_current(timestamp)
+
+
+class PipInstallResult:
+    """Outcome of a pip install whose completion was detected without screenshots."""
+
+    def __init__(self, exit_code, duration, tracker):
+        self.exit_code = exit_code
+        self.duration = duration
+        self.package_timings = tracker.package_timings
+        self.already_satisfied = tracker.already_satisfied
+        self.install_seconds = tracker.install_seconds
+        self.error_lines = tracker.error_lines
+
+    @property
+    def succeeded(self):
+        return self.exit_code == 0
+
+    def report(self):
+        """Return a multi-line summary of the install duration and per-package timings."""
+        status = "succeeded" if self.succeeded else f"failed (exit code {self.exit_code})"
+        lines = [f"pip install {status} in {self.duration:.1f}s"]
+        for package, seconds in sorted(
+            self.package_timings.items(), key=lambda item: item[1], reverse=True
+        ):
+            lines.append(f"  {package}: {seconds:.2f}s")
+        if self.install_seconds is not None:
+            lines.append(f"  (installing collected packages: {self.install_seconds:.2f}s)")
+        if self.already_satisfied:
+            lines.append(f"  {len(self.already_satisfied)} requirements already satisfied")
+        for error_line in self.error_lines:
+            lines.append(f"  {error_line}")
+        return "\n".join(lines)
+
+
+def run_pip_subprocess(project_folder, pip_executable="pip", timeout=300, on_line=None):
+    """
+    Run `pip install -r requirements.txt` as a managed subprocess and stream its output.
+
+    Args:
+        project_folder (str): Folder containing requirements.txt
+        pip_executable (str): pip command to run
+        timeout (float): Seconds after which the install is killed
+        on_line (callable): Called with each output line as it arrives
+
+    Returns:
+        PipInstallResult: Exit code, duration and per-package timings,
+        or None if pip could not be started
+    """
+    tracker = PipTimingTracker()
+    start_time = time.monotonic()
+
+    try:
+        process = subprocess.Popen(
+            [pip_executable, "install", "-r", "requirements.txt"],
+            cwd=project_folder,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            bufsize=1,
+        )
+    except OSError as e:
+        print(f"⚠️ Could not start {pip_executable}: {e}")
+        return None
+
+    def kill_on_timeout():
+        print(f"⏰ pip install exceeded {timeout}s, terminating it")
+        process.kill()
+
+    watchdog = threading.Timer(timeout, kill_on_timeout)
+    watchdog.daemon = True
+    watchdog.start()
+    try:
+        with process.stdout:
+            for line in process.stdout:
+                line = line.rstrip("\r\n")
+                tracker.feed(line, time.monotonic() - start_time)
+                if on_line is not None:
+                    on_line(line)
+        exit_code = process.wait()
+    finally:
+        watchdog.cancel()
+
+    duration = time.monotonic() - start_time
+    tracker.close(duration)
+    return PipInstallResult(exit_code, duration, tracker)
+
+
+def terminal_log_command(log_path, exit_code_path, shell=None):
+    """
+    Build a terminal command that runs pip with a log file and records its exit code.
+
+    Args:
+        log_path (str): File pip writes its timestamped log to
+        exit_code_path (str): File the command writes pip's exit code to when it finishes
+        shell (str): "powershell" or "posix"; the VS Code default shell of this platform
+            (PowerShell on Windows, bash/zsh elsewhere) when None
+
+    Returns:
+        str: Command to type into the VS Code terminal
+    """
+    if shell is None:
+        shell = "powershell" if sys.platform == "win32" else "posix"
+    if shell == "powershell":
+        return (
+            f'pip install -r requirements.txt --log "{log_path}"; '
+            f'Set-Content -Encoding ascii -Path "{exit_code_path}" -Value $LASTEXITCODE'
+        )
+    if shell == "posix":
+        return f'pip install -r requirements.txt --log "{log_path}"; echo $? > "{exit_code_path}"'
+    raise ValueError(f"Unknown shell {shell!r}, expected 'powershell' or 'posix'")
+
+
+def parse_pip_log_timestamp(date_part, millis_part):
+    """Convert the timestamp prefix of a pip log line to seconds since the epoch."""
+    stamp = datetime.strptime(date_part, "%Y-%m-%dT%H:%M:%S")
+    return stamp.timestamp() + int(millis_part) / 1000
+
+
+def wait_for_terminal_log(
+    log_path, exit_code_path, timeout=300, start_timeout=15, poll_interval=0.2, on_line=None
+):
+    """
+    Tail the log written by terminal_log_command until pip's exit code appears.
+
+    Per-package timings use the timestamps pip writes into the log, so they are
+    exact regardless of how often the file is polled.
+
+    Args:
+        log_path (str): pip --log file to tail
+        exit_code_path (str): File containing pip's exit code once it has finished
+        timeout (float): Seconds to wait for pip to finish
+        start_timeout (float): Seconds to wait for the log to appear before giving up
+        poll_interval (float): Seconds between reads of the log
+        on_line (callable): Called with each log message as it arrives
+
+    Returns:
+        PipInstallResult: Exit code, duration and per-package timings,
+        or None if the log never appeared or pip did not finish in time
+    """
+    tracker = PipTimingTracker()
+    start_time = time.monotonic()
+    first_stamp = None
+    last_stamp = None
+    position = 0
+
+    while True:
+        elapsed = time.monotonic() - start_time
+        if not os.path.exists(log_path) and elapsed > start_timeout:
+            print(f"⚠️ pip log {log_path} did not appear within {start_timeout}s")
+            return None
+        if elapsed > timeout:
+            print(f"⏰ pip did not finish within {timeout}s")
+            return None
+
+        if os.path.exists(log_path):
+            with open(log_path, "rb") as f:
+                f.seek(position)
+                chunk = f.read()
+            # Only consume complete lines; a partial last line is re-read next time
+            complete = chunk[: chunk.rfind(b"\n") + 1]
+            position += len(complete)
+
+            for raw_line in complete.decode("utf-8", errors="replace").splitlines():
+                match = PIP_LOG_TIMESTAMP.match(raw_line)
+                if match:
+                    last_stamp = parse_pip_log_timestamp(match.group(1), match.group(2))
+                    if first_stamp is None:
+                        first_stamp = last_stamp
+                    message = match.group(3)
+                else:
+                    message = raw_line
+                tracker.feed(message, (last_stamp or 0) - (first_stamp or 0))
+                if on_line is not None:
+                    on_line(message)
+
+        if os.path.exists(exit_code_path):
+            with open(exit_code_path, "r", encoding="ascii", errors="replace") as f:
+                exit_text = f.read().strip()
+            if exit_text:
+                duration = time.monotonic() - start_time
+                tracker.close((last_stamp or 0) - (first_stamp or 0))
+                exit_code = int(exit_text) if exit_text.lstrip("-").isdigit() else -1
+                return PipInstallResult(exit_code, duration, tracker)
+
+        time.sleep(poll_interval)
@@ -0,0 +1,239 @@
+import json
+import os
+import statistics
+import time
+
+from automation_state import state_path
+
+
+class DurationHistory:
+    """
+    How long each named wait took in previous runs, persisted as JSON.
+
+    The file maps a wait name (e.g. "copilot_generation") to its most recent
+    durations in seconds.
+    """
+
+    def __init__(self, path=None, max_samples=20):
+        """
+        Args:
+            path (str): JSON file to load from and save to; defaults to
+                poll_history.json in the automation state directory
+            max_samples (int): Durations kept per wait name
+        """
+        self.path = path or state_path("poll_history.json")
+        self.max_samples = max_samples
+        self.samples = {}
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    self.samples = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ Ignoring unreadable poll history {self.path}: {e}")
+
+    def expected(self, name):
+        """
+        Return the expected duration and its spread for a wait.
+
+        Args:
+            name (str): Wait name
+
+        Returns:
+            tuple: (median seconds, spread seconds), or None without at least 3 samples
+        """
+        durations = self.samples.get(name, [])
+        if len(durations) < 3:
+            return None
+
+        center = statistics.median(durations)
+        # Median absolute deviation, scaled to approximate one standard deviation
+        spread = 1.4826 * statistics.median(abs(d - center) for d in durations)
+        return center, max(spread, 0.1 * center)
+
+    def record(self, name, seconds):
+        """Add a duration for a wait, keeping only the most recent samples."""
+        durations = self.samples.setdefault(name, [])
+        durations.append(round(seconds, 3))
+        del durations[: -self.max_samples]
+
+    def save(self):
+        try:
+            with open(self.path, "w") as f:
+                json.dump(self.samples, f, indent=2)
+        except OSError as e:
+            print(f"⚠️ Could not save poll history {self.path}: {e}")
+
+
+class PollScheduler:
+    """
+    Decide when to poll for a condition that will become true at an unknown time.
+
+    Without history, polls start at `min_interval` and back off exponentially up
+    to `max_interval`. With at least three previous durations for the same wait,
+    the scheduler polls sparsely until shortly before the expected completion
+    time, densely (every `min_interval`) around it, and backs off again if the
+    wait runs longer than usual. All timing uses a monotonic clock and no sleep
+    ever runs past the deadline.
+    """
+
+    def __init__(
+        self,
+        name,
+        timeout,
+        min_interval=1.0,
+        max_interval=10.0,
+        backoff=1.5,
+        history=None,
+        pace=None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        """
+        Args:
+            name (str): Wait name used for the learned history, e.g. "pip_install"
+            timeout (float): Seconds after start() at which the wait gives up
+            min_interval (float): Shortest delay between polls
+            max_interval (float): Longest delay between polls
+            backoff (float): Factor applied to the delay after each poll outside the dense window
+            history (DurationHistory): Learned durations, or None to only back off
+            pace (callable): Returns a factor (>= 1) to stretch every delay by, e.g. while a
+                token budget runs low; None for no stretching
+            clock (callable): Monotonic time source (injectable for simulations)
+            sleep (callable): Sleep function (injectable for simulations)
+        """
+        self.name = name
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.history = history
+        self.pace = pace
+        self.clock = clock
+        self.sleep = sleep
+
+        self.polls = 0
+        self._started_at = None
+        self._previous_poll_at = None
+        self._last_poll_at = None
+        self._backoff_interval = min_interval
+        self._due = False
+
+    def start(self):
+        self._started_at = self.clock()
+        self._previous_poll_at = None
+        self._last_poll_at = None
+        self._backoff_interval = self.min_interval
+        self._due = False
+        self.polls = 0
+        return self
+
+    @property
+    def elapsed(self):
+        return self.clock() - self._started_at
+
+    @property
+    def remaining(self):
+        return max(0.0, self.timeout - self.elapsed)
+
+    @property
+    def expired(self):
+        return self.elapsed >= self.timeout
+
+    def _next_backoff(self):
+        delay = self._backoff_interval
+        self._backoff_interval = min(self.max_interval, self._backoff_interval * self.backoff)
+        return delay
+
+    def next_delay(self):
+        """
+        Return how long to wait before the next poll, without sleeping.
+
+        Returns:
+            float: Seconds until the next poll (never beyond the deadline)
+        """
+        if self._due:
+            return 0.0
+        elapsed = self.elapsed
+        expected = self.history.expected(self.name) if self.history else None
+
+        if expected is None:
+            delay = self._next_backoff()
+        else:
+            center, spread = expected
+            window_start = center - spread
+            window_end = center + spread
+
+            if elapsed + self.min_interval < window_start:
+                delay = min(self.max_interval, window_start - elapsed)
+            elif elapsed <= window_end:
+                delay = self.min_interval
+                self._backoff_interval = self.min_interval
+            else:
+                delay = self._next_backoff()
+
+        if self.pace is not None:
+            delay *= max(1.0, self.pace())
+        return max(0.0, min(delay, self.remaining))
+
+    def wait(self):
+        """
+        Sleep until the next poll is due and mark the poll.
+
+        Returns:
+            bool: False if the deadline has passed and no further poll should happen
+        """
+        if self.expired:
+            return False
+
+        self.sleep(self.next_delay())
+        self.mark_poll()
+        return True
+
+    def expedite(self):
+        """Make the next poll due at once, e.g. when another signal says the wait is over."""
+        self._due = True
+
+    def mark_poll(self):
+        """Record that a poll is happening now."""
+        self._due = False
+        self._previous_poll_at = self._last_poll_at
+        self._last_poll_at = self.clock()
+        self.polls += 1
+
+    def complete(self):
+        """
+        Record that the condition was observed at the latest poll.
+
+        The true completion happened somewhere between the previous poll and this
+        one, so the midpoint is stored as the learned duration.
+        """
+        if self.history is None or self._last_poll_at is None:
+            return
+
+        detected = self._last_poll_at - self._started_at
+        if self._previous_poll_at is not None:
+            previous = self._previous_poll_at - self._started_at
+            estimate = (previous + detected) / 2
+        else:
+            estimate = detected
+        self.history.record(self.name, estimate)
+        self.history.save()
+
+    def poll(self, check):
+        """
+        Call check() on the schedule until it returns a truthy value or time runs out.
+
+        Args:
+            check (callable): Returns a truthy result once the condition holds
+
+        Returns:
+            The first truthy result, or None on timeout
+        """
+        self.start()
+        while self.wait():
+            result = check()
+            if result:
+                self.complete()
+                return result
+        return None
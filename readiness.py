@@ -0,0 +1,380 @@
+import os
+import time
+
+from PIL import Image, ImageChops
+
+from keep_detector import VSCODE_BUTTON_COLOR, parse_color
+from screen_regions import crop_region
+
+
+def vscode_windows():
+    """
+    List the open VS Code windows with pygetwindow.
+
+    Returns:
+        list: pygetwindow windows whose title names VS Code
+
+    Raises:
+        ImportError: If pygetwindow is not installed (it is Windows/macOS only)
+    """
+    import pygetwindow as gw
+
+    return [
+        w
+        for w in gw.getAllWindows()
+        if "Visual Studio Code" in w.title or "Code" in w.title
+    ]
+
+
+def has_ink(min_fraction=0.002, contrast=48):
+    """
+    Region check: some pixels stand out from the region's background, e.g. a shell prompt.
+
+    An empty, freshly opened pane is a single colour; text drawn into it is not.
+
+    Args:
+        min_fraction (float): Fraction of the region's pixels that must stand out
+        contrast (int): Grey-level difference from the background for a pixel to stand out
+
+    Returns:
+        callable: check(image) for a cropped region
+    """
+
+    def check(image):
+        histogram = image.convert("L").histogram()
+        background = histogram.index(max(histogram))
+        ink = sum(
+            count for level, count in enumerate(histogram) if abs(level - background) >= contrast
+        )
+        return ink >= min_fraction * sum(histogram)
+
+    return check
+
+
+def has_color(color, tolerance=24, min_pixels=20):
+    """
+    Region check: the region contains a colour, e.g. the focus border of the chat input.
+
+    Args:
+        color (tuple): RGB colour to look for
+        tolerance (int): Largest per-channel difference for a pixel to match
+        min_pixels (int): Matching pixels needed
+
+    Returns:
+        callable: check(image) for a cropped region
+    """
+    import numpy as np
+
+    target = np.array(color, dtype=np.int16)
+
+    def check(image):
+        pixels = np.asarray(image.convert("RGB"), dtype=np.int16)
+        return int((np.abs(pixels - target).max(axis=-1) <= tolerance).sum()) >= min_pixels
+
+    return check
+
+
+class RegionSettle:
+    """
+    Pixel check that a screen region has changed from a baseline and stopped changing.
+
+    Frames are cropped to the region and shrunk to a small thumbnail, as in
+    FrameChangeGate. The region is ready once it differs from the baseline
+    (the frame taken before the hotkey) and has then looked the same for
+    `quiet` seconds, i.e. the pane has opened and finished animating, and
+    the optional `require` check passes on the region (a prompt has been
+    printed, the input has focus).
+    """
+
+    def __init__(
+        self,
+        baseline,
+        region=None,
+        quiet=0.3,
+        unchanged_after=None,
+        require=None,
+        downscale=8,
+        pixel_threshold=24,
+        min_changed_pixels=8,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            baseline (PIL.Image.Image): Screenshot taken before the action
+            region (tuple): (left, top, right, bottom) screen fractions to watch, or None
+            quiet (float): Seconds the region must stay unchanged after it changed
+            unchanged_after (float): Seconds after which a region that never changed counts
+                as ready (the action had nothing to show, e.g. the panel was already open);
+                None to wait for a change until the probe times out
+            require (callable): require(region_image) must also be True, e.g. has_ink()
+            downscale (int): Factor by which the region is shrunk before comparing
+            pixel_threshold (int): Per-channel difference (0-255) for a pixel to count as changed
+            min_changed_pixels (int): Changed thumbnail pixels needed to count as a change
+            clock (callable): Monotonic time source
+        """
+        self.region = region
+        self.quiet = quiet
+        self.unchanged_after = unchanged_after
+        self.require = require
+        self.downscale = max(1, int(downscale))
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_pixels = min_changed_pixels
+        self.clock = clock
+
+        self._baseline = (
+            self._thumbnail(crop_region(baseline, region)) if baseline is not None else None
+        )
+        self._started = clock()
+        self._last = None
+        self._last_change = None
+
+    def _thumbnail(self, cropped):
+        cropped = cropped.convert("RGB")
+        width, height = cropped.size
+        size = (max(1, width // self.downscale), max(1, height // self.downscale))
+        return cropped.resize(size, Image.BOX)
+
+    def _changed(self, thumbnail, reference):
+        if thumbnail.size != reference.size:
+            return True
+        red, green, blue = ImageChops.difference(thumbnail, reference).split()
+        delta = ImageChops.lighter(ImageChops.lighter(red, green), blue)
+        return sum(delta.histogram()[self.pixel_threshold + 1 :]) >= self.min_changed_pixels
+
+    def check(self, image):
+        """
+        Feed the latest screenshot.
+
+        Args:
+            image (PIL.Image.Image): Full screenshot, or None if capture failed
+
+        Returns:
+            bool: True once the region has changed and settled
+        """
+        if image is None:
+            return False
+        now = self.clock()
+        cropped = crop_region(image, self.region)
+        thumbnail = self._thumbnail(cropped)
+        if self._baseline is None:
+            self._baseline = thumbnail
+
+        if self._last_change is None:
+            if self._changed(thumbnail, self._baseline):
+                self._last_change = now
+        elif self._changed(thumbnail, self._last):
+            self._last_change = now
+        self._last = thumbnail
+
+        if self._last_change is not None:
+            settled = now - self._last_change >= self.quiet
+        else:
+            settled = self.unchanged_after is not None and now - self._started >= self.unchanged_after
+        return settled and (self.require is None or self.require(cropped))
+
+
+class ProbeResult:
+    """How long one readiness probe waited, against the fixed sleep it replaces."""
+
+    def __init__(self, name, ready, waited, fixed_sleep, checks):
+        self.name = name
+        self.ready = ready
+        self.waited = waited
+        self.fixed_sleep = fixed_sleep
+        self.checks = checks
+
+    @property
+    def saved(self):
+        return self.fixed_sleep - self.waited
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "ready": self.ready,
+            "waited_seconds": round(self.waited, 3),
+            "fixed_sleep_seconds": self.fixed_sleep,
+            "checks": self.checks,
+        }
+
+
+class ReadinessProbes:
+    """
+    Wait for the UI to reach an expected state instead of sleeping a fixed time.
+
+    Each probe polls a cheap local signal — a window title, a pixel check of a
+    screen region, a file or a process — and returns as soon as it holds, or
+    gives up after its timeout and lets the caller carry on as the fixed sleep
+    did. With probes disabled, wait() sleeps the fixed time it replaces.
+    """
+
+    def __init__(
+        self,
+        enabled=True,
+        timeout_scale=1.0,
+        interval=0.1,
+        list_windows=vscode_windows,
+        focus_color=VSCODE_BUTTON_COLOR,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        """
+        Args:
+            enabled (bool): False to sleep the fixed times instead of probing
+            timeout_scale (float): Multiplier for every probe timeout (raise it on slow machines)
+            interval (float): Seconds between checks
+            list_windows (callable): Returns the open VS Code windows; raises ImportError
+                when windows cannot be enumerated
+            focus_color (tuple): RGB focus border of the chat input (VS Code's focusBorder)
+            clock (callable): Monotonic time source
+            sleep (callable): Sleep function
+        """
+        self.enabled = enabled
+        self.timeout_scale = timeout_scale
+        self.interval = interval
+        self.list_windows = list_windows
+        self.focus_color = focus_color
+        self.clock = clock
+        self.sleep = sleep
+        self.results = []
+
+    @classmethod
+    def from_env(cls, clock=time.monotonic, sleep=time.sleep):
+        """
+        Build probes from READINESS ("on"/"off"), READINESS_TIMEOUT_SCALE and
+        CHAT_FOCUS_COLOR.
+
+        Returns:
+            ReadinessProbes: The configured probes
+        """
+        return cls(
+            enabled=os.getenv("READINESS", "on").lower() != "off",
+            timeout_scale=float(os.getenv("READINESS_TIMEOUT_SCALE", "1")),
+            focus_color=parse_color(os.getenv("CHAT_FOCUS_COLOR"), VSCODE_BUTTON_COLOR),
+            clock=clock,
+            sleep=sleep,
+        )
+
+    def wait(self, name, check, timeout, fixed_sleep):
+        """
+        Poll check() until it returns True or the timeout expires.
+
+        Args:
+            name (str): Probe name for logs and results, e.g. "terminal"
+            check (callable): Returns True once the UI is ready
+            timeout (float): Seconds to wait at most (scaled by timeout_scale)
+            fixed_sleep (float): The fixed sleep this probe replaces
+
+        Returns:
+            bool: True if the UI became ready, False on timeout
+        """
+        started = self.clock()
+        checks = 0
+        if not self.enabled:
+            self.sleep(fixed_sleep)
+            ready = True
+        else:
+            deadline = started + timeout * self.timeout_scale
+            while True:
+                checks += 1
+                try:
+                    ready = bool(check())
+                except Exception as e:
+                    print(f"⚠️ Readiness probe '{name}' failed: {e}")
+                    ready = False
+                if ready or self.clock() >= deadline:
+                    break
+                self.sleep(self.interval)
+
+        result = ProbeResult(name, ready, self.clock() - started, fixed_sleep, checks)
+        self.results.append(result)
+        if self.enabled:
+            if ready:
+                print(f"🚦 {name} ready after {result.waited:.2f}s (fixed sleep was {fixed_sleep}s)")
+            else:
+                print(f"⏳ {name} not ready after {result.waited:.2f}s, continuing anyway")
+        return ready
+
+    def settle(
+        self,
+        name,
+        capture,
+        baseline,
+        region,
+        timeout,
+        fixed_sleep,
+        quiet=0.3,
+        unchanged_after=None,
+        require=None,
+    ):
+        """
+        Wait until a screen region has changed from `baseline` and settled.
+
+        Args:
+            name (str): Probe name
+            capture (callable): Returns a full screenshot
+            baseline (PIL.Image.Image): Screenshot taken before the action
+            region (tuple): (left, top, right, bottom) screen fractions to watch
+            timeout (float): Seconds to wait at most
+            fixed_sleep (float): The fixed sleep this probe replaces
+            quiet (float): Seconds the region must stay unchanged
+            unchanged_after (float): Treat a region that never changes as ready after this long
+                (scaled by timeout_scale)
+            require (callable): Extra check of the cropped region, e.g. has_ink()
+
+        Returns:
+            bool: True if the region settled, False on timeout
+        """
+        probe = RegionSettle(
+            baseline,
+            region,
+            quiet=quiet,
+            unchanged_after=(
+                unchanged_after * self.timeout_scale if unchanged_after is not None else None
+            ),
+            require=require,
+            clock=self.clock,
+        )
+        return self.wait(name, lambda: probe.check(capture()), timeout, fixed_sleep)
+
+    def window_title(self, name, title_part, timeout, fixed_sleep):
+        """
+        Wait until a VS Code window whose title contains `title_part` is open.
+
+        Args:
+            name (str): Probe name
+            title_part (str): Lower-case text the window title must contain
+            timeout (float): Seconds to wait at most
+            fixed_sleep (float): The fixed sleep this probe replaces
+
+        Returns:
+            bool: True if the window appeared, False on timeout
+
+        Raises:
+            ImportError: If windows cannot be enumerated; the caller falls back to pixels
+        """
+        if self.enabled:
+            self.list_windows()
+
+        def check():
+            return any(title_part in w.title.lower() for w in self.list_windows())
+
+        return self.wait(name, check, timeout, fixed_sleep)
+
+    def seconds_saved(self):
+        return sum(result.saved for result in self.results)
+
+    def metrics(self):
+        return {
+            "probes": [result.to_dict() for result in self.results],
+            "seconds_saved": round(self.seconds_saved(), 3),
+            "timeouts": sum(not result.ready for result in self.results),
+        }
+
+    def summary(self):
+        waited = sum(result.waited for result in self.results)
+        fixed = sum(result.fixed_sleep for result in self.results)
+        timeouts = sum(not result.ready for result in self.results)
+        return (
+            f"{len(self.results)} probes waited {waited:.1f}s instead of {fixed:.1f}s of fixed sleeps "
+            f"({self.seconds_saved():.1f}s saved, {timeouts} timeouts)"
+        )
@@ -0,0 +1,444 @@
+import bisect
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from PIL import Image
+
+from response_decoding import response_output
+
+EVENTS_FILE = "events.jsonl"
+FRAMES_DIR = "frames"
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16] if text else None
+
+
+def request_parts(kwargs):
+    """
+    Find the prompt and image in the keyword arguments of a responses.create call.
+
+    Returns:
+        tuple: (prompt text, image data URL or None)
+    """
+    prompt, image_url = "", None
+    for item in kwargs.get("input") or []:
+        if not isinstance(item, dict):
+            continue
+        for content in item.get("content") or []:
+            if content.get("type") == "input_text":
+                prompt += content.get("text", "")
+            elif content.get("type") == "input_image":
+                image_url = content.get("image_url")
+    return prompt, image_url
+
+
+def _usage_dict(response):
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    return {
+        field: getattr(usage, field)
+        for field in ("input_tokens", "output_tokens", "total_tokens")
+        if isinstance(getattr(usage, field, None), int)
+    }
+
+
+class SessionRecorder:
+    """
+    Save the frames a real run captured and the model responses it received.
+
+    Each run is written to its own directory under `root`:
+
+        events.jsonl   one event per line, "t" in seconds since the run started:
+                       {"type": "frame", "t", "index", "file"}
+                       {"type": "response", "t", "frame", "prompt", "image",
+                        "latency", "bytes", "text", "usage"}
+        frames/        frame_000001.png, ...
+
+    "frame" is the index of the frame captured most recently before the request,
+    and "prompt"/"image" are short hashes of the prompt text and the encoded
+    image, so a replay can answer the same request exactly or fall back to the
+    response for the nearest earlier frame.
+    """
+
+    def __init__(self, root, clock=time.monotonic):
+        """
+        Args:
+            root (str): Directory that receives one sub-directory per recorded run
+            clock (callable): Monotonic time source for event timestamps
+        """
+        self.root = root
+        self.clock = clock
+        self.directory = None
+        self.frames = 0
+        self.responses = 0
+        self.last_frame = None
+        self._started_at = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Build a recorder from RECORD_DIR, or return None when recording is off."""
+        root = os.getenv("RECORD_DIR")
+        return cls(root) if root else None
+
+    def start(self, name=None):
+        """
+        Begin recording a run into root/name.
+
+        Args:
+            name (str): Run directory name; a timestamp when None
+        """
+        name = name or time.strftime("%Y%m%d-%H%M%S")
+        self.directory = os.path.join(self.root, name)
+        os.makedirs(os.path.join(self.directory, FRAMES_DIR), exist_ok=True)
+        self.frames = 0
+        self.responses = 0
+        self.last_frame = None
+        self._started_at = self.clock()
+        return self.directory
+
+    def _append(self, event):
+        if self.directory is None:
+            self.start()
+        event["t"] = round(self.clock() - self._started_at, 3)
+        with open(os.path.join(self.directory, EVENTS_FILE), "a", encoding="utf-8") as f:
+            f.write(json.dumps(event) + "\n")
+
+    def record_frame(self, image):
+        """Save a captured screenshot as the run's next frame."""
+        with self._lock:
+            if self.directory is None:
+                self.start()
+            self.frames += 1
+            file_name = f"frame_{self.frames:06d}.png"
+            # Fast compression: recording must not slow the loop it records much
+            image.save(os.path.join(self.directory, FRAMES_DIR, file_name), compress_level=1)
+            self._append({"type": "frame", "index": self.frames, "file": file_name})
+            self.last_frame = self.frames
+
+    def record_response(self, kwargs, response, latency, frame):
+        """Save a model response together with what was asked."""
+        prompt, image_url = request_parts(kwargs)
+        with self._lock:
+            self.responses += 1
+            self._append(
+                {
+                    "type": "response",
+                    "frame": frame,
+                    "prompt": _digest(prompt),
+                    "image": _digest(image_url),
+                    "latency": round(latency, 3),
+                    "bytes": len(json.dumps(kwargs)),
+                    "text": response_output(response)[0] or "",
+                    "usage": _usage_dict(response),
+                }
+            )
+
+    def summary(self):
+        return f"{self.frames} frames and {self.responses} responses saved to {self.directory}"
+
+
+class _RecordingResponses:
+    def __init__(self, responses, recorder):
+        self._responses = responses
+        self._recorder = recorder
+
+    def create(self, **kwargs):
+        frame = self._recorder.last_frame
+        started = time.monotonic()
+        result = self._responses.create(**kwargs)
+        if inspect.isawaitable(result):
+            return self._finish(result, kwargs, frame, started)
+        self._recorder.record_response(kwargs, result, time.monotonic() - started, frame)
+        return result
+
+    async def _finish(self, pending, kwargs, frame, started):
+        response = await pending
+        self._recorder.record_response(kwargs, response, time.monotonic() - started, frame)
+        return response
+
+
+class RecordingClient:
+    """Wrap an AzureOpenAI or AsyncAzureOpenAI client so responses.create results are recorded."""
+
+    def __init__(self, client, recorder):
+        self._client = client
+        self.responses = _RecordingResponses(client.responses, recorder)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class RecordingClients:
+    """Wrap engine.CuaClients so both the sync and the async client are recorded."""
+
+    def __init__(self, clients, recorder):
+        self._clients = clients
+        self._recorder = recorder
+        self._client = None
+        self._async_client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = RecordingClient(self._clients.client, self._recorder)
+        return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            self._async_client = RecordingClient(self._clients.async_client, self._recorder)
+        return self._async_client
+
+    def __getattr__(self, name):
+        return getattr(self._clients, name)
+
+
+class Recording:
+    """A recorded run loaded from a SessionRecorder directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.frame_times = []
+        self.frame_files = []
+        self.responses = []
+        with open(os.path.join(directory, EVENTS_FILE), "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                if event["type"] == "frame":
+                    self.frame_times.append(event["t"])
+                    self.frame_files.append(event["file"])
+                elif event["type"] == "response":
+                    self.responses.append(event)
+        if not self.frame_files:
+            raise ValueError(f"Recording {directory} has no frames")
+        self._images = {}
+
+    @property
+    def duration(self):
+        return self.frame_times[-1]
+
+    def frame_at(self, seconds):
+        """Return the index (1-based) of the frame on screen `seconds` into the run."""
+        return max(1, bisect.bisect_right(self.frame_times, seconds))
+
+    def image(self, index):
+        """Load a frame, keeping the most recent ones decoded."""
+        if index not in self._images:
+            if len(self._images) >= 8:
+                self._images.pop(next(iter(self._images)))
+            with Image.open(
+                os.path.join(self.directory, FRAMES_DIR, self.frame_files[index - 1])
+            ) as image:
+                self._images[index] = image.convert("RGB")
+        return self._images[index]
+
+    def response_for(self, prompt, image, frame):
+        """
+        Find the recorded response for a request.
+
+        Args:
+            prompt (str): Prompt hash of the request
+            image (str): Encoded-image hash of the request
+            frame (int): Index of the frame on screen when the request was made
+
+        Returns:
+            dict: The response event with the same prompt and image (nearest in
+            frames) if there is one, else the one for the nearest earlier frame
+            (or the earliest), or None
+        """
+        candidates = [event for event in self.responses if event["prompt"] == prompt]
+        if not candidates:
+            return None
+        exact = [event for event in candidates if image is not None and event["image"] == image]
+        if exact:
+            # Identical screens recur (e.g. once generation is done): use the closest in time
+            return min(exact, key=lambda event: abs((event["frame"] or 0) - (frame or 0)))
+        earlier = [event for event in candidates if (event["frame"] or 0) <= (frame or 0)]
+        if earlier:
+            return max(earlier, key=lambda event: (event["frame"] or 0, event["t"]))
+        return min(candidates, key=lambda event: (event["frame"] or 0, event["t"]))
+
+    def first_frame_time(self, prompt, is_done):
+        """
+        Ground truth for detection lag: when the screen first showed the awaited state.
+
+        Args:
+            prompt (str): The full prompt text of the check, e.g. KEEP_BUTTON_PROMPT
+            is_done (callable): is_done(response_text) -> bool
+
+        Returns:
+            float: Seconds into the run of the earliest frame answered as done, or None
+        """
+        digest = _digest(prompt)
+        done = [
+            self.frame_times[event["frame"] - 1]
+            for event in self.responses
+            if event["prompt"] == digest and event["frame"] and is_done(event["text"])
+        ]
+        return min(done) if done else None
+
+
+class VirtualClock:
+    """Clock whose sleep() advances time instantly, for replays faster than real time."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+class ReplayDesktop:
+    """
+    Stand-in for pyautogui that serves a recording's frames by elapsed time.
+
+    screenshot() returns the frame that was on screen at the same point of the
+    recorded run; key presses and mouse moves are logged, not sent.
+    """
+
+    def __init__(self, recording, clock=time.monotonic):
+        self.recording = recording
+        self.clock = clock
+        self.started_at = clock()
+        self.current_frame = None
+        self.screenshots = 0
+        self.actions = []
+
+    @property
+    def elapsed(self):
+        return self.clock() - self.started_at
+
+    def screenshot(self):
+        self.current_frame = self.recording.frame_at(self.elapsed)
+        self.screenshots += 1
+        return self.recording.image(self.current_frame).copy()
+
+    def hotkey(self, *keys):
+        self.actions.append((self.elapsed, "+".join(keys)))
+
+    def press(self, key):
+        self.actions.append((self.elapsed, key))
+
+    def write(self, text, interval=0.0):
+        self.actions.append((self.elapsed, f"write {len(text)} chars"))
+
+    def moveTo(self, x, y, *args, **kwargs):
+        self.actions.append((self.elapsed, f"move {x},{y}"))
+
+    def action_time(self, action):
+        """Seconds into the replay of the first matching action, or None."""
+        for seconds, name in self.actions:
+            if name == action:
+                return seconds
+        return None
+
+
+def make_response(text, usage=None):
+    """Build an object shaped like a Responses API result carrying `text`."""
+    return SimpleNamespace(
+        output=[SimpleNamespace(type="message", content=[SimpleNamespace(type="output_text", text=text)])],
+        usage=SimpleNamespace(**usage) if usage else None,
+    )
+
+
+class ReplayResponses:
+    """
+    Local stub of client.responses.create answering from a recording.
+
+    Each request is matched to a recorded response (see Recording.response_for)
+    and answered after the recorded latency, or `latency` seconds when given.
+    """
+
+    def __init__(self, recording, desktop, sleep=time.sleep, latency=None):
+        self.recording = recording
+        self.desktop = desktop
+        self.sleep = sleep
+        self.latency = latency
+        self.calls = 0
+        self.bytes_uploaded = 0
+        self.unmatched = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def _respond(self, kwargs):
+        prompt, image_url = request_parts(kwargs)
+        self.calls += 1
+        self.bytes_uploaded += len(json.dumps(kwargs))
+
+        event = self.recording.response_for(
+            _digest(prompt), _digest(image_url), self.desktop.current_frame
+        )
+        if event is None:
+            self.unmatched += 1
+            return make_response(""), self.latency or 0.0
+
+        usage = event.get("usage") or {}
+        self.input_tokens += usage.get("input_tokens", 0)
+        self.output_tokens += usage.get("output_tokens", 0)
+        latency = self.latency if self.latency is not None else event["latency"]
+        return make_response(event["text"], event.get("usage")), latency
+
+    def create(self, **kwargs):
+        response, latency = self._respond(kwargs)
+        self.sleep(latency)
+        return response
+
+
+class AsyncReplayResponses(ReplayResponses):
+    """Async variant of ReplayResponses for the pipelined monitor."""
+
+    async def create(self, **kwargs):
+        import asyncio
+
+        response, latency = self._respond(kwargs)
+        await asyncio.sleep(latency)
+        return response
+
+
+class ReplayClients:
+    """
+    Drop-in for engine.CuaClients whose sync and async clients answer from a recording.
+
+    Counters for calls, uploaded bytes and tokens are shared by both clients.
+    """
+
+    def __init__(self, recording, desktop, sleep=time.sleep, latency=None):
+        self.responses = ReplayResponses(recording, desktop, sleep, latency)
+        self.async_responses = AsyncReplayResponses(recording, desktop, sleep, latency)
+        self.client = SimpleNamespace(responses=self.responses)
+        self.async_client = SimpleNamespace(responses=self.async_responses)
+
+    def _total(self, counter):
+        return getattr(self.responses, counter) + getattr(self.async_responses, counter)
+
+    @property
+    def calls(self):
+        return self._total("calls")
+
+    @property
+    def bytes_uploaded(self):
+        return self._total("bytes_uploaded")
+
+    @property
+    def unmatched(self):
+        return self._total("unmatched")
+
+    @property
+    def input_tokens(self):
+        return self._total("input_tokens")
+
+    def warm_up(self):
+        return self.client
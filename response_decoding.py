@@ -0,0 +1,262 @@
+import json
+
+from screen_capture import CaptureSettings
+
+# Why a response did not yield a usable verdict
+FAILURE_REQUEST = "request_error"
+FAILURE_REFUSAL = "refusal"
+FAILURE_NO_TEXT = "no_text"
+FAILURE_NOT_JSON = "not_json"
+FAILURE_MISSING_FIELD = "missing_field"
+FAILURE_UNEXPECTED_VALUE = "unexpected_value"
+
+# Malformed answers are worth re-asking at once; failed requests and refusals wait for the next poll
+REASKABLE_FAILURES = (
+    FAILURE_NO_TEXT,
+    FAILURE_NOT_JSON,
+    FAILURE_MISSING_FIELD,
+    FAILURE_UNEXPECTED_VALUE,
+)
+
+
+class VerdictSchema:
+    """The JSON field a check answers with and the values it may take."""
+
+    def __init__(self, name, field, values, description=None):
+        """
+        Args:
+            name (str): Schema name sent to the API, e.g. "keep_button"
+            field (str): JSON field holding the verdict, e.g. "button"
+            values (tuple): Allowed verdicts, e.g. ("enabled", "disabled"), or (True, False)
+                for a JSON boolean
+            description (str): One line saying what to judge and what each verdict means,
+                repeated in the re-ask so it stands on its own
+        """
+        self.name = name
+        self.field = field
+        self.values = tuple(values)
+        self.description = description
+
+    @property
+    def boolean(self):
+        return set(self.values) == {True, False}
+
+    def normalise(self, value):
+        """
+        Map an answer onto the schema's values: strings are stripped and lower-cased,
+        and for a boolean schema "true"/"false" become booleans and anything else None.
+        """
+        if isinstance(value, str):
+            value = value.strip().strip('"').lower()
+            if self.boolean:
+                return {"true": True, "false": False}.get(value)
+        elif self.boolean and not isinstance(value, bool):
+            return None
+        return value
+
+    def json_schema(self):
+        if self.boolean:
+            value_schema = {"type": "boolean"}
+        else:
+            value_schema = {"type": "string", "enum": list(self.values)}
+        return {
+            "type": "object",
+            "properties": {self.field: value_schema},
+            "required": [self.field],
+            "additionalProperties": False,
+        }
+
+    def text_format(self):
+        """The Responses API `text` parameter constraining the answer to this schema."""
+        return {
+            "format": {
+                "type": "json_schema",
+                "name": self.name,
+                "schema": self.json_schema(),
+                "strict": True,
+            }
+        }
+
+    def reask_prompt(self):
+        """
+        Short follow-up prompt used when the first answer was malformed.
+
+        It is sent without the check's full prompt, so it carries the schema's
+        description of what to look for.
+        """
+        choices = " or ".join(
+            str(value).lower() if self.boolean else f'"{value}"' for value in self.values
+        )
+        lines = ["Look at the screenshot."]
+        if self.description:
+            lines.append(self.description)
+        lines += [
+            "Reply with only this JSON object and no other text:",
+            f'{{"{self.field}": {choices}}}',
+        ]
+        return "\n".join(lines)
+
+
+def boolean_text_format(name, fields):
+    """The Responses API `text` parameter for a JSON object of required boolean fields."""
+    return {
+        "format": {
+            "type": "json_schema",
+            "name": name,
+            "schema": {
+                "type": "object",
+                "properties": {field: {"type": "boolean"} for field in fields},
+                "required": list(fields),
+                "additionalProperties": False,
+            },
+            "strict": True,
+        }
+    }
+
+
+def response_output(response):
+    """
+    Read the text and any refusal from a Responses API result's message items.
+
+    Only the typed output items are walked; nothing is stringified.
+
+    Args:
+        response (Response): Result of client.responses.create
+
+    Returns:
+        tuple: (output text or None, refusal message or None)
+    """
+    texts = []
+    refusal = None
+    for item in getattr(response, "output", None) or []:
+        if getattr(item, "type", "message") != "message":
+            # e.g. a computer_call action instead of an answer
+            continue
+        for content in getattr(item, "content", None) or []:
+            if getattr(content, "type", None) == "refusal":
+                refusal = getattr(content, "refusal", None) or "refused"
+            elif getattr(content, "text", None) is not None:
+                texts.append(content.text)
+    return ("".join(texts) if texts else None), refusal
+
+
+def _strip_code_fence(text):
+    if text.startswith("```"):
+        text = text[3:]
+        if text.startswith("json"):
+            text = text[4:]
+        if text.endswith("```"):
+            text = text[:-3]
+    return text.strip()
+
+
+class DecodedVerdict:
+    """A verdict, or the class of failure that prevented one."""
+
+    def __init__(self, verdict, failure, text, reasked=False):
+        self.verdict = verdict
+        self.failure = failure
+        self.text = text
+        self.reasked = reasked
+
+    @property
+    def ok(self):
+        return self.failure is None
+
+    @property
+    def reaskable(self):
+        return self.failure in REASKABLE_FAILURES
+
+
+def decode_verdict(response, schema, reasked=False):
+    """
+    Decode and validate a check's verdict from a Responses API result.
+
+    Structured-output answers are JSON objects with the schema's field. Plain
+    one-word answers (the pip prompt asks for one) and fenced JSON are accepted
+    when the value is allowed.
+
+    Args:
+        response (Response): Result of client.responses.create
+        schema (VerdictSchema): Field and allowed values
+        reasked (bool): Whether this is the answer to a re-ask
+
+    Returns:
+        DecodedVerdict: The verdict, or its failure class and the raw text
+    """
+    text, refusal = response_output(response)
+    if refusal is not None:
+        return DecodedVerdict(None, FAILURE_REFUSAL, refusal, reasked)
+    if text is None or not text.strip():
+        return DecodedVerdict(None, FAILURE_NO_TEXT, text, reasked)
+
+    cleaned = _strip_code_fence(text.strip())
+    try:
+        data = json.loads(cleaned)
+    except json.JSONDecodeError:
+        word = schema.normalise(cleaned)
+        if word in schema.values:
+            return DecodedVerdict(word, None, text, reasked)
+        return DecodedVerdict(None, FAILURE_NOT_JSON, text, reasked)
+
+    if isinstance(data, dict):
+        if schema.field not in data:
+            return DecodedVerdict(None, FAILURE_MISSING_FIELD, text, reasked)
+        data = data[schema.field]
+    value = schema.normalise(data)
+    if value is None or value not in schema.values:
+        return DecodedVerdict(None, FAILURE_UNEXPECTED_VALUE, text, reasked)
+    return DecodedVerdict(value, None, text, reasked)
+
+
+def reask_settings(settings, max_width=640):
+    """Cheaper capture settings for a re-ask: same region, smaller JPEG."""
+    return CaptureSettings(
+        region=settings.region,
+        max_width=min(settings.max_width or max_width, max_width),
+        image_format="jpeg",
+        quality=70,
+    )
+
+
+class DecodeStats:
+    """Counts of decoded verdicts, failures by class and re-asks."""
+
+    def __init__(self):
+        self.decoded = 0
+        self.failures = {}
+        self.reasks = 0
+        self.recovered = 0
+        self.unusable = 0
+
+    def record_failure(self, failure):
+        self.failures[failure] = self.failures.get(failure, 0) + 1
+
+    def record(self, decoded):
+        """Record the final outcome of one check (after any re-ask)."""
+        if decoded.reasked:
+            self.reasks += 1
+            if decoded.ok:
+                self.recovered += 1
+        if decoded.ok:
+            self.decoded += 1
+        else:
+            self.unusable += 1
+            self.record_failure(decoded.failure)
+
+    def metrics(self):
+        return {
+            "decoded": self.decoded,
+            "reasks": self.reasks,
+            "recovered_by_reask": self.recovered,
+            "unusable": self.unusable,
+            "failures": dict(self.failures),
+        }
+
+    def summary(self):
+        failures = ", ".join(f"{name}={count}" for name, count in sorted(self.failures.items()))
+        return (
+            f"{self.decoded} verdicts decoded, {self.reasks} re-asks "
+            f"({self.recovered} recovered), {self.unusable} unusable"
+            + (f" [{failures}]" if failures else "")
+        )
@@ -0,0 +1,132 @@
+import base64
+import os
+from io import BytesIO
+
+from PIL import Image
+
+from screen_regions import crop_region, region_from_env
+
+# Pillow format name and MIME type for each supported encoding
+IMAGE_FORMATS = {
+    "png": ("PNG", "image/png"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp"),
+}
+
+
+class CaptureSettings:
+    """How a screenshot is cropped, scaled and encoded before it is sent to the CUA model."""
+
+    def __init__(self, region=None, max_width=None, image_format="png", quality=85):
+        """
+        Args:
+            region (tuple): (left, top, right, bottom) screen fractions to keep, or None
+            max_width (int): Downscale the cropped frame to at most this width, or None
+            image_format (str): "png", "jpeg" or "webp"
+            quality (int): Quality for lossy formats (1-100); ignored for PNG
+        """
+        image_format = image_format.lower()
+        if image_format == "jpg":
+            image_format = "jpeg"
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(
+                f"Unsupported image format '{image_format}', expected one of {sorted(IMAGE_FORMATS)}"
+            )
+
+        self.region = region
+        self.max_width = max_width
+        self.image_format = image_format
+        self.quality = quality
+
+    @classmethod
+    def from_env(cls, prefix, default_region=None):
+        """
+        Build settings from environment variables such as PIP_CHECK_REGION,
+        PIP_CHECK_MAX_WIDTH, PIP_CHECK_FORMAT and PIP_CHECK_QUALITY.
+
+        Args:
+            prefix (str): Variable prefix, e.g. "PIP_CHECK" or "KEEP_CHECK"
+            default_region (tuple): Region used when {prefix}_REGION is not set
+
+        Returns:
+            CaptureSettings: The configured settings
+        """
+        max_width = os.getenv(f"{prefix}_MAX_WIDTH")
+        return cls(
+            region=region_from_env(f"{prefix}_REGION", default_region),
+            max_width=int(max_width) if max_width else None,
+            image_format=os.getenv(f"{prefix}_FORMAT", "png"),
+            quality=int(os.getenv(f"{prefix}_QUALITY", "85")),
+        )
+
+    def describe(self):
+        """Return a short human-readable description for logs and benchmarks."""
+        region = "full" if self.region is None else ",".join(f"{v:g}" for v in self.region)
+        width = self.max_width or "native"
+        quality = "" if self.image_format == "png" else f" q{self.quality}"
+        return f"{self.image_format}{quality} region={region} width={width}"
+
+
+class EncodedFrame:
+    """A screenshot ready to be embedded in a CUA request."""
+
+    def __init__(self, base64_image, mime_type, width, height):
+        self.base64_image = base64_image
+        self.mime_type = mime_type
+        self.width = width
+        self.height = height
+
+    @property
+    def data_url(self):
+        return f"data:{self.mime_type};base64,{self.base64_image}"
+
+    @property
+    def payload_bytes(self):
+        return len(self.base64_image)
+
+
+def prepare_frame(screenshot, settings):
+    """
+    Crop and downscale a screenshot according to the capture settings.
+
+    Args:
+        screenshot (PIL.Image.Image): Full screenshot
+        settings (CaptureSettings): Crop and scale settings
+
+    Returns:
+        PIL.Image.Image: The frame that will be encoded
+    """
+    frame = crop_region(screenshot, settings.region)
+
+    if settings.max_width and frame.width > settings.max_width:
+        height = max(1, round(frame.height * settings.max_width / frame.width))
+        frame = frame.resize((settings.max_width, height), Image.LANCZOS)
+
+    return frame
+
+
+def encode_frame(screenshot, settings):
+    """
+    Crop, downscale and encode a screenshot as base64 in the configured format.
+
+    Args:
+        screenshot (PIL.Image.Image): Full screenshot
+        settings (CaptureSettings): Crop, scale and encoding settings
+
+    Returns:
+        EncodedFrame: The encoded frame with its real pixel dimensions
+    """
+    frame = prepare_frame(screenshot, settings)
+    pil_format, mime_type = IMAGE_FORMATS[settings.image_format]
+
+    save_options = {}
+    if settings.image_format != "png":
+        save_options["quality"] = settings.quality
+        if frame.mode not in ("RGB", "L"):
+            frame = frame.convert("RGB")
+
+    img_buffer = BytesIO()
+    frame.save(img_buffer, format=pil_format, **save_options)
+    base64_image = base64.b64encode(img_buffer.getvalue()).decode()
+
+    return EncodedFrame(base64_image, mime_type, frame.width, frame.height)
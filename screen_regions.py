@@ -0,0 +1,85 @@
+import os
+
+# Default regions of interest, as (left, top, right, bottom) fractions of the screen.
+# The integrated terminal sits at the bottom of a maximized VS Code window and the
+# GitHub Copilot chat panel is docked on the right-hand side.
+TERMINAL_REGION = (0.0, 0.55, 1.0, 1.0)
+COPILOT_CHAT_REGION = (0.6, 0.0, 1.0, 1.0)
+
+
+def parse_region(value, default=None):
+    """
+    Parse a region of interest from a "left,top,right,bottom" string of screen fractions.
+
+    Args:
+        value (str): Region string such as "0,0.55,1,1", or None/empty for the default
+        default (tuple): Region returned when value is empty
+
+    Returns:
+        tuple: (left, top, right, bottom) fractions, or default if value is empty
+    """
+    if not value or not value.strip():
+        return default
+
+    parts = [float(part) for part in value.split(",")]
+    if len(parts) != 4:
+        raise ValueError(f"Region must have 4 comma-separated values, got: {value}")
+
+    left, top, right, bottom = parts
+    if not (0.0 <= left < right <= 1.0 and 0.0 <= top < bottom <= 1.0):
+        raise ValueError(f"Region fractions must satisfy 0 <= left < right <= 1: {value}")
+    return (left, top, right, bottom)
+
+
+def region_from_env(name, default=None):
+    """
+    Read a region of interest from an environment variable.
+
+    Args:
+        name (str): Environment variable name, e.g. "PIP_CHECK_REGION"
+        default (tuple): Region used when the variable is not set
+
+    Returns:
+        tuple: (left, top, right, bottom) fractions, or default
+    """
+    return parse_region(os.getenv(name), default)
+
+
+def region_to_box(size, region):
+    """
+    Convert a fractional region into a pixel box for an image of the given size.
+
+    Args:
+        size (tuple): (width, height) of the image in pixels
+        region (tuple): (left, top, right, bottom) fractions, or None for the full image
+
+    Returns:
+        tuple: (left, top, right, bottom) pixel box
+    """
+    width, height = size
+    if region is None:
+        return (0, 0, width, height)
+
+    left, top, right, bottom = region
+    return (
+        round(left * width),
+        round(top * height),
+        max(round(right * width), round(left * width) + 1),
+        max(round(bottom * height), round(top * height) + 1),
+    )
+
+
+def crop_region(image, region):
+    """
+    Crop a PIL image to a fractional region of interest.
+
+    Args:
+        image (PIL.Image.Image): Full screenshot
+        region (tuple): (left, top, right, bottom) fractions, or None to keep the full image
+
+    Returns:
+        PIL.Image.Image: The cropped image (the original image if region is None)
+    """
+    if region is None:
+        return image
+    return image.crop(region_to_box(image.size, region))
@@ -0,0 +1,280 @@
+import time
+
+from cua_requests import create_cua_response
+from response_decoding import VerdictSchema, boolean_text_format, decode_verdict
+from screen_capture import CaptureSettings, encode_frame
+from screen_regions import COPILOT_CHAT_REGION, TERMINAL_REGION
+from tracing import record_usage, span
+
+
+class ScreenQuestion:
+    """One yes/no question about the screen, answered as a JSON boolean field."""
+
+    def __init__(self, field, question, region=None):
+        """
+        Args:
+            field (str): JSON field for the answer, e.g. "keep_enabled"
+            question (str): What the model should decide
+            region (tuple): (left, top, right, bottom) screen fractions the answer is visible in,
+                or None if it is not tied to one part of the screen
+        """
+        self.field = field
+        self.question = question
+        self.region = region
+
+
+SCREEN_QUESTIONS = {
+    question.field: question
+    for question in (
+        ScreenQuestion(
+            "terminal_idle",
+            "The VS Code terminal shows an empty command prompt (like \"PS C:\\path>\") "
+            "waiting for input, with no command such as pip install still running.",
+            TERMINAL_REGION,
+        ),
+        ScreenQuestion(
+            "keep_enabled",
+            "The \"Keep\" button in the GitHub Copilot chat panel is enabled (not grayed out).",
+            COPILOT_CHAT_REGION,
+        ),
+        ScreenQuestion(
+            "copilot_streaming",
+            "GitHub Copilot is still generating or streaming a response in the chat panel.",
+            COPILOT_CHAT_REGION,
+        ),
+        ScreenQuestion(
+            "error_visible",
+            "An error is visible in the terminal or the Copilot chat panel "
+            "(e.g. a Python traceback, \"ERROR:\" from pip, or a failed Copilot request).",
+        ),
+    )
+}
+
+
+def union_region(regions):
+    """
+    Return the smallest region covering all the given regions.
+
+    A question without a region does not widen the crop: batched with
+    regional questions it is answered from their crop, and only questions
+    that all lack a region get the whole screen.
+
+    Args:
+        regions (list): (left, top, right, bottom) fractions; None means no particular region
+
+    Returns:
+        tuple: The covering region, or None for the whole screen
+    """
+    regions = [region for region in regions if region is not None]
+    if not regions:
+        return None
+    return (
+        min(region[0] for region in regions),
+        min(region[1] for region in regions),
+        max(region[2] for region in regions),
+        max(region[3] for region in regions),
+    )
+
+
+def build_screen_state_prompt(questions):
+    """
+    Build one prompt that asks several questions about the same screenshot.
+
+    Args:
+        questions (list): ScreenQuestion objects
+
+    Returns:
+        str: Instructions requesting a JSON object with one boolean per question
+    """
+    lines = [
+        "The image provided as input is a screenshot of Visual Studio Code with GitHub Copilot.",
+        "Answer each question below with true or false, judging only from the screenshot.",
+        "",
+    ]
+    for question in questions:
+        lines.append(f"- {question.field}: {question.question}")
+    lines += [
+        "",
+        "In your response, return only this JSON object:",
+        "{",
+        ",\n".join(f'    "{question.field}": true or false' for question in questions),
+        "}",
+    ]
+    return "\n".join(lines)
+
+
+def parse_screen_state(response, fields, decode_stats=None):
+    """
+    Read the typed answers from the model's JSON reply.
+
+    Each field is decoded and validated like a single check's verdict (see
+    response_decoding.decode_verdict), so a refusal, a reply that is not a JSON
+    object or a field that is missing or not a boolean leaves that field None.
+
+    Args:
+        response (Response): Result of client.responses.create
+        fields (list): Fields that were asked
+        decode_stats (DecodeStats): Optional counts of decoded answers and failures, per field
+
+    Returns:
+        dict: field -> True/False, or None for a field without a usable answer
+    """
+    state = {}
+    for field in fields:
+        decoded = decode_verdict(response, VerdictSchema("screen_state", field, (True, False)))
+        if decode_stats is not None:
+            decode_stats.record(decoded)
+        state[field] = decoded.verdict
+    return state
+
+
+class ScreenStateWaiter:
+    """A monitor waiting on some screen-state fields."""
+
+    def __init__(self, name, fields, on_state):
+        """
+        Args:
+            name (str): Label used in log lines, e.g. "keep"
+            fields (list): Fields the waiter needs answered
+            on_state (callable): on_state(state dict) -> truthy once the waiter is done, or None
+                for a waiter that reads query()'s return value itself
+        """
+        self.name = name
+        self.fields = tuple(fields)
+        self.on_state = on_state
+        self.answers_received = 0
+
+
+class ScreenStateBroker:
+    """
+    Ask every waiting monitor's questions about one frame in a single CUA request.
+
+    Monitors register a ScreenStateWaiter for the fields they need. query() asks
+    the union of those fields about one screenshot, cropped to the union of the
+    questions' regions, and hands the typed answers to each waiter. Waiters whose
+    callback reports done are removed, so the next query only asks what is still
+    needed. When several waits overlap, one request replaces one per wait.
+    """
+
+    def __init__(
+        self,
+        client,
+        model_name,
+        settings=None,
+        questions=None,
+        structured_output=False,
+        budget=None,
+        decode_stats=None,
+    ):
+        """
+        Args:
+            client (AzureOpenAI): Azure OpenAI client
+            model_name (str): CUA model deployment name
+            settings (CaptureSettings): Scaling and format; the region is derived per query
+            questions (dict): field -> ScreenQuestion; SCREEN_QUESTIONS by default
+            structured_output (bool): Constrain answers to a JSON object of booleans via the API
+            budget (TokenBudget): Optional budget that records usage and shrinks frames when low
+            decode_stats (DecodeStats): Optional counts of decoded answers and failures
+        """
+        self.client = client
+        self.model_name = model_name
+        self.settings = settings or CaptureSettings()
+        self.questions = questions or SCREEN_QUESTIONS
+        self.structured_output = structured_output
+        self.budget = budget
+        self.decode_stats = decode_stats
+
+        self.waiters = []
+        self.requests_sent = 0
+        self.answers_dispatched = 0
+        self.request_seconds = 0.0
+
+    def watch(self, name, fields, on_state):
+        """
+        Register a monitor for some fields.
+
+        Returns:
+            ScreenStateWaiter: The registered waiter
+        """
+        unknown = [field for field in fields if field not in self.questions]
+        if unknown:
+            raise ValueError(f"Unknown screen-state fields: {unknown}")
+        waiter = ScreenStateWaiter(name, fields, on_state)
+        self.waiters.append(waiter)
+        return waiter
+
+    def unwatch(self, waiter):
+        if waiter in self.waiters:
+            self.waiters.remove(waiter)
+
+    @property
+    def fields(self):
+        """Fields asked by the next query, in registration order."""
+        fields = []
+        for waiter in self.waiters:
+            fields += [field for field in waiter.fields if field not in fields]
+        return fields
+
+    def query(self, screenshot):
+        """
+        Ask all pending questions about one screenshot and dispatch the answers.
+
+        Args:
+            screenshot (PIL.Image.Image): Full screenshot
+
+        Returns:
+            dict: field -> True/False/None, or None if nothing is being waited on
+        """
+        fields = self.fields
+        if not fields:
+            return None
+
+        questions = [self.questions[field] for field in fields]
+        settings = CaptureSettings(
+            region=union_region(question.region for question in questions),
+            max_width=self.settings.max_width,
+            image_format=self.settings.image_format,
+            quality=self.settings.quality,
+        )
+        if self.budget is not None:
+            settings = self.budget.capture_settings(settings)
+
+        with span("encode", format=settings.image_format):
+            frame = encode_frame(screenshot, settings)
+
+        request_start = time.monotonic()
+        with span("model_call", check="screen_state", bytes=frame.payload_bytes) as current:
+            response = create_cua_response(
+                self.client,
+                self.model_name,
+                build_screen_state_prompt(questions),
+                frame,
+                boolean_text_format("screen_state", fields) if self.structured_output else None,
+            )
+            record_usage(current, response)
+        if self.budget is not None:
+            self.budget.record("screen_state", response)
+        self.request_seconds += time.monotonic() - request_start
+        self.requests_sent += 1
+
+        with span("parse", check="screen_state"):
+            state = parse_screen_state(response, fields, self.decode_stats)
+        print(f"🔍 Screen state: {state}")
+        self.dispatch(state)
+        return state
+
+    def dispatch(self, state):
+        """Hand answers to every waiter and remove the ones that are done."""
+        for waiter in list(self.waiters):
+            answers = {field: state.get(field) for field in waiter.fields}
+            waiter.answers_received += 1
+            self.answers_dispatched += 1
+            if waiter.on_state is not None and waiter.on_state(answers):
+                self.unwatch(waiter)
+
+    def summary(self):
+        mean = self.request_seconds / self.requests_sent if self.requests_sent else 0.0
+        return (
+            f"{self.requests_sent} batched requests ({mean:.2f}s mean), "
+            f"{self.answers_dispatched} answers dispatched to waiters"
+        )
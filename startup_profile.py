@@ -0,0 +1,135 @@
+import os
+import subprocess
+import sys
+import time
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# Dependencies imported only by the stage that needs them, timed one by one
+DEFERRED_IMPORTS = (
+    ("session start", "numpy"),
+    ("launch and keyboard input", "pyautogui"),
+    ("first model call", "openai"),
+    ("token fetch (Azure AD)", "azure.identity"),
+    ("async monitor", "asyncio"),
+)
+
+
+class ImportTiming:
+    """One line of `python -X importtime` output."""
+
+    def __init__(self, name, self_us, cumulative_us, depth):
+        self.name = name
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.depth = depth
+
+    @property
+    def package(self):
+        return self.name.split(".")[0]
+
+
+def parse_importtime(stderr):
+    """
+    Read the timings `python -X importtime` writes to stderr.
+
+    Args:
+        stderr (str): The interpreter's stderr
+
+    Returns:
+        list: ImportTiming per imported module, in the order they finished
+    """
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        # Nested imports are indented by two spaces per level after the separator's space
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        timings.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us), depth))
+    return timings
+
+
+def time_imports(args, env=None):
+    """
+    Run the interpreter under -X importtime.
+
+    Args:
+        args (list): Arguments after `python -X importtime`, e.g. ["-c", "import openai"]
+        env (dict): Environment for the child; os.environ when None
+
+    Returns:
+        tuple: (list of ImportTiming, wall-clock seconds, exit code, stderr)
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    seconds = time.perf_counter() - started
+    return parse_importtime(completed.stderr), seconds, completed.returncode, completed.stderr
+
+
+def by_package(timings):
+    """Self import time in microseconds summed per top-level package, largest first."""
+    totals = {}
+    for timing in timings:
+        totals[timing.package] = totals.get(timing.package, 0) + timing.self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def deferred_import_time(module):
+    """
+    Time importing one deferred dependency in a fresh interpreter.
+
+    Returns:
+        tuple: (milliseconds, None), or (None, reason) when it cannot be imported here
+    """
+    timings, _, returncode, stderr = time_imports(["-c", f"import {module}"])
+    if returncode != 0:
+        last_line = stderr.strip().splitlines()[-1] if stderr.strip() else f"exit code {returncode}"
+        return None, last_line
+    for timing in reversed(timings):
+        if timing.name == module:
+            return timing.cumulative_us / 1000, None
+    return 0.0, None
+
+
+def profile_startup(app_args=(), top=12):
+    """
+    Print where the startup time of app.py goes.
+
+    app.py runs with --check-config (so nothing touches the screen or the
+    network) under -X importtime in a child process; its import time is
+    grouped by top-level package. Each dependency the stages import later is
+    then timed on its own in a fresh interpreter.
+
+    Args:
+        app_args (list): Extra app.py arguments, e.g. ["--project-folder", "..."]
+        top (int): Packages to list
+
+    Returns:
+        int: 0
+    """
+    timings, seconds, returncode, _ = time_imports([APP_PATH, "--check-config"] + list(app_args))
+    total_ms = sum(timing.self_us for timing in timings) / 1000
+    print(
+        f"\n⏱️ app.py --check-config: {seconds * 1000:.0f} ms wall, {total_ms:.0f} ms importing "
+        f"{len(timings)} modules (exit code {returncode})"
+    )
+    print(f"   {'package':<28} {'ms':>8} {'share':>7}")
+    for package, self_us in by_package(timings)[:top]:
+        print(f"   {package:<28} {self_us / 1000:>8.1f} {self_us / 1000 / total_ms:>7.0%}")
+
+    print("\n⏱️ Deferred until the stage that needs them (imported alone):")
+    print(f"   {'module':<16} {'stage':<28} {'ms':>8}")
+    loaded = {timing.name for timing in timings}
+    for stage, module in DEFERRED_IMPORTS:
+        milliseconds, problem = deferred_import_time(module)
+        note = f"{milliseconds:>8.1f}" if problem is None else f"{'-':>8}  ({problem})"
+        if module in loaded:
+            note += "  ⚠️ already imported at startup"
+        print(f"   {module:<16} {stage:<28} {note}")
+    return 0
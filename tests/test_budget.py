@@ -0,0 +1,99 @@
+from budget import LEVEL_LOCAL, LEVEL_NORMAL, LEVEL_SMALL, LEVEL_SPARSE, Spend, TokenBudget
+from replay import VirtualClock, make_response
+from screen_capture import CaptureSettings
+from screen_regions import COPILOT_CHAT_REGION
+
+
+def usage(input_tokens, output_tokens=0):
+    return make_response("{}", {"input_tokens": input_tokens, "output_tokens": output_tokens})
+
+
+def test_spend_is_broken_down_by_stage_and_check():
+    budget = TokenBudget()
+    budget.stage = "install"
+    budget.record("pip", usage(100, 5))
+    budget.stage = "generation"
+    budget.record("keep", usage(200, 10))
+    budget.record("keep_reask", usage(50, 5))
+
+    assert (budget.job.calls, budget.job.tokens) == (3, 370)
+    assert budget.stages["generation"].calls == 2
+    assert budget.checks["keep"].input_tokens == 200
+    assert budget.checks["keep_reask"].output_tokens == 5
+
+
+def test_response_without_usage_counts_a_call_of_zero_tokens():
+    budget = TokenBudget()
+    budget.record("keep", make_response("{}"))
+    assert (budget.job.calls, budget.job.tokens) == (1, 0)
+
+
+def test_cost_only_with_a_price():
+    spend = Spend()
+    spend.add(1_000_000, 500_000)
+    assert spend.cost(None, None) is None
+    assert spend.cost(3.0, 12.0) == 9.0
+    assert spend.to_dict(3.0, 12.0)["cost_usd"] == 9.0
+
+
+def test_monitoring_degrades_in_steps_as_the_job_cap_fills():
+    budget = TokenBudget(job_tokens=1000)
+    settings = CaptureSettings(region=COPILOT_CHAT_REGION, image_format="png")
+
+    budget.record("keep", usage(400))
+    assert budget.level == LEVEL_NORMAL and budget.poll_slowdown == 1.0
+
+    budget.record("keep", usage(200))
+    assert budget.level == LEVEL_SPARSE and budget.poll_slowdown == 2.0
+    assert budget.capture_settings(settings) is settings
+
+    budget.record("keep", usage(200))
+    assert budget.level == LEVEL_SMALL
+    small = budget.capture_settings(settings)
+    assert (small.region, small.image_format, small.max_width) == (COPILOT_CHAT_REGION, "jpeg", 640)
+
+    assert budget.allow_call()
+    budget.record("keep", usage(200))
+    assert budget.level == LEVEL_LOCAL
+    assert not budget.allow_call()
+    assert budget.degraded_calls_skipped == 1
+
+
+def test_call_cap_counts_calls_not_tokens():
+    budget = TokenBudget(job_calls=2)
+    budget.record("keep", usage(1))
+    assert budget.allow_call()
+    budget.record("keep", usage(1))
+    assert not budget.allow_call()
+
+
+def test_new_job_starts_with_a_fresh_job_cap():
+    budget = TokenBudget(job_tokens=100)
+    budget.record("keep", usage(100))
+    assert not budget.allow_call()
+    budget.start_job()
+    assert budget.allow_call()
+    assert budget.job.calls == 0
+
+
+def test_hourly_cap_is_shared_through_the_ledger(tmp_path):
+    clock = VirtualClock()
+    clock.sleep(1000)
+    ledger = str(tmp_path / "ledger.jsonl")
+    first = TokenBudget(hour_tokens=1000, ledger_path=ledger, clock=clock)
+    second = TokenBudget(hour_tokens=1000, ledger_path=ledger, clock=clock)
+
+    first.record("keep", usage(1000))
+    assert not second.allow_call()
+
+    # The spend leaves the window an hour later
+    clock.sleep(3601)
+    assert second.allow_call()
+    assert second.metrics()["last_hour"] == {"calls": 0, "tokens": 0}
+
+
+def test_ledger_ignores_damaged_lines(tmp_path):
+    ledger = tmp_path / "ledger.jsonl"
+    ledger.write_text('{"t": 10, "tokens": 300}\nnot json\n{"t": 10}\n')
+    budget = TokenBudget(hour_tokens=1000, ledger_path=str(ledger), clock=lambda: 20.0)
+    assert budget.used_fraction() == 0.3
@@ -0,0 +1,190 @@
+import email.utils
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from openai import BadRequestError, InternalServerError, RateLimitError
+
+from cua_gateway import CuaGateway, TokenBucket, retry_after_seconds
+from replay import VirtualClock
+
+
+class ErrorWithResponse(Exception):
+    def __init__(self, response):
+        super().__init__("rate limited")
+        self.response = response
+
+
+def error_with_headers(headers):
+    return ErrorWithResponse(SimpleNamespace(headers=headers))
+
+
+def test_bucket_allows_a_burst_then_spaces_requests():
+    clock = VirtualClock()
+    bucket = TokenBucket(rate=2.0, capacity=2.0, clock=clock)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    # Concurrent callers queue one interval apart
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_bucket_refills_up_to_capacity():
+    clock = VirtualClock()
+    bucket = TokenBucket(rate=1.0, capacity=2.0, clock=clock)
+    bucket.reserve()
+    bucket.reserve()
+    clock.sleep(10)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_default_capacity_is_one_second_of_tokens():
+    assert TokenBucket(rate=5.0, clock=VirtualClock()).capacity == 5.0
+    assert TokenBucket(rate=0.5, clock=VirtualClock()).capacity == 1.0
+
+
+def test_drain_delays_the_next_token():
+    clock = VirtualClock()
+    bucket = TokenBucket(rate=1.0, capacity=5.0, clock=clock)
+    bucket.drain(3.0)
+    assert bucket.reserve() == pytest.approx(4.0)
+
+
+def test_retry_after_prefers_milliseconds():
+    error = error_with_headers({"retry-after-ms": "1500", "retry-after": "7"})
+    assert retry_after_seconds(error) == pytest.approx(1.5)
+
+
+def test_retry_after_seconds_and_http_date():
+    assert retry_after_seconds(error_with_headers({"retry-after": "7"})) == 7.0
+    date = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert retry_after_seconds(error_with_headers({"retry-after": date})) == pytest.approx(30, abs=2)
+
+
+def test_retry_after_missing_or_unparseable():
+    assert retry_after_seconds(Exception("no response")) is None
+    assert retry_after_seconds(error_with_headers({})) is None
+    assert retry_after_seconds(error_with_headers({"retry-after": "soon"})) is None
+
+
+def status_error(error_class, status, headers=None):
+    response = SimpleNamespace(status_code=status, headers=headers or {}, request=None)
+    return error_class("refused", response=response, body=None)
+
+
+class FlakyCreate:
+    """responses.create that raises the given errors, then answers."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "response"
+
+
+def gateway(clock, **kwargs):
+    kwargs.setdefault("jitter", lambda: 0.0)
+    return CuaGateway(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_rate_limit_is_retried_after_its_retry_after():
+    clock = VirtualClock()
+    create = FlakyCreate(status_error(RateLimitError, 429, {"retry-after": "2"}))
+    cua = gateway(clock)
+    assert cua.create(create, {"model": "cua"}) == "response"
+    assert create.calls == 2
+    assert clock.now == pytest.approx(2.0)
+    assert (cua.stats.rate_limited, cua.stats.retries) == (1, 1)
+
+
+def test_backoff_doubles_without_retry_after():
+    clock = VirtualClock()
+    create = FlakyCreate(
+        status_error(InternalServerError, 500), status_error(InternalServerError, 500)
+    )
+    cua = gateway(clock, base_delay=0.5, jitter=lambda: 1.0)
+    cua.create(create, {"model": "cua"})
+    assert clock.now == pytest.approx(0.5 + 1.0)
+    assert cua.stats.server_errors == 2
+
+
+def test_client_errors_are_not_retried():
+    create = FlakyCreate(status_error(BadRequestError, 400))
+    cua = gateway(VirtualClock())
+    with pytest.raises(BadRequestError):
+        cua.create(create, {"model": "cua"})
+    assert create.calls == 1
+    assert cua.stats.failures == 1
+
+
+def test_error_is_raised_after_max_retries():
+    create = FlakyCreate(*[status_error(InternalServerError, 500)] * 5)
+    cua = gateway(VirtualClock(), max_retries=2)
+    with pytest.raises(InternalServerError):
+        cua.create(create, {"model": "cua"})
+    assert create.calls == 3
+
+
+def test_requests_are_paced_per_deployment():
+    clock = VirtualClock()
+    cua = gateway(clock, requests_per_minute=60, burst=1)
+    create = FlakyCreate()
+    for _ in range(3):
+        cua.create(create, {"model": "cua", "input": clock.now})
+    assert clock.now == pytest.approx(2.0)
+    cua.create(create, {"model": "other"})
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_retry_after_pauses_other_processes(tmp_path):
+    path = str(tmp_path / "pauses.json")
+    create = FlakyCreate(status_error(RateLimitError, 429, {"retry-after": "30"}))
+    gateway(VirtualClock(), pause_path=path).create(create, {"model": "cua"})
+
+    other = gateway(VirtualClock(), pause_path=path)
+    assert other._shared_pause("cua") == pytest.approx(30, abs=2)
+    assert other._shared_pause("other") == 0.0
+
+
+def test_identical_concurrent_requests_share_one_call():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        started.set()
+        release.wait(5)
+        return "response"
+
+    cua = CuaGateway()
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cua.create(create, {"model": "cua"})))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(cua.create(create, {"model": "cua"})))
+    follower.start()
+    while cua.stats.requests < 2:
+        time.sleep(0.01)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert results == ["response", "response"]
+    assert len(calls) == 1
+    assert cua.stats.coalesced == 1
+
+
+def test_streamed_requests_are_never_shared():
+    create = FlakyCreate()
+    cua = CuaGateway()
+    cua.create(create, {"model": "cua", "stream": True})
+    cua.create(create, {"model": "cua", "stream": True})
+    assert create.calls == 2
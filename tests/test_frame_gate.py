@@ -0,0 +1,69 @@
+from PIL import Image, ImageDraw
+
+from frame_gate import FrameChangeGate
+
+SIZE = (400, 200)
+
+
+def screen(button=(60, 60, 60), cursor=False):
+    image = Image.new("RGB", SIZE, (30, 30, 30))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((300, 150, 380, 180), fill=button)
+    if cursor:
+        draw.rectangle((20, 20, 21, 30), fill=(220, 220, 220))
+    return image
+
+
+def test_first_frame_is_always_sent():
+    gate = FrameChangeGate("keep")
+    assert gate.should_send(screen())
+    assert gate.frames_sent == 1
+
+
+def test_unchanged_frame_reuses_the_verdict():
+    gate = FrameChangeGate("keep")
+    assert gate.should_send(screen())
+    gate.record_verdict("disabled")
+    assert not gate.should_send(screen(cursor=True))
+    assert gate.last_verdict == "disabled"
+    assert gate.frames_skipped == 1
+
+
+def test_changed_frame_is_sent():
+    gate = FrameChangeGate("keep")
+    gate.should_send(screen())
+    gate.record_verdict("disabled")
+    assert gate.should_send(screen(button=(0, 120, 212)))
+
+
+def test_no_skip_before_a_verdict_was_recorded():
+    gate = FrameChangeGate("keep")
+    gate.should_send(screen())
+    assert gate.should_send(screen())
+
+
+def test_change_outside_the_region_is_ignored():
+    gate = FrameChangeGate("keep", region=(0.5, 0.5, 1.0, 1.0))
+    gate.should_send(screen())
+    gate.record_verdict("disabled")
+    image = screen()
+    ImageDraw.Draw(image).rectangle((0, 0, 150, 80), fill=(255, 255, 255))
+    assert not gate.should_send(image)
+    assert gate.should_send(screen(button=(0, 120, 212)))
+
+
+def test_skips_are_capped():
+    gate = FrameChangeGate("keep", max_consecutive_skips=2)
+    gate.should_send(screen())
+    gate.record_verdict("disabled")
+    assert [gate.should_send(screen()) for _ in range(3)] == [False, False, True]
+
+
+def test_reset_forgets_the_reference():
+    gate = FrameChangeGate("keep")
+    gate.should_send(screen())
+    gate.record_verdict("disabled")
+    gate.reset()
+    assert gate.last_verdict is None
+    assert gate.should_send(screen())
+    assert "2 frames sent, 0 skipped" in gate.summary()
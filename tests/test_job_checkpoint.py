@@ -0,0 +1,93 @@
+from job_checkpoint import JobCheckpoint, text_digest
+
+PROMPT = "add a script that prints hello"
+REQUIREMENTS_SHA = text_digest("numpy\n")
+
+
+def checkpoint(tmp_path, prompt=PROMPT, resume=True):
+    return JobCheckpoint(str(tmp_path / "job.json"), str(tmp_path), prompt, resume=resume)
+
+
+def interrupted_after(tmp_path, *stages):
+    first = checkpoint(tmp_path)
+    for stage in stages:
+        first.complete(stage, 5.0)
+    first.finish(False)
+    return checkpoint(tmp_path)
+
+
+def test_new_job_resumes_nothing(tmp_path):
+    job = checkpoint(tmp_path)
+    assert not job.resuming
+    assert job.resumable_stages(window_open=True) == {}
+
+
+def test_open_window_skips_launch_and_terminal(tmp_path):
+    retry = interrupted_after(tmp_path, "launch", "open_terminal", "install_requirements")
+    assert retry.resuming
+    assert retry.attempt == 2
+    assert set(retry.resumable_stages(window_open=True)) == {"launch", "open_terminal"}
+
+
+def test_closed_window_resumes_nothing(tmp_path):
+    retry = interrupted_after(tmp_path, "launch", "open_terminal", "send_prompt")
+    assert retry.resumable_stages(window_open=False) == {}
+
+
+def test_pending_install_reopens_the_terminal(tmp_path):
+    retry = interrupted_after(tmp_path, "launch", "open_terminal")
+    assert set(retry.resumable_stages(window_open=True, install_pending=True)) == {"launch"}
+
+
+def test_sent_prompt_skips_copilot_and_prompt(tmp_path):
+    retry = interrupted_after(
+        tmp_path, "launch", "open_terminal", "install_requirements", "open_copilot", "send_prompt"
+    )
+    assert set(retry.resumable_stages(window_open=True)) == {
+        "launch",
+        "open_terminal",
+        "open_copilot",
+        "send_prompt",
+    }
+
+
+def test_completed_job_or_new_prompt_starts_over(tmp_path):
+    first = checkpoint(tmp_path)
+    first.complete("launch", 5.0)
+    first.finish(True)
+    assert not checkpoint(tmp_path).resuming
+
+    retry = interrupted_after(tmp_path, "launch")
+    assert retry.resuming
+    assert not checkpoint(tmp_path, prompt="something else").resuming
+
+
+def test_installed_matches_requirements_and_pip(tmp_path):
+    first = checkpoint(tmp_path)
+    assert not first.installed(REQUIREMENTS_SHA, "pip")
+    first.record_install(REQUIREMENTS_SHA, "pip", 42.0)
+
+    later = checkpoint(tmp_path)
+    assert later.installed(REQUIREMENTS_SHA, "pip")
+    assert not later.installed(text_digest("numpy\nrequests\n"), "pip")
+    assert not later.installed(REQUIREMENTS_SHA, "pip3")
+    assert later.install["seconds"] == 42.0
+
+
+def test_record_mode_never_skips(tmp_path):
+    first = checkpoint(tmp_path)
+    first.complete("launch", 5.0)
+    first.record_install(REQUIREMENTS_SHA, "pip", 42.0)
+    first.finish(False)
+
+    recording = checkpoint(tmp_path, resume=False)
+    assert not recording.resuming
+    assert recording.resumable_stages(window_open=True) == {}
+    assert not recording.installed(REQUIREMENTS_SHA, "pip")
+
+
+def test_skip_counts_the_previous_duration(tmp_path):
+    retry = interrupted_after(tmp_path, "launch")
+    retry.skip("launch", "window still open")
+    assert retry.skipped == ["launch"]
+    assert retry.seconds_saved == 5.0
@@ -0,0 +1,108 @@
+import sys
+
+import engine
+from engine import AutomationConfig, AutomationSession
+from orchestrator import ExistingDisplay, Job, JobResult, Orchestrator, summarize
+
+
+def result(job_id, succeeded=True, duration=60.0, error=None, worker=1):
+    details = {"keep_button_found": succeeded}
+    exit_code = 0 if succeeded else 1
+    return JobResult(Job(job_id, "/tmp", "prompt"), worker, ":1", exit_code, duration, details, error, None)
+
+
+def test_rate_counts_only_succeeded_jobs():
+    results = [result("a"), result("b"), result("c", succeeded=False)]
+    summary = summarize(results, 3600.0, 2)
+    assert "3 jobs on 2 workers in 3600.0s (2.0 succeeded jobs/hour)" in summary
+    assert "✅ 2 succeeded, ❌ 1 failed" in summary
+
+
+def test_no_rate_when_nothing_succeeded():
+    results = [
+        JobResult(Job(f"job{index}", "/tmp", "prompt"), None, None, None, 0.0, {}, "no worker available", None)
+        for index in range(8)
+    ]
+    summary = summarize(results, 0.0001, 4)
+    assert "jobs/hour" not in summary
+    assert "✅ 0 succeeded, ❌ 8 failed" in summary
+    assert "job0: no worker available" in summary
+
+
+def test_no_rate_for_a_near_zero_wall_time():
+    summary = summarize([result("a", duration=0.01)], 0.01, 1)
+    assert "jobs/hour" not in summary
+
+
+def test_failed_job_without_error_reports_missing_keep_button():
+    summary = summarize([result("a", succeeded=False)], 120.0, 1)
+    assert "a: Keep button not detected" in summary
+    assert "⏱️ per job: mean 60.0s, median 60.0s, max 60.0s" in summary
+
+
+WORKER = """
+import json, os, time
+time.sleep(0.5)
+with open(os.environ["JOB_RESULT_PATH"], "w") as f:
+    json.dump({"keep_button_found": True, "user_data_dir": os.environ["VSCODE_USER_DATA_DIR"]}, f)
+"""
+
+
+class FakeCodeCli:
+    """Stands in for subprocess.Popen running the code CLI: a folder opened on a user data
+    dir that already has a running instance is handed to that instance's window."""
+
+    def __init__(self):
+        self.windows = {}
+
+    def __call__(self, command, shell=False):
+        user_data_dir = None
+        if "--user-data-dir" in command:
+            user_data_dir = command[command.index("--user-data-dir") + 1]
+        self.windows.setdefault(user_data_dir, []).append(command[-1])
+
+
+def launch_all(monkeypatch, tmp_path, user_data_dirs):
+    code = FakeCodeCli()
+    monkeypatch.setattr(engine.subprocess, "Popen", code)
+    for index, user_data_dir in enumerate(user_data_dirs):
+        config = AutomationConfig(
+            project_folder=str(tmp_path / f"project{index}"), user_data_dir=user_data_dir
+        )
+        session = AutomationSession(config, clients=object(), desktop=object())
+        session._wait_for_window = lambda *args, **kwargs: None
+        session.maximize_window = lambda: None
+        session.launch("code")
+    return code.windows
+
+
+def test_each_worker_gets_its_own_user_data_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("AUTOMATION_STATE_DIR", str(tmp_path / "state"))
+    orchestrator = Orchestrator(
+        [ExistingDisplay(":1"), ExistingDisplay(":2")],
+        str(tmp_path / "out"),
+        worker_command=[sys.executable, "-c", WORKER],
+    )
+    results, _ = orchestrator.run([Job(f"job{index}", str(tmp_path), "prompt") for index in range(4)])
+
+    assert all(result.succeeded for result in results)
+    by_worker = {}
+    for result in results:
+        by_worker.setdefault(result.worker, set()).add(result.details["user_data_dir"])
+    assert sorted(by_worker) == [1, 2]
+    assert all(len(dirs) == 1 for dirs in by_worker.values())
+    assert by_worker[1] != by_worker[2]
+
+
+def test_two_workers_open_two_separate_windows(monkeypatch, tmp_path):
+    monkeypatch.setenv("AUTOMATION_STATE_DIR", str(tmp_path / "state"))
+    windows = launch_all(monkeypatch, tmp_path, [str(tmp_path / "worker1"), str(tmp_path / "worker2")])
+    assert len(windows) == 2
+    assert all(len(folders) == 1 for folders in windows.values())
+
+
+def test_shared_user_data_dir_reuses_one_window(monkeypatch, tmp_path):
+    monkeypatch.setenv("AUTOMATION_STATE_DIR", str(tmp_path / "state"))
+    windows = launch_all(monkeypatch, tmp_path, [None, None])
+    assert list(windows) == [None]
+    assert len(windows[None]) == 2
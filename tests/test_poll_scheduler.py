@@ -0,0 +1,101 @@
+import pytest
+
+from poll_scheduler import DurationHistory, PollScheduler
+from replay import VirtualClock
+
+
+def scheduler(clock, timeout=60.0, history=None, pace=None):
+    return PollScheduler(
+        "wait",
+        timeout,
+        min_interval=1.0,
+        max_interval=10.0,
+        backoff=2.0,
+        history=history,
+        pace=pace,
+        clock=clock,
+        sleep=clock.sleep,
+    ).start()
+
+
+def history_with(tmp_path, *durations):
+    history = DurationHistory(str(tmp_path / "history.json"))
+    for seconds in durations:
+        history.record("wait", seconds)
+    return history
+
+
+def test_backs_off_without_history():
+    clock = VirtualClock()
+    polls = scheduler(clock)
+    assert [polls.next_delay() for _ in range(6)] == [1.0, 2.0, 4.0, 8.0, 10.0, 10.0]
+
+
+def test_never_sleeps_past_the_deadline():
+    clock = VirtualClock()
+    polls = scheduler(clock, timeout=5.0)
+    times = []
+    while polls.wait():
+        times.append(clock.now)
+    assert times[-1] == pytest.approx(5.0)
+    assert not polls.wait()
+
+
+def test_expected_needs_three_samples(tmp_path):
+    assert history_with(tmp_path, 30, 32).expected("wait") is None
+    center, spread = history_with(tmp_path, 20, 30, 40).expected("wait")
+    assert center == 30
+    assert spread == pytest.approx(14.826)
+    # A tight history still gets a spread of 10% of the median
+    assert history_with(tmp_path, 30, 30, 31).expected("wait") == (30, 3.0)
+
+
+def test_history_keeps_the_latest_samples(tmp_path):
+    history = DurationHistory(str(tmp_path / "history.json"), max_samples=2)
+    for seconds in (1, 2, 3):
+        history.record("wait", seconds)
+    history.save()
+    assert DurationHistory(history.path).samples == {"wait": [2, 3]}
+
+
+def test_polls_densely_around_the_expected_time(tmp_path):
+    clock = VirtualClock()
+    polls = scheduler(clock, history=history_with(tmp_path, 30, 30, 30))
+    # Spread is 10% of 30s, so the dense window is 27-33s
+    assert polls.next_delay() == 10.0
+    clock.sleep(26.5)
+    assert polls.next_delay() == 1.0
+    clock.sleep(10)
+    assert polls.next_delay() == 1.0
+    assert polls.next_delay() == 2.0
+
+
+def test_pace_stretches_delays():
+    clock = VirtualClock()
+    assert scheduler(clock, pace=lambda: 3.0).next_delay() == 3.0
+    assert scheduler(clock, pace=lambda: 0.5).next_delay() == 1.0
+
+
+def test_expedite_makes_the_next_poll_due():
+    clock = VirtualClock()
+    polls = scheduler(clock)
+    polls.expedite()
+    assert polls.next_delay() == 0.0
+    polls.mark_poll()
+    assert polls.next_delay() == 1.0
+
+
+def test_poll_records_the_midpoint_of_the_last_two_polls(tmp_path):
+    clock = VirtualClock()
+    history = history_with(tmp_path)
+    polls = scheduler(clock, history=history)
+    result = polls.poll(lambda: clock.now >= 6 and "done")
+    assert result == "done"
+    # Polls at 1, 3 and 7 seconds: the condition became true between 3 and 7
+    assert history.samples["wait"] == [5.0]
+
+
+def test_poll_gives_up_at_the_timeout():
+    clock = VirtualClock()
+    assert scheduler(clock, timeout=3.0).poll(lambda: False) is None
+    assert clock.now == pytest.approx(3.0)
@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+from replay import make_response
+from response_decoding import (
+    FAILURE_MISSING_FIELD,
+    FAILURE_NO_TEXT,
+    FAILURE_NOT_JSON,
+    FAILURE_REFUSAL,
+    FAILURE_UNEXPECTED_VALUE,
+    DecodeStats,
+    VerdictSchema,
+    decode_verdict,
+)
+
+SCHEMA = VerdictSchema(
+    "keep_button",
+    "button",
+    ("enabled", "disabled"),
+    'Decide whether the "Keep" button is enabled ("enabled") or grayed out ("disabled").',
+)
+
+
+def refusal_response(message):
+    content = SimpleNamespace(type="refusal", refusal=message)
+    return SimpleNamespace(output=[SimpleNamespace(type="message", content=[content])])
+
+
+def test_json_schema_allows_only_the_verdicts():
+    schema = SCHEMA.json_schema()
+    assert schema["properties"]["button"]["enum"] == ["enabled", "disabled"]
+    assert schema["required"] == ["button"]
+    assert schema["additionalProperties"] is False
+    assert SCHEMA.text_format()["format"]["strict"] is True
+
+
+def test_reask_prompt_names_the_target_and_the_answer_format():
+    prompt = SCHEMA.reask_prompt()
+    assert '"Keep" button' in prompt
+    assert '{"button": "enabled" or "disabled"}' in prompt
+
+
+def test_reask_prompt_without_description_still_asks_for_the_field():
+    prompt = VerdictSchema("pip_install", "installation_status", ("complete", "in_progress")).reask_prompt()
+    assert '{"installation_status": "complete" or "in_progress"}' in prompt
+
+
+def test_decodes_structured_answer():
+    decoded = decode_verdict(make_response('{"button": "enabled"}'), SCHEMA)
+    assert decoded.ok
+    assert decoded.verdict == "enabled"
+
+
+def test_decodes_fenced_json_and_normalises_case():
+    decoded = decode_verdict(make_response('```json\n{"button": " Disabled "}\n```'), SCHEMA)
+    assert decoded.verdict == "disabled"
+
+
+def test_accepts_a_plain_allowed_word():
+    decoded = decode_verdict(make_response('"enabled"'), SCHEMA, reasked=True)
+    assert decoded.verdict == "enabled"
+    assert decoded.reasked
+
+
+def test_classifies_malformed_answers():
+    cases = {
+        "": FAILURE_NO_TEXT,
+        "The Keep button appears to be enabled.": FAILURE_NOT_JSON,
+        '{"status": "enabled"}': FAILURE_MISSING_FIELD,
+        '{"button": "greyed out"}': FAILURE_UNEXPECTED_VALUE,
+    }
+    for text, failure in cases.items():
+        decoded = decode_verdict(make_response(text), SCHEMA)
+        assert decoded.verdict is None
+        assert decoded.failure == failure
+        assert decoded.reaskable
+
+
+def test_refusal_is_not_reasked():
+    decoded = decode_verdict(refusal_response("I can't help with that."), SCHEMA)
+    assert decoded.failure == FAILURE_REFUSAL
+    assert not decoded.reaskable
+
+
+def test_decode_stats_count_reasks_and_failures():
+    stats = DecodeStats()
+    stats.record(decode_verdict(make_response('{"button": "enabled"}'), SCHEMA))
+    stats.record_failure(FAILURE_NOT_JSON)
+    stats.record(decode_verdict(make_response('{"button": "disabled"}'), SCHEMA, reasked=True))
+    stats.record(decode_verdict(make_response("maybe"), SCHEMA, reasked=True))
+
+    assert stats.metrics() == {
+        "decoded": 2,
+        "reasks": 2,
+        "recovered_by_reask": 1,
+        "unusable": 1,
+        "failures": {FAILURE_NOT_JSON: 2},
+    }
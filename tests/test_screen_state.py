@@ -0,0 +1,78 @@
+from engine import AutomationSession
+from replay import make_response
+from response_decoding import DecodeStats
+from screen_regions import COPILOT_CHAT_REGION, TERMINAL_REGION
+from screen_state import SCREEN_QUESTIONS, parse_screen_state, union_region
+
+
+def test_union_covers_every_region():
+    assert union_region([(0.1, 0.5, 0.4, 0.9), (0.3, 0.2, 0.8, 0.6)]) == (0.1, 0.2, 0.8, 0.9)
+
+
+def test_single_region_is_kept():
+    assert union_region([TERMINAL_REGION]) == TERMINAL_REGION
+
+
+def test_question_without_region_does_not_widen_the_crop():
+    assert union_region([COPILOT_CHAT_REGION, None]) == COPILOT_CHAT_REGION
+
+
+def test_whole_screen_only_when_no_question_has_a_region():
+    assert union_region([None, None]) is None
+    assert union_region([]) is None
+    assert union_region(iter([])) is None
+
+
+def test_decision_questions_have_regions():
+    assert SCREEN_QUESTIONS["terminal_idle"].region == TERMINAL_REGION
+    assert SCREEN_QUESTIONS["keep_enabled"].region == COPILOT_CHAT_REGION
+
+
+def test_parse_screen_state_reads_booleans_only():
+    stats = DecodeStats()
+    state = parse_screen_state(
+        make_response('{"terminal_idle": true, "keep_enabled": "False", "error_visible": "maybe"}'),
+        ["terminal_idle", "keep_enabled", "error_visible", "copilot_streaming"],
+        stats,
+    )
+    assert state == {
+        "terminal_idle": True,
+        "keep_enabled": False,
+        "error_visible": None,
+        "copilot_streaming": None,
+    }
+    assert stats.decoded == 2
+    assert stats.failures == {"unexpected_value": 1, "missing_field": 1}
+
+
+def test_parse_screen_state_does_not_slice_json_out_of_prose():
+    state = parse_screen_state(make_response('Here you go: {"terminal_idle": true}'), ["terminal_idle"])
+    assert state == {"terminal_idle": None}
+
+
+def test_parse_screen_state_accepts_fenced_json():
+    response = make_response('```json\n{"keep_enabled": true, "error_visible": false}\n```')
+    assert parse_screen_state(response, ["keep_enabled", "error_visible"]) == {
+        "keep_enabled": True,
+        "error_visible": False,
+    }
+
+
+def test_pip_wait_reports_errors_but_completes_on_idle():
+    assert AutomationSession._pip_state_verdict({"terminal_idle": None, "error_visible": True}) is None
+    assert AutomationSession._pip_state_verdict({"terminal_idle": False, "error_visible": True}) == "in_progress"
+    assert AutomationSession._pip_state_verdict({"terminal_idle": True, "error_visible": True}) == "complete"
+
+
+def test_keep_wait_fails_only_on_an_error_after_streaming_stopped():
+    def verdict(keep, streaming, error):
+        return AutomationSession._keep_state_verdict(
+            {"keep_enabled": keep, "copilot_streaming": streaming, "error_visible": error}
+        )
+
+    assert verdict(True, False, True) == "enabled"
+    assert verdict(False, False, True) == "failed"
+    assert verdict(False, True, True) == "disabled"
+    assert verdict(False, None, True) == "disabled"
+    assert verdict(False, False, False) == "disabled"
+    assert verdict(None, False, True) is None
@@ -0,0 +1,126 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from automation_state import lock_abandoned, process_alive
+from replay import VirtualClock
+from token_cache import CachedToken, TokenCache
+
+SCOPE = "https://cognitiveservices.azure.com/.default"
+
+
+class FakeTokenIssuer:
+    """Credential issuing numbered tokens that live `lifetime` seconds."""
+
+    def __init__(self, lifetime=3600, clock=time.time):
+        self.lifetime = lifetime
+        self.clock = clock
+        self.issued = 0
+
+    def get_token(self, *scopes):
+        self.issued += 1
+        return CachedToken(f"token-{self.issued}", self.clock() + self.lifetime)
+
+
+def exited_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_token_is_fetched_once_and_then_served_from_memory():
+    issuer = FakeTokenIssuer()
+    cache = TokenCache(SCOPE, credential=issuer)
+    assert cache() == "token-1"
+    assert cache() == "token-1"
+    assert issuer.issued == 1
+    assert (cache.fetches, cache.memory_hits) == (1, 1)
+
+
+def test_second_process_takes_the_token_from_the_shared_file(tmp_path):
+    path = str(tmp_path / "token.json")
+    first = FakeTokenIssuer()
+    second = FakeTokenIssuer()
+    assert TokenCache(SCOPE, credential=first, path=path)() == "token-1"
+
+    other = TokenCache(SCOPE, credential=second, path=path)
+    assert other() == "token-1"
+    assert second.issued == 0
+    assert other.shared_hits == 1
+
+
+def test_shared_file_is_readable_by_the_owner_only(tmp_path):
+    path = tmp_path / "token.json"
+    TokenCache(SCOPE, credential=FakeTokenIssuer(), path=str(path))()
+    if sys.platform != "win32":
+        assert path.stat().st_mode & 0o777 == 0o600
+    assert json.loads(path.read_text())["token"] == "token-1"
+
+
+def test_token_below_min_validity_is_replaced_before_returning():
+    clock = VirtualClock()
+    issuer = FakeTokenIssuer(lifetime=600, clock=clock)
+    cache = TokenCache(SCOPE, credential=issuer, refresh_before=120, min_validity=60, clock=clock)
+    cache()
+    clock.sleep(550)
+    assert cache() == "token-2"
+
+
+def test_token_near_expiry_is_refreshed_in_the_background():
+    clock = VirtualClock()
+    issuer = FakeTokenIssuer(lifetime=600, clock=clock)
+    cache = TokenCache(SCOPE, credential=issuer, refresh_before=120, min_validity=60, clock=clock)
+    cache()
+    clock.sleep(500)
+    # Still valid for 100s: handed out while the refresh runs
+    assert cache() == "token-1"
+    assert wait_for(lambda: cache.background_refreshes == 1)
+    assert cache() == "token-2"
+
+
+def test_lock_of_an_exited_process_is_broken(tmp_path):
+    path = str(tmp_path / "token.json")
+    with open(path + ".lock", "w") as f:
+        json.dump({"pid": exited_pid(), "created": time.time()}, f)
+
+    cache = TokenCache(SCOPE, credential=FakeTokenIssuer(), path=path)
+    started = time.monotonic()
+    assert cache() == "token-1"
+    assert time.monotonic() - started < 5
+    assert not os.path.exists(path + ".lock")
+
+
+def test_lock_of_a_running_process_is_left_in_place(tmp_path):
+    path = str(tmp_path / "token.json")
+    lock_path = path + ".lock"
+    with open(lock_path, "w") as f:
+        json.dump({"pid": os.getpid(), "created": time.time() - 3600}, f)
+
+    cache = TokenCache(SCOPE, credential=FakeTokenIssuer(), path=path)
+    with cache._locked(timeout=0.2):
+        pass
+    assert os.path.exists(lock_path)
+
+
+def test_ownerless_lock_is_abandoned_only_once_old(tmp_path):
+    lock_path = str(tmp_path / "token.json.lock")
+    open(lock_path, "w").close()
+    assert not lock_abandoned(lock_path, timeout=30)
+    old = time.time() - 60
+    os.utime(lock_path, (old, old))
+    assert lock_abandoned(lock_path, timeout=30)
+    assert not lock_abandoned(str(tmp_path / "missing.lock"), timeout=30)
+
+
+def test_process_alive():
+    assert process_alive(os.getpid())
+    assert not process_alive(exited_pid())
@@ -0,0 +1,100 @@
+from PIL import Image, ImageDraw
+
+from verdict_cache import VerdictCache, perceptual_hash, prompt_id
+
+SIZE = (320, 180)
+REGION = (0.5, 0.0, 1.0, 1.0)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def screen(button=(128, 128, 128), spinner=None):
+    image = Image.new("RGB", SIZE, (40, 40, 40))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((240, 140, 300, 160), fill=button)
+    if spinner is not None:
+        draw.point(spinner, fill=(200, 200, 200))
+    return image
+
+
+def test_identical_screens_hash_the_same():
+    assert perceptual_hash(screen(), REGION) == perceptual_hash(screen(), REGION)
+
+
+def test_button_colour_change_changes_the_hash():
+    assert perceptual_hash(screen(), REGION) != perceptual_hash(screen(button=(0, 120, 215)), REGION)
+
+
+def test_change_outside_the_region_keeps_the_hash():
+    changed = screen()
+    ImageDraw.Draw(changed).rectangle((10, 10, 100, 100), fill=(255, 0, 0))
+    assert perceptual_hash(screen(), REGION) == perceptual_hash(changed, REGION)
+
+
+def test_single_pixel_change_keeps_the_hash():
+    # One pixel moves its cell's mean by about 7, within the background's quantisation step
+    assert perceptual_hash(screen(), REGION) == perceptual_hash(screen(spinner=(200, 20)), REGION)
+
+
+def test_prompt_id_changes_with_the_prompt():
+    assert prompt_id("keep", "Is it enabled?") == prompt_id("keep", "Is it enabled?")
+    assert prompt_id("keep", "Is it enabled?") != prompt_id("keep", "Is it enabled now?")
+
+
+def test_hit_after_put_and_miss_for_another_prompt():
+    cache = VerdictCache(clock=Clock())
+    cache.put(cache.key("keep-1", screen(), REGION), True, latency=2.0)
+
+    assert cache.get(cache.key("keep-1", screen(), REGION)) is True
+    assert cache.get(cache.key("pip-1", screen(), REGION)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.saved_seconds == 2.0
+
+
+def test_entries_expire_after_the_ttl():
+    clock = Clock()
+    cache = VerdictCache(ttl=60, clock=clock)
+    key = cache.key("keep-1", screen(), REGION)
+    cache.put(key, False)
+
+    clock.now += 59
+    assert cache.get(key) is False
+    clock.now += 2
+    assert cache.get(key) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = VerdictCache(max_entries=2, clock=Clock())
+    cache.put("keep:a", True)
+    cache.put("keep:b", False)
+    cache.get("keep:a")
+    cache.put("keep:c", True)
+
+    assert cache.get("keep:b") is None
+    assert cache.get("keep:a") is True
+    assert cache.evictions == 1
+
+
+def test_entries_and_latency_persist_to_disk(tmp_path):
+    path = str(tmp_path / "verdicts.json")
+    clock = Clock()
+    cache = VerdictCache(path=path, clock=clock)
+    cache.put("keep:a", True, latency=3.0)
+    cache.save()
+
+    reloaded = VerdictCache(path=path, clock=clock)
+    assert reloaded.get("keep:a") is True
+    assert reloaded.saved_seconds == 3.0
+
+
+def test_unreadable_file_starts_empty(tmp_path):
+    path = tmp_path / "verdicts.json"
+    path.write_text("not json")
+    assert len(VerdictCache(path=str(path))) == 0
@@ -0,0 +1,163 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from vscode_pool import PooledWindow, VSCodePool
+
+
+class FakeLauncher:
+    """Pretend VS Code instances, recording what the pool asked of them."""
+
+    def __init__(self):
+        self.running = set()
+        self.launched = []
+        self.switched = []
+        self.stopped = []
+
+    def launch(self, window, folder):
+        self.running.add(window.slot)
+        self.launched.append((window.slot, folder))
+
+    def open_folder(self, window, folder):
+        self.switched.append((window.slot, folder))
+
+    def is_alive(self, window):
+        return window.slot in self.running
+
+    def stop(self, window):
+        self.running.discard(window.slot)
+        self.stopped.append(window.slot)
+
+
+def pool(tmp_path, launcher, **kwargs):
+    kwargs.setdefault("size", 1)
+    return VSCodePool(
+        launcher, path=str(tmp_path / "pool.json"), idle_folder=str(tmp_path), sleep=lambda _: None, **kwargs
+    )
+
+
+def exited_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_second_job_gets_the_window_warm(tmp_path):
+    launcher = FakeLauncher()
+    vscode = pool(tmp_path, launcher)
+
+    window, warm = vscode.acquire(str(tmp_path / "p1"))
+    assert not warm
+    vscode.release(window)
+    window, warm = vscode.acquire(str(tmp_path / "p2"))
+
+    assert warm
+    assert launcher.launched == [(0, str(tmp_path / "p1"))]
+    assert launcher.switched == [(0, str(tmp_path / "p2"))]
+    assert (vscode.cold_starts, vscode.warm_starts) == (1, 1)
+
+
+def test_busy_pool_hands_out_nothing(tmp_path):
+    vscode = pool(tmp_path, FakeLauncher())
+    vscode.acquire(str(tmp_path / "p1"))
+    assert vscode.acquire(str(tmp_path / "p2")) == (None, False)
+
+
+def test_window_of_an_exited_owner_is_reused(tmp_path):
+    launcher = FakeLauncher()
+    vscode = pool(tmp_path, launcher)
+    window, _ = vscode.acquire(str(tmp_path / "p1"))
+    window.owner = exited_pid()
+    vscode._update(window)
+
+    window, warm = vscode.acquire(str(tmp_path / "p2"))
+    assert window is not None and warm
+
+
+def test_window_is_recycled_lazily_after_recycle_after_jobs(tmp_path):
+    launcher = FakeLauncher()
+    vscode = pool(tmp_path, launcher, recycle_after=2)
+    for index in range(2):
+        window, _ = vscode.acquire(str(tmp_path / f"p{index}"))
+        vscode.release(window)
+    # Marked, but not restarted until the next job needs it
+    assert launcher.stopped == []
+
+    window, warm = vscode.acquire(str(tmp_path / "p2"))
+    assert not warm
+    assert launcher.stopped == [0]
+    assert launcher.launched[-1] == (0, str(tmp_path / "p2"))
+    assert vscode.recycled == 1
+
+
+def test_failed_job_marks_the_window_for_recycling(tmp_path):
+    launcher = FakeLauncher()
+    vscode = pool(tmp_path, launcher)
+    window, _ = vscode.acquire(str(tmp_path / "p1"))
+    vscode.release(window, healthy=False)
+    assert window.recycle == "after a failed job"
+
+    _, warm = vscode.acquire(str(tmp_path / "p1"))
+    assert not warm
+
+
+def test_dead_window_is_relaunched(tmp_path):
+    launcher = FakeLauncher()
+    vscode = pool(tmp_path, launcher)
+    window, _ = vscode.acquire(str(tmp_path / "p1"))
+    vscode.release(window)
+    launcher.running.clear()
+
+    _, warm = vscode.acquire(str(tmp_path / "p1"))
+    assert not warm
+    assert vscode.unhealthy == 1
+
+
+def test_slot_user_data_is_kept_per_display(tmp_path, monkeypatch):
+    monkeypatch.setenv("AUTOMATION_STATE_DIR", str(tmp_path))
+    monkeypatch.setenv("DISPLAY", ":1")
+    first = VSCodePool(FakeLauncher())._new_window(0)
+    monkeypatch.setenv("DISPLAY", ":2")
+    second = VSCodePool(FakeLauncher())._new_window(0)
+
+    assert first.user_data_dir != second.user_data_dir
+    assert "_1" in first.user_data_dir and "_2" in second.user_data_dir
+
+
+def test_state_round_trips(tmp_path):
+    window = PooledWindow(1, "/data", folder="/p", jobs=3, launched_at=1.0, recycle="after 3 jobs")
+    assert PooledWindow.from_dict(json.loads(json.dumps(window.to_dict()))).to_dict() == window.to_dict()
+
+
+def test_lock_of_an_exited_process_is_broken(tmp_path):
+    vscode = pool(tmp_path, FakeLauncher())
+    with open(vscode.path + ".lock", "w") as f:
+        json.dump({"pid": exited_pid(), "created": time.time()}, f)
+
+    window, _ = vscode.acquire(str(tmp_path / "p1"))
+    assert window is not None
+    assert not os.path.exists(vscode.path + ".lock")
+
+
+def test_lock_of_a_running_process_is_waited_for(tmp_path):
+    vscode = pool(tmp_path, FakeLauncher())
+    lock_path = vscode.path + ".lock"
+    with open(lock_path, "w") as f:
+        json.dump({"pid": os.getpid(), "created": time.time() - 3600}, f)
+
+    taken = threading.Event()
+
+    def take():
+        with vscode._locked(timeout=0.05):
+            taken.set()
+
+    thread = threading.Thread(target=take)
+    thread.start()
+    # Held past the timeout by a live process: still not taken
+    assert not taken.wait(0.5)
+    os.remove(lock_path)
+    thread.join(5)
+    assert taken.is_set()
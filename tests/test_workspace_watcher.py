@@ -0,0 +1,114 @@
+import json
+import os
+
+from replay import VirtualClock
+from workspace_watcher import WorkspaceWatcher
+
+
+def workspace(tmp_path):
+    (tmp_path / "main.py").write_text("print('hello')\n")
+    (tmp_path / "notes.txt").write_text("keep me\n")
+    (tmp_path / "old.py").write_text("x = 1\n")
+    return tmp_path
+
+
+def watcher(root, clock, quiet=3.0):
+    return WorkspaceWatcher(str(root), quiet=quiet, poll_interval=0.5, backend="polling", clock=clock).start()
+
+
+def test_not_settled_before_anything_changes(tmp_path):
+    clock = VirtualClock()
+    watch = watcher(workspace(tmp_path), clock)
+    clock.sleep(60)
+    assert not watch.check()
+    assert not watch.changed
+    assert watch.idle_seconds == 60
+
+
+def test_settles_once_changes_stay_quiet(tmp_path):
+    clock = VirtualClock()
+    root = workspace(tmp_path)
+    watch = watcher(root, clock)
+
+    clock.sleep(1)
+    (root / "factorial.py").write_text("def factorial(n):\n    return 1\n")
+    assert not watch.check()
+    assert watch.changed
+
+    clock.sleep(2)
+    assert not watch.check()
+    clock.sleep(1)
+    assert watch.check()
+    assert watch.metrics()["settled_seconds"] == 4.0
+
+
+def test_a_new_change_restarts_the_quiet_period(tmp_path):
+    clock = VirtualClock()
+    root = workspace(tmp_path)
+    watch = watcher(root, clock)
+
+    clock.sleep(1)
+    (root / "a.py").write_text("a = 1\n")
+    watch.check()
+    clock.sleep(2.5)
+    (root / "b.py").write_text("b = 2\n")
+    watch.check()
+    clock.sleep(2.5)
+    assert not watch.check()
+    clock.sleep(0.5)
+    assert watch.check()
+
+
+def test_ignored_paths_do_not_count_as_changes(tmp_path):
+    clock = VirtualClock()
+    root = workspace(tmp_path)
+    watch = watcher(root, clock)
+
+    (root / "__pycache__").mkdir()
+    (root / "__pycache__" / "main.cpython-311.pyc").write_bytes(b"\0")
+    (root / "main.py.swp").write_bytes(b"\0")
+    clock.sleep(1)
+    assert not watch.check()
+    assert not watch.changed
+
+
+def test_manifest_lists_created_modified_and_deleted_files(tmp_path):
+    clock = VirtualClock()
+    root = workspace(tmp_path)
+    watch = watcher(root, clock)
+
+    (root / "main.py").write_text("import factorial\n\nprint(factorial.factorial(5))\n")
+    (root / "factorial.py").write_text("def factorial(n):\n    return 1 if n < 2 else n * factorial(n - 1)\n")
+    (root / "old.py").unlink()
+    changes = {change.path: change for change in watch.manifest()}
+
+    assert sorted(changes) == ["factorial.py", "main.py", "old.py"]
+    assert (changes["factorial.py"].status, changes["factorial.py"].lines_added) == ("created", 2)
+    assert changes["main.py"].status == "modified"
+    assert (changes["main.py"].lines_added, changes["main.py"].lines_removed) == (3, 1)
+    assert changes["old.py"].status == "deleted"
+    assert changes["old.py"].size is None
+    assert "+def factorial(n):" in changes["factorial.py"].diff
+
+
+def test_touched_but_unchanged_file_is_not_listed(tmp_path):
+    clock = VirtualClock()
+    root = workspace(tmp_path)
+    watch = watcher(root, clock)
+    (root / "notes.txt").write_text("keep me\n")
+    os.utime(root / "notes.txt", ns=(0, 10**9))
+    assert watch.manifest() == []
+
+
+def test_write_manifest_includes_diffs(tmp_path):
+    root = tmp_path / "project"
+    root.mkdir()
+    watch = watcher(workspace(root), VirtualClock())
+    (root / "factorial.py").write_text("def factorial(n):\n    return 1\n")
+
+    path = tmp_path / "manifest.json"
+    watch.write_manifest(str(path))
+    data = json.loads(path.read_text())
+    assert data["workspace"] == str(root)
+    assert [entry["path"] for entry in data["files"]] == ["factorial.py"]
+    assert data["files"][0]["diff"].startswith("--- /dev/null")
@@ -0,0 +1,250 @@
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from frame_gate import FrameChangeGate
+
+# Text entry strategies, fastest first
+INJECTION_BACKENDS = ("clipboard", "bulk", "typewrite")
+
+
+def _paste_hotkey():
+    return ("command", "v") if sys.platform == "darwin" else ("ctrl", "v")
+
+
+def _copy_hotkey():
+    return ("command", "c") if sys.platform == "darwin" else ("ctrl", "c")
+
+
+def _select_all_hotkey():
+    return ("command", "a") if sys.platform == "darwin" else ("ctrl", "a")
+
+
+class SystemClipboard:
+    """
+    Read and write the system clipboard.
+
+    Uses pyperclip (installed with pyautogui) when available, otherwise the
+    platform's command-line tools: clip/PowerShell on Windows, pbcopy/pbpaste on
+    macOS, wl-copy, xclip or xsel on Linux.
+    """
+
+    def __init__(self):
+        try:
+            import pyperclip
+
+            self._pyperclip = pyperclip
+        except ImportError:
+            self._pyperclip = None
+
+    def _commands(self):
+        if sys.platform == "win32":
+            return (["clip"], ["powershell", "-NoProfile", "-Command", "Get-Clipboard -Raw"])
+        if sys.platform == "darwin":
+            return (["pbcopy"], ["pbpaste"])
+        if os.getenv("WAYLAND_DISPLAY") and shutil.which("wl-copy"):
+            return (["wl-copy"], ["wl-paste", "--no-newline"])
+        if shutil.which("xclip"):
+            return (
+                ["xclip", "-selection", "clipboard"],
+                ["xclip", "-selection", "clipboard", "-o"],
+            )
+        if shutil.which("xsel"):
+            return (["xsel", "--clipboard", "--input"], ["xsel", "--clipboard", "--output"])
+        return None
+
+    @property
+    def available(self):
+        return self._pyperclip is not None or self._commands() is not None
+
+    def copy(self, text):
+        if self._pyperclip is not None:
+            self._pyperclip.copy(text)
+            return
+        commands = self._commands()
+        if commands is None:
+            raise RuntimeError("No clipboard backend available")
+        subprocess.run(commands[0], input=text.encode("utf-8"), check=True, timeout=5)
+
+    def paste(self):
+        if self._pyperclip is not None:
+            return self._pyperclip.paste()
+        commands = self._commands()
+        if commands is None:
+            raise RuntimeError("No clipboard backend available")
+        output = subprocess.run(commands[1], capture_output=True, check=True, timeout=5).stdout
+        return output.decode("utf-8", errors="replace")
+
+
+class InjectionResult:
+    """How a piece of text was entered and whether it was verified."""
+
+    def __init__(self, backend, seconds, verified, attempts):
+        self.backend = backend
+        self.seconds = seconds
+        self.verified = verified
+        self.attempts = attempts
+
+    def report(self):
+        status = {True: "verified", False: "NOT verified", None: "unverified"}[self.verified]
+        fallback = f" after trying {', '.join(self.attempts[:-1])}" if len(self.attempts) > 1 else ""
+        return f"entered with {self.backend} in {self.seconds:.2f}s ({status}){fallback}"
+
+
+class TextInjector:
+    """
+    Enter text into the focused VS Code input much faster than per-character typing.
+
+    pyautogui.typewrite(text, interval=0.05) costs 50 ms per character. The
+    "clipboard" backend copies the text and pastes it with one hotkey; "bulk"
+    sends every key event without an inter-key delay; "typewrite" types in
+    chunks with a short pause between them. After entering the text it is
+    verified, either by reading it back (select all + copy, for inputs such as
+    the Copilot chat box) or by checking that the screen region changed (for the
+    terminal). If a backend is unavailable or verification fails, the input is
+    cleared where possible and the next, slower backend is tried.
+    """
+
+    def __init__(
+        self,
+        backend="clipboard",
+        keyboard=None,
+        clipboard=None,
+        chunk_size=64,
+        chunk_pause=0.05,
+        settle_time=0.3,
+    ):
+        """
+        Args:
+            backend (str): First backend to try: "clipboard", "bulk" or "typewrite"
+            keyboard: Object with pyautogui's hotkey/press/write/screenshot functions;
+                pyautogui itself by default
+            clipboard (SystemClipboard): Clipboard access; the system clipboard by default
+            chunk_size (int): Characters per chunk for the typewrite backend
+            chunk_pause (float): Seconds between chunks for the typewrite backend
+            settle_time (float): Seconds to let the UI render before verifying
+        """
+        backend = backend.lower()
+        if backend not in INJECTION_BACKENDS:
+            raise ValueError(
+                f"Unsupported text injection backend '{backend}', expected one of {INJECTION_BACKENDS}"
+            )
+        if keyboard is None:
+            import pyautogui
+
+            keyboard = pyautogui
+
+        self.backends = INJECTION_BACKENDS[INJECTION_BACKENDS.index(backend) :]
+        self.keyboard = keyboard
+        self.clipboard = clipboard or SystemClipboard()
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_pause = chunk_pause
+        self.settle_time = settle_time
+
+    @classmethod
+    def from_env(cls, keyboard=None):
+        """Build the injector from TEXT_INJECTION ("clipboard" by default, "bulk" or "typewrite")."""
+        return cls(os.getenv("TEXT_INJECTION", "clipboard"), keyboard=keyboard)
+
+    def _write_lines(self, text, interval=0.0):
+        # Enter would submit the chat prompt, so line breaks are typed as Shift+Enter
+        for index, line in enumerate(text.split("\n")):
+            if index:
+                self.keyboard.hotkey("shift", "enter")
+            if line:
+                self.keyboard.write(line, interval=interval)
+
+    def _enter(self, backend, text):
+        if backend == "clipboard":
+            if not self.clipboard.available:
+                raise RuntimeError("clipboard unavailable")
+            try:
+                previous = self.clipboard.paste()
+            except Exception:
+                previous = None
+            self.clipboard.copy(text)
+            self.keyboard.hotkey(*_paste_hotkey())
+            # Give the target time to read the clipboard before it is restored
+            time.sleep(self.settle_time)
+            if previous is not None:
+                self.clipboard.copy(previous)
+        elif backend == "bulk":
+            self._write_lines(text)
+        else:
+            for start in range(0, len(text), self.chunk_size):
+                self._write_lines(text[start : start + self.chunk_size])
+                time.sleep(self.chunk_pause)
+
+    def _read_back(self):
+        """Select the input's contents and copy them, then move the cursor back to the end."""
+        try:
+            previous = self.clipboard.paste()
+        except Exception:
+            previous = None
+        self.clipboard.copy("")
+        self.keyboard.hotkey(*_select_all_hotkey())
+        self.keyboard.hotkey(*_copy_hotkey())
+        time.sleep(0.05)
+        contents = self.clipboard.paste()
+        self.keyboard.hotkey("ctrl", "end")
+        if previous is not None:
+            self.clipboard.copy(previous)
+        return contents
+
+    def _clear(self):
+        self.keyboard.hotkey(*_select_all_hotkey())
+        self.keyboard.press("delete")
+
+    def inject(self, text, verify="readback", region=None):
+        """
+        Enter text into the focused input, verifying it and falling back if needed.
+
+        Args:
+            text (str): Text to enter (not submitted; press Enter afterwards)
+            verify (str): "readback" to compare the input's contents with the text,
+                "diff" to require a visible change in `region`, or "none"
+            region (tuple): Screen region watched by the "diff" check, or None for the full screen
+
+        Returns:
+            InjectionResult: Backend used, time taken and verification outcome
+        """
+        start_time = time.monotonic()
+        attempts = []
+        verified = None
+
+        for backend in self.backends:
+            attempts.append(backend)
+            gate = None
+            if verify == "diff":
+                gate = FrameChangeGate("inject", region=region)
+                gate.should_send(self.keyboard.screenshot())
+                gate.record_verdict("before")
+
+            try:
+                self._enter(backend, text)
+            except Exception as e:
+                print(f"⚠️ Text injection with {backend} failed: {e}")
+                continue
+
+            if verify == "none" or (verify == "readback" and not self.clipboard.available):
+                verified = None
+                break
+
+            time.sleep(self.settle_time)
+            if verify == "readback":
+                landed = self._read_back()
+                verified = landed.replace("\r\n", "\n").strip() == text.strip()
+                if not verified and backend != self.backends[-1]:
+                    print(f"⚠️ {backend} entered {len(landed)} of {len(text)} characters, retrying")
+                    self._clear()
+            else:
+                # Without a read-back, only an input that shows no change at all can be retried safely
+                verified = gate.should_send(self.keyboard.screenshot())
+                if not verified:
+                    print(f"⚠️ No visible change after {backend}, retrying")
+            if verified:
+                break
+
+        return InjectionResult(attempts[-1], time.monotonic() - start_time, verified, attempts)
@@ -0,0 +1,310 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from automation_state import lock_abandoned, remove_lock, state_path, write_lock_owner
+
+# Credential chain tried in order; the managed identity probe times out slowly off Azure, so it is last
+DEFAULT_CHAIN = ("environment", "cli", "managed_identity")
+
+# Chain entry -> azure.identity credential class
+CREDENTIAL_TYPES = {
+    "environment": "EnvironmentCredential",
+    "workload_identity": "WorkloadIdentityCredential",
+    "managed_identity": "ManagedIdentityCredential",
+    "cli": "AzureCliCredential",
+    "developer_cli": "AzureDeveloperCliCredential",
+    "powershell": "AzurePowerShellCredential",
+    "interactive": "InteractiveBrowserCredential",
+}
+
+
+def build_credential(chain=DEFAULT_CHAIN):
+    """
+    Build an azure.identity credential that tries the chain's entries in order.
+
+    Args:
+        chain (tuple): Names from CREDENTIAL_TYPES, e.g. ("environment", "cli")
+
+    Returns:
+        TokenCredential: The single credential, or a ChainedTokenCredential over them
+
+    Raises:
+        ValueError: If the chain is empty or names an unknown credential
+    """
+    unknown = [name for name in chain if name not in CREDENTIAL_TYPES]
+    if unknown or not chain:
+        raise ValueError(
+            f"Unknown credential chain {','.join(chain)!r}, expected names from {sorted(CREDENTIAL_TYPES)}"
+        )
+
+    import azure.identity
+
+    credentials = [getattr(azure.identity, CREDENTIAL_TYPES[name])() for name in chain]
+    if len(credentials) == 1:
+        return credentials[0]
+    return azure.identity.ChainedTokenCredential(*credentials)
+
+
+class CachedToken:
+    """An access token and its expiry in seconds since the epoch, like azure.core's AccessToken."""
+
+    def __init__(self, token, expires_on):
+        self.token = token
+        self.expires_on = expires_on
+
+    def to_dict(self):
+        return {"token": self.token, "expires_on": self.expires_on}
+
+
+class TokenCache:
+    """
+    Bearer token provider that shares tokens across sessions and processes.
+
+    DefaultAzureCredential walks its whole chain (environment, workload and
+    managed identity probes, CLI, ...) and fetches a new token in every
+    process, which costs seconds per automation worker. Here the chain is
+    explicit and short, and the credential is only built when a token
+    actually has to be fetched. Tokens are kept in memory and in a file in
+    the automation state directory (readable by the owner only) that every
+    worker of the same user, scope and chain reads, so a worker normally
+    gets a token without touching the credential at all. One process
+    fetches at a time under a lock file; the others wait and take its token.
+
+    A token within `refresh_before` seconds of expiry is refreshed on a
+    background thread while it is still handed out, so callers never wait
+    for a refresh; only a token with less than `min_validity` seconds left
+    is refreshed before returning. The instance is callable, returning the
+    token string, so it can be passed as azure_ad_token_provider.
+    """
+
+    def __init__(
+        self,
+        scope,
+        credential=None,
+        chain=DEFAULT_CHAIN,
+        path=None,
+        refresh_before=300.0,
+        min_validity=60.0,
+        clock=time.time,
+    ):
+        """
+        Args:
+            scope (str): Token scope, e.g. https://cognitiveservices.azure.com/.default
+            credential: Object with get_token(scope) (an azure.identity credential);
+                built from `chain` on the first fetch when None
+            chain (tuple): Credential chain for build_credential
+            path (str): Shared token file, or None to cache in this process only
+            refresh_before (float): Seconds before expiry a background refresh starts
+            min_validity (float): Seconds of validity below which a token is not handed out
+            clock (callable): Wall-clock time source; token expiries are epoch seconds
+        """
+        self.scope = scope
+        self._credential = credential
+        self.chain = tuple(chain)
+        self.path = path
+        self.refresh_before = refresh_before
+        self.min_validity = min_validity
+        self.clock = clock
+
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.fetches = 0
+        self.background_refreshes = 0
+        self.fetch_seconds = 0.0
+        self.errors = 0
+
+        self._token = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    @classmethod
+    def from_env(cls, scope):
+        """
+        Build the cache from AZURE_CREDENTIAL_CHAIN (comma-separated names from
+        CREDENTIAL_TYPES), AZURE_TOKEN_CACHE ("disk" by default or "memory") and
+        AZURE_TOKEN_REFRESH_BEFORE.
+
+        Args:
+            scope (str): Token scope
+
+        Returns:
+            TokenCache: The configured cache; no credential is built yet
+        """
+        chain = tuple(
+            name.strip().lower()
+            for name in os.getenv("AZURE_CREDENTIAL_CHAIN", ",".join(DEFAULT_CHAIN)).split(",")
+            if name.strip()
+        )
+        path = None
+        if os.getenv("AZURE_TOKEN_CACHE", "disk").lower() == "disk":
+            # Tokens of another identity, tenant or chain never share a file
+            identity = "|".join(
+                [scope, ",".join(chain), os.getenv("AZURE_TENANT_ID", ""), os.getenv("AZURE_CLIENT_ID", "")]
+            )
+            path = state_path("tokens", f"{hashlib.sha256(identity.encode('utf-8')).hexdigest()[:16]}.json")
+        return cls(
+            scope,
+            chain=chain,
+            path=path,
+            refresh_before=float(os.getenv("AZURE_TOKEN_REFRESH_BEFORE", "300")),
+        )
+
+    @property
+    def credential(self):
+        if self._credential is None:
+            self._credential = build_credential(self.chain)
+        return self._credential
+
+    def _remaining(self, token):
+        return token.expires_on - self.clock() if token is not None else float("-inf")
+
+    def _read_shared(self):
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            return CachedToken(data["token"], float(data["expires_on"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            # Replaced atomically, so this is a foreign or damaged file; the next fetch rewrites it
+            return None
+
+    def _write_shared(self, token):
+        if not self.path:
+            return
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            # Owner-only, the file holds a bearer token
+            fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(token.to_dict(), f)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not share the Azure token through {self.path}: {e}")
+
+    @contextmanager
+    def _locked(self, timeout=30.0):
+        """
+        Hold the shared file's lock so one process fetches at a time.
+
+        The lock file names its owner's pid and when it was taken. A waiter
+        only breaks it once that process is gone; if a live owner holds it
+        past `timeout`, the waiter fetches without the lock rather than
+        stealing it, which at worst costs one extra token request.
+        """
+        if not self.path:
+            yield
+            return
+        lock_path = self.path + ".lock"
+        deadline = time.monotonic() + timeout
+        owned = False
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+            except FileExistsError:
+                if lock_abandoned(lock_path, timeout):
+                    remove_lock(lock_path)
+                    continue
+                if time.monotonic() >= deadline:
+                    print(f"⚠️ {lock_path} is still held by a running process, fetching without it")
+                    break
+                time.sleep(0.05)
+                continue
+            write_lock_owner(fd)
+            owned = True
+            break
+        try:
+            yield
+        finally:
+            if owned:
+                remove_lock(lock_path)
+
+    def _fetch(self, needed):
+        """
+        Fetch a token unless another thread or process already has one valid for `needed` seconds.
+
+        Returns:
+            CachedToken: The newest token
+        """
+        with self._lock, self._locked():
+            shared = self._read_shared()
+            if self._remaining(shared) > self._remaining(self._token):
+                self._token = shared
+            if self._remaining(self._token) > needed:
+                self.shared_hits += 1
+                return self._token
+
+            started = time.perf_counter()
+            access_token = self.credential.get_token(self.scope)
+            self.fetch_seconds += time.perf_counter() - started
+            self.fetches += 1
+            self._token = CachedToken(access_token.token, float(access_token.expires_on))
+            self._write_shared(self._token)
+            return self._token
+
+    def _refresh(self):
+        try:
+            fetches = self.fetches
+            self._fetch(self.refresh_before)
+            self.background_refreshes += self.fetches - fetches
+        except Exception as e:
+            # The current token is still valid; the next call tries again
+            self.errors += 1
+            print(f"⚠️ Background Azure token refresh failed: {e}")
+        finally:
+            self._refreshing = False
+
+    def get_token(self):
+        """
+        Return a valid token, from memory, the shared file or the credential.
+
+        Returns:
+            CachedToken: A token valid for at least min_validity seconds
+        """
+        token = self._token
+        from_shared = False
+        if self._remaining(token) <= self.refresh_before:
+            # Another process may have refreshed it already
+            shared = self._read_shared()
+            if self._remaining(shared) > self._remaining(token):
+                token = self._token = shared
+                from_shared = True
+
+        remaining = self._remaining(token)
+        if remaining <= self.min_validity:
+            return self._fetch(self.min_validity)
+
+        if remaining <= self.refresh_before and not self._refreshing:
+            self._refreshing = True
+            threading.Thread(target=self._refresh, name="azure-token-refresh", daemon=True).start()
+        if from_shared:
+            self.shared_hits += 1
+        else:
+            self.memory_hits += 1
+        return token
+
+    def __call__(self):
+        return self.get_token().token
+
+    def metrics(self):
+        return {
+            "chain": list(self.chain),
+            "shared": self.path is not None,
+            "memory_hits": self.memory_hits,
+            "shared_hits": self.shared_hits,
+            "fetches": self.fetches,
+            "background_refreshes": self.background_refreshes,
+            "fetch_seconds": round(self.fetch_seconds, 3),
+            "errors": self.errors,
+        }
+
+    def summary(self):
+        return (
+            f"{self.memory_hits} from memory, {self.shared_hits} from the shared cache, "
+            f"{self.fetches} fetched via {' > '.join(self.chain)} in {self.fetch_seconds:.2f}s, "
+            f"{self.background_refreshes} refreshed in the background"
+        )
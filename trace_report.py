@@ -0,0 +1,48 @@
+"""
+Summarise per-stage latency and token usage from exported automation traces.
+
+Reads JSON-lines trace files written with TRACE_PATH=traces.jsonl (one span per
+line, appended by every run) and prints p50/p95 latency, total time, error
+count and tokens per span name, so it is clear where wall time and tokens go
+across many runs.
+
+Usage:
+    python trace_report.py traces.jsonl
+    python trace_report.py traces/*.jsonl --json summary.json
+"""
+
+import argparse
+import glob
+import json
+import sys
+
+from tracing import format_summary, load_spans, summarize
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="JSON-lines trace files (globs allowed)")
+    parser.add_argument("--json", help="Also write the summary as JSON to this file")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for pattern in args.paths:
+        paths += sorted(glob.glob(pattern)) or [pattern]
+
+    spans = load_spans(paths)
+    if not spans:
+        print("No spans found")
+        return 1
+
+    stats = summarize(spans)
+    traces = len({record["trace_id"] for record in spans})
+    print(format_summary(stats, traces))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"traces": traces, "spans": stats}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
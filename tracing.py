@@ -0,0 +1,289 @@
+import contextvars
+import json
+import os
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+
+# Span currently open in this thread / asyncio task, parent of the next span started
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+
+class Span:
+    """One timed operation. Durations come from a monotonic clock."""
+
+    def __init__(self, name, trace_id, parent_id, attributes, start_wall_ns, start_ns):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.status = STATUS_OK
+        self.start_wall_ns = start_wall_ns
+        self.start_ns = start_ns
+        self.end_ns = None
+
+    @property
+    def duration(self):
+        """Seconds between start and end, or None while the span is open."""
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_error(self, error):
+        self.status = STATUS_ERROR
+        self.attributes["error.type"] = type(error).__name__
+        self.attributes["error.message"] = str(error)
+
+    def to_dict(self):
+        """JSON-lines record; field names follow the OpenTelemetry span model."""
+        end_wall_ns = self.start_wall_ns + (self.end_ns - self.start_ns)
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_wall_ns,
+            "end_time_unix_nano": end_wall_ns,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class Tracer:
+    """
+    Collect spans for the stages of an automation run.
+
+    Spans nest through a context variable, so a span opened inside another (in
+    the same thread, asyncio task or asyncio.to_thread call) becomes its child.
+    Finished spans are kept in memory until exported as JSON lines (one span per
+    line, easy to append to across hundreds of runs) or as an OTLP/JSON file
+    that OpenTelemetry collectors and viewers can import.
+    """
+
+    def __init__(
+        self,
+        service_name="cua-vscode-automation",
+        clock=time.monotonic_ns,
+        wall_clock=time.time_ns,
+    ):
+        """
+        Args:
+            service_name (str): service.name resource attribute in OTLP exports
+            clock (callable): Monotonic nanosecond clock used for durations
+            wall_clock (callable): Nanoseconds since the epoch, used only for timestamps
+        """
+        self.service_name = service_name
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.trace_id = uuid.uuid4().hex
+        self.finished = []
+
+    def start_trace(self):
+        """Begin a new trace, e.g. for the next run of a session."""
+        self.trace_id = uuid.uuid4().hex
+        return self.trace_id
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Time the enclosed block as a span.
+
+        Args:
+            name (str): Span name, e.g. "capture" or "model_call"
+            **attributes: Initial attributes
+
+        Yields:
+            Span: The open span, for adding attributes
+        """
+        parent = _current_span.get()
+        current = Span(
+            name,
+            self.trace_id,
+            parent.span_id if parent is not None else None,
+            attributes,
+            self.wall_clock(),
+            self.clock(),
+        )
+        token = _current_span.set(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.record_error(e)
+            raise
+        finally:
+            current.end_ns = self.clock()
+            _current_span.reset(token)
+            self.finished.append(current)
+
+    def export_jsonl(self, path, clear=True):
+        """Append finished spans to a JSON-lines file."""
+        with open(path, "a", encoding="utf-8") as f:
+            for finished in self.finished:
+                f.write(json.dumps(finished.to_dict()) + "\n")
+        if clear:
+            self.finished = []
+
+    def export_otlp(self, path, clear=True):
+        """Write finished spans as an OTLP/JSON ExportTraceServiceRequest."""
+
+        def attribute(key, value):
+            if isinstance(value, bool):
+                typed = {"boolValue": value}
+            elif isinstance(value, int):
+                typed = {"intValue": str(value)}
+            elif isinstance(value, float):
+                typed = {"doubleValue": value}
+            else:
+                typed = {"stringValue": str(value)}
+            return {"key": key, "value": typed}
+
+        spans = []
+        for finished in self.finished:
+            record = finished.to_dict()
+            spans.append(
+                {
+                    "traceId": record["trace_id"],
+                    "spanId": record["span_id"],
+                    "parentSpanId": record["parent_span_id"] or "",
+                    "name": record["name"],
+                    "kind": 1,
+                    "startTimeUnixNano": str(record["start_time_unix_nano"]),
+                    "endTimeUnixNano": str(record["end_time_unix_nano"]),
+                    "attributes": [attribute(k, v) for k, v in record["attributes"].items()],
+                    "status": {"code": 2 if record["status"] == STATUS_ERROR else 1},
+                }
+            )
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "resourceSpans": [
+                        {
+                            "resource": {
+                                "attributes": [attribute("service.name", self.service_name)]
+                            },
+                            "scopeSpans": [{"scope": {"name": "tracing"}, "spans": spans}],
+                        }
+                    ]
+                },
+                f,
+            )
+        if clear:
+            self.finished = []
+
+    def export(self, path):
+        """
+        Export to `path`: OTLP/JSON for *.json files, JSON lines otherwise.
+
+        A "{trace_id}" placeholder in the path is replaced, e.g. traces/{trace_id}.json.
+        """
+        path = path.replace("{trace_id}", self.trace_id)
+        if path.endswith(".json"):
+            self.export_otlp(path)
+        else:
+            self.export_jsonl(path)
+
+
+# Process-wide tracer used by the automation modules
+tracer = Tracer()
+
+
+def span(name, **attributes):
+    """Open a span on the process-wide tracer (see Tracer.span)."""
+    return tracer.span(name, **attributes)
+
+
+def record_usage(current, response):
+    """Copy token usage from a Responses API result onto a span, when reported."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    for field in ("input_tokens", "output_tokens", "total_tokens"):
+        value = getattr(usage, field, None)
+        if isinstance(value, int):
+            current.set_attribute(f"tokens.{field.split('_')[0]}", value)
+
+
+def load_spans(paths):
+    """
+    Read spans from JSON-lines trace files.
+
+    Args:
+        paths (list): Files written by Tracer.export_jsonl
+
+    Returns:
+        list: Span dictionaries
+    """
+    spans = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            spans += [json.loads(line) for line in f if line.strip()]
+    return spans
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(spans):
+    """
+    Aggregate spans by name.
+
+    Args:
+        spans (list): Span dictionaries
+
+    Returns:
+        dict: name -> {"count", "errors", "total_s", "p50_s", "p95_s", "input_tokens", "output_tokens"}
+    """
+    groups = {}
+    for record in spans:
+        groups.setdefault(record["name"], []).append(record)
+
+    stats = {}
+    for name, records in groups.items():
+        durations = [record["duration_ms"] / 1000 for record in records]
+        stats[name] = {
+            "count": len(records),
+            "errors": sum(1 for record in records if record.get("status") == STATUS_ERROR),
+            "total_s": sum(durations),
+            "p50_s": statistics.median(durations),
+            "p95_s": percentile(durations, 0.95),
+            "input_tokens": sum(record["attributes"].get("tokens.input", 0) for record in records),
+            "output_tokens": sum(record["attributes"].get("tokens.output", 0) for record in records),
+        }
+    return stats
+
+
+def format_summary(stats, traces=None):
+    """Return a table of per-stage p50/p95 latency, total time and tokens."""
+    header = "📊 Span summary" + (f" over {traces} traces" if traces else "")
+    lines = [
+        header,
+        f"{'span':<22} {'count':>7} {'p50 s':>8} {'p95 s':>8} {'total s':>9} {'errors':>7} {'tokens in/out':>15}",
+    ]
+    for name, row in sorted(stats.items(), key=lambda item: -item[1]["total_s"]):
+        tokens = (
+            f"{row['input_tokens']}/{row['output_tokens']}"
+            if row["input_tokens"] or row["output_tokens"]
+            else "-"
+        )
+        lines.append(
+            f"{name:<22} {row['count']:>7} {row['p50_s']:>8.3f} {row['p95_s']:>8.3f} "
+            f"{row['total_s']:>9.1f} {row['errors']:>7} {tokens:>15}"
+        )
+    return "\n".join(lines)
+
+
+def trace_path_from_env():
+    """TRACE_PATH: where each run's spans are exported (*.jsonl appends, *.json writes OTLP)."""
+    return os.getenv("TRACE_PATH") or None
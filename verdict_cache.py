@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+from PIL import Image
+
+from automation_state import state_path
+from screen_regions import crop_region
+
+
+def perceptual_hash(image, region=None, hash_size=32, levels=16):
+    """
+    Perceptual hash of a screen region: its quantised average-colour grid.
+
+    The region is shrunk to hash_size x hash_size cells by box averaging and
+    each RGB channel is quantised to `levels` steps. Re-rendering an identical
+    screen yields the same hash, and because colour is kept (unlike a greyscale
+    gradient hash) a Keep button turning from grey to blue changes it. Only a
+    change to some cell's quantised average colour changes the hash: a small
+    change (a spinner frame, a few pixels of text, a thin border) that keeps
+    every cell within its quantisation step hashes the same, and the cached
+    verdict for the earlier screen is returned for it until the entry expires.
+
+    Args:
+        image (PIL.Image.Image): Full screenshot
+        region (tuple): (left, top, right, bottom) screen fractions, or None for the whole frame
+        hash_size (int): Cells per side of the grid
+        levels (int): Quantisation steps per colour channel
+
+    Returns:
+        str: Hex digest of the hash
+    """
+    import numpy as np
+
+    cells = crop_region(image, region).convert("RGB").resize(
+        (hash_size, hash_size), Image.BOX
+    )
+    quantised = np.asarray(cells, dtype=np.uint16) * levels // 256
+    return hashlib.sha1(quantised.astype(np.uint8).tobytes()).hexdigest()
+
+
+def prompt_id(name, prompt):
+    """Identify a prompt by name and content, so editing the prompt invalidates old verdicts."""
+    return f"{name}-{hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8]}"
+
+
+class VerdictCache:
+    """
+    Bounded LRU cache of parsed CUA verdicts keyed on (prompt id, region hash).
+
+    Screens recur constantly within and across runs: an idle Copilot panel, a
+    greyed-out Keep button, a finished PowerShell prompt. When the region a
+    check looks at hashes to a value already classified with the same prompt,
+    the stored verdict is reused instead of calling the model. Entries expire
+    after `ttl` seconds and the least recently used entry is evicted once
+    `max_entries` is reached. With a path the cache is loaded from and saved to
+    a JSON file so verdicts carry over between runs.
+    """
+
+    def __init__(self, path=None, max_entries=256, ttl=3600, hash_size=32, clock=time.time):
+        """
+        Args:
+            path (str): JSON file to persist entries to, or None for an in-memory cache
+            max_entries (int): Entries kept before the least recently used one is evicted
+            ttl (float): Seconds an entry stays valid
+            hash_size (int): Resolution of the perceptual hash (see perceptual_hash)
+            clock (callable): Wall-clock time source; entries outlive the process
+        """
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.hash_size = hash_size
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+        self._entries = OrderedDict()
+        self._latency = {}
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+                for key, (verdict, stored_at) in data["entries"].items():
+                    self._entries[key] = (verdict, stored_at)
+                for prompt, (mean, count) in data.get("latency", {}).items():
+                    self._latency[prompt] = (mean, count)
+                self._expire()
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                print(f"⚠️ Ignoring unreadable verdict cache {path}: {e}")
+                self._entries.clear()
+                self._latency.clear()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build the cache from VERDICT_CACHE ("memory" by default, "disk" or "off"),
+        VERDICT_CACHE_SIZE, VERDICT_CACHE_TTL and VERDICT_CACHE_HASH_SIZE.
+
+        Returns:
+            VerdictCache: The cache, or None when caching is off
+        """
+        mode = os.getenv("VERDICT_CACHE", "memory").lower()
+        if mode == "off":
+            return None
+
+        return cls(
+            path=state_path("verdict_cache.json") if mode == "disk" else None,
+            max_entries=int(os.getenv("VERDICT_CACHE_SIZE", "256")),
+            ttl=float(os.getenv("VERDICT_CACHE_TTL", "3600")),
+            hash_size=int(os.getenv("VERDICT_CACHE_HASH_SIZE", "32")),
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, prompt_id, image, region=None):
+        """
+        Return the cache key for a frame as seen by one check.
+
+        Args:
+            prompt_id (str): Identifies the question asked, see prompt_id()
+            image (PIL.Image.Image): Full screenshot
+            region (tuple): Region the check sends to the model
+
+        Returns:
+            str: Cache key
+        """
+        return f"{prompt_id}:{perceptual_hash(image, region, self.hash_size)}"
+
+    def _expire(self):
+        cutoff = self.clock() - self.ttl
+        for key in [key for key, (_, stored_at) in self._entries.items() if stored_at < cutoff]:
+            del self._entries[key]
+
+    def get(self, key):
+        """
+        Look up a verdict, counting a hit or a miss.
+
+        Returns:
+            The cached verdict, or None if absent or expired
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] < self.clock() - self.ttl:
+            del self._entries[key]
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.saved_seconds += self._latency.get(key.split(":", 1)[0], (0.0, 0))[0]
+        return entry[0]
+
+    def put(self, key, verdict, latency=None):
+        """
+        Store a verdict.
+
+        Args:
+            key (str): Key from key()
+            verdict: Parsed verdict (must be JSON-serialisable)
+            latency (float): Seconds the model call took, used to estimate time saved by hits
+        """
+        self._entries[key] = (verdict, self.clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+        if latency is not None:
+            # Running mean of the model latency per prompt
+            prompt = key.split(":", 1)[0]
+            mean, count = self._latency.get(prompt, (0.0, 0))
+            self._latency[prompt] = ((mean * count + latency) / (count + 1), count + 1)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def save(self):
+        if not self.path:
+            return
+        self._expire()
+        try:
+            with open(self.path, "w") as f:
+                json.dump({"entries": dict(self._entries), "latency": self._latency}, f)
+        except OSError as e:
+            print(f"⚠️ Could not save verdict cache {self.path}: {e}")
+
+    def metrics(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+            "saved_seconds": round(self.saved_seconds, 3),
+            "entries": len(self._entries),
+            "evictions": self.evictions,
+        }
+
+    def summary(self):
+        return (
+            f"{self.hits} hits / {self.hits + self.misses} lookups "
+            f"({self.hit_rate:.0%} hit rate), ~{self.saved_seconds:.1f}s of model latency saved, "
+            f"{len(self._entries)} entries, {self.evictions} evicted"
+        )
@@ -0,0 +1,333 @@
+import json
+import os
+import shutil
+import sys
+
+from automation_state import state_path
+
+STABLE = "stable"
+INSIDERS = "insiders"
+
+
+class EditorInstall:
+    """A VS Code executable that was found, and what kind of install it belongs to."""
+
+    def __init__(self, path, edition=STABLE, kind="path", version=None, mtime_ns=None):
+        """
+        Args:
+            path (str): Executable or CLI launcher to start VS Code with
+            edition (str): "stable" or "insiders"
+            kind (str): Where it was found: explicit, path, user, system, snap, flatpak,
+                portable or registry
+            version (str): Version from the install's package.json, or None if unknown
+            mtime_ns (int): Executable modification time, used to validate the index
+        """
+        self.path = path
+        self.edition = edition
+        self.kind = kind
+        self.version = version
+        self.mtime_ns = mtime_ns
+
+    def to_dict(self):
+        return {
+            "path": self.path,
+            "edition": self.edition,
+            "kind": self.kind,
+            "version": self.version,
+            "mtime_ns": self.mtime_ns,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def describe(self):
+        version = f" {self.version}" if self.version else ""
+        return f"VS Code{' Insiders' if self.edition == INSIDERS else ''}{version} ({self.kind}) at {self.path}"
+
+
+def read_registry_commands():
+    """Open-command values VS Code registers on Windows (per-user, then machine-wide)."""
+    try:
+        import winreg
+    except ImportError:
+        return []
+
+    commands = []
+    for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+        for executable in ("Code.exe", "Code - Insiders.exe"):
+            try:
+                key = winreg.OpenKey(
+                    hive, rf"Software\Classes\Applications\{executable}\shell\open\command"
+                )
+                try:
+                    value, _ = winreg.QueryValueEx(key, "")
+                finally:
+                    winreg.CloseKey(key)
+            except OSError:
+                continue
+            if value:
+                commands.append(value)
+    return commands
+
+
+class VSCodeDiscovery:
+    """
+    Find the VS Code executable on Windows, macOS or Linux and remember where it is.
+
+    A full discovery walks the candidate locations for the platform: VSCODE_PATH,
+    `code` on PATH, per-user and system installs, snap and flatpak exports,
+    Insiders builds, portable installs and, on Windows, the registry. The result
+    is written to a small JSON index. Later starts read the index and make a
+    single stat of the executable. If the stat fails or the modification time has
+    changed (VS Code was updated, moved or removed), discovery runs again.
+
+    Everything the discovery looks at can be injected, so it can be pointed at a
+    fake install tree: a root prefix for absolute paths, the environment, the
+    home directory, the PATH lookup and the registry reader.
+    """
+
+    def __init__(
+        self,
+        platform=sys.platform,
+        environ=None,
+        home=None,
+        root="",
+        which=shutil.which,
+        registry=read_registry_commands,
+        index_path=None,
+    ):
+        """
+        Args:
+            platform (str): sys.platform value whose layout to search
+            environ (dict): Environment variables; os.environ when None
+            home (str): Home directory; expanded from "~" when None
+            root (str): Prefix for absolute candidate paths, e.g. a fake install tree
+            which (callable): PATH lookup, shutil.which by default
+            registry (callable): Returns Windows open-command strings
+            index_path (str): Index file; vscode_index.json in the state directory when None
+        """
+        self.platform = platform
+        self.environ = os.environ if environ is None else environ
+        self.home = home or os.path.expanduser("~")
+        self.root = root
+        self.which = which
+        self.registry = registry
+        self.index_path = index_path or state_path("vscode_index.json")
+
+        # Stats made by the last find(), to show what the index saves
+        self.stats = 0
+
+    def _abs(self, path):
+        return self.root + path if self.root else path
+
+    def _stat(self, path):
+        self.stats += 1
+        try:
+            return os.stat(path)
+        except OSError:
+            return None
+
+    def _windows_candidates(self):
+        local = self.environ.get("LOCALAPPDATA") or os.path.join(self.home, "AppData", "Local")
+        program_dirs = [
+            self.environ.get("ProgramFiles") or "C:\\Program Files",
+            self.environ.get("ProgramFiles(x86)") or "C:\\Program Files (x86)",
+        ]
+        for edition, folder, executable, cli in (
+            (STABLE, "Microsoft VS Code", "Code.exe", "code.cmd"),
+            (INSIDERS, "Microsoft VS Code Insiders", "Code - Insiders.exe", "code-insiders.cmd"),
+        ):
+            for kind, parent in [("user", os.path.join(local, "Programs"))] + [
+                ("system", directory) for directory in program_dirs
+            ]:
+                yield os.path.join(parent, folder, executable), edition, kind
+                yield os.path.join(parent, folder, "bin", cli), edition, kind
+        yield os.path.join(self.home, "scoop", "apps", "vscode", "current", "Code.exe"), STABLE, "portable"
+
+    def _mac_candidates(self):
+        for edition, app, cli in (
+            (STABLE, "Visual Studio Code.app", "code"),
+            (INSIDERS, "Visual Studio Code - Insiders.app", "code-insiders"),
+        ):
+            for kind, parent in (
+                ("system", self._abs("/Applications")),
+                ("user", os.path.join(self.home, "Applications")),
+            ):
+                yield os.path.join(parent, app, "Contents", "Resources", "app", "bin", cli), edition, kind
+
+    def _linux_candidates(self):
+        flatpak_exports = (
+            self._abs("/var/lib/flatpak/exports/bin"),
+            os.path.join(self.home, ".local", "share", "flatpak", "exports", "bin"),
+        )
+        for edition, cli, share, flatpak_id in (
+            (STABLE, "code", "code", "com.visualstudio.code"),
+            (INSIDERS, "code-insiders", "code-insiders", "com.visualstudio.code.insiders"),
+        ):
+            yield self._abs(f"/usr/bin/{cli}"), edition, "system"
+            yield self._abs(f"/usr/share/{share}/bin/{cli}"), edition, "system"
+            yield self._abs(f"/opt/visual-studio-{cli}/bin/{cli}"), edition, "system"
+            yield self._abs(f"/snap/bin/{cli}"), edition, "snap"
+            for exports in flatpak_exports:
+                yield os.path.join(exports, flatpak_id), edition, "flatpak"
+        # The .tar.gz build, extracted into the home directory
+        yield os.path.join(self.home, "VSCode-linux-x64", "bin", "code"), STABLE, "portable"
+
+    def candidates(self):
+        """
+        Yield (path, edition, kind) for every location VS Code may be installed at, in order.
+
+        Returns:
+            generator: Candidate locations; they are not checked for existence
+        """
+        if self.platform == "win32":
+            yield from self._windows_candidates()
+        elif self.platform == "darwin":
+            yield from self._mac_candidates()
+        else:
+            yield from self._linux_candidates()
+
+    def _explicit(self):
+        """VSCODE_PATH: an executable, or the folder of a portable install."""
+        path = self.environ.get("VSCODE_PATH")
+        if not path:
+            return None
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            kind = "portable" if os.path.isdir(os.path.join(path, "data")) else "explicit"
+            for name in ("Code.exe", "code", "bin/code", "Code - Insiders.exe", "code-insiders"):
+                candidate = os.path.join(path, name)
+                if os.path.isfile(candidate):
+                    return candidate, INSIDERS if "nsiders" in name else STABLE, kind
+            return None
+        return path, INSIDERS if "nsiders" in os.path.basename(path) else STABLE, "explicit"
+
+    def _registry_paths(self):
+        for command in self.registry() if self.platform == "win32" else []:
+            # e.g. "C:\...\Code.exe" "%1" -> the quoted executable
+            path = command.split('"')[1] if '"' in command else command.split()[0]
+            yield path, INSIDERS if "Insiders" in path else STABLE, "registry"
+
+    def _path_lookups(self):
+        for edition, command in ((STABLE, "code"), (INSIDERS, "code-insiders")):
+            path = self.which(command)
+            if path:
+                yield path, edition, "path"
+
+    def install_version(self, path, kind=None):
+        """
+        Read the version from the package.json shipped with an executable or CLI launcher.
+
+        Args:
+            path (str): Executable or launcher that was found
+            kind (str): Install kind; snap launchers live outside the install
+
+        Returns:
+            str: Version such as "1.95.3", or None when it cannot be found
+        """
+        manifests = []
+        if kind == "snap":
+            name = os.path.basename(path)
+            manifests.append(
+                self._abs(f"/snap/{name}/current/usr/share/{name}/resources/app/package.json")
+            )
+        directory = os.path.dirname(os.path.realpath(path))
+        for _ in range(5):
+            manifests += [
+                os.path.join(directory, "resources", "app", "package.json"),
+                os.path.join(directory, "package.json"),
+                # flatpak: exports/bin/<id> -> app/<id>/current/active/files/extra/vscode
+                os.path.join(directory, "files", "extra", "vscode", "resources", "app", "package.json"),
+            ]
+            directory = os.path.dirname(directory)
+
+        for manifest in manifests:
+            try:
+                with open(manifest, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(data, dict) and "code" in str(data.get("name", "")).lower():
+                return data.get("version")
+        return None
+
+    def discover(self):
+        """
+        Search every candidate location, without the index.
+
+        Returns:
+            EditorInstall: The first install found, or None
+        """
+        explicit = self._explicit()
+        sources = [explicit] if explicit else []
+        sources = (
+            sources
+            + list(self._path_lookups())
+            + list(self.candidates())
+            + list(self._registry_paths())
+        )
+        # Stable before Insiders, keeping each edition's order
+        sources.sort(key=lambda source: source[1] != STABLE and source[2] != "explicit")
+        for path, edition, kind in sources:
+            stat = self._stat(path)
+            if stat is not None:
+                return EditorInstall(
+                    path, edition, kind, self.install_version(path, kind), stat.st_mtime_ns
+                )
+        return None
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+            if data.get("platform") != self.platform or data.get("explicit") != self.environ.get("VSCODE_PATH"):
+                return None
+            return EditorInstall.from_dict(data["install"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_index(self, install):
+        with open(self.index_path, "w") as f:
+            json.dump(
+                {
+                    "platform": self.platform,
+                    "explicit": self.environ.get("VSCODE_PATH"),
+                    "install": install.to_dict(),
+                },
+                f,
+                indent=2,
+            )
+
+    def find(self):
+        """
+        Return the VS Code install, from the index when it is still valid.
+
+        Returns:
+            EditorInstall: The install, or None if VS Code is not installed
+        """
+        self.stats = 0
+        install = self._load_index()
+        if install is not None:
+            stat = self._stat(install.path)
+            if stat is not None and stat.st_mtime_ns == install.mtime_ns:
+                return install
+
+        install = self.discover()
+        if install is not None:
+            self._save_index(install)
+        return install
+
+
+def find_vscode_executable(discovery=None):
+    """
+    Find the VS Code executable on this machine.
+
+    Args:
+        discovery (VSCodeDiscovery): Discovery to use; the default for this platform when None
+
+    Returns:
+        str: Path of the executable or CLI launcher, or None if VS Code was not found
+    """
+    install = (discovery or VSCodeDiscovery()).find()
+    return install.path if install is not None else None
@@ -0,0 +1,377 @@
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+from automation_state import (
+    lock_abandoned,
+    process_alive,
+    remove_lock,
+    state_path,
+    write_lock_owner,
+)
+
+
+class PooledWindow:
+    """One pool slot: a VS Code instance with its own user data directory."""
+
+    def __init__(
+        self, slot, user_data_dir, folder=None, jobs=0, launched_at=None, owner=None, recycle=None
+    ):
+        self.slot = slot
+        self.user_data_dir = user_data_dir
+        self.folder = folder
+        self.jobs = jobs
+        self.launched_at = launched_at
+        # PID of the automation process using the window, or None when idle
+        self.owner = owner
+        # Why the window is restarted when it is next acquired, or None to reuse it warm
+        self.recycle = recycle
+
+    def to_dict(self):
+        return {
+            "slot": self.slot,
+            "user_data_dir": self.user_data_dir,
+            "folder": self.folder,
+            "jobs": self.jobs,
+            "launched_at": self.launched_at,
+            "owner": self.owner,
+            "recycle": self.recycle,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+class CodeCliLauncher:
+    """
+    Start, switch and stop pooled VS Code instances through the `code` command line.
+
+    Each window runs with its own --user-data-dir, so `code -r` always reuses
+    that window and no other, and one window can be recycled without touching
+    the rest. Extensions are shared; sign in to GitHub once in each slot.
+    """
+
+    def __init__(self, vscode_path):
+        self.vscode_path = vscode_path
+
+    def _command(self, window, *args):
+        return [self.vscode_path, "--user-data-dir", window.user_data_dir, *args]
+
+    def launch(self, window, folder):
+        subprocess.Popen(
+            self._command(window, "--new-window", folder),
+            shell=self.vscode_path.endswith(".cmd"),
+        )
+
+    def open_folder(self, window, folder):
+        """Switch the window to another folder; the window reloads in place."""
+        subprocess.run(
+            self._command(window, "-r", folder),
+            shell=self.vscode_path.endswith(".cmd"),
+            timeout=30,
+        )
+
+    def main_pid(self, window):
+        """PID of the instance's main process from code.lock, or None if unknown."""
+        try:
+            with open(os.path.join(window.user_data_dir, "code.lock"), "r") as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def is_alive(self, window):
+        """True/False when the instance's main process is known, None when it cannot be told."""
+        pid = self.main_pid(window)
+        return process_alive(pid) if pid is not None else None
+
+    def stop(self, window):
+        pid = self.main_pid(window)
+        if pid is None or not process_alive(pid):
+            return
+        if sys.platform == "win32":
+            subprocess.run(["taskkill", "/PID", str(pid), "/T", "/F"], capture_output=True)
+        else:
+            os.kill(pid, signal.SIGTERM)
+
+
+class VSCodePool:
+    """
+    Keep N VS Code windows launched, maximized and primed between jobs.
+
+    acquire() hands a job an idle, healthy window switched to the job's folder
+    with `code -r` (a warm start), or launches and prepares one (a cold start)
+    when no warm window is available. release() resets the window for the next
+    job and, once it has served `recycle_after` jobs or a job failed in it,
+    marks it for recycling; the restart happens when the window is next
+    acquired, straight into that job's folder, so the job that finished does
+    not wait for it. Every window handed out is in the same state, maximized
+    with the Copilot panel open and no terminal, whether it was launched for
+    the job, warmed up ahead or reused. The pool's slots are persisted under a
+    lock, so successive app.py processes on the same display (e.g. one per job
+    from orchestrator.py) share the same windows.
+    """
+
+    def __init__(
+        self,
+        launcher,
+        size=2,
+        recycle_after=20,
+        prepare=None,
+        reset=None,
+        ready=None,
+        path=None,
+        idle_folder=None,
+        launch_wait=10.0,
+        sleep=time.sleep,
+    ):
+        """
+        Args:
+            launcher (CodeCliLauncher): Starts, switches and stops windows
+            size (int): Windows kept in the pool
+            recycle_after (int): Jobs after which a window is restarted
+            prepare (callable): prepare(window) maximizes a newly launched window and
+                opens its Copilot panel
+            reset (callable): reset(window) closes the job's terminal and clears editors
+                and chat after a job
+            ready (callable): ready(window) waits until a launched window is up; a fixed
+                launch_wait sleep when None
+            path (str): Pool state file; vscode_pool_<display>.json in the state directory
+            idle_folder (str): Folder opened by windows launched ahead of any job
+            launch_wait (float): Seconds to let a launched window load when there is no ready probe
+            sleep (callable): Sleep function (injectable for simulations)
+        """
+        self.launcher = launcher
+        self.size = max(1, size)
+        self.recycle_after = max(1, recycle_after)
+        self.prepare = prepare
+        self.reset = reset
+        self.ready = ready
+        # Windows on another display belong to another pool, user data included
+        self.display = re.sub(r"\W", "_", os.getenv("DISPLAY") or "default")
+        self.path = path or state_path(f"vscode_pool_{self.display}.json")
+        self.idle_folder = idle_folder or os.path.dirname(state_path("vscode_pool", "idle", ".keep"))
+        self.launch_wait = launch_wait
+        self.sleep = sleep
+
+        self.warm_starts = 0
+        self.cold_starts = 0
+        self.recycled = 0
+        self.unhealthy = 0
+
+    @contextmanager
+    def _locked(self, timeout=60.0):
+        """
+        Hold the pool state's lock while reading and changing the slots.
+
+        The lock file names its owner's pid. It is only broken once that
+        process is gone, however long it is held: warm_up() launches windows
+        under the lock, and two processes changing the slots at once would
+        launch the same slot twice. `timeout` only applies to a lock without
+        a readable owner.
+        """
+        lock_path = self.path + ".lock"
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if lock_abandoned(lock_path, timeout):
+                    remove_lock(lock_path)
+                    continue
+                if deadline is not None and time.monotonic() >= deadline:
+                    print(f"⏳ Waiting for {lock_path}, held by a running process")
+                    deadline = None
+                time.sleep(0.05)
+                continue
+            write_lock_owner(fd)
+            break
+        try:
+            yield
+        finally:
+            remove_lock(lock_path)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, "r") as f:
+                return [PooledWindow.from_dict(data) for data in json.load(f)["windows"]]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Ignoring unreadable VS Code pool state {self.path}: {e}")
+            return []
+
+    def _save(self, windows):
+        with open(self.path, "w") as f:
+            json.dump({"windows": [window.to_dict() for window in windows]}, f, indent=2)
+
+    def _new_window(self, slot):
+        return PooledWindow(
+            slot, state_path("vscode_pool", self.display, f"slot{slot}", "user-data")
+        )
+
+    def healthy(self, window):
+        """A window is healthy unless its main process is known to have exited."""
+        return window.launched_at is not None and self.launcher.is_alive(window) is not False
+
+    def _idle(self, window):
+        return window.owner is None or not process_alive(window.owner)
+
+    def _launch(self, window, folder):
+        window.folder = folder
+        window.jobs = 0
+        window.launched_at = time.time()
+        window.recycle = None
+        self.launcher.launch(window, folder)
+
+    def acquire(self, folder):
+        """
+        Hand out a window showing `folder`.
+
+        Args:
+            folder (str): Project folder for the job
+
+        Returns:
+            tuple: (PooledWindow, warm) where warm is True if an already running window
+            was switched to the folder; (None, False) if every slot is busy
+        """
+        folder = os.path.abspath(folder)
+        with self._locked():
+            windows = self._load()
+            free = [window for window in windows if self._idle(window)]
+
+            # Prefer a healthy window that already shows the folder, then any healthy one
+            free.sort(key=lambda window: (window.folder != folder, window.slot))
+            window = next(
+                (window for window in free if window.recycle is None and self.healthy(window)), None
+            )
+            warm = window is not None
+            stale = False
+            if window is None:
+                used = {window.slot for window in windows}
+                if len(windows) < self.size:
+                    window = self._new_window(min(set(range(self.size)) - used))
+                    windows.append(window)
+                elif free:
+                    # Windows marked for recycling first, they are still running
+                    free.sort(key=lambda window: window.recycle is None)
+                    window = free[0]
+                    stale = True
+                    if window.recycle is not None:
+                        self.recycled += 1
+                        print(f"🔁 Recycling pooled window {window.slot} {window.recycle}")
+                    else:
+                        self.unhealthy += 1
+                        print(f"🩺 Pool window {window.slot} is not running, relaunching it")
+                else:
+                    print("⚠️ Every pooled VS Code window is busy")
+                    return None, False
+            window.owner = os.getpid()
+            self._save(windows)
+
+        if warm:
+            self.warm_starts += 1
+            if window.folder != folder:
+                print(f"♻️ Switching pooled window {window.slot} to {folder} (warm start)")
+                self.launcher.open_folder(window, folder)
+                window.folder = folder
+            else:
+                print(f"♻️ Pooled window {window.slot} already shows {folder} (warm start)")
+        else:
+            self.cold_starts += 1
+            if stale:
+                self.launcher.stop(window)
+            print(f"🧊 Launching pooled window {window.slot} with {folder} (cold start)")
+            self._launch(window, folder)
+            self._prepare(window)
+        self._update(window)
+        return window, warm
+
+    def release(self, window, healthy=True):
+        """
+        Return a window to the pool after a job, resetting it or marking it for recycling.
+
+        Args:
+            window (PooledWindow): Window from acquire()
+            healthy (bool): False if the job failed in a way that may have left the window broken
+        """
+        window.jobs += 1
+        if healthy and self.reset is not None:
+            try:
+                self.reset(window)
+            except Exception as e:
+                print(f"⚠️ Could not reset pooled window {window.slot}: {e}")
+                healthy = False
+
+        if not healthy:
+            window.recycle = "after a failed job"
+        elif window.jobs >= self.recycle_after:
+            window.recycle = f"after {window.jobs} jobs"
+        elif not self.healthy(window):
+            window.recycle = "after it stopped running"
+        if window.recycle is not None:
+            print(f"🔁 Pooled window {window.slot} will be recycled on its next use {window.recycle}")
+
+        window.owner = None
+        self._update(window)
+
+    def warm_up(self):
+        """Launch and prepare every missing, dead or to-be-recycled window now, ahead of the first job."""
+        with self._locked():
+            windows = self._load()
+            slots = {window.slot: window for window in windows}
+            for slot in range(self.size):
+                if slot not in slots:
+                    slots[slot] = self._new_window(slot)
+            started = [
+                window
+                for window in slots.values()
+                if self._idle(window) and (window.recycle is not None or not self.healthy(window))
+            ]
+            for window in started:
+                if window.recycle is not None:
+                    self.recycled += 1
+                    self.launcher.stop(window)
+                self._launch(window, self.idle_folder)
+            self._save(sorted(slots.values(), key=lambda window: window.slot))
+
+        for window in started:
+            print(f"🔥 Warming pooled window {window.slot}")
+            self._prepare(window)
+            self._update(window)
+        return len(started)
+
+    def _prepare(self, window):
+        if self.ready is not None:
+            self.ready(window)
+        else:
+            self.sleep(self.launch_wait)
+        if self.prepare is not None:
+            try:
+                self.prepare(window)
+            except Exception as e:
+                print(f"⚠️ Could not prepare pooled window {window.slot}: {e}")
+
+    def _update(self, window):
+        with self._locked():
+            windows = [other for other in self._load() if other.slot != window.slot]
+            windows.append(window)
+            self._save(sorted(windows, key=lambda other: other.slot))
+
+    def shutdown(self):
+        """Stop every pooled window and forget the pool."""
+        with self._locked():
+            for window in self._load():
+                self.launcher.stop(window)
+            self._save([])
+
+    def summary(self):
+        return (
+            f"{self.warm_starts} warm starts, {self.cold_starts} cold starts, "
+            f"{self.recycled} recycled, {self.unhealthy} relaunched after failing health checks"
+        )
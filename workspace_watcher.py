@@ -0,0 +1,336 @@
+import difflib
+import fnmatch
+import json
+import os
+import threading
+import time
+
+# Paths inside the workspace that change without Copilot writing code
+DEFAULT_IGNORE = (
+    ".git",
+    "__pycache__",
+    ".venv",
+    "venv",
+    "node_modules",
+    ".pytest_cache",
+    "*.pyc",
+    "*.swp",
+    "*~",
+    ".#*",
+)
+
+# Text files up to this size are kept at start so modified files can be diffed
+MAX_BASELINE_BYTES = 512 * 1024
+
+
+def _read_text(path):
+    try:
+        if os.path.getsize(path) > MAX_BASELINE_BYTES:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+class FileChange:
+    """One file Copilot created, modified or deleted, with its line counts."""
+
+    def __init__(self, path, status, size=None, lines_added=0, lines_removed=0, diff=None):
+        """
+        Args:
+            path (str): Path relative to the workspace, with forward slashes
+            status (str): "created", "modified" or "deleted"
+            size (int): Size in bytes after the change, None when deleted
+            lines_added (int): Lines added (all lines of a created text file)
+            lines_removed (int): Lines removed
+            diff (str): Unified diff for text files, None otherwise
+        """
+        self.path = path
+        self.status = status
+        self.size = size
+        self.lines_added = lines_added
+        self.lines_removed = lines_removed
+        self.diff = diff
+
+    def to_dict(self, include_diff=False):
+        data = {
+            "path": self.path,
+            "status": self.status,
+            "size": self.size,
+            "lines_added": self.lines_added,
+            "lines_removed": self.lines_removed,
+        }
+        if include_diff:
+            data["diff"] = self.diff
+        return data
+
+
+class WorkspaceWatcher:
+    """
+    Watch the project folder for the files Copilot writes and report when edits go quiet.
+
+    The watcher is started just before the prompt is sent, so its baseline is
+    the workspace as it was before Copilot touched it. Changes are picked up
+    from watchdog's native file-system events (inotify, FSEvents,
+    ReadDirectoryChangesW) when watchdog is installed, or by rescanning file
+    sizes and modification times at most every `poll_interval` seconds. Once
+    at least one file has changed and nothing has changed for `quiet`
+    seconds, the edits have settled, which the Keep-button loop uses as its
+    completion signal. manifest() lists what was created, modified and
+    deleted against the baseline, with unified diffs of text files.
+    """
+
+    def __init__(
+        self,
+        root,
+        quiet=3.0,
+        poll_interval=0.5,
+        ignore=DEFAULT_IGNORE,
+        backend="auto",
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            root (str): Workspace folder to watch
+            quiet (float): Seconds without changes after which edits count as settled
+            poll_interval (float): Seconds between rescans with the polling backend
+            ignore (tuple): fnmatch patterns of file and folder names to skip
+            backend (str): "watchdog", "polling" or "auto" (watchdog when installed)
+            clock (callable): Monotonic time source
+        """
+        self.root = os.path.abspath(root)
+        self.quiet = quiet
+        self.poll_interval = poll_interval
+        self.ignore = tuple(ignore)
+        self.requested_backend = backend
+        self.backend = None
+        self.clock = clock
+
+        self.started_at = None
+        self.first_change_at = None
+        self.last_change_at = None
+        self.settled_at = None
+        self.events = 0
+        self.scans = 0
+        self._baseline = {}
+        self._baseline_text = {}
+        self._snapshot = {}
+        self._last_scan_at = None
+        self._observer = None
+        self._lock = threading.Lock()
+
+    def _ignored(self, name):
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.ignore)
+
+    def _relative(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def _ignored_path(self, path):
+        return any(self._ignored(part) for part in self._relative(path).split("/"))
+
+    def scan(self):
+        """
+        Stat every file in the workspace.
+
+        Returns:
+            dict: relative path -> (size, mtime_ns)
+        """
+        self.scans += 1
+        snapshot = {}
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if self._ignored(entry.name):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        snapshot[self._relative(entry.path)] = (stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    continue
+        return snapshot
+
+    def _start_watchdog(self):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory or event.event_type in ("opened", "closed_no_write"):
+                    return
+                paths = [event.src_path, getattr(event, "dest_path", "") or event.src_path]
+                if all(watcher._ignored_path(path) for path in paths):
+                    return
+                watcher._record_change()
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), self.root, recursive=True)
+        self._observer.start()
+
+    def _record_change(self):
+        with self._lock:
+            now = self.clock()
+            self.events += 1
+            if self.first_change_at is None:
+                self.first_change_at = now
+            self.last_change_at = now
+            self.settled_at = None
+
+    def start(self):
+        """Take the baseline and start watching."""
+        self.started_at = self.clock()
+        self._baseline = self.scan()
+        self._snapshot = dict(self._baseline)
+        self._last_scan_at = self.started_at
+        self._baseline_text = {
+            path: _read_text(os.path.join(self.root, path)) for path in self._baseline
+        }
+
+        self.backend = "polling"
+        if self.requested_backend in ("auto", "watchdog"):
+            try:
+                self._start_watchdog()
+                self.backend = "watchdog"
+            except ImportError:
+                if self.requested_backend == "watchdog":
+                    print("⚠️ watchdog is not installed, watching the workspace by polling")
+            except OSError as e:
+                print(f"⚠️ Could not watch {self.root} natively ({e}), polling instead")
+        print(f"📂 Watching {self.root} for generated files ({self.backend})")
+        return self
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+
+    def check(self):
+        """
+        Pick up changes and report whether the edits have settled.
+
+        Returns:
+            bool: True once files have changed and then stayed unchanged for `quiet` seconds
+        """
+        now = self.clock()
+        if self.backend == "polling" and now - self._last_scan_at >= self.poll_interval:
+            self._last_scan_at = now
+            snapshot = self.scan()
+            if snapshot != self._snapshot:
+                self._snapshot = snapshot
+                self._record_change()
+
+        with self._lock:
+            if self.last_change_at is None:
+                return False
+            settled = now - self.last_change_at >= self.quiet
+            if settled and self.settled_at is None:
+                self.settled_at = now
+            return settled
+
+    @property
+    def changed(self):
+        return self.first_change_at is not None
+
+    @property
+    def idle_seconds(self):
+        """Seconds since the watcher started without any change, or 0 once files changed."""
+        return 0.0 if self.changed else self.clock() - self.started_at
+
+    def manifest(self):
+        """
+        Compare the workspace with the baseline taken at start().
+
+        Returns:
+            list: FileChange for every created, modified and deleted file, by path
+        """
+        current = self.scan()
+        changes = []
+        for path in sorted(set(self._baseline) | set(current)):
+            before = self._baseline.get(path)
+            after = current.get(path)
+            if before == after:
+                continue
+            full_path = os.path.join(self.root, path)
+            old_text = self._baseline_text.get(path) if before is not None else ""
+            new_text = _read_text(full_path) if after is not None else ""
+            if before is None:
+                status = "created"
+            elif after is None:
+                status = "deleted"
+            elif old_text is not None and old_text == new_text:
+                continue  # touched but unchanged
+            else:
+                status = "modified"
+
+            change = FileChange(path, status, size=after[0] if after else None)
+            if old_text is not None and new_text is not None:
+                diff = list(
+                    difflib.unified_diff(
+                        old_text.splitlines(keepends=True),
+                        new_text.splitlines(keepends=True),
+                        fromfile=f"a/{path}" if before else "/dev/null",
+                        tofile=f"b/{path}" if after else "/dev/null",
+                    )
+                )
+                change.lines_added = sum(
+                    1 for line in diff if line.startswith("+") and not line.startswith("+++")
+                )
+                change.lines_removed = sum(
+                    1 for line in diff if line.startswith("-") and not line.startswith("---")
+                )
+                change.diff = "".join(diff)
+            changes.append(change)
+        return changes
+
+    def write_manifest(self, path, changes=None):
+        """Write the manifest with diffs as JSON, e.g. for a job's artifacts."""
+        changes = self.manifest() if changes is None else changes
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"workspace": self.root, "files": [change.to_dict(include_diff=True) for change in changes]},
+                f,
+                indent=2,
+            )
+
+    def metrics(self, changes=None):
+        changes = self.manifest() if changes is None else changes
+
+        def since_start(moment):
+            return round(moment - self.started_at, 3) if moment is not None else None
+
+        return {
+            "backend": self.backend,
+            "quiet_seconds": self.quiet,
+            "first_change_seconds": since_start(self.first_change_at),
+            "last_change_seconds": since_start(self.last_change_at),
+            "settled_seconds": since_start(self.settled_at),
+            "scans": self.scans,
+            "events": self.events,
+            "files": [change.to_dict() for change in changes],
+        }
+
+    def summary(self, changes=None):
+        changes = self.manifest() if changes is None else changes
+        counts = {}
+        for change in changes:
+            counts[change.status] = counts.get(change.status, 0) + 1
+        files = ", ".join(f"{count} {status}" for status, count in counts.items()) or "no files changed"
+        added = sum(change.lines_added for change in changes)
+        removed = sum(change.lines_removed for change in changes)
+        settled = (
+            f", settled {self.settled_at - self.started_at:.1f}s after the prompt"
+            if self.settled_at is not None
+            else ""
+        )
+        return f"{files} (+{added}/-{removed} lines){settled}"